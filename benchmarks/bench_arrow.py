@@ -0,0 +1,62 @@
+"""Compare feeding an Arrow string column to a kernel with and without copies.
+
+The ``to_pylist`` path converts the column to Python strings and calls
+``helloworld`` on each; the view path wraps the Arrow buffers with
+``numba_extras.arrow.from_arrow`` and runs the same loop in ``@njit`` code,
+decoding each string from its UTF-8 bytes.
+
+    $ python benchmarks/bench_arrow.py
+"""
+
+import timeit
+
+import numpy as np
+import pyarrow as pa
+from numba import get_num_threads, njit
+
+from numba_extras.arrow import from_arrow, is_valid, value
+from numba_extras.helloworld import helloworld
+
+SIZES = [1 << 12, 1 << 16, 1 << 20]
+
+
+@njit
+def greet_lengths(col):
+    total = 0
+    for i in range(col.length):
+        if is_valid(col, i):
+            total += len(helloworld(value(col, i)))
+    return total
+
+
+def greet_pylist(arr):
+    total = 0
+    for s in arr.to_pylist():
+        if s is not None:
+            total += len(helloworld(s))
+    return total
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    print("threads:", get_num_threads())
+    rs = np.random.RandomState(0)
+    for size in SIZES:
+        words = ["word{}".format(v) for v in rs.randint(0, 1 << 20, size)]
+        arr = pa.array(words, mask=rs.rand(size) < 0.1)
+        assert greet_lengths(from_arrow(arr)) == greet_pylist(arr)
+        wrap = _best(lambda: from_arrow(arr))
+        view = _best(lambda: greet_lengths(from_arrow(arr)))
+        pylist = _best(lambda: greet_pylist(arr))
+        print(
+            "{:>8} strings  from_arrow {:.2e}s  view+njit {:.2e}s  "
+            "to_pylist {:.2e}s".format(size, wrap, view, pylist)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare an atomic histogram with per-thread buffers.
+
+Both kernels bin the same values under ``prange``. The atomic version adds
+into one shared array with ``atomic_add``; the buffered version gives every
+thread its own row and sums the rows at the end. Few bins means heavy
+contention on the shared counters.
+
+    $ python benchmarks/bench_atomic.py
+"""
+
+import timeit
+
+import numpy as np
+from numba import get_num_threads, get_thread_id, njit, prange
+
+from numba_extras.atomic import atomic_add
+
+SIZES = [1 << 16, 1 << 20, 1 << 23]
+BINS = [8, 1024, 1 << 16]
+
+
+@njit(parallel=True)
+def atomic_histogram(x, bins):
+    out = np.zeros(bins, np.int64)
+    for i in prange(x.shape[0]):
+        atomic_add(out, x[i], 1)
+    return out
+
+
+@njit(parallel=True)
+def buffered_histogram(x, bins):
+    local = np.zeros((get_num_threads(), bins), np.int64)
+    for i in prange(x.shape[0]):
+        local[get_thread_id(), x[i]] += 1
+    return local.sum(axis=0)
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    print("threads:", get_num_threads())
+    rs = np.random.RandomState(0)
+    for size in SIZES:
+        for bins in BINS:
+            x = rs.randint(0, bins, size).astype(np.int64)
+            assert np.array_equal(atomic_histogram(x, bins), np.bincount(x, None, bins))
+            atomic = _best(lambda: atomic_histogram(x, bins))
+            buffered = _best(lambda: buffered_histogram(x, bins))
+            print(
+                "{:>8} values {:>6} bins  atomic {:.2e}s  buffered {:.2e}s".format(
+                    size, bins, atomic, buffered
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare combining masks as Bitsets with NumPy bool arrays.
+
+Each case evaluates ``(a & b) | ~c`` and counts the result. The bool arrays
+use one byte per element; the Bitset packs 64 elements per word. The sparse
+case also builds RoaringBitmaps with 0.1% of positions set and evaluates
+``(a & b) | c`` on them.
+
+    $ python benchmarks/bench_bitset.py
+"""
+
+import timeit
+
+import numpy as np
+from numba import njit
+
+from numba_extras.bitset import bitset_from_bool, roaring_from_indices
+
+SIZES = [1 << 16, 1 << 20, 1 << 24]
+
+
+@njit
+def bitset_combine(a, b, c):
+    return ((a & b) | ~c).count()
+
+
+@njit
+def roaring_combine(a, b, c):
+    return ((a & b) | c).count()
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    rs = np.random.RandomState(0)
+    for size in SIZES:
+        m = [rs.rand(size) < 0.5 for _ in range(3)]
+        b = [bitset_from_bool(x) for x in m]
+        assert bitset_combine(*b) == ((m[0] & m[1]) | ~m[2]).sum()
+        numpy = _best(lambda: ((m[0] & m[1]) | ~m[2]).sum())
+        bits = _best(lambda: bitset_combine(*b))
+        print(
+            "{:>9} dense   numpy {:.2e}s ({} B)  bitset {:.2e}s ({} B)".format(
+                size, numpy, m[0].nbytes, bits, b[0].words.nbytes
+            )
+        )
+        m = [rs.rand(size) < 0.001 for _ in range(3)]
+        r = [roaring_from_indices(np.flatnonzero(x)) for x in m]
+        assert roaring_combine(*r) == ((m[0] & m[1]) | m[2]).sum()
+        numpy = _best(lambda: ((m[0] & m[1]) | m[2]).sum())
+        roaring = _best(lambda: roaring_combine(*r))
+        nbytes = r[0].values.nbytes + r[0].words.nbytes
+        print(
+            "{:>9} sparse  numpy {:.2e}s ({} B)  roaring {:.2e}s ({} B)".format(
+                size, numpy, m[0].nbytes, roaring, nbytes
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Compression ratio and throughput of numba_extras.codecs.
+
+The input is a sorted int64 ID array with random gaps. Each codec is
+timed encoding and decoding it; throughput is in MB/s of uncompressed
+data. When pyarrow is built with LZ4, its C implementation of the same
+block format is listed for reference.
+
+    $ python benchmarks/bench_codecs.py
+"""
+
+import timeit
+
+import numpy as np
+from numba import get_num_threads
+
+from numba_extras.codecs import (
+    bitpack,
+    bitunpack,
+    delta_decode,
+    delta_encode,
+    lz4_compress,
+    lz4_compress_blocks,
+    lz4_decompress,
+    lz4_decompress_blocks,
+    rle_decode,
+    rle_encode,
+)
+
+SIZE = 1 << 23
+GAP = 64
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def _codecs(ids):
+    codecs = {
+        "delta+bitpack": (
+            lambda: bitpack(delta_encode(ids)),
+            lambda p: delta_decode(bitunpack(p)),
+            lambda p: p.refs.nbytes + p.widths.nbytes + p.words.nbytes,
+        ),
+        "rle": (
+            lambda: rle_encode(ids // 256),
+            lambda p: rle_decode(*p),
+            lambda p: p[0].nbytes + p[1].nbytes,
+        ),
+        "lz4": (
+            lambda: lz4_compress(ids),
+            lambda p: lz4_decompress(p, ids.nbytes),
+            lambda p: p.nbytes,
+        ),
+        "lz4 blocks": (
+            lambda: lz4_compress_blocks(ids),
+            lz4_decompress_blocks,
+            lambda p: p.data.nbytes,
+        ),
+        "delta+lz4 blocks": (
+            lambda: lz4_compress_blocks(delta_encode(ids)),
+            lambda p: delta_decode(lz4_decompress_blocks(p).view(np.int64)),
+            lambda p: p.data.nbytes,
+        ),
+    }
+    try:
+        import pyarrow as pa
+
+        if pa.Codec.is_available("lz4_raw"):
+            codec = pa.Codec("lz4_raw")
+            codecs["arrow lz4_raw"] = (
+                lambda: codec.compress(ids),
+                lambda p: codec.decompress(p, ids.nbytes),
+                lambda p: p.size,
+            )
+    except ImportError:
+        pass
+    return codecs
+
+
+def main():
+    print("threads:", get_num_threads())
+    rs = np.random.RandomState(0)
+    ids = np.cumsum(rs.randint(1, GAP, SIZE)).astype(np.int64)
+    mb = ids.nbytes / 1e6
+    for name, (encode, decode, size) in _codecs(ids).items():
+        packed = encode()
+        enc = _best(encode)
+        dec = _best(lambda: decode(packed))
+        print(
+            "{:<18} ratio {:6.2f}  encode {:7.0f} MB/s  decode {:7.0f} MB/s".format(
+                name, ids.nbytes / size(packed), mb / enc, mb / dec
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""Compare numba_extras.encode.factorize with pandas.factorize.
+
+$ python benchmarks/bench_encode.py
+"""
+
+import timeit
+
+import numpy as np
+import pandas as pd
+from numba import get_num_threads
+
+from numba_extras.encode import factorize
+
+N = 1 << 21
+CARDINALITIES = [100, 10000, 1000000]
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    print("threads:", get_num_threads())
+    rs = np.random.RandomState(0)
+    for card in CARDINALITIES:
+        ints = rs.randint(0, card, N)
+        words = np.array(["key-{}".format(i) for i in range(card)])[ints]
+        objects = words.astype(object)
+        rows = [
+            ("int64", lambda: factorize(ints), lambda: pd.factorize(ints)),
+            ("str", lambda: factorize(words), lambda: pd.factorize(objects)),
+        ]
+        for name, ours, theirs in rows:
+            print(
+                "{:>8} distinct {:<6} factorize {:.3f}s  pandas {:.3f}s".format(
+                    card, name, _best(ours), _best(theirs)
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compare formula evaluation with NumPy, pandas.eval and numba_extras.expr.
+
+An arithmetic formula and one calling ``log1p`` and ``sqrt`` are each
+evaluated over three columns by eager NumPy (one temporary per operator),
+``pandas.eval`` when pandas is installed (numexpr is used if it is
+installed too), and an ``expr.compile``-d formula, both with its kernel
+cached and including the first compilation. The last line times
+``compile`` plus evaluation of 20 distinct formulas against cache hits
+on small columns, which is the per-request cost of a service that
+receives formulas as text.
+
+    $ python benchmarks/bench_expr.py
+"""
+
+import timeit
+
+import numpy as np
+from numba import get_num_threads
+
+from numba_extras import expr
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+SIZES = [1 << 12, 1 << 16, 1 << 20, 1 << 23]
+FORMULAS = {
+    "px * qty + fee * px / (11 + qty)": lambda px, qty, fee: (
+        px * qty + fee * px / (11 + qty)
+    ),
+    "px * qty + log1p(fee) * sqrt(px) / (1 + abs(qty))": lambda px, qty, fee: (
+        px * qty + np.log1p(fee) * np.sqrt(px) / (1 + np.abs(qty))
+    ),
+}
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    print("threads:", get_num_threads())
+    rs = np.random.RandomState(0)
+    for formula, eager in FORMULAS.items():
+        print(formula)
+        for size in SIZES:
+            c = {
+                "px": rs.rand(size) * 100,
+                "qty": rs.randint(-10, 10, size),
+                "fee": rs.rand(size),
+            }
+            expected = eager(**c)
+            expr.clear_cache()
+            start = timeit.default_timer()
+            np.testing.assert_allclose(expr.compile(formula)(c), expected)
+            first = timeit.default_timer() - start
+            times = [
+                _best(lambda: eager(**c)),
+                _best(lambda: expr.compile(formula)(c)),
+                first,
+            ]
+            line = "{:>8} rows  numpy {:.2e}s  expr {:.2e}s  (first call {:.2e}s)"
+            if pd is not None:
+                frame = pd.DataFrame(c)
+                line += "  pandas.eval {:.2e}s"
+                times.append(_best(lambda: frame.eval(formula)))
+            print(line.format(size, *times))
+    c = {"px": np.ones(100), "qty": np.ones(100, np.int64), "fee": np.ones(100)}
+    formulas = ["px * {} + qty".format(k) for k in range(20)]
+    start = timeit.default_timer()
+    for text in formulas:
+        expr.compile(text)(c)
+    cold = (timeit.default_timer() - start) / len(formulas)
+    start = timeit.default_timer()
+    for text in formulas:
+        expr.compile(text)(c)
+    warm = (timeit.default_timer() - start) / len(formulas)
+    print(
+        "per formula on 100 rows: new {:.2e}s  cached {:.2e}s  ({})".format(
+            cold, warm, expr.cache_info()
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""Compare a fused chain with eager NumPy in time and peak memory.
+
+The pipeline squares a float64 array, adds one, keeps the values whose
+remainder modulo 3 is below 1 and either sums them or collects them. NumPy
+evaluates it with a temporary array per step; ``fuse.lazy`` runs it as one
+loop. Every variant runs in a fresh process, which reports the growth of
+its peak resident set over the input array after a warm-up run; outside
+Linux the peak cannot be reset and includes the compilation.
+
+    $ python benchmarks/bench_fuse.py
+"""
+
+import resource
+import subprocess
+import sys
+import timeit
+
+import numpy as np
+from numba import get_num_threads, njit
+
+from numba_extras.fuse import lazy
+
+SIZES = [1 << 16, 1 << 20, 1 << 24]
+
+
+@njit
+def shifted_square(v):
+    return v * v + 1.0
+
+
+@njit
+def low_remainder(v):
+    return v % 3.0 < 1.0
+
+
+def numpy_sum(x):
+    y = x * x + 1.0
+    return y[y % 3.0 < 1.0].sum()
+
+
+def numpy_collect(x):
+    y = x * x + 1.0
+    return y[y % 3.0 < 1.0]
+
+
+def _chain(x, parallel):
+    return lazy(x, parallel=parallel).map(shifted_square).filter(low_remainder)
+
+
+VARIANTS = {
+    "numpy sum": numpy_sum,
+    "fused sum": lambda x: _chain(x, False).sum(),
+    "parallel sum": lambda x: _chain(x, True).sum(),
+    "numpy collect": numpy_collect,
+    "fused collect": lambda x: _chain(x, False).to_array(),
+}
+
+
+def _reset_peak():
+    # Linux only: the warm-up's compilation needs more memory than any of
+    # the variants, so its peak would hide theirs.
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+
+def _peak_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _data(size):
+    # Scaled in place, so that making the input leaves no higher peak.
+    x = np.random.RandomState(0).rand(size)
+    x *= 100
+    return x
+
+
+def _measure(name, size):
+    x = _data(size)
+    fn = VARIANTS[name]
+    small = x[:1000]
+    fn(small)
+    _reset_peak()
+    base = _peak_mb()
+    elapsed = min(timeit.repeat(lambda: fn(x), number=1, repeat=3))
+    print(elapsed, _peak_mb() - base)
+
+
+def main():
+    print("threads:", get_num_threads())
+    for size in SIZES:
+        x = _data(size)
+        assert np.isclose(_chain(x, True).sum(), numpy_sum(x))
+        cells = []
+        for name in VARIANTS:
+            out = subprocess.run(
+                [sys.executable, __file__, name, str(size)],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.split()
+            cells.append("{} {:.2e}s +{:.0f} MB".format(name, *map(float, out)))
+        print("{:>8} rows  input {:.0f} MB".format(size, x.nbytes / 2**20))
+        print("    " + "\n    ".join(cells))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3:
+        _measure(sys.argv[1], int(sys.argv[2]))
+    else:
+        main()
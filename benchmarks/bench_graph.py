@@ -0,0 +1,82 @@
+"""Compare numba_extras.graph with scipy.sparse.csgraph.
+
+Runs on a random undirected graph with about 16 edges per vertex (counted
+in both directions). PageRank and triangle counting have no csgraph
+equivalent, so only their times are printed.
+
+    $ python benchmarks/bench_graph.py
+"""
+
+import timeit
+
+import numpy as np
+import scipy.sparse.csgraph as csgraph
+from numba import get_num_threads
+
+from numba_extras.graph import (
+    bfs,
+    connected_components,
+    dijkstra,
+    pagerank,
+    triangle_count,
+)
+from numba_extras.sparse import coo_to_csr, to_scipy
+
+SIZES = [1 << 16, 1 << 20]
+DEGREE = 8
+
+
+def _best(fn, repeat=3):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    print("threads:", get_num_threads())
+    rs = np.random.RandomState(0)
+    for n in SIZES:
+        rows = rs.randint(0, n, n * DEGREE)
+        cols = rs.randint(0, n, n * DEGREE)
+        weights = rs.rand(n * DEGREE)
+        g = coo_to_csr(
+            np.concatenate([rows, cols]),
+            np.concatenate([cols, rows]),
+            np.concatenate([weights, weights]),
+            (n, n),
+        )
+        s = to_scipy(g)
+        cases = [
+            (
+                "bfs",
+                lambda: csgraph.breadth_first_order(s, 0),
+                lambda: bfs(g, 0),
+            ),
+            (
+                "components",
+                lambda: csgraph.connected_components(s, directed=False),
+                lambda: connected_components(g),
+            ),
+            (
+                "dijkstra",
+                lambda: csgraph.dijkstra(s, indices=0),
+                lambda: dijkstra(g, 0),
+            ),
+            ("pagerank", None, lambda: pagerank(g)),
+            ("triangles", None, lambda: triangle_count(g)),
+        ]
+        print("{} vertices, {} stored edges".format(n, g.indices.shape[0]))
+        for name, scipy_fn, numba_fn in cases:
+            numba = _best(numba_fn)
+            if scipy_fn is None:
+                print("  {:<11} numba {:.2e}s".format(name, numba))
+                continue
+            scipy = _best(scipy_fn)
+            print(
+                "  {:<11} scipy {:.2e}s  numba {:.2e}s  ({:.1f}x)".format(
+                    name, scipy, numba, scipy / numba
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
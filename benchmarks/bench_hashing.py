@@ -0,0 +1,54 @@
+"""Throughput of numba_extras.hashing against Python's hash and hashlib.
+
+Python caches the hash of a str object after the first call, so the
+"python hash strs" row only measures lookups of cached hashes.
+
+$ python benchmarks/bench_hashing.py
+"""
+
+import hashlib
+import timeit
+
+import numpy as np
+from numba import get_num_threads
+
+from numba_extras.hashing import hash_column, murmur3_32, xxh64
+
+BUFFER = 1 << 26
+COLUMN = 1 << 22
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    print("threads:", get_num_threads())
+    data = np.random.RandomState(0).randint(0, 256, BUFFER).astype(np.uint8)
+    raw = data.tobytes()
+    cases = {
+        "xxh64": lambda: xxh64(data),
+        "murmur3_32": lambda: murmur3_32(data),
+        "python hash": lambda: hash(raw[1:]),
+        "hashlib.md5": lambda: hashlib.md5(raw).digest(),
+        "hashlib.blake2b": lambda: hashlib.blake2b(raw).digest(),
+    }
+    for name, fn in cases.items():
+        print("{:<16} {:6.2f} GB/s".format(name, BUFFER / _best(fn) / 1e9))
+
+    ints = np.arange(COLUMN, dtype=np.int64)
+    words = np.array(["user-{}".format(i) for i in range(COLUMN // 16)])
+    listed = words.tolist()
+    columns = {
+        "int64 column": (lambda: hash_column(ints), COLUMN),
+        "python hash ints": (lambda: [hash(v) for v in ints.tolist()], COLUMN),
+        "str column": (lambda: hash_column(words), words.shape[0]),
+        "python hash strs": (lambda: [hash(w) for w in listed], words.shape[0]),
+    }
+    for name, (fn, n) in columns.items():
+        print("{:<16} {:8.1f} Mitems/s".format(name, n / _best(fn) / 1e6))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Compare serial shard reads with numba_extras.io.parallel_read.
+
+Writes ``SHARDS`` files of ``SHARD_SIZE`` random bytes to a temporary
+directory, then reads them all and runs a jitted checksum over each, once
+with ``np.fromfile`` in a loop and once with ``parallel_read`` at several
+prefetch depths. "cold" runs first evict the files from the page cache
+with ``posix_fadvise`` where available; "warm" runs read cached pages.
+
+    $ python benchmarks/bench_io.py [directory]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+
+import numpy as np
+from numba import get_num_threads, njit
+
+from numba_extras.io import parallel_read
+
+SHARDS = 128
+SHARD_SIZE = 4 << 20
+PREFETCH = [1, 4, 16]
+
+
+@njit(nogil=True)
+def checksum(data):
+    total = np.uint64(0)
+    for b in data:
+        total += b
+    return total
+
+
+def serial_read(paths):
+    return [checksum(np.fromfile(p, np.uint8)) for p in paths]
+
+
+def _evict(paths):
+    if not hasattr(os, "posix_fadvise"):
+        return False
+    for p in paths:
+        fd = os.open(p, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    return True
+
+
+def _time(fn, paths, cold, repeat=3):
+    fn()
+    best = float("inf")
+    for _ in range(repeat):
+        if cold:
+            _evict(paths)
+        best = min(best, timeit.timeit(fn, number=1))
+    return best
+
+
+def main():
+    print("threads:", get_num_threads())
+    with tempfile.TemporaryDirectory(
+        dir=sys.argv[1] if len(sys.argv) > 1 else None
+    ) as tmp:
+        rs = np.random.RandomState(0)
+        paths = []
+        for i in range(SHARDS):
+            path = os.path.join(tmp, "shard{}.bin".format(i))
+            rs.randint(0, 256, SHARD_SIZE).astype(np.uint8).tofile(path)
+            paths.append(path)
+        gb = SHARDS * SHARD_SIZE / 1e9
+        modes = ["warm", "cold"] if _evict(paths) else ["warm"]
+        for mode in modes:
+            cold = mode == "cold"
+            t = _time(lambda: serial_read(paths), paths, cold)
+            print("{} serial          {:.2f} GB/s".format(mode, gb / t))
+            for depth in PREFETCH:
+                t = _time(
+                    lambda: parallel_read(paths, checksum, prefetch=depth), paths, cold
+                )
+                print("{} prefetch {:>3}    {:.2f} GB/s".format(mode, depth, gb / t))
+
+
+if __name__ == "__main__":
+    main()
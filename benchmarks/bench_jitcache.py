@@ -0,0 +1,79 @@
+"""Measure the time and memory of rebuilding jitted closures per request.
+
+A service handles a stream of requests, each needing a kernel that closes
+over one of ``DISTINCT`` constants. Without a cache it compiles a new
+closure for every request; with a ``JitCache`` large enough for the
+working set it compiles each distinct kernel once; with one smaller than
+the working set, cycling through the constants evicts every entry before
+it is reused. The memory column is the growth of the resident set.
+Eviction gives back the memory of the dispatchers it drops, but not of
+their machine code, which numba keeps mapped for the life of the process.
+
+    $ python benchmarks/bench_jitcache.py
+"""
+
+import resource
+import timeit
+
+import numpy as np
+from numba import get_num_threads, njit
+
+from numba_extras.jitcache import JitCache
+
+REQUESTS = 60
+DISTINCT = 6
+
+
+def weighted(k):
+    def kernel(x):
+        s = 0.0
+        for i in range(x.shape[0]):
+            s += np.sin(x[i] * k) + x[i] ** 2
+        return s
+
+    return kernel
+
+
+def _rss_mb():
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * resource.getpagesize() / 2**20
+    except OSError:
+        # The peak, which is all other systems report.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _serve(get):
+    x = np.arange(1000.0)
+    rss = _rss_mb()
+    start = timeit.default_timer()
+    for r in range(REQUESTS):
+        get(float(r % DISTINCT))(x)
+    return timeit.default_timer() - start, _rss_mb() - rss
+
+
+def main():
+    print("threads:", get_num_threads())
+    print("{} requests over {} constants".format(REQUESTS, DISTINCT))
+    elapsed, grown = _serve(lambda k: njit(weighted(k)))
+    print("  njit per request  {:.2f}s  +{:.0f} MB".format(elapsed, grown))
+    for maxsize in (DISTINCT, DISTINCT // 2):
+        cache = JitCache(maxsize=maxsize)
+        elapsed, grown = _serve(lambda k: cache.get(weighted, k))
+        stats = cache.stats()
+        print(
+            "  JitCache({})  {:.2f}s  +{:.0f} MB  hits {}  misses {}  "
+            "evictions {}  compile time {:.2f}s".format(
+                maxsize,
+                elapsed,
+                grown,
+                stats.hits,
+                stats.misses,
+                stats.evictions,
+                stats.compile_time,
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare numba_extras.random with NumPy's Generator.
+
+``uniform`` fills an array in parallel from per-block Philox streams;
+NumPy fills it from one Philox generator on one thread. The shuffle and
+weighted-choice cases run on one thread in both.
+
+    $ python benchmarks/bench_random.py
+"""
+
+import timeit
+
+import numpy as np
+from numba import get_num_threads
+
+from numba_extras.random import Philox, choice, shuffle, uniform
+
+SIZES = [1 << 16, 1 << 20, 1 << 24]
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def _report(name, size, numpy, numba):
+    print(
+        "{:<16} {:>9}  numpy {:.2e}s  numba {:.2e}s  ({:.1f}x)".format(
+            name, size, numpy, numba, numpy / numba
+        )
+    )
+
+
+def main():
+    print("threads:", get_num_threads())
+    gen = np.random.Generator(np.random.Philox(1))
+    rng = Philox(1)
+    for size in SIZES:
+        _report(
+            "uniform",
+            size,
+            _best(lambda: gen.random(size)),
+            _best(lambda: uniform(size, 1)),
+        )
+        x = np.arange(size)
+        _report(
+            "shuffle",
+            size,
+            _best(lambda: gen.shuffle(x)),
+            _best(lambda: shuffle(x, rng)),
+        )
+        weights = gen.random(size)
+        k = size // 100
+        p = weights / weights.sum()
+        _report(
+            "choice k=n/100",
+            size,
+            _best(lambda: gen.choice(size, k, replace=False, p=p), repeat=3),
+            _best(lambda: choice(weights, k, rng), repeat=3),
+        )
+
+
+if __name__ == "__main__":
+    main()
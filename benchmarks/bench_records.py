@@ -0,0 +1,107 @@
+"""Compare kernels over arrays of structs and structs of arrays.
+
+A 56-byte trade record has eight fields, of which the kernel reads two:
+it sums ``px * qty`` over the buys. Over the array of structs (AoS) each
+cache line holds about one record, so most of the memory traffic is
+fields the kernel never reads; over the columns (SoA) every byte read is
+used. The conversion from AoS to SoA is timed as well, with NumPy field
+by field and with ``records.to_columns`` in one pass, along with
+``records.sort_by`` and ``records.group_by`` on the symbol field against
+their NumPy equivalents.
+
+    $ python benchmarks/bench_records.py
+"""
+
+import timeit
+
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+from numba_extras import records
+
+SIZES = [1 << 12, 1 << 16, 1 << 20, 1 << 23]
+DTYPE = np.dtype(
+    [
+        ("id", "i8"),
+        ("ts", "i8"),
+        ("px", "f8"),
+        ("qty", "i4"),
+        ("side", "i1"),
+        ("venue", "S3"),
+        ("sym", "S6"),
+        ("account", "S18"),
+    ]
+)
+
+
+@njit(parallel=True)
+def buy_notional_aos(a):
+    total = 0.0
+    for i in prange(a.shape[0]):
+        if a[i].side > 0:
+            total += a[i].px * a[i].qty
+    return total
+
+
+@njit(parallel=True)
+def buy_notional_soa(px, qty, side):
+    total = 0.0
+    for i in prange(px.shape[0]):
+        if side[i] > 0:
+            total += px[i] * qty[i]
+    return total
+
+
+def numpy_columns(a):
+    return tuple(np.ascontiguousarray(a[name]) for name in a.dtype.names)
+
+
+def numpy_group_by(a):
+    order = np.argsort(a["sym"], kind="stable")
+    keys, starts = np.unique(a["sym"][order], return_index=True)
+    return keys, starts, order
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    print("threads:", get_num_threads())
+    rs = np.random.RandomState(0)
+    symbols = np.array([b"AAPL", b"MSFT", b"GOOGL", b"AMZN", b"NVDA", b"META"])
+    for size in SIZES:
+        a = np.zeros(size, DTYPE)
+        a["id"] = np.arange(size)
+        a["px"] = rs.rand(size) * 100
+        a["qty"] = rs.randint(1, 1000, size)
+        a["side"] = rs.choice([-1, 1], size)
+        a["sym"] = symbols[rs.randint(0, len(symbols), size)]
+        columns = records.to_columns(a)
+        px, qty, side = columns[2], columns[3], columns[4]
+        assert np.isclose(buy_notional_aos(a), buy_notional_soa(px, qty, side))
+        times = [
+            _best(lambda: buy_notional_aos(a)),
+            _best(lambda: buy_notional_soa(px, qty, side)),
+            _best(lambda: numpy_columns(a)),
+            _best(lambda: records.to_columns(a)),
+        ]
+        print(
+            "{:>8} rows  kernel AoS {:.2e}s  SoA {:.2e}s  |  to SoA numpy "
+            "{:.2e}s  to_columns {:.2e}s".format(size, *times)
+        )
+        times = [
+            _best(lambda: a[np.argsort(a["sym"], kind="stable")]),
+            _best(lambda: records.sort_by(a, "sym")),
+            _best(lambda: numpy_group_by(a)),
+            _best(lambda: records.group_by(a, "sym")),
+        ]
+        print(
+            "{:>8} rows  sort numpy {:.2e}s  sort_by {:.2e}s  |  group numpy "
+            "{:.2e}s  group_by {:.2e}s".format(size, *times)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare the numba_extras.scan kernels with their NumPy counterparts.
+
+Each scan costs two passes over the data once it runs in chunks, so it
+needs at least two threads to beat a serial ``np.cumsum``; on one thread
+it falls back to a single serial pass.
+
+    $ python benchmarks/bench_scan.py
+"""
+
+import timeit
+
+import numpy as np
+from numba import get_num_threads
+
+from numba_extras.scan import compact, cumsum, nonzero, offsets, segmented_cumsum
+from numba_extras.ufuncs import cumsum_reset
+
+SIZES = [1 << 16, 1 << 20, 1 << 24]
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    print("threads:", get_num_threads())
+    rs = np.random.RandomState(0)
+    for size in SIZES:
+        x = rs.standard_normal(size)
+        lengths = rs.randint(0, 100, size)
+        starts = rs.rand(size) < 0.001
+        mask = x > 0.5
+        cases = [
+            ("cumsum f8", lambda: np.cumsum(x), lambda: cumsum(x)),
+            (
+                "offsets i8",
+                lambda: np.concatenate([[0], np.cumsum(lengths)]),
+                lambda: offsets(lengths),
+            ),
+            (
+                "segmented",
+                lambda: cumsum_reset(x, starts),
+                lambda: segmented_cumsum(x, starts),
+            ),
+            ("nonzero", lambda: np.flatnonzero(mask), lambda: nonzero(mask)),
+            ("compact", lambda: x[mask], lambda: compact(x, mask)),
+        ]
+        for name, baseline, kernel in cases:
+            base = _best(baseline)
+            ours = _best(kernel)
+            print(
+                "{:<11} {:>9}  numpy {:.2e}s  scan {:.2e}s  ({:.1f}x)".format(
+                    name, size, base, ours, base / ours
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare numba_extras.serialize with pickling a typed Dict via Python.
+
+``numba.typed.Dict`` cannot be pickled directly, so the pickle path copies
+it into a Python dict, pickles that and rebuilds the typed Dict on load.
+The serialize path writes the int64 -> float64 dict to a file with
+``dump`` and reads it back with ``load``.
+
+    $ python benchmarks/bench_serialize.py
+"""
+
+import os
+import pickle
+import tempfile
+import timeit
+
+from numba import get_num_threads, njit, typed, types
+
+from numba_extras.serialize import dump, load
+
+SIZES = [1 << 14, 1 << 18, 1 << 22]
+
+
+@njit
+def _fill(d, n):
+    for i in range(n):
+        d[i * 7] = i * 0.5
+
+
+def _build(n):
+    d = typed.Dict.empty(types.int64, types.float64)
+    _fill(d, n)
+    return d
+
+
+def pickle_round_trip(d, path):
+    with open(path, "wb") as f:
+        pickle.dump(dict(d), f, pickle.HIGHEST_PROTOCOL)
+    with open(path, "rb") as f:
+        plain = pickle.load(f)
+    out = typed.Dict.empty(types.int64, types.float64)
+    for k, v in plain.items():
+        out[k] = v
+    return out
+
+
+def serialize_round_trip(d, path):
+    dump(d, path)
+    return load(path)
+
+
+def _best(fn, repeat=3):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    print("threads:", get_num_threads())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "dict.bin")
+        for size in SIZES:
+            d = _build(size)
+            assert serialize_round_trip(d, path)[7 * (size - 1)] == (size - 1) / 2
+            fast = _best(lambda: serialize_round_trip(d, path))
+            slow = _best(lambda: pickle_round_trip(d, path))
+            print(
+                "{:>8} entries  serialize {:.2e}s  pickle {:.2e}s".format(
+                    size, fast, slow
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
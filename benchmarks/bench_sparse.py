@@ -0,0 +1,62 @@
+"""Compare numba_extras.sparse kernels with scipy.sparse.
+
+Times ``m @ x``, ``m @ b`` (32 dense columns), CSR to CSC conversion and COO
+to CSR construction on random square matrices with about 10 nonzeros per
+row. SciPy runs these on one thread; the numba kernels use every numba
+thread.
+
+    $ python benchmarks/bench_sparse.py
+"""
+
+import timeit
+
+import numpy as np
+import scipy.sparse as sp
+from numba import get_num_threads
+
+from numba_extras.sparse import coo_to_csr, from_scipy, spmm, spmv, to_csc
+
+SIZES = [1 << 14, 1 << 17, 1 << 20]
+PER_ROW = 10
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def _report(name, n, scipy_time, numba_time):
+    print(
+        "{:<8} {:>8} rows  scipy {:.2e}s  numba {:.2e}s  ({:.1f}x)".format(
+            name, n, scipy_time, numba_time, scipy_time / numba_time
+        )
+    )
+
+
+def main():
+    print("threads:", get_num_threads())
+    rs = np.random.RandomState(0)
+    for n in SIZES:
+        nnz = n * PER_ROW
+        rows = rs.randint(0, n, nnz)
+        cols = rs.randint(0, n, nnz)
+        data = rs.standard_normal(nnz)
+        coo = sp.coo_matrix((data, (rows, cols)), shape=(n, n))
+        a = coo.tocsr()
+        m = from_scipy(a)
+        x = rs.standard_normal(n)
+        b = rs.standard_normal((n, 32))
+        np.testing.assert_allclose(spmv(m, x), a @ x)
+        _report("spmv", n, _best(lambda: a @ x), _best(lambda: spmv(m, x)))
+        _report("spmm", n, _best(lambda: a @ b), _best(lambda: spmm(m, b)))
+        _report("to_csc", n, _best(lambda: a.tocsc()), _best(lambda: to_csc(m)))
+        _report(
+            "from_coo",
+            n,
+            _best(lambda: coo.tocsr()),
+            _best(lambda: coo_to_csr(rows, cols, data, (n, n))),
+        )
+
+
+if __name__ == "__main__":
+    main()
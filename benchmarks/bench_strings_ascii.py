@@ -0,0 +1,67 @@
+"""Compare numba_extras.strings.ascii with numba's generic string methods.
+
+Each row times one operation inside ``@njit`` over consecutive pairs of a
+list of ASCII strings. The "loop only" row is the cost of walking the list,
+which is included in every other row.
+
+    $ python benchmarks/bench_strings_ascii.py
+"""
+
+import timeit
+
+from numba import njit, typed
+
+from numba_extras.strings import ascii
+
+N = 100000
+LENGTH = 64
+
+CASES = [
+    ("loop only", "len(a) + len(b)", "len(a) + len(b)"),
+    ("concat", "len(a + b)", "len(ascii.concat(a, b))"),
+    ("equal", "a == b", "ascii.equal(a, b)"),
+    ("compare", "a < b", "ascii.compare(a, b) < 0"),
+    ("find", "a.find(needle)", "ascii.find(a, needle)"),
+    ("upper", "len(a.upper())", "len(ascii.upper(a))"),
+    ("split", "len(a.split(needle))", "len(ascii.split(a, needle))"),
+]
+
+TEMPLATE = """
+def run(words, needle):
+    total = 0
+    for i in range(len(words) - 1):
+        a = words[i]
+        b = words[i + 1]
+        total += {}
+    return total
+"""
+
+
+def _kernel(expr):
+    namespace = {}
+    exec(TEMPLATE.format(expr), {"ascii": ascii}, namespace)
+    return njit(namespace["run"])
+
+
+def _best(fn, repeat=7):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def main():
+    words = typed.List(["{:0{}d}tail".format(i, LENGTH) for i in range(N)])
+    for name, generic_expr, ascii_expr in CASES:
+        generic = _kernel(generic_expr)
+        fast = _kernel(ascii_expr)
+        assert generic(words, "tail") == fast(words, "tail")
+        slow = _best(lambda: generic(words, "tail"))
+        quick = _best(lambda: fast(words, "tail"))
+        print(
+            "{:<10} generic {:6.2f}ms  ascii {:6.2f}ms".format(
+                name, slow * 1e3, quick * 1e3
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Tag messages against many keywords: Aho-Corasick versus ``re``.
+
+Times ``numba_extras.strings.search.any_match`` and ``find_all_batch`` over
+a batch of messages against ``re.search`` with an alternation of the same
+keywords. ``re`` stops at the first match, so it is compared with
+``any_match``; ``find_all_batch`` also reports every overlapping match.
+
+    $ python benchmarks/bench_strings_search.py
+"""
+
+import random
+import re
+import string
+import timeit
+
+from numba import get_num_threads, typed
+
+from numba_extras.strings import search
+
+KEYWORDS = 2000
+MESSAGES = 20000
+
+
+def _best(fn, repeat=3):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def _word(rng, lo, hi):
+    return "".join(
+        rng.choice(string.ascii_lowercase) for _ in range(rng.randint(lo, hi))
+    )
+
+
+def main():
+    print("threads:", get_num_threads())
+    rng = random.Random(0)
+    keywords = sorted({_word(rng, 6, 10) for _ in range(KEYWORDS)})
+    messages = [
+        " ".join(_word(rng, 2, 9) for _ in range(20))
+        + (" " + rng.choice(keywords) if rng.random() < 0.1 else "")
+        for _ in range(MESSAGES)
+    ]
+    batch = typed.List(messages)
+    pattern = re.compile("|".join(map(re.escape, keywords)))
+    ac = search.build(keywords)
+    expected = [pattern.search(m) is not None for m in messages]
+    assert search.any_match(ac, batch).tolist() == expected
+
+    regex = _best(lambda: [pattern.search(m) is not None for m in messages])
+    first = _best(lambda: search.any_match(ac, batch))
+    every = _best(lambda: search.find_all_batch(ac, batch))
+    print(
+        "{} keywords, {} messages, {} states".format(
+            len(keywords), MESSAGES, ac.nstates
+        )
+    )
+    print("re alternation  {:.3f}s".format(regex))
+    print("any_match       {:.3f}s  ({:.0f}x)".format(first, regex / first))
+    print("find_all_batch  {:.3f}s  ({:.0f}x)".format(every, regex / every))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Compare parallel top-k selection with np.argpartition.
+
+``np.argpartition`` builds a full index array and partitions a copy of the
+scores; ``top_k`` makes one read-only pass. The NumPy baseline also sorts
+its k results so both return the same ordered output.
+
+    $ python benchmarks/bench_topk.py
+"""
+
+import timeit
+import tracemalloc
+
+import numpy as np
+from numba import get_num_threads
+
+from numba_extras.containers import top_k
+
+SIZES = [1 << 20, 1 << 24, 1 << 27]
+KS = [10, 1000]
+
+
+def _best(fn, repeat=3):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def _peak(fn):
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def numpy_top_k(x, k):
+    idx = np.argpartition(x, x.shape[0] - k)[x.shape[0] - k :]
+    return idx[np.argsort(-x[idx], kind="stable")]
+
+
+def main():
+    print("threads:", get_num_threads())
+    rs = np.random.RandomState(0)
+    for size in SIZES:
+        x = rs.standard_normal(size)
+        for k in KS:
+            assert set(numpy_top_k(x, k)) == set(top_k(x, k)[1])
+            numpy = _best(lambda: numpy_top_k(x, k))
+            numba = _best(lambda: top_k(x, k))
+            print(
+                "{:>10} k={:<5} argpartition {:.2e}s ({:.0f} MB)"
+                "  top_k {:.2e}s ({:.2f} MB)".format(
+                    size,
+                    k,
+                    numpy,
+                    _peak(lambda: numpy_top_k(x, k)) / 1e6,
+                    numba,
+                    _peak(lambda: top_k(x, k)) / 1e6,
+                )
+            )
+
+
+if __name__ == "__main__":
+    main()
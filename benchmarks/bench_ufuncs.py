@@ -0,0 +1,63 @@
+"""Measure where the parallel ufuncs builds overtake the cpu builds.
+
+Prints a mapping in the format of
+``numba_extras.ufuncs.DEFAULT_PARALLEL_THRESHOLDS``: for each kind, the
+smallest total input size from which ``target="parallel"`` stayed faster
+at every larger size measured, or None when it never did.
+
+    $ python benchmarks/bench_ufuncs.py
+"""
+
+import timeit
+
+import numpy as np
+
+from numba import get_num_threads
+
+from numba_extras.ufuncs import clip_scale, cumsum_reset, rolling_mean
+
+ROW = 1024
+SIZES = [1 << p for p in range(12, 23)]
+
+
+def _best(fn, repeat=5):
+    fn()
+    return min(timeit.repeat(fn, number=1, repeat=repeat))
+
+
+def _cases(size):
+    x = np.random.standard_normal(size)
+    rows = x.reshape(-1, ROW)
+    reset = np.zeros(rows.shape, dtype=bool)
+    reset[:, ::100] = True
+    return {
+        "rolling": lambda t: rolling_mean(x, 32, target=t),
+        "cumulative": lambda t: cumsum_reset(rows, reset, target=t),
+        "elementwise": lambda t: clip_scale(x, -1.0, 1.0, target=t),
+    }
+
+
+def main():
+    print("threads:", get_num_threads())
+    thresholds = {}
+    wins = {}
+    for size in SIZES:
+        for kind, run in _cases(size).items():
+            cpu = _best(lambda: run("cpu"))
+            par = _best(lambda: run("parallel"))
+            print(
+                "{:<12} {:>10} cpu {:.2e}s parallel {:.2e}s".format(
+                    kind, size, cpu, par
+                )
+            )
+            if par < cpu:
+                wins.setdefault(kind, size)
+            else:
+                wins.pop(kind, None)
+    for kind in ("rolling", "cumulative", "elementwise"):
+        thresholds[kind] = wins.get(kind)
+    print(thresholds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+from .arrow import (  # noqa: F401
+    BinaryColumn,
+    BooleanColumn,
+    PrimitiveColumn,
+    StringColumn,
+    from_arrow,
+    from_buffer,
+    get,
+    is_valid,
+    null_count,
+    str_bytes,
+    value,
+)
@@ -0,0 +1,279 @@
+"""Zero-copy views of Apache Arrow columns for nopython code.
+
+``from_arrow`` turns a ``pyarrow`` array into a named tuple of NumPy arrays
+that view the Arrow buffers in place. Nothing is copied, so a column of
+millions of strings is ready for ``@njit`` code in microseconds instead of
+going through ``to_pylist``:
+
+* ``PrimitiveColumn`` holds integer, floating point and temporal arrays
+  (temporal values as their integer storage),
+* ``BooleanColumn`` holds boolean arrays, whose values are a bitmap,
+* ``StringColumn`` and ``BinaryColumn`` hold ``string`` / ``binary`` arrays
+  and their ``large_`` variants: int32 or int64 ``offsets`` into a uint8
+  ``data`` buffer.
+
+Every column has ``validity``, the Arrow validity bitmap (empty when the
+array has no nulls), ``offset``, the bit position of element 0 in the
+bitmaps, and ``length``. ``data`` and ``offsets`` are already sliced to
+the column, so element ``i`` is ``data[i]`` or
+``data[offsets[i]:offsets[i + 1]]``. Arrow arrays are immutable; the views
+are writeable only when the underlying buffer is, and writing through them
+changes the Arrow array.
+
+``is_valid``, ``value``, ``get``, ``str_bytes`` and ``null_count`` read
+columns from Python and from ``@njit`` code. ``value`` of a string column
+decodes the UTF-8 bytes of that one element into a ``str``.
+"""
+
+import collections
+
+import numpy as np
+from numba import carray, njit, types
+from numba.cpython.unicode import (
+    PY_UNICODE_1BYTE_KIND,
+    PY_UNICODE_2BYTE_KIND,
+    PY_UNICODE_4BYTE_KIND,
+    _empty_string,
+    _set_code_point,
+)
+from numba.extending import overload
+
+PrimitiveColumn = collections.namedtuple(
+    "PrimitiveColumn", ["validity", "data", "offset", "length"]
+)
+BooleanColumn = collections.namedtuple(
+    "BooleanColumn", ["validity", "data", "offset", "length"]
+)
+StringColumn = collections.namedtuple(
+    "StringColumn", ["validity", "offsets", "data", "offset", "length"]
+)
+BinaryColumn = collections.namedtuple(
+    "BinaryColumn", ["validity", "offsets", "data", "offset", "length"]
+)
+
+_COLUMNS = (PrimitiveColumn, BooleanColumn, StringColumn, BinaryColumn)
+
+
+def _is(col, *classes):
+    return isinstance(col, types.BaseNamedTuple) and col.instance_class in classes
+
+
+def _view(buf, dtype):
+    if buf is None:
+        return np.empty(0, dtype)
+    return np.frombuffer(buf, dtype)
+
+
+def _validity(arr):
+    if arr.null_count == 0:
+        return np.empty(0, np.uint8)
+    return _view(arr.buffers()[0], np.uint8)
+
+
+def _column(arr):
+    import pyarrow as pa
+
+    t = arr.type
+    n = len(arr)
+    start = arr.offset
+    bufs = arr.buffers()
+    if pa.types.is_boolean(t):
+        return BooleanColumn(_validity(arr), _view(bufs[1], np.uint8), start, n)
+    if pa.types.is_string(t) or pa.types.is_large_string(t):
+        cls = StringColumn
+    elif pa.types.is_binary(t) or pa.types.is_large_binary(t):
+        cls = BinaryColumn
+    else:
+        cls = None
+    if cls is not None:
+        large = pa.types.is_large_string(t) or pa.types.is_large_binary(t)
+        offsets = _view(bufs[1], np.int64 if large else np.int32)
+        if offsets.shape[0] == 0:
+            offsets = np.zeros(1, offsets.dtype)
+        offsets = offsets[start : start + n + 1]
+        return cls(_validity(arr), offsets, _view(bufs[2], np.uint8), start, n)
+    if pa.types.is_integer(t) or pa.types.is_floating(t):
+        dtype = np.dtype(t.to_pandas_dtype())
+        if dtype == np.float16:
+            raise TypeError("float16 columns are not supported")
+    elif pa.types.is_temporal(t):
+        dtype = np.dtype("i{}".format(t.bit_width // 8))
+    else:
+        raise TypeError("unsupported Arrow type {}".format(t))
+    data = _view(bufs[1], dtype)[start : start + n]
+    return PrimitiveColumn(_validity(arr), data, start, n)
+
+
+def from_arrow(obj):
+    """Wrap Arrow data without copying.
+
+    An ``Array`` gives one column. A ``ChunkedArray`` gives a list with one
+    column per chunk. A ``RecordBatch`` or ``Table`` gives a dict mapping
+    each column name to its column (a list of chunks for a ``Table``).
+    Dictionary, nested and other layouts raise TypeError.
+    """
+    import pyarrow as pa
+
+    if isinstance(obj, pa.Array):
+        return _column(obj)
+    if isinstance(obj, pa.ChunkedArray):
+        return [_column(chunk) for chunk in obj.chunks]
+    if isinstance(obj, (pa.RecordBatch, pa.Table)):
+        return {
+            name: from_arrow(obj.column(i)) for i, name in enumerate(obj.column_names)
+        }
+    raise TypeError("expected a pyarrow Array, ChunkedArray, RecordBatch or Table")
+
+
+def from_buffer(obj, dtype=np.uint8):
+    """View any ``__array_interface__`` or buffer-protocol object as an array.
+
+    Objects with ``__array_interface__`` keep their own dtype and shape;
+    other buffers are read as a 1-d array of ``dtype``. Neither copies.
+    """
+    if hasattr(obj, "__array_interface__"):
+        return np.asarray(obj)
+    return np.frombuffer(memoryview(obj), dtype)
+
+
+@njit
+def _bit(bitmap, i):
+    return (bitmap[i >> 3] >> (i & 7)) & 1 == 1
+
+
+def _is_valid(col, i):
+    pass
+
+
+@overload(_is_valid)
+def _ol_is_valid(col, i):
+    if not _is(col, *_COLUMNS):
+        return None
+
+    def impl(col, i):
+        if col.validity.shape[0] == 0:
+            return True
+        return _bit(col.validity, col.offset + i)
+
+    return impl
+
+
+@njit
+def is_valid(col, i):
+    """Whether element ``i`` of ``col`` is not null."""
+    return _is_valid(col, i)
+
+
+@njit
+def null_count(col):
+    """Number of null elements in ``col``."""
+    if col.validity.shape[0] == 0:
+        return 0
+    count = 0
+    for i in range(col.length):
+        if not _bit(col.validity, col.offset + i):
+            count += 1
+    return count
+
+
+@njit
+def str_bytes(col, i):
+    """The bytes of element ``i`` of a string or binary column, as a view."""
+    return col.data[col.offsets[i] : col.offsets[i + 1]]
+
+
+@njit
+def _decode(b):
+    # Arrow guarantees valid UTF-8 in string columns, so the decoder does
+    # not check continuation bytes.
+    n = b.shape[0]
+    ascii = True
+    for j in range(n):
+        if b[j] >= 0x80:
+            ascii = False
+            break
+    if ascii:
+        out = _empty_string(PY_UNICODE_1BYTE_KIND, n, 1)
+        carray(out._data, n, np.uint8)[:] = b
+        return out
+    count = 0
+    widest = 0
+    j = 0
+    while j < n:
+        c = b[j]
+        if c < 0x80:
+            step = 1
+        elif c < 0xE0:
+            step = 2
+        elif c < 0xF0:
+            step = 3
+        else:
+            step = 4
+        if step > widest:
+            widest = step
+        count += 1
+        j += step
+    kind = PY_UNICODE_4BYTE_KIND
+    if widest < 4:
+        kind = PY_UNICODE_2BYTE_KIND
+    if widest < 3 and (b < 0xC4).all():
+        # Two-byte sequences led by 0xC2 or 0xC3 are U+0080 to U+00FF.
+        kind = PY_UNICODE_1BYTE_KIND
+    out = _empty_string(kind, count, 0)
+    j = 0
+    for k in range(count):
+        c = np.int64(b[j])
+        if c < 0x80:
+            cp = c
+            j += 1
+        elif c < 0xE0:
+            cp = (c & 0x1F) << 6 | (b[j + 1] & 0x3F)
+            j += 2
+        elif c < 0xF0:
+            cp = (c & 0x0F) << 12 | (b[j + 1] & 0x3F) << 6 | (b[j + 2] & 0x3F)
+            j += 3
+        else:
+            cp = (
+                (c & 0x07) << 18
+                | (b[j + 1] & 0x3F) << 12
+                | (b[j + 2] & 0x3F) << 6
+                | (b[j + 3] & 0x3F)
+            )
+            j += 4
+        _set_code_point(out, k, cp)
+    return out
+
+
+def _value(col, i):
+    pass
+
+
+@overload(_value)
+def _ol_value(col, i):
+    if _is(col, PrimitiveColumn):
+        return lambda col, i: col.data[i]
+    if _is(col, BooleanColumn):
+        return lambda col, i: _bit(col.data, col.offset + i)
+    if _is(col, StringColumn):
+        return lambda col, i: _decode(str_bytes(col, i))
+    if _is(col, BinaryColumn):
+        return lambda col, i: str_bytes(col, i)
+    return None
+
+
+@njit
+def value(col, i):
+    """Element ``i`` of ``col``, ignoring the validity bitmap.
+
+    Null slots hold unspecified values (empty for strings and binary). A
+    string column gives a ``str``, a binary column a uint8 view.
+    """
+    return _value(col, i)
+
+
+@njit
+def get(col, i, default):
+    """Element ``i`` of ``col``, or ``default`` when it is null."""
+    if not _is_valid(col, i):
+        return default
+    return _value(col, i)
@@ -0,0 +1,154 @@
+import numpy as np
+import pytest
+
+WORDS = ["hello", None, "wörld", "", "日本", None, "😀 ok", "café"]
+
+
+def _address(a):
+    return a.__array_interface__["data"][0]
+
+
+@pytest.mark.parametrize("type_", ["string", "large_string"])
+def test_strings_match_pylist(type_):
+    pa = pytest.importorskip("pyarrow")
+    from numba_extras.arrow import StringColumn, from_arrow, get, is_valid, value
+
+    arr = pa.array(WORDS, type=getattr(pa, type_)())
+    col = from_arrow(arr)
+    assert isinstance(col, StringColumn)
+    assert col.length == len(WORDS)
+    got = [value(col, i) if is_valid(col, i) else None for i in range(col.length)]
+    assert got == WORDS
+    assert get(col, 1, "missing") == "missing"
+    assert get(col, 6, "missing") == "😀 ok"
+
+
+def test_views_share_arrow_buffers():
+    pa = pytest.importorskip("pyarrow")
+    from numba_extras.arrow import from_arrow
+
+    ints = pa.array([1, None, 3, 4], pa.int32())
+    col = from_arrow(ints)
+    validity, data = ints.buffers()
+    assert _address(col.data) == data.address
+    assert _address(col.validity) == validity.address
+    strings = pa.array(WORDS)
+    col = from_arrow(strings)
+    _, offsets, data = strings.buffers()
+    assert _address(col.offsets) == offsets.address
+    assert _address(col.data) == data.address
+    assert from_arrow(pa.array([1, 2])).validity.shape == (0,)
+
+
+def test_sliced_arrays():
+    pa = pytest.importorskip("pyarrow")
+    from numba_extras.arrow import from_arrow, is_valid, null_count, value
+
+    values = [None if i % 3 == 0 else i for i in range(20)]
+    for arr, expected in [
+        (pa.array(values, pa.int64())[5:17], values[5:17]),
+        (pa.array([str(v) if v else None for v in values])[3:11], None),
+        (pa.array([v and v % 2 == 0 for v in values])[7:], None),
+    ]:
+        if expected is None:
+            expected = arr.to_pylist()
+        col = from_arrow(arr)
+        got = [value(col, i) if is_valid(col, i) else None for i in range(col.length)]
+        assert got == expected
+        assert null_count(col) == arr.null_count
+
+
+def test_njit_kernel_on_string_column():
+    pa = pytest.importorskip("pyarrow")
+    from numba import njit
+    from numba_extras.arrow import from_arrow, is_valid, value
+    from numba_extras.helloworld import helloworld
+
+    @njit
+    def greet(col):
+        out = []
+        for i in range(col.length):
+            if is_valid(col, i):
+                out.append(helloworld(value(col, i)))
+        return out
+
+    col = from_arrow(pa.array(WORDS)[2:])
+    assert greet(col) == ["Hi, " + w for w in WORDS[2:] if w is not None]
+
+
+def test_nullable_ints_in_njit():
+    pa = pytest.importorskip("pyarrow")
+    from numba import njit
+    from numba_extras.arrow import from_arrow, get
+
+    @njit
+    def total(col):
+        acc = 0
+        for i in range(col.length):
+            acc += get(col, i, 0)
+        return acc
+
+    arr = pa.array([1, None, 3, None, 5], pa.int16())
+    assert total(from_arrow(arr)) == 9
+    assert total(from_arrow(arr[2:])) == 8
+    times = pa.array([0, 86_400, None], pa.timestamp("s"))
+    assert from_arrow(times).data.dtype == np.int64
+    assert total(from_arrow(times)) == 86_400
+
+
+def test_binary_and_bool():
+    pa = pytest.importorskip("pyarrow")
+    from numba_extras.arrow import BinaryColumn, from_arrow, str_bytes, value
+
+    col = from_arrow(pa.array([b"\x00\xff", None, b"abc"], pa.large_binary()))
+    assert isinstance(col, BinaryColumn)
+    assert bytes(value(col, 2)) == b"abc"
+    assert bytes(str_bytes(col, 0)) == b"\x00\xff"
+    col = from_arrow(pa.array([True, False, True, True])[1:])
+    assert [value(col, i) for i in range(col.length)] == [False, True, True]
+
+
+def test_batches_and_chunks():
+    pa = pytest.importorskip("pyarrow")
+    from numba_extras.arrow import from_arrow, value
+
+    batch = pa.record_batch({"x": [1.5, 2.5], "s": ["a", "b"]})
+    cols = from_arrow(batch)
+    assert list(cols) == ["x", "s"]
+    assert value(cols["x"], 1) == 2.5
+    assert value(cols["s"], 0) == "a"
+    chunks = from_arrow(pa.chunked_array([[1, 2], [3]]))
+    assert [c.length for c in chunks] == [2, 1]
+    table = from_arrow(pa.table({"x": pa.chunked_array([[1], [2, 3]])}))
+    assert [value(c, 0) for c in table["x"]] == [1, 2]
+
+
+def test_rejects_unsupported_types():
+    pa = pytest.importorskip("pyarrow")
+    from numba_extras.arrow import from_arrow
+
+    with pytest.raises(TypeError):
+        from_arrow(pa.array([[1], [2]]))
+    with pytest.raises(TypeError):
+        from_arrow(pa.array(["a", "b"]).dictionary_encode())
+    with pytest.raises(TypeError):
+        from_arrow(pa.array([1.0], pa.float16()))
+    with pytest.raises(TypeError):
+        from_arrow([1, 2])
+
+
+def test_from_buffer():
+    from numba_extras.arrow import from_buffer
+
+    raw = bytearray(b"\x01\x02\x03\x04")
+    view = from_buffer(raw)
+    view[0] = 9
+    assert raw[0] == 9
+    assert from_buffer(raw, np.int16).shape == (2,)
+    x = np.arange(6.0).reshape(2, 3)
+
+    class Exported:
+        __array_interface__ = x.__array_interface__
+
+    got = from_buffer(Exported())
+    assert got.shape == (2, 3) and np.shares_memory(got, x)
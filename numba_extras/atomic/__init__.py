@@ -0,0 +1,8 @@
+from .atomic import (  # noqa: F401
+    atomic_add,
+    atomic_cas,
+    atomic_load,
+    atomic_max,
+    atomic_min,
+    atomic_sub,
+)
@@ -0,0 +1,217 @@
+"""Atomic read-modify-write operations on array elements.
+
+Each operation updates ``ary[idx]`` atomically with sequentially consistent
+ordering and returns the value the element held before the update, so
+``atomic_add`` doubles as fetch-and-add. ``idx`` is an integer for 1-d
+arrays or a tuple of integers for n-d arrays; negative indices wrap around
+and, like plain indexing in nopython mode, indices are not bounds checked.
+These are only usable from ``@njit`` code.
+
+Read elements that other threads update with ``atomic_load`` rather than
+plain indexing, both inside a ``prange`` body and after it. The parfor pass
+does not know that the atomic operations write to their array, so it may
+hoist a plain read such as ``old = ary[0]`` out of the loop or reuse the
+array's initial contents for a read after the loop. A compare-and-swap retry loop
+built on that read then compares against a stale value forever.
+``atomic_load`` is a call, which parfor never hoists::
+
+    for i in prange(n):
+        while True:
+            old = atomic_load(counter, 0)
+            if atomic_cas(counter, 0, old, old + 1) == old:
+                break
+
+Float elements are compared by bit pattern in ``atomic_cas``, as
+``cmpxchg`` only works on integers. So ``-0.0`` does not match a stored
+``0.0`` and a NaN ``expected`` matches a stored NaN with the same bits.
+float16 arrays are not supported, and integer arrays only accept integer
+or boolean values.
+"""
+
+from llvmlite import ir
+from numba import types
+from numba.core import cgutils
+from numba.core.errors import TypingError
+from numba.extending import intrinsic
+
+_ORDERING = "seq_cst"
+
+
+def _check_target(ary, idx):
+    if not isinstance(ary, types.Array):
+        raise TypingError("atomic operations require an array, got {}".format(ary))
+    if not ary.mutable:
+        raise TypingError("atomic operations require a writable array")
+    if (
+        not isinstance(ary.dtype, (types.Integer, types.Float))
+        or ary.dtype == types.float16
+    ):
+        raise TypingError(
+            "atomic operations support integer and float arrays, got {}".format(
+                ary.dtype
+            )
+        )
+    if isinstance(idx, types.Integer):
+        ndim = 1
+    elif isinstance(idx, types.BaseTuple) and all(
+        isinstance(i, types.Integer) for i in idx
+    ):
+        ndim = len(idx)
+    else:
+        raise TypingError("index must be an integer or a tuple of integers")
+    if ndim != ary.ndim:
+        raise TypingError(
+            "expected {} indices for a {}-d array, got {}".format(
+                ary.ndim, ary.ndim, ndim
+            )
+        )
+
+
+def _item_pointer(context, builder, aryty, idxty, ary, idx):
+    array = context.make_array(aryty)(context, builder, ary)
+    if isinstance(idxty, types.BaseTuple):
+        raw = cgutils.unpack_tuple(builder, idx, len(idxty))
+        inds = [context.cast(builder, v, t, types.intp) for v, t in zip(raw, idxty)]
+    else:
+        inds = [context.cast(builder, idx, idxty, types.intp)]
+    return cgutils.get_item_pointer(
+        context, builder, aryty, array, inds, wraparound=True
+    )
+
+
+def _bits_type(lltype):
+    return ir.IntType(64 if isinstance(lltype, ir.DoubleType) else 32)
+
+
+def _cas_loop(builder, ptr, lltype, update):
+    # Generic compare-and-swap retry loop. Float elements are exchanged
+    # through their integer bit pattern because cmpxchg only takes integers.
+    ity = _bits_type(lltype)
+    iptr = builder.bitcast(ptr, ity.as_pointer())
+    initial = builder.load_atomic(iptr, "monotonic", ity.width // 8)
+    entry = builder.basic_block
+    loop = builder.append_basic_block("atomic.cas.loop")
+    done = builder.append_basic_block("atomic.cas.done")
+    builder.branch(loop)
+    builder.position_at_end(loop)
+    current = builder.phi(ity)
+    current.add_incoming(initial, entry)
+    old = builder.bitcast(current, lltype)
+    new = builder.bitcast(update(builder, old), ity)
+    res = builder.cmpxchg(iptr, current, new, _ORDERING, _ORDERING)
+    current.add_incoming(builder.extract_value(res, 0), builder.basic_block)
+    builder.cbranch(builder.extract_value(res, 1), done, loop)
+    builder.position_at_end(done)
+    return old
+
+
+def _check_value(ary, val):
+    if isinstance(ary.dtype, types.Integer):
+        allowed = (types.Integer, types.Boolean)
+    else:
+        allowed = (types.Integer, types.Float, types.Boolean)
+    if not isinstance(val, allowed):
+        raise TypingError(
+            "cannot apply a {} value to a {} array".format(val, ary.dtype)
+        )
+
+
+def _rmw(ary, idx, val, int_op, float_update):
+    # ``int_op`` maps signedness to an ``atomicrmw`` operation. For floats,
+    # ``float_update`` is either the name of a native ``atomicrmw`` operation
+    # or a callable building the new value inside a CAS loop.
+    _check_target(ary, idx)
+    _check_value(ary, val)
+    sig = ary.dtype(ary, idx, val)
+
+    def codegen(context, builder, signature, args):
+        aryty, idxty, valty = signature.args
+        dtype = aryty.dtype
+        ptr = _item_pointer(context, builder, aryty, idxty, args[0], args[1])
+        val = context.cast(builder, args[2], valty, dtype)
+        if isinstance(dtype, types.Integer):
+            return builder.atomic_rmw(int_op(dtype.signed), ptr, val, _ORDERING)
+        if isinstance(float_update, str):
+            return builder.atomic_rmw(float_update, ptr, val, _ORDERING)
+        lltype = context.get_value_type(dtype)
+        return _cas_loop(builder, ptr, lltype, lambda b, old: float_update(b, old, val))
+
+    return sig, codegen
+
+
+def _fmax(builder, old, val):
+    return builder.select(builder.fcmp_ordered(">", val, old), val, old)
+
+
+def _fmin(builder, old, val):
+    return builder.select(builder.fcmp_ordered("<", val, old), val, old)
+
+
+@intrinsic
+def atomic_add(typingctx, ary, idx, val):
+    return _rmw(ary, idx, val, lambda signed: "add", "fadd")
+
+
+@intrinsic
+def atomic_sub(typingctx, ary, idx, val):
+    return _rmw(ary, idx, val, lambda signed: "sub", "fsub")
+
+
+@intrinsic
+def atomic_max(typingctx, ary, idx, val):
+    return _rmw(ary, idx, val, lambda signed: "max" if signed else "umax", _fmax)
+
+
+@intrinsic
+def atomic_min(typingctx, ary, idx, val):
+    return _rmw(ary, idx, val, lambda signed: "min" if signed else "umin", _fmin)
+
+
+@intrinsic
+def atomic_cas(typingctx, ary, idx, expected, desired):
+    _check_target(ary, idx)
+    _check_value(ary, expected)
+    _check_value(ary, desired)
+    sig = ary.dtype(ary, idx, expected, desired)
+
+    def codegen(context, builder, signature, args):
+        aryty, idxty, expty, desty = signature.args
+        dtype = aryty.dtype
+        ptr = _item_pointer(context, builder, aryty, idxty, args[0], args[1])
+        exp = context.cast(builder, args[2], expty, dtype)
+        des = context.cast(builder, args[3], desty, dtype)
+        lltype = context.get_value_type(dtype)
+        if isinstance(dtype, types.Integer):
+            res = builder.cmpxchg(ptr, exp, des, _ORDERING, _ORDERING)
+            return builder.extract_value(res, 0)
+        ity = _bits_type(lltype)
+        iptr = builder.bitcast(ptr, ity.as_pointer())
+        res = builder.cmpxchg(
+            iptr,
+            builder.bitcast(exp, ity),
+            builder.bitcast(des, ity),
+            _ORDERING,
+            _ORDERING,
+        )
+        return builder.bitcast(builder.extract_value(res, 0), lltype)
+
+    return sig, codegen
+
+
+@intrinsic
+def atomic_load(typingctx, ary, idx):
+    _check_target(ary, idx)
+    sig = ary.dtype(ary, idx)
+
+    def codegen(context, builder, signature, args):
+        aryty, idxty = signature.args
+        ptr = _item_pointer(context, builder, aryty, idxty, args[0], args[1])
+        lltype = context.get_value_type(aryty.dtype)
+        if isinstance(aryty.dtype, types.Integer):
+            return builder.load_atomic(ptr, _ORDERING, aryty.dtype.bitwidth // 8)
+        ity = _bits_type(lltype)
+        iptr = builder.bitcast(ptr, ity.as_pointer())
+        bits = builder.load_atomic(iptr, _ORDERING, ity.width // 8)
+        return builder.bitcast(bits, lltype)
+
+    return sig, codegen
@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize(
+    "dtype", [np.int32, np.int64, np.uint32, np.float32, np.float64]
+)
+def test_fetch_semantics(dtype):
+    from numba import njit
+    from numba_extras.atomic import atomic_add, atomic_max, atomic_min, atomic_sub
+
+    @njit
+    def run(a):
+        olds = np.empty(4, a.dtype)
+        olds[0] = atomic_add(a, 0, 5)
+        olds[1] = atomic_sub(a, 0, 2)
+        olds[2] = atomic_max(a, 1, 7)
+        olds[3] = atomic_min(a, -1, 1)
+        return olds
+
+    a = np.array([10, 3, 4], dtype=dtype)
+    olds = run(a)
+    np.testing.assert_array_equal(olds, [10, 15, 3, 4])
+    np.testing.assert_array_equal(a, [13, 7, 1])
+
+
+def test_compare_and_swap():
+    from numba import njit
+    from numba_extras.atomic import atomic_cas
+
+    @njit
+    def run(a):
+        first = atomic_cas(a, (0, 1), 2.0, 9.0)
+        second = atomic_cas(a, (0, 1), 2.0, 5.0)
+        return first, second
+
+    a = np.array([[1.0, 2.0], [3.0, 4.0]])
+    assert run(a) == (2.0, 9.0)
+    assert a[0, 1] == 9.0
+
+
+def test_parallel_histogram_stress():
+    from numba import njit, prange
+    from numba_extras.atomic import atomic_add, atomic_max
+
+    @njit(parallel=True)
+    def histogram(values, bins, peak):
+        counts = np.zeros(bins, np.int64)
+        for i in prange(values.shape[0]):
+            b = values[i] % bins
+            atomic_add(counts, b, 1)
+            atomic_max(peak, 0, values[i])
+        return counts
+
+    values = np.random.RandomState(0).randint(0, 1 << 30, 1 << 20)
+    peak = np.zeros(1, np.int64)
+    for _ in range(5):
+        counts = histogram(values, 97, peak)
+        np.testing.assert_array_equal(counts, np.bincount(values % 97, minlength=97))
+    assert peak[0] == values.max()
+
+
+def test_parallel_float_scatter_add():
+    from numba import njit, prange
+    from numba_extras.atomic import atomic_add
+
+    @njit(parallel=True)
+    def scatter(idx, weights, out):
+        for i in prange(idx.shape[0]):
+            atomic_add(out, idx[i], weights[i])
+
+    rs = np.random.RandomState(1)
+    idx = rs.randint(0, 50, 100000)
+    weights = rs.randint(0, 8, 100000).astype(np.float64)
+    out = np.zeros(50)
+    scatter(idx, weights, out)
+    np.testing.assert_array_equal(out, np.bincount(idx, weights, minlength=50))
+
+
+def test_cas_retry_loop_in_prange():
+    # Regression test: a plain ``cell[0]`` read is hoisted out of the prange
+    # body by parfor, so the retry loop must read with atomic_load. Retries
+    # are bounded so a regression fails instead of hanging.
+    from numba import njit, prange
+    from numba_extras.atomic import atomic_add, atomic_cas, atomic_load
+
+    @njit(parallel=True)
+    def count(n, cell, failed, retries):
+        for i in prange(n):
+            done = False
+            for _ in range(retries):
+                old = atomic_load(cell, 0)
+                if atomic_cas(cell, 0, old, old + 1) == old:
+                    done = True
+                    break
+            if not done:
+                atomic_add(failed, 0, 1)
+
+    cell = np.zeros(1, np.int64)
+    failed = np.zeros(1, np.int64)
+    count(50000, cell, failed, 100000)
+    assert failed[0] == 0
+    assert cell[0] == 50000
+
+
+def test_float_cas_compares_bits():
+    from numba import njit
+    from numba_extras.atomic import atomic_cas, atomic_load
+
+    @njit
+    def swap(a, expected, desired):
+        atomic_cas(a, 0, expected, desired)
+        return atomic_load(a, 0)
+
+    assert swap(np.array([0.0]), -0.0, 1.0) == 0.0
+    assert swap(np.array([0.0]), 0.0, 1.0) == 1.0
+    assert swap(np.array([np.nan]), np.nan, 2.0) == 2.0
+
+
+def test_typing_errors():
+    from numba import njit
+    from numba.core.errors import TypingError
+    from numba_extras.atomic import atomic_add
+
+    @njit
+    def bad_index(a):
+        return atomic_add(a, 0, 1)
+
+    with pytest.raises(TypingError):
+        bad_index(np.zeros((2, 2)))
+
+    @njit
+    def bad_dtype(a):
+        return atomic_add(a, 0, 1)
+
+    with pytest.raises(TypingError):
+        bad_dtype(np.zeros(2, np.complex128))
+
+
+def test_rejects_float16_and_lossy_values():
+    from numba import njit
+    from numba.core.errors import TypingError
+    from numba_extras.atomic import atomic_add, atomic_max
+
+    @njit
+    def fmax(a):
+        return atomic_max(a, 0, 1.0)
+
+    with pytest.raises(TypingError):
+        fmax(np.zeros(2, np.float16))
+
+    @njit
+    def add_float(a):
+        return atomic_add(a, 0, 2.7)
+
+    with pytest.raises(TypingError):
+        add_float(np.zeros(2, np.int64))
@@ -0,0 +1,7 @@
+from .bitset import (  # noqa: F401
+    Bitset,
+    RoaringBitmap,
+    bitset_from_bool,
+    roaring_from_bitset,
+    roaring_from_indices,
+)
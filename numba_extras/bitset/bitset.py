@@ -0,0 +1,458 @@
+"""Bitsets and compressed bitmaps.
+
+``Bitset`` packs a fixed number of bits into uint64 words: one eighth of the
+memory of a NumPy bool mask, and combining two of them touches eight times
+fewer bytes. It supports ``&``, ``|``, ``^``, ``~`` and ``andnot``, counting
+with the CPU's popcount instruction, ``rank``/``select`` and iteration over
+set bits through ``next_set`` or ``indices``.
+
+``RoaringBitmap`` is an immutable compressed bitmap over non-negative int64
+positions in the layout of Roaring bitmaps: positions are grouped by their
+high 48 bits into chunks of 65536, and each chunk is stored as a sorted
+uint16 array while it holds at most 4096 positions, or as a 1024-word bitmap
+otherwise. Sparse sets therefore cost about two bytes per position. It
+supports the same set operations, each returning a new bitmap.
+
+Both are jitclasses and work from Python and from ``@njit`` code.
+"""
+
+import numpy as np
+from numba import int64, njit, types, uint16, uint64
+from numba.cpython.unsafe.numbers import trailing_zeros
+from numba.experimental import jitclass
+from numba.extending import intrinsic
+
+_ONE = np.uint64(1)
+_ALL = np.uint64(0xFFFFFFFFFFFFFFFF)
+_CHUNK_WORDS = 1024
+_ARRAY_MAX = 4096
+
+_AND = 0
+_OR = 1
+_XOR = 2
+_ANDNOT = 3
+
+
+@intrinsic
+def _popcount(typingctx, x):
+    if x != types.uint64:
+        return None
+
+    def codegen(context, builder, sig, args):
+        return builder.ctpop(args[0])
+
+    return types.uint64(types.uint64), codegen
+
+
+@njit
+def _select_in_word(w, k):
+    # Position of the k-th (0-based) set bit of ``w``.
+    for _ in range(k):
+        w &= w - _ONE
+    return int(trailing_zeros(w))
+
+
+@jitclass([("size", int64), ("words", uint64[::1])])
+class Bitset:
+    # Bits past ``size`` in the last word are kept clear.
+    def __init__(self, size):
+        if size < 0:
+            raise ValueError("size must be non-negative")
+        self.size = size
+        self.words = np.zeros((size + 63) // 64, np.uint64)
+
+    def __len__(self):
+        return self.size
+
+    def _check(self, i):
+        if not 0 <= i < self.size:
+            raise IndexError("bit index out of range")
+
+    def get(self, i):
+        self._check(i)
+        return (self.words[i >> 6] >> np.uint64(i & 63)) & _ONE != 0
+
+    def set(self, i):
+        self._check(i)
+        self.words[i >> 6] |= _ONE << np.uint64(i & 63)
+
+    def clear(self, i):
+        self._check(i)
+        self.words[i >> 6] &= ~(_ONE << np.uint64(i & 63))
+
+    def count(self):
+        total = 0
+        for w in self.words:
+            total += _popcount(w)
+        return int(total)
+
+    def _same_size(self, other):
+        if other.size != self.size:
+            raise ValueError("bitsets must have the same size")
+
+    def _empty_like(self):
+        return Bitset(self.size)
+
+    def __and__(self, other):
+        self._same_size(other)
+        out = self._empty_like()
+        np.bitwise_and(self.words, other.words, out.words)
+        return out
+
+    def __or__(self, other):
+        self._same_size(other)
+        out = self._empty_like()
+        np.bitwise_or(self.words, other.words, out.words)
+        return out
+
+    def __xor__(self, other):
+        self._same_size(other)
+        out = self._empty_like()
+        np.bitwise_xor(self.words, other.words, out.words)
+        return out
+
+    def andnot(self, other):
+        self._same_size(other)
+        out = self._empty_like()
+        for i in range(self.words.shape[0]):
+            out.words[i] = self.words[i] & ~other.words[i]
+        return out
+
+    def __invert__(self):
+        out = self._empty_like()
+        np.invert(self.words, out.words)
+        tail = self.size & 63
+        if tail:
+            out.words[-1] &= (_ONE << np.uint64(tail)) - _ONE
+        return out
+
+    def rank(self, i):
+        # Number of set bits before position ``i``.
+        i = min(max(i, 0), self.size)
+        full = i >> 6
+        total = 0
+        for k in range(full):
+            total += _popcount(self.words[k])
+        if i & 63:
+            mask = (_ONE << np.uint64(i & 63)) - _ONE
+            total += _popcount(self.words[full] & mask)
+        return int(total)
+
+    def select(self, k):
+        # Position of the k-th (0-based) set bit, or -1.
+        if k < 0:
+            return -1
+        for i in range(self.words.shape[0]):
+            c = int(_popcount(self.words[i]))
+            if k < c:
+                return i * 64 + _select_in_word(self.words[i], k)
+            k -= c
+        return -1
+
+    def next_set(self, i):
+        # First set bit at or after ``i``, or -1.
+        if i < 0:
+            i = 0
+        if i >= self.size:
+            return -1
+        k = i >> 6
+        w = self.words[k] & (_ALL << np.uint64(i & 63))
+        while w == 0:
+            k += 1
+            if k == self.words.shape[0]:
+                return -1
+            w = self.words[k]
+        return k * 64 + int(trailing_zeros(w))
+
+    def indices(self):
+        out = np.empty(self.count(), np.int64)
+        n = 0
+        for k in range(self.words.shape[0]):
+            w = self.words[k]
+            while w:
+                out[n] = k * 64 + int(trailing_zeros(w))
+                n += 1
+                w &= w - _ONE
+        return out
+
+    def to_bool(self):
+        out = np.zeros(self.size, np.bool_)
+        for k in range(self.words.shape[0]):
+            w = self.words[k]
+            while w:
+                out[k * 64 + int(trailing_zeros(w))] = True
+                w &= w - _ONE
+        return out
+
+
+@njit
+def bitset_from_bool(mask):
+    """Pack a 1-d boolean array into a Bitset."""
+    out = Bitset(mask.shape[0])
+    for k in range(out.words.shape[0]):
+        w = np.uint64(0)
+        base = k * 64
+        for b in range(min(64, mask.shape[0] - base)):
+            if mask[base + b]:
+                w |= _ONE << np.uint64(b)
+        out.words[k] = w
+    return out
+
+
+@jitclass(
+    [
+        ("keys", int64[::1]),
+        ("cards", int64[::1]),
+        ("starts", int64[::1]),
+        ("values", uint16[::1]),
+        ("words", uint64[::1]),
+    ]
+)
+class RoaringBitmap:
+    # Container ``i`` covers positions ``keys[i] << 16`` onwards and holds
+    # ``cards[i]`` of them: in ``values[starts[i]:starts[i] + cards[i]]``
+    # when ``cards[i] <= 4096``, else in ``words[starts[i]:starts[i] + 1024]``.
+    def __init__(self, keys, cards, starts, values, words):
+        self.keys = keys
+        self.cards = cards
+        self.starts = starts
+        self.values = values
+        self.words = words
+
+    def count(self):
+        return int(self.cards.sum())
+
+    def _find(self, key):
+        i = np.searchsorted(self.keys, key)
+        if i < self.keys.shape[0] and self.keys[i] == key:
+            return i
+        return -1
+
+    def contains(self, x):
+        if x < 0:
+            return False
+        i = self._find(x >> 16)
+        if i < 0:
+            return False
+        low = x & 0xFFFF
+        start = self.starts[i]
+        if self.cards[i] <= _ARRAY_MAX:
+            chunk = self.values[start : start + self.cards[i]]
+            j = np.searchsorted(chunk, low)
+            return j < chunk.shape[0] and chunk[j] == low
+        w = self.words[start + (low >> 6)]
+        return (w >> np.uint64(low & 63)) & _ONE != 0
+
+    def _load(self, i, buf):
+        # Expands container ``i`` into the 1024-word ``buf``.
+        start = self.starts[i]
+        if self.cards[i] > _ARRAY_MAX:
+            buf[:] = self.words[start : start + _CHUNK_WORDS]
+            return
+        buf[:] = 0
+        for j in range(start, start + self.cards[i]):
+            v = self.values[j]
+            buf[v >> 6] |= _ONE << np.uint64(v & 63)
+
+    def _combine(self, other, op):
+        na = self.keys.shape[0]
+        nb = other.keys.shape[0]
+        out = _Builder(na + nb)
+        wa = np.zeros(_CHUNK_WORDS, np.uint64)
+        wb = np.zeros(_CHUNK_WORDS, np.uint64)
+        res = np.empty(_CHUNK_WORDS, np.uint64)
+        i = 0
+        j = 0
+        while i < na or j < nb:
+            if j >= nb or (i < na and self.keys[i] < other.keys[j]):
+                key = self.keys[i]
+                self._load(i, wa)
+                wb[:] = 0
+                i += 1
+            elif i >= na or other.keys[j] < self.keys[i]:
+                key = other.keys[j]
+                wa[:] = 0
+                other._load(j, wb)
+                j += 1
+            else:
+                key = self.keys[i]
+                self._load(i, wa)
+                other._load(j, wb)
+                i += 1
+                j += 1
+            if op == _AND:
+                np.bitwise_and(wa, wb, res)
+            elif op == _OR:
+                np.bitwise_or(wa, wb, res)
+            elif op == _XOR:
+                np.bitwise_xor(wa, wb, res)
+            else:
+                for k in range(_CHUNK_WORDS):
+                    res[k] = wa[k] & ~wb[k]
+            out.add(key, res)
+        return out.finish()
+
+    def __and__(self, other):
+        return self._combine(other, _AND)
+
+    def __or__(self, other):
+        return self._combine(other, _OR)
+
+    def __xor__(self, other):
+        return self._combine(other, _XOR)
+
+    def andnot(self, other):
+        return self._combine(other, _ANDNOT)
+
+    def rank(self, x):
+        # Number of positions below ``x``.
+        if x <= 0:
+            return 0
+        key = x >> 16
+        i = np.searchsorted(self.keys, key)
+        total = int(self.cards[:i].sum())
+        if i == self.keys.shape[0] or self.keys[i] != key:
+            return total
+        low = x & 0xFFFF
+        start = self.starts[i]
+        if self.cards[i] <= _ARRAY_MAX:
+            chunk = self.values[start : start + self.cards[i]]
+            return total + int(np.searchsorted(chunk, low))
+        for k in range(low >> 6):
+            total += int(_popcount(self.words[start + k]))
+        if low & 63:
+            mask = (_ONE << np.uint64(low & 63)) - _ONE
+            total += int(_popcount(self.words[start + (low >> 6)] & mask))
+        return total
+
+    def select(self, k):
+        # The k-th (0-based) smallest position, or -1.
+        if k < 0:
+            return -1
+        for i in range(self.keys.shape[0]):
+            if k >= self.cards[i]:
+                k -= self.cards[i]
+                continue
+            base = self.keys[i] << 16
+            start = self.starts[i]
+            if self.cards[i] <= _ARRAY_MAX:
+                return base + int(self.values[start + k])
+            for w in range(_CHUNK_WORDS):
+                c = int(_popcount(self.words[start + w]))
+                if k < c:
+                    return base + w * 64 + _select_in_word(self.words[start + w], k)
+                k -= c
+        return -1
+
+    def indices(self):
+        out = np.empty(self.count(), np.int64)
+        n = 0
+        for i in range(self.keys.shape[0]):
+            base = self.keys[i] << 16
+            start = self.starts[i]
+            if self.cards[i] <= _ARRAY_MAX:
+                for j in range(start, start + self.cards[i]):
+                    out[n] = base + int(self.values[j])
+                    n += 1
+                continue
+            for w in range(_CHUNK_WORDS):
+                bits = self.words[start + w]
+                while bits:
+                    out[n] = base + w * 64 + int(trailing_zeros(bits))
+                    n += 1
+                    bits &= bits - _ONE
+        return out
+
+    def to_bitset(self, size):
+        out = Bitset(size)
+        for x in self.indices():
+            out.set(x)
+        return out
+
+
+@jitclass(
+    [
+        ("n", int64),
+        ("keys", int64[::1]),
+        ("cards", int64[::1]),
+        ("starts", int64[::1]),
+        ("values", uint16[::1]),
+        ("nvalues", int64),
+        ("words", uint64[::1]),
+        ("nwords", int64),
+    ]
+)
+class _Builder:
+    # Collects chunks in key order and stores each in its compact form.
+    def __init__(self, capacity):
+        self.n = 0
+        self.keys = np.empty(capacity, np.int64)
+        self.cards = np.empty(capacity, np.int64)
+        self.starts = np.empty(capacity, np.int64)
+        self.values = np.empty(_ARRAY_MAX * capacity, np.uint16)
+        self.nvalues = 0
+        self.words = np.empty(_CHUNK_WORDS * capacity, np.uint64)
+        self.nwords = 0
+
+    def add(self, key, chunk):
+        card = 0
+        for w in chunk:
+            card += int(_popcount(w))
+        if card == 0:
+            return
+        self.keys[self.n] = key
+        self.cards[self.n] = card
+        if card > _ARRAY_MAX:
+            self.starts[self.n] = self.nwords
+            self.words[self.nwords : self.nwords + _CHUNK_WORDS] = chunk
+            self.nwords += _CHUNK_WORDS
+        else:
+            self.starts[self.n] = self.nvalues
+            for w in range(_CHUNK_WORDS):
+                bits = chunk[w]
+                while bits:
+                    low = w * 64 + int(trailing_zeros(bits))
+                    self.values[self.nvalues] = low
+                    self.nvalues += 1
+                    bits &= bits - _ONE
+        self.n += 1
+
+    def finish(self):
+        return RoaringBitmap(
+            self.keys[: self.n].copy(),
+            self.cards[: self.n].copy(),
+            self.starts[: self.n].copy(),
+            self.values[: self.nvalues].copy(),
+            self.words[: self.nwords].copy(),
+        )
+
+
+@njit
+def roaring_from_indices(indices):
+    """Build a RoaringBitmap from non-negative positions in any order."""
+    positions = np.unique(indices)
+    if positions.shape[0] and positions[0] < 0:
+        raise ValueError("positions must be non-negative")
+    keys = positions >> 16
+    nchunks = 0
+    for i in range(positions.shape[0]):
+        if i == 0 or keys[i] != keys[i - 1]:
+            nchunks += 1
+    out = _Builder(nchunks)
+    chunk = np.zeros(_CHUNK_WORDS, np.uint64)
+    i = 0
+    while i < positions.shape[0]:
+        key = keys[i]
+        chunk[:] = 0
+        while i < positions.shape[0] and keys[i] == key:
+            low = positions[i] & 0xFFFF
+            chunk[low >> 6] |= _ONE << np.uint64(low & 63)
+            i += 1
+        out.add(key, chunk)
+    return out.finish()
+
+
+@njit
+def roaring_from_bitset(bits):
+    """Compress a Bitset into a RoaringBitmap."""
+    return roaring_from_indices(bits.indices())
@@ -0,0 +1,138 @@
+import numpy as np
+import pytest
+
+
+def _masks(n=1000, seed=0):
+    rs = np.random.RandomState(seed)
+    return rs.rand(n) < 0.3, rs.rand(n) < 0.6
+
+
+def _positions(seed=0):
+    # A sparse chunk, a dense chunk and a chunk only one side has.
+    rs = np.random.RandomState(seed)
+    x = np.concatenate(
+        [
+            rs.randint(0, 1 << 16, 100),
+            rs.randint(1 << 16, 2 << 16, 30000),
+            rs.randint(5 << 16, 6 << 16, 10),
+        ]
+    )
+    y = np.concatenate(
+        [rs.randint(0, 1 << 16, 10000), rs.randint(1 << 16, 2 << 16, 300)]
+    )
+    return x, y
+
+
+@pytest.mark.parametrize("n", [0, 1, 64, 1000])
+def test_bitset_ops_match_bool_masks(n):
+    from numba_extras.bitset import bitset_from_bool
+
+    m1, m2 = _masks(n)
+    a, b = bitset_from_bool(m1), bitset_from_bool(m2)
+    np.testing.assert_array_equal((a & b).to_bool(), m1 & m2)
+    np.testing.assert_array_equal((a | b).to_bool(), m1 | m2)
+    np.testing.assert_array_equal((a ^ b).to_bool(), m1 ^ m2)
+    np.testing.assert_array_equal(a.andnot(b).to_bool(), m1 & ~m2)
+    np.testing.assert_array_equal((~a).to_bool(), ~m1)
+    assert (~a).count() == n - m1.sum()
+    assert a.count() == m1.sum()
+    assert len(a) == n
+
+
+def test_bitset_rank_select_iteration():
+    from numba_extras.bitset import bitset_from_bool
+
+    mask = _masks()[0]
+    bits = bitset_from_bool(mask)
+    expected = np.flatnonzero(mask)
+    np.testing.assert_array_equal(bits.indices(), expected)
+    for i in (0, 1, 63, 64, 500, 1000):
+        assert bits.rank(i) == mask[:i].sum()
+    for k in (0, 10, len(expected) - 1):
+        assert bits.select(k) == expected[k]
+    assert bits.select(len(expected)) == -1
+    found = []
+    i = bits.next_set(0)
+    while i >= 0:
+        found.append(i)
+        i = bits.next_set(i + 1)
+    assert found == expected.tolist()
+
+
+def test_bitset_set_clear_bounds():
+    from numba_extras.bitset import Bitset
+
+    bits = Bitset(70)
+    bits.set(3)
+    bits.set(69)
+    assert bits.get(69) and not bits.get(68)
+    bits.clear(3)
+    assert bits.indices().tolist() == [69]
+    with pytest.raises(IndexError):
+        bits.set(70)
+    with pytest.raises(ValueError):
+        bits & Bitset(71)
+
+
+def test_bitset_in_njit():
+    from numba import njit
+    from numba_extras.bitset import Bitset, bitset_from_bool
+
+    @njit
+    def combine(m1, m2, m3):
+        a = bitset_from_bool(m1)
+        b = bitset_from_bool(m2)
+        c = bitset_from_bool(m3)
+        return ((a & b) | ~c).count()
+
+    m1, m2 = _masks()
+    m3 = _masks(seed=1)[0]
+    assert combine(m1, m2, m3) == ((m1 & m2) | ~m3).sum()
+
+    @njit
+    def fresh(n):
+        return Bitset(n)
+
+    assert fresh(5).count() == 0
+
+
+def test_roaring_ops_match_sets():
+    from numba_extras.bitset import roaring_from_indices
+
+    x, y = _positions()
+    r, s = roaring_from_indices(x), roaring_from_indices(y)
+    X, Y = set(x.tolist()), set(y.tolist())
+    # Both container kinds are exercised.
+    assert r.cards.max() > 4096 and r.cards.min() <= 4096
+    assert (r & s).indices().tolist() == sorted(X & Y)
+    assert (r | s).indices().tolist() == sorted(X | Y)
+    assert (r ^ s).indices().tolist() == sorted(X ^ Y)
+    assert r.andnot(s).indices().tolist() == sorted(X - Y)
+    assert r.count() == len(X)
+
+
+def test_roaring_queries():
+    from numba_extras.bitset import roaring_from_indices
+
+    x = _positions()[0]
+    r = roaring_from_indices(x)
+    ordered = np.unique(x)
+    for v in (0, 1000, 70000, 1 << 17, 6 << 16):
+        assert r.rank(v) == np.searchsorted(ordered, v)
+    for k in (0, 99, 100, 5000, len(ordered) - 1):
+        assert r.select(k) == ordered[k]
+    assert r.select(len(ordered)) == -1
+    assert r.contains(ordered[200]) and r.contains(ordered[-1])
+    assert not r.contains(-1) and not r.contains(3 << 16)
+    with pytest.raises(ValueError):
+        roaring_from_indices(np.array([-1, 2]))
+
+
+def test_roaring_bitset_roundtrip():
+    from numba_extras.bitset import bitset_from_bool, roaring_from_bitset
+
+    mask = np.zeros(200000, bool)
+    mask[70000:140000] = True
+    mask[::97] = True
+    r = roaring_from_bitset(bitset_from_bool(mask))
+    np.testing.assert_array_equal(r.to_bitset(mask.shape[0]).to_bool(), mask)
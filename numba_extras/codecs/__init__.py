@@ -0,0 +1,19 @@
+from .integer import (  # noqa: F401
+    BitPacked,
+    bitpack,
+    bitunpack,
+    delta_decode,
+    delta_encode,
+    rle_decode,
+    rle_encode,
+    zigzag_decode,
+    zigzag_encode,
+)
+from .lz4 import (  # noqa: F401
+    LZ4Blocks,
+    lz4_bound,
+    lz4_compress,
+    lz4_compress_blocks,
+    lz4_decompress,
+    lz4_decompress_blocks,
+)
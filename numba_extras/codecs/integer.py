@@ -0,0 +1,254 @@
+"""Lightweight codecs for integer arrays.
+
+``delta_encode`` keeps the first value and then the difference of each
+value from the one before, wrapping around in the dtype of the input, so
+sorted IDs become small non-negative gaps. ``zigzag_encode`` maps signed
+integers to unsigned ones of the same width so that values near zero, of
+either sign, stay small: 0, -1, 1, -2, ... become 0, 1, 2, 3, ...
+
+``bitpack`` is frame-of-reference bit-packing. Every block of ``block``
+values stores its minimum and the bit width of the largest offset from
+it, then the offsets at that width in uint64 words. Blocks start on a
+word, so they are packed and unpacked in parallel and a block of equal
+values takes no words at all. ``bitpack(delta_encode(ids))`` is the usual
+encoding of sorted ID arrays.
+
+``rle_encode`` splits an array into runs of equal values and returns the
+value and length of each run; ``rle_decode`` expands them again.
+
+Everything here works from Python and from ``@njit`` code.
+"""
+
+import collections
+
+import numpy as np
+from numba import njit, prange, types
+from numba.extending import overload
+from numba.np.numpy_support import as_dtype
+
+from ..scan import nonzero, offsets, scan
+
+BitPacked = collections.namedtuple(
+    "BitPacked", ["refs", "widths", "offsets", "words", "length", "block"]
+)
+
+
+def _check_integer(x):
+    if not (isinstance(x, types.Array) and isinstance(x.dtype, types.Integer)):
+        raise TypeError("expected an integer array")
+
+
+@njit
+def _wrapping_add(a, b):
+    # ``scan`` writes through an array of the input dtype, which wraps.
+    return a + b
+
+
+@njit(parallel=True)
+def delta_encode(x):
+    """``x[0]`` followed by ``x[i] - x[i - 1]``, wrapping in ``x.dtype``."""
+    out = np.empty_like(x)
+    if x.shape[0]:
+        out[0] = x[0]
+    for i in prange(1, x.shape[0]):
+        out[i] = x[i] - x[i - 1]
+    return out
+
+
+@njit
+def delta_decode(d):
+    """The inverse of ``delta_encode``: a running sum in ``d.dtype``."""
+    return scan(d, _wrapping_add, 0)
+
+
+def _zigzag_encode(x):
+    pass
+
+
+@overload(_zigzag_encode, jit_options={"parallel": True})
+def _ol_zigzag_encode(x):
+    _check_integer(x)
+    if not x.dtype.signed:
+        raise TypeError("zigzag_encode expects signed integers")
+    udtype = np.dtype("u{}".format(as_dtype(x.dtype).itemsize))
+
+    def impl(x):
+        out = np.empty(x.shape[0], udtype)
+        for i in prange(x.shape[0]):
+            # Widening first keeps ``v << 1`` from overflowing for every
+            # dtype but int64, where it wraps as intended.
+            v = np.int64(x[i])
+            out[i] = (v << 1) ^ (v >> 63)
+        return out
+
+    return impl
+
+
+@njit
+def zigzag_encode(x):
+    """Map signed integers to unsigned ones of the same width."""
+    return _zigzag_encode(x)
+
+
+def _zigzag_decode(u):
+    pass
+
+
+@overload(_zigzag_decode, jit_options={"parallel": True})
+def _ol_zigzag_decode(u):
+    _check_integer(u)
+    if u.dtype.signed:
+        raise TypeError("zigzag_decode expects unsigned integers")
+    sdtype = np.dtype("i{}".format(as_dtype(u.dtype).itemsize))
+
+    def impl(u):
+        out = np.empty(u.shape[0], sdtype)
+        for i in prange(u.shape[0]):
+            v = np.uint64(u[i])
+            out[i] = np.int64(v >> np.uint64(1)) ^ -np.int64(v & np.uint64(1))
+        return out
+
+    return impl
+
+
+@njit
+def zigzag_decode(u):
+    """The inverse of ``zigzag_encode``."""
+    return _zigzag_decode(u)
+
+
+@njit
+def _bit_width(v):
+    width = 0
+    while v:
+        width += 1
+        v >>= np.uint64(1)
+    return width
+
+
+def _bitpack(x, block):
+    pass
+
+
+@overload(_bitpack, jit_options={"parallel": True})
+def _ol_bitpack(x, block):
+    _check_integer(x)
+
+    def impl(x, block):
+        if block < 1:
+            raise ValueError("block must be at least 1")
+        n = x.shape[0]
+        nblocks = (n + block - 1) // block
+        refs = np.empty(nblocks, x.dtype)
+        widths = np.empty(nblocks, np.uint8)
+        sizes = np.empty(nblocks, np.int64)
+        for b in prange(nblocks):
+            lo = b * block
+            hi = min(lo + block, n)
+            ref = x[lo]
+            top = x[lo]
+            for i in range(lo + 1, hi):
+                ref = min(ref, x[i])
+                top = max(top, x[i])
+            refs[b] = ref
+            # Offsets are taken modulo 2**64, which is exact for every
+            # integer dtype since ``top >= ref``.
+            width = _bit_width(np.uint64(top) - np.uint64(ref))
+            widths[b] = width
+            sizes[b] = ((hi - lo) * width + 63) >> 6
+        starts = offsets(sizes)
+        words = np.zeros(starts[nblocks], np.uint64)
+        for b in prange(nblocks):
+            lo = b * block
+            hi = min(lo + block, n)
+            width = np.uint64(widths[b])
+            ref = np.uint64(refs[b])
+            pos = np.uint64(starts[b] * 64)
+            for i in range(lo, hi):
+                v = np.uint64(x[i]) - ref
+                word = pos >> np.uint64(6)
+                shift = pos & np.uint64(63)
+                words[word] |= v << shift
+                if shift + width > np.uint64(64):
+                    words[word + 1] |= v >> (np.uint64(64) - shift)
+                pos += width
+        return BitPacked(refs, widths, starts, words, n, block)
+
+    return impl
+
+
+@njit
+def bitpack(x, block=128):
+    """Frame-of-reference bit-pack the integer array ``x``."""
+    return _bitpack(x, block)
+
+
+@njit(parallel=True)
+def bitunpack(p):
+    """The array that ``bitpack`` packed into ``p``."""
+    refs = p.refs
+    widths = p.widths
+    starts = p.offsets
+    words = p.words
+    n = p.length
+    block = p.block
+    out = np.empty(n, refs.dtype)
+    for b in prange(refs.shape[0]):
+        lo = b * block
+        hi = min(lo + block, n)
+        width = np.uint64(widths[b])
+        ref = np.uint64(refs[b])
+        if width == 0:
+            out[lo:hi] = refs[b]
+            continue
+        mask = ~np.uint64(0) >> (np.uint64(64) - width)
+        pos = np.uint64(starts[b] * 64)
+        for i in range(lo, hi):
+            word = pos >> np.uint64(6)
+            shift = pos & np.uint64(63)
+            v = words[word] >> shift
+            if shift + width > np.uint64(64):
+                v |= words[word + 1] << (np.uint64(64) - shift)
+            out[i] = ref + (v & mask)
+            pos += width
+    return out
+
+
+@njit(parallel=True)
+def _run_starts(x):
+    n = x.shape[0]
+    starts = np.empty(n, np.bool_)
+    if n:
+        starts[0] = True
+    for i in prange(1, n):
+        starts[i] = x[i] != x[i - 1]
+    return starts
+
+
+@njit(parallel=True)
+def rle_encode(x):
+    """Runs of equal values in ``x``: ``(values, lengths)``.
+
+    Each NaN is a run of its own, since NaN compares unequal to itself.
+    """
+    first = nonzero(_run_starts(x))
+    runs = first.shape[0]
+    values = np.empty(runs, x.dtype)
+    lengths = np.empty(runs, np.int64)
+    for r in prange(runs):
+        values[r] = x[first[r]]
+        stop = first[r + 1] if r + 1 < runs else x.shape[0]
+        lengths[r] = stop - first[r]
+    return values, lengths
+
+
+@njit(parallel=True)
+def rle_decode(values, lengths):
+    """Expand runs: ``np.repeat(values, lengths)``."""
+    if values.shape[0] != lengths.shape[0]:
+        raise ValueError("values and lengths differ in length")
+    starts = offsets(lengths)
+    out = np.empty(starts[-1], values.dtype)
+    for r in prange(values.shape[0]):
+        out[starts[r] : starts[r + 1]] = values[r]
+    return out
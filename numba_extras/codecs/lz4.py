@@ -0,0 +1,274 @@
+"""LZ4 block compression in nopython mode.
+
+``lz4_compress`` writes one block in the LZ4 block format, which any LZ4
+implementation reads back given the uncompressed size (``LZ4_decompress_safe``,
+``lz4.block.decompress(..., uncompressed_size=...)`` or Arrow's ``lz4_raw``
+codec). The compressor is the greedy single-probe matcher of the reference
+``LZ4_compress_fast`` at acceleration 1, including its skipping over data
+that does not compress. ``lz4_decompress`` validates every length and offset
+and raises ValueError on malformed input instead of reading or writing out
+of bounds.
+
+``lz4_compress_blocks`` cuts the input into independent blocks of
+``block_size`` bytes and compresses them in parallel into an
+``LZ4Blocks`` named tuple; ``lz4_decompress_blocks`` inflates them in
+parallel. Each block is itself a valid LZ4 block. Inputs of any dtype are
+read as their bytes, and decompression gives uint8 arrays to ``.view``.
+"""
+
+import collections
+
+import numpy as np
+from numba import njit, prange
+
+from ..scan import offsets
+
+LZ4Blocks = collections.namedtuple(
+    "LZ4Blocks", ["data", "offsets", "block_size", "size"]
+)
+
+_MIN_MATCH = 4
+# The last match must start at least 12 bytes before the end of the block
+# and the last 5 bytes are always literals.
+_MF_LIMIT = 12
+_LAST_LITERALS = 5
+_MAX_OFFSET = 65535
+# 4096 int32 positions: the 16 KB table of the reference implementation.
+_HASH_LOG = 12
+# After 2**_SKIP_STRENGTH failed probes the step between probes grows by one.
+_SKIP_STRENGTH = 6
+
+
+@njit
+def _bytes(x):
+    return np.ascontiguousarray(x).reshape(-1).view(np.uint8)
+
+
+@njit
+def lz4_bound(n):
+    """Largest compressed size of ``n`` bytes, as ``LZ4_compressBound``."""
+    return n + n // 255 + 16
+
+
+@njit
+def _read32(src, i):
+    i = np.uintp(i)
+    return (
+        np.uint32(src[i])
+        | np.uint32(src[i + 1]) << np.uint32(8)
+        | np.uint32(src[i + 2]) << np.uint32(16)
+        | np.uint32(src[i + 3]) << np.uint32(24)
+    )
+
+
+@njit
+def _hash(seq):
+    return ((np.uint64(seq) * np.uint64(2654435761)) & np.uint64(0xFFFFFFFF)) >> (
+        np.uint64(32 - _HASH_LOG)
+    )
+
+
+@njit
+def _copy(dst, d, src, s, n):
+    # Byte loop: most copies are a few bytes, where a slice copy's setup
+    # costs more than the copy itself.
+    d = np.uintp(d)
+    s = np.uintp(s)
+    for k in range(np.uintp(n)):
+        dst[d + k] = src[s + k]
+
+
+@njit
+def _put_length(dst, d, n):
+    # The 255-continued extension of a length field that overflowed 15.
+    while n >= 255:
+        dst[d] = 255
+        d += 1
+        n -= 255
+    dst[d] = n
+    return d + 1
+
+
+@njit
+def _emit(src, dst, d, anchor, literals, offset, match):
+    token = d
+    d += 1
+    if literals >= 15:
+        tok = 15 << 4
+        d = _put_length(dst, d, literals - 15)
+    else:
+        tok = literals << 4
+    _copy(dst, d, src, anchor, literals)
+    d += literals
+    if match < 0:
+        dst[token] = tok
+        return d
+    dst[d] = offset & 0xFF
+    dst[d + 1] = offset >> 8
+    d += 2
+    match -= _MIN_MATCH
+    if match >= 15:
+        tok |= 15
+        d = _put_length(dst, d, match - 15)
+    else:
+        tok |= match
+    dst[token] = tok
+    return d
+
+
+@njit
+def _compress_into(src, lo, hi, dst, d, table):
+    # Compresses src[lo:hi] into dst[d:] and returns the end position.
+    anchor = lo
+    limit = hi - _MF_LIMIT
+    match_limit = hi - _LAST_LITERALS
+    if hi - lo > _MF_LIMIT:
+        table[:] = -1
+        table[_hash(_read32(src, lo))] = lo
+        ip = lo + 1
+        while ip <= limit:
+            # Probe until a 4-byte match within reach turns up.
+            attempts = 1 << _SKIP_STRENGTH
+            ref = -1
+            while ip <= limit:
+                seq = _read32(src, ip)
+                h = _hash(seq)
+                ref = table[h]
+                table[h] = ip
+                if ref >= lo and ip - ref <= _MAX_OFFSET and _read32(src, ref) == seq:
+                    break
+                ip += attempts >> _SKIP_STRENGTH
+                attempts += 1
+                ref = -1
+            if ref < 0:
+                break
+            while ip > anchor and ref > lo and src[ip - 1] == src[ref - 1]:
+                ip -= 1
+                ref -= 1
+            length = _MIN_MATCH
+            while ip + length < match_limit and src[ip + length] == src[ref + length]:
+                length += 1
+            d = _emit(src, dst, d, anchor, ip - anchor, ip - ref, length)
+            ip += length
+            anchor = ip
+            if ip <= limit:
+                table[_hash(_read32(src, ip - 2))] = ip - 2
+    return _emit(src, dst, d, anchor, hi - anchor, 0, -1)
+
+
+@njit
+def lz4_compress(x):
+    """``x``, read as bytes, compressed into one LZ4 block."""
+    src = _bytes(x)
+    dst = np.empty(lz4_bound(src.shape[0]), np.uint8)
+    table = np.empty(1 << _HASH_LOG, np.int32)
+    return dst[: _compress_into(src, 0, src.shape[0], dst, 0, table)].copy()
+
+
+@njit
+def _length(src, i, hi, n):
+    # Adds the 255-continued extension at src[i:] to ``n``; -1 on overrun.
+    while True:
+        if i >= hi:
+            return -1, i
+        b = src[i]
+        i += 1
+        n += b
+        if b != 255:
+            return n, i
+
+
+@njit
+def _decompress_into(src, lo, hi, dst, start, stop):
+    # Inflates the block src[lo:hi] into dst[start:stop]. Returns the end
+    # of the output, or -1 if the block is malformed.
+    i = lo
+    d = start
+    while i < hi:
+        token = src[i]
+        i += 1
+        literals = np.int64(token >> 4)
+        if literals == 15:
+            literals, i = _length(src, i, hi, literals)
+            if literals < 0:
+                return -1
+        if i + literals > hi or d + literals > stop:
+            return -1
+        _copy(dst, d, src, i, literals)
+        i += literals
+        d += literals
+        if i == hi:
+            return d
+        if i + 2 > hi:
+            return -1
+        offset = np.int64(src[i]) | np.int64(src[i + 1]) << 8
+        i += 2
+        match = np.int64(token & 15)
+        if match == 15:
+            match, i = _length(src, i, hi, match)
+            if match < 0:
+                return -1
+        match += _MIN_MATCH
+        if offset == 0 or offset > d - start or d + match > stop:
+            return -1
+        # Copying forwards one byte at a time also handles matches that
+        # overlap their own output, which repeat the last ``offset`` bytes.
+        _copy(dst, d, dst, d - offset, match)
+        d += match
+    # Every block ends with a literal run, which returned above.
+    return -1
+
+
+@njit
+def lz4_decompress(src, size):
+    """Inflate one LZ4 block holding ``size`` bytes into a uint8 array."""
+    src = _bytes(src)
+    out = np.empty(size, np.uint8)
+    if _decompress_into(src, 0, src.shape[0], out, 0, size) != size:
+        raise ValueError("malformed LZ4 block")
+    return out
+
+
+@njit(parallel=True)
+def lz4_compress_blocks(x, block_size=1 << 16):
+    """Compress ``x``, read as bytes, in independent blocks in parallel."""
+    if block_size < 1:
+        raise ValueError("block_size must be at least 1")
+    src = _bytes(x)
+    n = src.shape[0]
+    nblocks = (n + block_size - 1) // block_size
+    bound = lz4_bound(block_size)
+    scratch = np.empty(nblocks * bound, np.uint8)
+    sizes = np.empty(nblocks, np.int64)
+    for b in prange(nblocks):
+        table = np.empty(1 << _HASH_LOG, np.int32)
+        lo = b * block_size
+        hi = min(lo + block_size, n)
+        sizes[b] = _compress_into(src, lo, hi, scratch, b * bound, table) - b * bound
+    starts = offsets(sizes)
+    data = np.empty(starts[nblocks], np.uint8)
+    for b in prange(nblocks):
+        data[starts[b] : starts[b + 1]] = scratch[b * bound : b * bound + sizes[b]]
+    return LZ4Blocks(data, starts, block_size, n)
+
+
+@njit(parallel=True)
+def lz4_decompress_blocks(blocks):
+    """Inflate what ``lz4_compress_blocks`` wrote, in parallel."""
+    data = blocks.data
+    starts = blocks.offsets
+    block_size = blocks.block_size
+    n = blocks.size
+    nblocks = starts.shape[0] - 1
+    if nblocks != (n + block_size - 1) // block_size:
+        raise ValueError("block count does not match the size")
+    out = np.empty(n, np.uint8)
+    ok = np.empty(nblocks, np.bool_)
+    for b in prange(nblocks):
+        lo = b * block_size
+        hi = min(lo + block_size, n)
+        end = _decompress_into(data, starts[b], starts[b + 1], out, lo, hi)
+        ok[b] = end == hi
+    if not ok.all():
+        raise ValueError("malformed LZ4 block")
+    return out
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+DTYPES = [np.int8, np.int16, np.int32, np.int64, np.uint8, np.uint32, np.uint64]
+
+
+def _extremes(dtype, n=5000, seed=0):
+    info = np.iinfo(dtype)
+    rs = np.random.RandomState(seed)
+    x = rs.randint(-100, 100, n).astype(dtype)
+    x[::97] = info.min
+    x[::89] = info.max
+    return x
+
+
+@pytest.mark.parametrize("dtype", DTYPES)
+def test_delta_round_trip(dtype):
+    from numba_extras.codecs import delta_decode, delta_encode
+
+    x = _extremes(dtype, 100_000)
+    d = delta_encode(x)
+    assert d.dtype == x.dtype
+    np.testing.assert_array_equal(d[1:], np.diff(x))
+    np.testing.assert_array_equal(delta_decode(d), x)
+    assert delta_decode(delta_encode(x[:0])).shape == (0,)
+
+
+@pytest.mark.parametrize("dtype", [np.int8, np.int16, np.int32, np.int64])
+def test_zigzag(dtype):
+    from numba_extras.codecs import zigzag_decode, zigzag_encode
+
+    np.testing.assert_array_equal(
+        zigzag_encode(np.array([0, -1, 1, -2, 2], dtype)), [0, 1, 2, 3, 4]
+    )
+    x = _extremes(dtype)
+    z = zigzag_encode(x)
+    assert z.dtype == np.dtype(dtype).str.replace("i", "u")
+    np.testing.assert_array_equal(zigzag_decode(z), x)
+    with pytest.raises(Exception):
+        zigzag_encode(z)
+
+
+@pytest.mark.parametrize("dtype", DTYPES)
+@pytest.mark.parametrize("block", [1, 7, 128])
+def test_bitpack_round_trip(dtype, block):
+    from numba_extras.codecs import bitpack, bitunpack
+
+    x = _extremes(dtype)
+    p = bitpack(x, block)
+    out = bitunpack(p)
+    assert out.dtype == x.dtype
+    np.testing.assert_array_equal(out, x)
+    x[:] = 3
+    assert bitpack(x, block).words.shape == (0,)
+    np.testing.assert_array_equal(bitunpack(bitpack(x, block)), x)
+    assert bitunpack(bitpack(x[:0])).shape == (0,)
+
+
+def test_bitpack_sorted_ids():
+    from numba_extras.codecs import bitpack, bitunpack, delta_decode, delta_encode
+
+    rs = np.random.RandomState(1)
+    ids = np.cumsum(rs.randint(1, 16, 1 << 16)).astype(np.int64)
+    p = bitpack(delta_encode(ids))
+    # Gaps below 16 need at most 4 bits; the first value sits in its own
+    # block's reference only when it is the block minimum.
+    assert p.words.nbytes < ids.nbytes // 12
+    np.testing.assert_array_equal(delta_decode(bitunpack(p)), ids)
+
+
+def test_rle():
+    from numba_extras.codecs import rle_decode, rle_encode
+
+    x = np.repeat(np.arange(50) % 3, np.arange(1, 51))
+    values, lengths = rle_encode(x)
+    assert values.shape == (50,)
+    np.testing.assert_array_equal(lengths, np.arange(1, 51))
+    np.testing.assert_array_equal(rle_decode(values, lengths), x)
+    big = np.random.RandomState(2).randint(0, 2, 200_000).astype(np.int16)
+    np.testing.assert_array_equal(rle_decode(*rle_encode(big)), big)
+    v, n = rle_encode(np.empty(0, np.int64))
+    assert v.shape == n.shape == (0,)
+    with pytest.raises(ValueError):
+        rle_decode(values, lengths[:-1])
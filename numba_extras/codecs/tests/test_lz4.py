@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+
+def _samples():
+    rs = np.random.RandomState(0)
+    text = b"the quick brown fox jumps over the lazy dog. " * 500
+    return [
+        b"",
+        b"a",
+        b"abcdefghijkl",
+        b"abcdefghijklm",
+        b"a" * 100_000,
+        text,
+        rs.bytes(70_000),
+        bytes(rs.randint(0, 4, 300_000).astype(np.uint8)),
+        (rs.bytes(300) + text[:2000]) * 50,
+    ]
+
+
+def _arrow():
+    pa = pytest.importorskip("pyarrow")
+    if not pa.Codec.is_available("lz4_raw"):
+        pytest.skip("pyarrow built without lz4")
+    return pa
+
+
+def test_round_trip():
+    from numba_extras.codecs import lz4_bound, lz4_compress, lz4_decompress
+
+    for data in _samples():
+        src = np.frombuffer(data, np.uint8)
+        packed = lz4_compress(src)
+        assert packed.shape[0] <= lz4_bound(len(data))
+        assert lz4_decompress(packed, len(data)).tobytes() == data
+    assert len(lz4_compress(np.frombuffer(b"a" * 100_000, np.uint8))) < 500
+
+
+def test_compatible_with_reference_lz4():
+    pa = _arrow()
+    from numba_extras.codecs import lz4_compress, lz4_decompress
+
+    for data in _samples()[1:]:
+        ours = lz4_compress(np.frombuffer(data, np.uint8)).tobytes()
+        got = pa.decompress(
+            ours, decompressed_size=len(data), codec="lz4_raw", asbytes=True
+        )
+        assert got == data
+        theirs = pa.compress(data, codec="lz4_raw", asbytes=True)
+        assert lz4_decompress(np.frombuffer(theirs, np.uint8), len(data)).tobytes() == (
+            data
+        )
+
+
+def test_typed_input():
+    from numba_extras.codecs import lz4_compress, lz4_decompress
+
+    x = np.arange(10_000, dtype=np.int32).reshape(100, 100)[:, ::2]
+    out = lz4_decompress(lz4_compress(x), x.nbytes).view(np.int32)
+    np.testing.assert_array_equal(out.reshape(x.shape), x)
+
+
+@pytest.mark.parametrize("block_size", [1, 1000, 1 << 16])
+def test_blocks(block_size):
+    from numba_extras.codecs import (
+        lz4_compress_blocks,
+        lz4_decompress,
+        lz4_decompress_blocks,
+    )
+
+    data = np.frombuffer(b"".join(_samples()[4:7]), np.uint8)
+    if block_size == 1:
+        data = data[:5000]
+    blocks = lz4_compress_blocks(data, block_size)
+    assert blocks.offsets.shape[0] == -(-data.shape[0] // block_size) + 1
+    np.testing.assert_array_equal(lz4_decompress_blocks(blocks), data)
+    first = blocks.data[blocks.offsets[0] : blocks.offsets[1]]
+    np.testing.assert_array_equal(lz4_decompress(first, block_size), data[:block_size])
+    empty = lz4_compress_blocks(data[:0])
+    assert lz4_decompress_blocks(empty).shape == (0,)
+
+
+def test_malformed_input():
+    from numba_extras.codecs import (
+        lz4_compress,
+        lz4_compress_blocks,
+        lz4_decompress,
+        lz4_decompress_blocks,
+    )
+
+    data = np.frombuffer(b"hello hello hello hello hello!", np.uint8)
+    packed = lz4_compress(data)
+    bad = [
+        np.empty(0, np.uint8),
+        packed[:-1],
+        packed[:3],
+        np.array([0x0F, 0x00, 0x00, 0x00], np.uint8),
+        np.array([0x10, ord("a"), 0x05, 0x00, 0x00], np.uint8),
+    ]
+    for src in bad:
+        with pytest.raises(ValueError):
+            lz4_decompress(src, data.shape[0])
+    for size in (data.shape[0] - 1, data.shape[0] + 1):
+        with pytest.raises(ValueError):
+            lz4_decompress(packed, size)
+    blocks = lz4_compress_blocks(data, 8)
+    broken = blocks._replace(data=blocks.data.copy())
+    broken.data[blocks.offsets[1]] = 0xFF
+    with pytest.raises(ValueError):
+        lz4_decompress_blocks(broken)
@@ -0,0 +1,2 @@
+from .heap import Heap, IndexedPriorityQueue  # noqa: F401
+from .topk import top_k  # noqa: F401
@@ -0,0 +1,194 @@
+"""Array-backed d-ary min-heaps.
+
+``Heap`` holds ``(key, item)`` pairs with float64 keys and int64 items and
+grows as needed. ``IndexedPriorityQueue`` holds each item of ``range(n)`` at
+most once and keeps a map from item to heap slot, which gives
+``decrease_key`` and membership tests in O(log n) and O(1), as needed by
+Dijkstra or Prim. Both take the arity ``d``: a 4-ary heap is shallower and
+does fewer cache misses per operation than a binary one.
+
+For a max-heap, push negated keys.
+"""
+
+import numpy as np
+from numba import float64, int64, njit
+from numba.experimental import jitclass
+
+
+@njit
+def _place(keys, items, slots, i, key, item):
+    keys[i] = key
+    items[i] = item
+    if slots.shape[0]:
+        slots[item] = i
+
+
+@njit
+def _sift_up(keys, items, slots, d, i):
+    key = keys[i]
+    item = items[i]
+    while i > 0:
+        parent = (i - 1) // d
+        if keys[parent] <= key:
+            break
+        _place(keys, items, slots, i, keys[parent], items[parent])
+        i = parent
+    _place(keys, items, slots, i, key, item)
+
+
+@njit
+def _sift_down(keys, items, slots, d, size, i):
+    key = keys[i]
+    item = items[i]
+    while True:
+        first = d * i + 1
+        if first >= size:
+            break
+        best = first
+        for c in range(first + 1, min(first + d, size)):
+            if keys[c] < keys[best]:
+                best = c
+        if keys[best] >= key:
+            break
+        _place(keys, items, slots, i, keys[best], items[best])
+        i = best
+    _place(keys, items, slots, i, key, item)
+
+
+@jitclass(
+    [
+        ("d", int64),
+        ("size", int64),
+        ("keys", float64[::1]),
+        ("items", int64[::1]),
+        ("_slots", int64[::1]),
+    ]
+)
+class Heap:
+    def __init__(self, d=2, capacity=16):
+        if d < 2:
+            raise ValueError("d must be at least 2")
+        self.d = d
+        self.size = 0
+        self.keys = np.empty(max(capacity, 1), np.float64)
+        self.items = np.empty(max(capacity, 1), np.int64)
+        self._slots = np.empty(0, np.int64)
+
+    def __len__(self):
+        return self.size
+
+    def push(self, key, item):
+        if self.size == self.keys.shape[0]:
+            keys = np.empty(2 * self.size, np.float64)
+            items = np.empty(2 * self.size, np.int64)
+            keys[: self.size] = self.keys
+            items[: self.size] = self.items
+            self.keys = keys
+            self.items = items
+        self.keys[self.size] = key
+        self.items[self.size] = item
+        self.size += 1
+        _sift_up(self.keys, self.items, self._slots, self.d, self.size - 1)
+
+    def peek(self):
+        if self.size == 0:
+            raise IndexError("peek from an empty heap")
+        return self.keys[0], self.items[0]
+
+    def pop(self):
+        if self.size == 0:
+            raise IndexError("pop from an empty heap")
+        key = self.keys[0]
+        item = self.items[0]
+        self.size -= 1
+        if self.size:
+            self.keys[0] = self.keys[self.size]
+            self.items[0] = self.items[self.size]
+            _sift_down(self.keys, self.items, self._slots, self.d, self.size, 0)
+        return key, item
+
+    def pushpop(self, key, item):
+        # Push then pop in one sift, like ``heapq.heappushpop``.
+        if self.size == 0 or key <= self.keys[0]:
+            return key, item
+        top_key = self.keys[0]
+        top_item = self.items[0]
+        self.keys[0] = key
+        self.items[0] = item
+        _sift_down(self.keys, self.items, self._slots, self.d, self.size, 0)
+        return top_key, top_item
+
+
+@jitclass(
+    [
+        ("d", int64),
+        ("size", int64),
+        ("keys", float64[::1]),
+        ("items", int64[::1]),
+        ("slots", int64[::1]),
+    ]
+)
+class IndexedPriorityQueue:
+    # ``slots[item]`` is the heap slot of ``item``, or -1 when absent.
+    def __init__(self, n, d=2):
+        if d < 2:
+            raise ValueError("d must be at least 2")
+        self.d = d
+        self.size = 0
+        self.keys = np.empty(n, np.float64)
+        self.items = np.empty(n, np.int64)
+        self.slots = np.full(n, -1, np.int64)
+
+    def __len__(self):
+        return self.size
+
+    def _check(self, item):
+        if not 0 <= item < self.slots.shape[0]:
+            raise IndexError("item out of range")
+
+    def __contains__(self, item):
+        return 0 <= item < self.slots.shape[0] and self.slots[item] >= 0
+
+    def key(self, item):
+        self._check(item)
+        if self.slots[item] < 0:
+            raise KeyError("item not in queue")
+        return self.keys[self.slots[item]]
+
+    def push(self, item, key):
+        self._check(item)
+        if self.slots[item] >= 0:
+            raise ValueError("item already in queue")
+        _place(self.keys, self.items, self.slots, self.size, key, item)
+        self.size += 1
+        _sift_up(self.keys, self.items, self.slots, self.d, self.size - 1)
+
+    def decrease_key(self, item, key):
+        self._check(item)
+        i = self.slots[item]
+        if i < 0:
+            raise KeyError("item not in queue")
+        if key > self.keys[i]:
+            raise ValueError("new key is larger than the current key")
+        self.keys[i] = key
+        _sift_up(self.keys, self.items, self.slots, self.d, i)
+
+    def peek(self):
+        if self.size == 0:
+            raise IndexError("peek from an empty queue")
+        return self.items[0], self.keys[0]
+
+    def pop(self):
+        if self.size == 0:
+            raise IndexError("pop from an empty queue")
+        item = self.items[0]
+        key = self.keys[0]
+        self.slots[item] = -1
+        self.size -= 1
+        if self.size:
+            last = self.size
+            _place(
+                self.keys, self.items, self.slots, 0, self.keys[last], self.items[last]
+            )
+            _sift_down(self.keys, self.items, self.slots, self.d, self.size, 0)
+        return item, key
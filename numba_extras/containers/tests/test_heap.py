@@ -0,0 +1,83 @@
+import heapq
+
+import numpy as np
+import pytest
+
+
+@pytest.mark.parametrize("d", [2, 3, 4])
+def test_heap_matches_heapq(d):
+    from numba_extras.containers import Heap
+
+    rs = np.random.RandomState(d)
+    heap = Heap(d, 1)
+    ref = []
+    for step in range(500):
+        if ref and rs.rand() < 0.4:
+            # Equal keys may come out in any order, so only keys are compared.
+            assert heap.pop()[0] == heapq.heappop(ref)[0]
+        else:
+            key = float(rs.randint(0, 50))
+            heap.push(key, step)
+            heapq.heappush(ref, (key, step))
+        assert len(heap) == len(ref)
+        if ref:
+            assert heap.peek()[0] == ref[0][0]
+    assert heap.pushpop(-1.0, 7) == (-1.0, 7)
+    top = heap.peek()
+    assert heap.pushpop(1e9, 8) == top
+    with pytest.raises(IndexError):
+        Heap().pop()
+
+
+def test_indexed_queue_dijkstra():
+    from numba import njit
+    from numba_extras.containers import IndexedPriorityQueue
+
+    @njit
+    def dijkstra(adj, source):
+        n = adj.shape[0]
+        dist = np.full(n, np.inf)
+        dist[source] = 0.0
+        queue = IndexedPriorityQueue(n, 4)
+        queue.push(source, 0.0)
+        while len(queue):
+            u, du = queue.pop()
+            for v in range(n):
+                w = adj[u, v]
+                if w > 0 and du + w < dist[v]:
+                    dist[v] = du + w
+                    if v in queue:
+                        queue.decrease_key(v, dist[v])
+                    else:
+                        queue.push(v, dist[v])
+        return dist
+
+    rs = np.random.RandomState(0)
+    adj = rs.rand(40, 40) * (rs.rand(40, 40) < 0.2)
+    expected = np.full(40, np.inf)
+    expected[0] = 0.0
+    for _ in range(40):
+        for u in range(40):
+            for v in range(40):
+                if adj[u, v] > 0:
+                    expected[v] = min(expected[v], expected[u] + adj[u, v])
+    np.testing.assert_allclose(dijkstra(adj, 0), expected)
+
+
+def test_indexed_queue_errors():
+    from numba_extras.containers import IndexedPriorityQueue
+
+    queue = IndexedPriorityQueue(3)
+    queue.push(1, 2.0)
+    assert 1 in queue and 2 not in queue and 7 not in queue
+    assert queue.key(1) == 2.0
+    with pytest.raises(ValueError):
+        queue.push(1, 0.0)
+    with pytest.raises(ValueError):
+        queue.decrease_key(1, 3.0)
+    with pytest.raises(KeyError):
+        queue.decrease_key(0, 1.0)
+    with pytest.raises(IndexError):
+        queue.push(3, 1.0)
+    assert queue.pop() == (1, 2.0)
+    assert 1 not in queue
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+
+def _expected(x, k, largest):
+    sign = -1 if largest else 1
+    ranked = sorted((sign * v.item(), i) for i, v in enumerate(x) if v == v)[:k]
+    return [sign * v for v, _ in ranked], [i for _, i in ranked]
+
+
+@pytest.mark.parametrize("largest", [True, False])
+@pytest.mark.parametrize("dtype", [np.float64, np.float32, np.int64, np.uint8])
+def test_top_k_matches_sort(largest, dtype):
+    from numba_extras.containers import top_k
+
+    x = np.random.RandomState(0).randint(0, 100, 20000).astype(dtype)
+    for k in (1, 10, 500):
+        values, indices = top_k(x, k, largest)
+        expected_values, expected_indices = _expected(x, k, largest)
+        assert values.dtype == x.dtype
+        assert values.tolist() == expected_values
+        assert indices.tolist() == expected_indices
+
+
+def test_top_k_edge_cases():
+    from numba_extras.containers import top_k
+
+    x = np.array([np.nan, 2.0, np.nan, 5.0])
+    values, indices = top_k(x, 3)
+    assert values.tolist() == [5.0, 2.0] and indices.tolist() == [3, 1]
+    assert top_k(np.arange(5), 0)[0].shape == (0,)
+    assert top_k(np.arange(3), 10)[1].tolist() == [2, 1, 0]
+    with pytest.raises(ValueError):
+        top_k(np.arange(3), -1)
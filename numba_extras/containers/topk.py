@@ -0,0 +1,115 @@
+"""Parallel top-k selection.
+
+``top_k`` splits the input into one contiguous run per thread. Each thread
+keeps the k best values of its run in a min-heap whose root is the value to
+beat, so almost every element costs a single comparison and nothing is
+copied. The per-thread heaps are merged at the end. Memory use is
+``O(threads * k)``, where ``np.argpartition`` copies the whole array.
+"""
+
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+
+@njit
+def _worse(va, ia, vb, ib, largest):
+    # Whether (va, ia) ranks below (vb, ib); ties go to the smaller index.
+    if va == vb:
+        return ia > ib
+    return va < vb if largest else va > vb
+
+
+@njit
+def _sift_down(vals, idx, size, i, largest):
+    # Binary heap with the worst kept entry at the root.
+    while True:
+        child = 2 * i + 1
+        if child >= size:
+            return
+        if child + 1 < size and _worse(
+            vals[child + 1], idx[child + 1], vals[child], idx[child], largest
+        ):
+            child += 1
+        if not _worse(vals[child], idx[child], vals[i], idx[i], largest):
+            return
+        vals[i], vals[child] = vals[child], vals[i]
+        idx[i], idx[child] = idx[child], idx[i]
+        i = child
+
+
+@njit
+def _offer(vals, idx, size, k, v, i, largest):
+    # Adds (v, i) to a heap of ``size`` entries; returns the new size.
+    if size < k:
+        vals[size] = v
+        idx[size] = i
+        j = size
+        while j > 0:
+            parent = (j - 1) // 2
+            if not _worse(vals[j], idx[j], vals[parent], idx[parent], largest):
+                break
+            vals[j], vals[parent] = vals[parent], vals[j]
+            idx[j], idx[parent] = idx[parent], idx[j]
+            j = parent
+        return size + 1
+    if _worse(vals[0], idx[0], v, i, largest):
+        vals[0] = v
+        idx[0] = i
+        _sift_down(vals, idx, size, 0, largest)
+    return size
+
+
+@njit(parallel=True)
+def _top_k(x, k, largest):
+    n = x.shape[0]
+    parts = max(1, min(get_num_threads(), n // max(k, 1)))
+    vals = np.empty((parts, k), x.dtype)
+    idx = np.empty((parts, k), np.int64)
+    sizes = np.zeros(parts, np.int64)
+    for p in prange(parts):
+        lo = n * p // parts
+        hi = n * (p + 1) // parts
+        pv = vals[p]
+        pi = idx[p]
+        size = 0
+        for i in range(lo, hi):
+            v = x[i]
+            if v != v:
+                continue
+            if size == k:
+                # Fast reject: most elements do not beat the root.
+                if largest:
+                    if v <= pv[0]:
+                        continue
+                elif v >= pv[0]:
+                    continue
+            size = _offer(pv, pi, size, k, v, i, largest)
+        sizes[p] = size
+    out_v = np.empty(k, x.dtype)
+    out_i = np.empty(k, np.int64)
+    size = 0
+    for p in range(parts):
+        for j in range(sizes[p]):
+            size = _offer(out_v, out_i, size, k, vals[p, j], idx[p, j], largest)
+    # Popping the root repeatedly yields the kept entries worst first.
+    for end in range(size - 1, 0, -1):
+        out_v[0], out_v[end] = out_v[end], out_v[0]
+        out_i[0], out_i[end] = out_i[end], out_i[0]
+        _sift_down(out_v, out_i, end, 0, largest)
+    return out_v[:size], out_i[:size]
+
+
+@njit
+def top_k(x, k, largest=True):
+    """Return ``(values, indices)`` of the ``k`` largest elements of ``x``.
+
+    Results are ordered best first, ties by smaller index. With
+    ``largest=False`` the smallest elements are returned instead. NaN is
+    skipped, so fewer than ``k`` results come back when ``x`` has fewer
+    than ``k`` non-NaN values.
+    """
+    if x.ndim != 1:
+        raise ValueError("top_k expects a 1-d array")
+    if k < 0:
+        raise ValueError("k must be non-negative")
+    return _top_k(x, min(k, x.shape[0]), largest)
@@ -0,0 +1 @@
+from .encode import decode, factorize  # noqa: F401
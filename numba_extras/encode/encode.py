@@ -0,0 +1,232 @@
+"""Dictionary encoding of columns.
+
+``factorize`` maps a column of strings, integers or floats to int32 codes
+plus the table of distinct values, numbered in order of first appearance
+like ``pandas.factorize``. Float NaN gets code -1. ``decode`` is the
+inverse. Both take NumPy arrays (including fixed-width ``U`` arrays) or
+typed lists, from Python or from ``@njit`` code.
+
+The distinct values are found with an open-addressing hash table that all
+threads fill at once: a thread claims an empty slot with a compare-and-swap
+on the row index, and a slot already holding an equal value keeps the
+smallest row index with an atomic min, so the table ends up holding each
+value's first occurrence whatever the thread interleaving. The table is
+sized from the number of distinct values, not the number of rows.
+"""
+
+import numpy as np
+from numba import njit, prange, types
+from numba.extending import overload
+from numba.typed import List
+
+from ..atomic import atomic_add, atomic_cas, atomic_load, atomic_min
+from ..hashing import hash_column, xxh64
+
+_MIN_TABLE = 1 << 12
+
+
+def _is_missing(x):
+    pass
+
+
+@overload(_is_missing)
+def _ol_is_missing(x):
+    if isinstance(x, types.Float):
+        return lambda x: np.isnan(x)
+    return lambda x: False
+
+
+def _take(values, idx):
+    pass
+
+
+@overload(_take)
+def _ol_take(values, idx):
+    if isinstance(values, types.Array):
+        return lambda values, idx: values[idx]
+    if isinstance(values, types.ListType):
+        item = values.item_type
+
+        def impl(values, idx):
+            out = List.empty_list(item)
+            for j in idx:
+                out.append(values[j])
+            return out
+
+        return impl
+    return None
+
+
+def _same(values, a, b):
+    pass
+
+
+@overload(_same)
+def _ol_same(values, a, b):
+    if isinstance(values, types.Array) and values.ndim == 2:
+        # Rows of raw bytes, one per fixed-width string.
+        def impl(values, a, b):
+            for k in range(values.shape[1]):
+                if values[a, k] != values[b, k]:
+                    return False
+            return True
+
+        return impl
+    return lambda values, a, b: values[a] == values[b]
+
+
+def _missing_at(values, i):
+    pass
+
+
+@overload(_missing_at)
+def _ol_missing_at(values, i):
+    if isinstance(values, types.Array) and values.ndim == 2:
+        return lambda values, i: False
+    return lambda values, i: _is_missing(values[i])
+
+
+@njit(parallel=True)
+def _insert(values, hashes, slots, slot_of):
+    # Returns False, leaving later rows unprocessed, once the table passes
+    # 3/4 load; threads already probing can only add a few more entries, so
+    # probes always find a free slot.
+    n = hashes.shape[0]
+    mask = slots.shape[0] - 1
+    limit = slots.shape[0] * 3 // 4
+    used = np.zeros(1, np.int64)
+    # Typed lists reject the unsigned index prange produces here.
+    for i in prange(n):
+        row = np.intp(i)
+        if _missing_at(values, row) or atomic_load(used, 0) > limit:
+            continue
+        j = np.intp(hashes[row] & np.uint64(mask))
+        while True:
+            s = atomic_load(slots, j)
+            if s < 0:
+                if atomic_cas(slots, j, -1, row) == -1:
+                    atomic_add(used, 0, 1)
+                    break
+                continue
+            if hashes[s] == hashes[row] and _same(values, s, row):
+                # prange hands each thread ascending rows, so the common
+                # case skips the atomic.
+                if row < s:
+                    atomic_min(slots, j, row)
+                break
+            j = (j + 1) & mask
+        slot_of[row] = j
+    return atomic_load(used, 0) <= limit
+
+
+@njit(parallel=True)
+def _lookup(slots, slot_of):
+    # Overwrites ``slot_of`` in place: fresh pages are costly to fault in.
+    for i in prange(slot_of.shape[0]):
+        if slot_of[i] >= 0:
+            slot_of[i] = slots[slot_of[i]]
+    return slot_of
+
+
+@njit
+def _first_rows(values, hashes):
+    # For every row, the index of the first row with an equal value, or -1
+    # for missing values. The table starts small and grows eightfold until
+    # it holds every distinct value, so its size follows the cardinality
+    # rather than the row count.
+    slot_of = np.full(hashes.shape[0], -1, np.int64)
+    size = _MIN_TABLE
+    while True:
+        slots = np.full(size, -1, np.int64)
+        if _insert(values, hashes, slots, slot_of):
+            return _lookup(slots, slot_of)
+        size *= 8
+
+
+@njit
+def _codes(first):
+    # One forward pass: a row's first occurrence never comes after it, so
+    # its code is already known unless the row is the first occurrence.
+    n = first.shape[0]
+    codes = np.empty(n, np.int32)
+    firsts = np.empty(n, np.int64)
+    k = 0
+    for i in range(n):
+        f = first[i]
+        if f < 0:
+            codes[i] = -1
+        elif f == i:
+            codes[i] = k
+            firsts[k] = i
+            k += 1
+        else:
+            codes[i] = codes[f]
+    return codes, firsts[:k]
+
+
+@njit(parallel=True)
+def _row_hashes(rows):
+    hashes = np.empty(rows.shape[0], np.uint64)
+    for i in prange(rows.shape[0]):
+        hashes[i] = xxh64(rows[i])
+    return hashes
+
+
+@njit
+def _factorize(values):
+    codes, firsts = _codes(_first_rows(values, hash_column(values)))
+    return codes, _take(values, firsts)
+
+
+def factorize(values):
+    """Return ``(codes, uniques)`` with ``uniques[codes[i]] == values[i]``.
+
+    ``codes`` is int32 and numbers distinct values by first appearance;
+    float NaN is coded -1. ``uniques`` has the type of ``values``.
+    """
+    if isinstance(values, np.ndarray) and values.dtype.kind in "SU":
+        # Fixed-width strings are compared and hashed as raw byte rows,
+        # which avoids building a string object per element.
+        values = np.ascontiguousarray(values)
+        rows = values.view(np.uint8).reshape(values.shape[0], values.dtype.itemsize)
+        codes, firsts = _codes(_first_rows(rows, _row_hashes(rows)))
+        return codes, values[firsts]
+    return _factorize(values)
+
+
+@overload(factorize)
+def _ol_factorize(values):
+    return lambda values: _factorize(values)
+
+
+def _decode(codes, uniques):
+    pass
+
+
+@overload(_decode, jit_options={"parallel": True})
+def _ol_decode(codes, uniques):
+    if isinstance(uniques, types.Array) and isinstance(uniques.dtype, types.Float):
+
+        def impl(codes, uniques):
+            out = np.empty(codes.shape[0], uniques.dtype)
+            for i in prange(codes.shape[0]):
+                c = codes[i]
+                out[i] = uniques[c] if c >= 0 else np.nan
+            return out
+
+        return impl
+    if isinstance(uniques, (types.Array, types.ListType)):
+
+        def impl(codes, uniques):
+            if codes.shape[0] > 0 and codes.min() < 0:
+                raise ValueError("negative codes only decode to float NaN")
+            return _take(uniques, codes)
+
+        return impl
+    return None
+
+
+@njit
+def decode(codes, uniques):
+    """Inverse of ``factorize``: ``uniques[codes]``, with -1 as NaN."""
+    return _decode(codes, uniques)
@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+
+def _columns():
+    rs = np.random.RandomState(0)
+    words = np.array(["w{}".format(i) for i in range(500)] + ["é", "日本", ""])
+    floats = rs.randint(0, 50, 5000).astype(np.float64)
+    floats[::13] = np.nan
+    return {
+        "str": words[rs.randint(0, words.shape[0], 5000)],
+        "int": rs.randint(-1000, 1000, 5000),
+        "float": floats,
+    }
+
+
+@pytest.mark.parametrize("kind", ["str", "int", "float"])
+def test_factorize_matches_pandas(kind):
+    pd = pytest.importorskip("pandas")
+    from numba_extras.encode import decode, factorize
+
+    values = _columns()[kind]
+    codes, uniques = factorize(values)
+    expected_codes, expected_uniques = pd.factorize(values)
+    assert codes.dtype == np.int32
+    np.testing.assert_array_equal(codes, expected_codes)
+    np.testing.assert_array_equal(uniques, expected_uniques)
+    np.testing.assert_array_equal(decode(codes, uniques), values)
+
+
+def test_typed_list_round_trip():
+    from numba import typed
+    from numba_extras.encode import decode, factorize
+
+    words = ["b", "a", "b", "日本", "a", ""]
+    codes, uniques = factorize(typed.List(words))
+    np.testing.assert_array_equal(codes, [0, 1, 0, 2, 1, 3])
+    assert list(uniques) == ["b", "a", "日本", ""]
+    assert list(decode(codes, uniques)) == words
+
+
+def test_edge_cases():
+    from numba_extras.encode import decode, factorize
+
+    codes, uniques = factorize(np.empty(0, np.int64))
+    assert codes.shape == uniques.shape == (0,)
+    codes, uniques = factorize(np.array([np.nan, np.nan]))
+    np.testing.assert_array_equal(codes, [-1, -1])
+    assert uniques.shape == (0,)
+    codes, uniques = factorize(np.array([0.0, -0.0]))
+    np.testing.assert_array_equal(codes, [0, 0])
+    with pytest.raises(ValueError):
+        decode(np.array([0, -1], np.int32), np.array(["a"]))
+
+
+def test_factorize_inside_njit():
+    from numba import njit
+    from numba_extras.encode import factorize
+
+    @njit
+    def distinct(values):
+        codes, uniques = factorize(values)
+        return codes.max() + 1, len(uniques)
+
+    assert distinct(np.array([3, 1, 3, 2])) == (3, 3)
+
+
+@pytest.mark.parametrize("cardinality", [3000, 3100, 20000, 200000])
+def test_table_growth_matches_pandas(cardinality):
+    pd = pytest.importorskip("pandas")
+    from numba_extras.encode import factorize
+
+    values = np.random.RandomState(3).randint(0, cardinality, 300000)
+    codes, uniques = factorize(values)
+    expected_codes, expected_uniques = pd.factorize(values)
+    np.testing.assert_array_equal(codes, expected_codes)
+    np.testing.assert_array_equal(uniques, expected_uniques)
+    words = np.array(["k{}".format(v) for v in values[:50000]])
+    codes, uniques = factorize(words)
+    expected_codes, expected_uniques = pd.factorize(words)
+    np.testing.assert_array_equal(codes, expected_codes)
+    np.testing.assert_array_equal(uniques, expected_uniques)
@@ -0,0 +1,8 @@
+from .expr import (  # noqa: F401
+    FUNCTIONS,
+    CacheInfo,
+    Expression,
+    cache_info,
+    clear_cache,
+    compile,
+)
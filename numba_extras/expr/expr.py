@@ -0,0 +1,274 @@
+"""Formulas over named columns, compiled to fused kernels.
+
+``compile`` parses a formula in a small arithmetic language and turns it
+into a jitted function of one element of each column, ``Expression.scalar``,
+which ``@njit`` code can call inside its own loops. Calling the expression
+evaluates it over whole columns in a single parallel loop, without the
+temporary arrays of evaluating it operator by operator::
+
+    f = compile("where(qty > 0, px * qty, 0) + log1p(fee)")
+    f(columns)            # a dict, a structured array, ...
+    f(px=px, qty=qty, fee=0.5)
+
+The language has numbers, column names, ``+ - * / // % **``, comparisons,
+``and``, ``or``, ``not`` and the functions in ``FUNCTIONS``. Anything else,
+such as attributes, subscripts or other calls, raises ValueError.
+Arithmetic follows NumPy: division by zero gives inf or nan, not an error.
+
+The kernels for a formula and the dtypes of its columns are kept in an LRU
+cache of ``CACHE_SIZE`` entries, shared by all expressions; ``cache_info``
+reports on it. Formulas that differ only in spacing share entries.
+"""
+
+import ast
+import collections
+import sys
+import threading
+
+import numpy as np
+from numba import njit, prange, typeof
+from numba.np.numpy_support import as_dtype
+
+CACHE_SIZE = 256
+
+CacheInfo = collections.namedtuple(
+    "CacheInfo", ["hits", "misses", "maxsize", "currsize"]
+)
+
+# Name in formulas: (code, number of arguments).
+FUNCTIONS = {
+    "abs": ("abs", 1),
+    "sqrt": ("np.sqrt", 1),
+    "exp": ("np.exp", 1),
+    "expm1": ("np.expm1", 1),
+    "log": ("np.log", 1),
+    "log2": ("np.log2", 1),
+    "log10": ("np.log10", 1),
+    "log1p": ("np.log1p", 1),
+    "sin": ("np.sin", 1),
+    "cos": ("np.cos", 1),
+    "tan": ("np.tan", 1),
+    "arcsin": ("np.arcsin", 1),
+    "arccos": ("np.arccos", 1),
+    "arctan": ("np.arctan", 1),
+    "sinh": ("np.sinh", 1),
+    "cosh": ("np.cosh", 1),
+    "tanh": ("np.tanh", 1),
+    "floor": ("np.floor", 1),
+    "ceil": ("np.ceil", 1),
+    "isnan": ("np.isnan", 1),
+    "arctan2": ("np.arctan2", 2),
+    "minimum": ("np.minimum", 2),
+    "maximum": ("np.maximum", 2),
+    "where": ("_where", 3),
+}
+
+_BINARY = {
+    ast.Add: "+",
+    ast.Sub: "-",
+    ast.Mult: "*",
+    ast.Div: "/",
+    ast.FloorDiv: "//",
+    ast.Mod: "%",
+    ast.Pow: "**",
+}
+_UNARY = {ast.USub: "-", ast.UAdd: "+", ast.Not: "not "}
+_COMPARE = {
+    ast.Lt: "<",
+    ast.LtE: "<=",
+    ast.Gt: ">",
+    ast.GtE: ">=",
+    ast.Eq: "==",
+    ast.NotEq: "!=",
+}
+_BOOL = {ast.And: " and ", ast.Or: " or "}
+
+
+@njit
+def _where(cond, x, y):
+    return x if cond else y
+
+
+def _number(node):
+    if sys.version_info < (3, 8) and isinstance(node, ast.Num):
+        return node.n
+    if isinstance(node, ast.Constant):
+        return node.value
+    return None
+
+
+class _Emitter:
+    # Turns the parsed formula into Python source over parameters x0,
+    # x1, ..., numbering the column names by their first appearance.
+
+    def __init__(self):
+        self.names = []
+
+    def emit(self, node):
+        value = _number(node)
+        if value is not None:
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError("unsupported constant {!r}".format(value))
+            return repr(value)
+        if isinstance(node, ast.Name):
+            if node.id in FUNCTIONS:
+                raise ValueError("{} is a function".format(node.id))
+            if node.id not in self.names:
+                self.names.append(node.id)
+            return "x{}".format(self.names.index(node.id))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            return "({} {} {})".format(
+                self.emit(node.left), _BINARY[type(node.op)], self.emit(node.right)
+            )
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+            return "({}{})".format(_UNARY[type(node.op)], self.emit(node.operand))
+        if isinstance(node, ast.Compare) and all(
+            type(op) in _COMPARE for op in node.ops
+        ):
+            parts = [self.emit(node.left)]
+            for op, right in zip(node.ops, node.comparators):
+                parts += [_COMPARE[type(op)], self.emit(right)]
+            return "({})".format(" ".join(parts))
+        if isinstance(node, ast.BoolOp):
+            values = [self.emit(v) for v in node.values]
+            return "({})".format(_BOOL[type(node.op)].join(values))
+        if isinstance(node, ast.Call):
+            func = getattr(node.func, "id", None)
+            if func not in FUNCTIONS:
+                raise ValueError("unknown function {}".format(func or "call"))
+            if node.keywords:
+                raise ValueError("{} takes no keywords".format(func))
+            code, nargs = FUNCTIONS[func]
+            if len(node.args) != nargs:
+                raise ValueError("{} takes {} arguments".format(func, nargs))
+            return "{}({})".format(code, ", ".join(self.emit(a) for a in node.args))
+        raise ValueError(
+            "unsupported syntax {} at column {}".format(
+                type(node).__name__, getattr(node, "col_offset", 0)
+            )
+        )
+
+
+def _parse(text):
+    try:
+        tree = ast.parse(text.strip(), mode="eval")
+    except SyntaxError as e:
+        raise ValueError("invalid formula {!r}: {}".format(text, e.msg)) from None
+    emitter = _Emitter()
+    body = emitter.emit(tree.body)
+    return tuple(emitter.names), body
+
+
+def _define(source, name, **env):
+    scope = dict(env, np=np, prange=prange, _where=_where)
+    exec(source, scope)
+    return scope[name]
+
+
+_lock = threading.Lock()
+_kernels = collections.OrderedDict()
+_hits = 0
+_misses = 0
+
+
+def cache_info():
+    """Hits, misses and size of the kernel cache, as ``functools`` does."""
+    with _lock:
+        return CacheInfo(_hits, _misses, CACHE_SIZE, len(_kernels))
+
+
+def clear_cache():
+    """Drop every cached kernel and reset the counts."""
+    global _hits, _misses
+    with _lock:
+        _kernels.clear()
+        _hits = _misses = 0
+
+
+class Expression:
+    """A compiled formula; see ``compile``.
+
+    ``names`` are the columns it reads, in order of first appearance, and
+    ``scalar`` is the jitted function of one value of each of them.
+    """
+
+    def __init__(self, text, names, body):
+        self.text = text
+        self.names = names
+        self._body = body
+        self._params = ", ".join("x{}".format(k) for k in range(len(names)))
+        self._scalar = None
+
+    @property
+    def scalar(self):
+        # Made on first use: a cache hit needs no dispatcher of its own.
+        if self._scalar is None:
+            source = "def scalar({}):\n    return {}\n".format(self._params, self._body)
+            self._scalar = njit(error_model="numpy")(_define(source, "scalar"))
+        return self._scalar
+
+    def __repr__(self):
+        return "Expression({!r})".format(self.text)
+
+    def _kernel(self, key, values):
+        global _hits, _misses
+        with _lock:
+            kernel = _kernels.get(key)
+            if kernel is not None:
+                _kernels.move_to_end(key)
+                _hits += 1
+                return kernel
+            _misses += 1
+        # Type the formula for one element of each column to find the
+        # dtype of the result.
+        elements = [typeof(v).dtype if v.ndim else typeof(v[()]) for v in values]
+        self.scalar.compile(tuple(elements))
+        result = self.scalar.overloads[tuple(elements)].signature.return_type
+        args = ", ".join(
+            "x{}[i]".format(k) if v.ndim else "x{}".format(k)
+            for k, v in enumerate(values)
+        )
+        source = (
+            "def kernel(n, {params}):\n"
+            "    out = np.empty(n, out_dtype)\n"
+            "    for i in prange(n):\n"
+            "        out[i] = scalar({args})\n"
+            "    return out\n"
+        ).format(params=self._params, args=args)
+        kernel = _define(
+            source, "kernel", scalar=self.scalar, out_dtype=as_dtype(result)
+        )
+        kernel = njit(parallel=True, error_model="numpy")(kernel)
+        with _lock:
+            _kernels[key] = kernel
+            while len(_kernels) > CACHE_SIZE:
+                _kernels.popitem(last=False)
+        return kernel
+
+    def __call__(self, columns=None, **named):
+        """Evaluate over 1-d columns of equal length, or scalars.
+
+        Columns are looked up by name in ``columns`` (a dict, a structured
+        array or anything else indexed by name) and then in ``named``.
+        """
+        values = []
+        for name in self.names:
+            if name in named:
+                value = named[name]
+            elif columns is not None:
+                value = columns[name]
+            else:
+                raise KeyError(name)
+            values.append(np.asarray(value))
+        lengths = {v.shape[0] for v in values if v.ndim}
+        if any(v.ndim > 1 for v in values) or len(lengths) > 1:
+            raise ValueError("columns must be 1-d and of equal length")
+        n = lengths.pop() if lengths else 1
+        key = (self._body, tuple((v.dtype.str, v.ndim) for v in values))
+        return self._kernel(key, values)(n, *values)
+
+
+def compile(text):
+    """Parse the formula ``text`` into an ``Expression``."""
+    names, body = _parse(text)
+    return Expression(text, names, body)
@@ -0,0 +1,134 @@
+import numpy as np
+import pytest
+
+
+def _columns(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "px": rng.random(n) * 100,
+        "qty": rng.integers(-10, 10, n),
+        "fee": rng.random(n).astype(np.float32),
+    }
+
+
+def test_evaluates_like_numpy():
+    from numba_extras.expr import compile
+
+    c = _columns()
+    px, qty, fee = c["px"], c["qty"], c["fee"]
+    cases = [
+        ("px * qty + log(fee)", px * qty + np.log(fee)),
+        ("-px ** 2 / (1 + abs(qty))", -(px**2) / (1 + np.abs(qty))),
+        ("qty // 3 % 2", qty // 3 % 2),
+        ("where(qty > 0, px, -px)", np.where(qty > 0, px, -px)),
+        ("0 < qty <= 5 or px > 99", ((qty > 0) & (qty <= 5)) | (px > 99)),
+        ("not isnan(px) and qty != 0", qty != 0),
+        (
+            "maximum(px, 50.5) - minimum(qty, 0)",
+            np.maximum(px, 50.5) - np.minimum(qty, 0),
+        ),
+        (
+            "arctan2(fee, sqrt(px)) * exp(-1e-3)",
+            np.arctan2(fee, np.sqrt(px)) * np.exp(-1e-3),
+        ),
+    ]
+    for text, expected in cases:
+        got = compile(text)(c)
+        assert got.shape == expected.shape
+        np.testing.assert_allclose(got, expected, rtol=1e-6, err_msg=text)
+    assert compile("qty > 0")(c).dtype == np.bool_
+    assert compile("qty * 2")(c).dtype == qty.dtype
+
+
+def test_columns_by_name():
+    from numba_extras.expr import compile
+
+    f = compile("b * a + a")
+    assert f.names == ("b", "a")
+    a = np.arange(5.0)
+    np.testing.assert_array_equal(f(a=a, b=2), 3 * a)
+    np.testing.assert_array_equal(f({"a": a}, b=a), a * a + a)
+    records = np.zeros(5, [("a", "f8"), ("b", "i2")])
+    records["a"] = a
+    records["b"] = 3
+    np.testing.assert_array_equal(f(records), 4 * a)
+    assert f(a=a[:0], b=a[:0]).shape == (0,)
+    with pytest.raises(KeyError):
+        f(a=a)
+    with pytest.raises(ValueError):
+        f(a=a, b=a[:3])
+
+
+def test_scalar_in_njit():
+    from numba import njit
+    from numba_extras.expr import compile
+
+    notional = compile("px * qty").scalar
+
+    @njit
+    def buys(px, qty):
+        total = 0.0
+        for i in range(px.shape[0]):
+            if qty[i] > 0:
+                total += notional(px[i], qty[i])
+        return total
+
+    c = _columns()
+    keep = c["qty"] > 0
+    assert buys(c["px"], c["qty"]) == pytest.approx((c["px"] * c["qty"])[keep].sum())
+
+
+def test_cache():
+    from numba_extras import expr
+
+    expr.clear_cache()
+    c = _columns(10)
+    expr.compile("px * qty")(c)
+    expr.compile("px*qty")(c)
+    expr.compile("px * qty")(px=c["px"].astype(np.float32), qty=c["qty"])
+    info = expr.cache_info()
+    assert (info.hits, info.misses, info.currsize) == (1, 2, 2)
+    old = expr.expr.CACHE_SIZE
+    expr.expr.CACHE_SIZE = 2
+    try:
+        expr.compile("px + 1")(c)
+        assert expr.cache_info().currsize == 2
+        # The least recently used kernel, for float64 prices, is gone.
+        expr.compile("px * qty")(px=c["px"].astype(np.float32), qty=c["qty"])
+        assert expr.cache_info().misses == 3
+        expr.compile("px * qty")(c)
+        assert expr.cache_info().misses == 4
+    finally:
+        expr.expr.CACHE_SIZE = old
+        expr.clear_cache()
+
+
+def test_rejects_other_syntax():
+    from numba_extras.expr import compile
+
+    for text in [
+        "px.real",
+        "px[0]",
+        "eval('1')",
+        "log(px, 2)",
+        "log",
+        "lambda: 1",
+        "px +",
+        "'text'",
+        "True",
+        "__import__('os')",
+        "px if qty else 0",
+        "log(x=px)",
+    ]:
+        with pytest.raises(ValueError):
+            compile(text)
+
+
+def test_numpy_arithmetic():
+    from numba_extras.expr import compile
+
+    x = np.array([1.0, -1.0, 0.0])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        expected = x / 0
+    np.testing.assert_array_equal(compile("x / 0")(x=x), expected)
+    np.testing.assert_array_equal(compile("x / y")(x=x, y=np.zeros(3)), expected)
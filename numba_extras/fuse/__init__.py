@@ -0,0 +1 @@
+from .fuse import Lazy, lazy  # noqa: F401
@@ -0,0 +1,272 @@
+"""Chains of elementwise operations compiled into a single loop.
+
+``lazy(x)`` starts a chain over one or more arrays of equal length;
+``map`` and ``filter`` add stages and a terminal operation compiles the
+whole chain into one loop and runs it::
+
+    lazy(x).map(f).filter(g).sum()
+    lazy(a, b).map(lambda u, v: u * v).max()
+
+No stage allocates: each element goes through every stage while it is in
+a register, and only ``to_array`` writes anything. With several arrays the
+first stage gets one value of each. Stages are jitted functions; plain
+Python functions are jitted on the way in.
+
+``lazy(..., parallel=True)`` splits the loop into one chunk per thread.
+Chunks are reduced separately and combined in order, so float sums may
+differ from a serial pass in the last bits. ``kernel`` returns the
+compiled function of the arrays, which ``@njit`` code can call.
+
+Compiled chains are cached by their stages, terminal and dtypes.
+"""
+
+import numpy as np
+from numba import get_num_threads, njit, prange, typeof
+from numba.core import errors
+from numba.core.registry import CPUDispatcher
+from numba.np.numpy_support import as_dtype
+
+from ..jitcache import JitCache
+
+_MIN_PARALLEL = 1 << 15
+
+_serial = JitCache(maxsize=256)
+_parallel = JitCache(maxsize=256, parallel=True)
+
+
+@njit
+def _parts(n):
+    threads = get_num_threads()
+    if threads == 1 or n < _MIN_PARALLEL:
+        return 1
+    return min(threads, n // (_MIN_PARALLEL // 4))
+
+
+# Per terminal: the statements run for each element that reaches the end
+# of the chain, with ``v`` its value, ``acc`` the chunk's accumulator and
+# ``c`` the number of elements so far.
+_STEPS = {
+    "sum": ["acc += v"],
+    "mean": ["acc += v"],
+    "count": [],
+    # ``acc != acc`` keeps a NaN, as NumPy does.
+    "min": ["if c == 0 or (acc == acc and (v < acc or v != v)):", "    acc = v"],
+    "max": ["if c == 0 or (acc == acc and (v > acc or v != v)):", "    acc = v"],
+    "reduce": ["acc = v if c == 0 else op(acc, v)"],
+    "to_array": ["out[lo + c] = v"],
+}
+
+_COMBINE = {
+    "sum": ["total = acc_type(0)", "for p in range(parts):", "    total += accs[p]"],
+    "count": ["total = 0", "for p in range(parts):", "    total += counts[p]"],
+    "min": [
+        "total = acc_type(0)",
+        "seen = 0",
+        "for p in range(parts):",
+        "    if counts[p]:",
+        "        a = accs[p]",
+        "        if seen == 0 or (total == total and (a < total or a != a)):",
+        "            total = a",
+        "        seen += counts[p]",
+        "if seen == 0:",
+        "    raise ValueError('min of an empty sequence')",
+    ],
+    "reduce": [
+        "total = acc_type(0)",
+        "seen = 0",
+        "for p in range(parts):",
+        "    if counts[p]:",
+        "        total = accs[p] if seen == 0 else op(total, accs[p])",
+        "        seen += counts[p]",
+        "if seen == 0:",
+        "    raise ValueError('reduce of an empty sequence')",
+    ],
+}
+_COMBINE["mean"] = _COMBINE["sum"] + [
+    "count = 0",
+    "for p in range(parts):",
+    "    count += counts[p]",
+    "total = total / count if count else np.nan",
+]
+_COMBINE["max"] = [
+    line.replace("a < total", "a > total").replace("min of", "max of")
+    for line in _COMBINE["min"]
+]
+
+
+def _factory(ninputs, kinds, funcs, terminal, acc_dtype, op, parallel):
+    # The source of the fused loop; see ``_STEPS`` and ``_COMBINE``.
+    xs = ", ".join("x{}".format(k) for k in range(ninputs))
+    lines = [
+        "def kernel({}):".format(xs),
+        "    n = x0.shape[0]",
+        "    parts = _parts(n)" if parallel else "    parts = 1",
+        "    accs = np.empty(parts, acc_type)",
+        "    counts = np.zeros(parts, np.int64)",
+    ]
+    if terminal == "to_array":
+        lines.append("    out = np.empty(n, acc_type)")
+    lines += [
+        "    for p in {}(parts):".format("prange" if parallel else "range"),
+        "        lo = n * p // parts",
+        "        hi = n * (p + 1) // parts",
+        "        acc = acc_type(0)",
+        "        c = 0",
+        "        for i in range(lo, hi):",
+    ]
+    indent = " " * 12
+    args = ", ".join("x{}[i]".format(k) for k in range(ninputs))
+    for k, kind in enumerate(kinds):
+        if kind == "map":
+            lines.append("{}v = f{}({})".format(indent, k, args))
+            args = "v"
+        else:
+            lines.append("{}if f{}({}):".format(indent, k, args))
+            indent += "    "
+    if args != "v":
+        lines.append("{}v = {}".format(indent, args))
+    lines += [indent + step for step in _STEPS[terminal]]
+    lines += [
+        indent + "c += 1",
+        "        accs[p] = acc",
+        "        counts[p] = c",
+    ]
+    if terminal == "to_array":
+        if "filter" not in kinds:
+            lines.append("    return out")
+        else:
+            lines += [
+                "    starts = np.zeros(parts + 1, np.int64)",
+                "    for p in range(parts):",
+                "        starts[p + 1] = starts[p] + counts[p]",
+                "    result = np.empty(starts[parts], acc_type)",
+                "    for p in {}(parts):".format("prange" if parallel else "range"),
+                "        lo = n * p // parts",
+                "        result[starts[p] : starts[p + 1]] = out[lo : lo + counts[p]]",
+                "    return result",
+            ]
+    else:
+        lines += ["    " + line for line in _COMBINE[terminal]]
+        lines.append("    return total")
+    scope = {
+        "np": np,
+        "prange": prange,
+        "_parts": _parts,
+        "acc_type": acc_dtype.type,
+        "op": op,
+    }
+    scope.update(("f{}".format(k), f) for k, f in enumerate(funcs))
+    exec("\n".join(lines), scope)
+    return scope["kernel"]
+
+
+def _jitted(f):
+    return f if isinstance(f, CPUDispatcher) else njit(f)
+
+
+def _return_type(f, args):
+    f.compile(args)
+    return f.overloads[args].signature.return_type
+
+
+class Lazy:
+    """A chain of stages over arrays; see ``lazy``."""
+
+    def __init__(self, arrays, stages, parallel):
+        self.arrays = arrays
+        self.stages = stages
+        self.parallel = parallel
+
+    def map(self, f):
+        """Apply ``f`` to each element."""
+        return Lazy(self.arrays, self.stages + (("map", _jitted(f)),), self.parallel)
+
+    def filter(self, g):
+        """Keep the elements for which ``g`` is true."""
+        return Lazy(self.arrays, self.stages + (("filter", _jitted(g)),), self.parallel)
+
+    def _element_type(self):
+        types = tuple(typeof(x).dtype for x in self.arrays)
+        for kind, f in self.stages:
+            if kind == "map":
+                types = (_return_type(f, types),)
+            else:
+                _return_type(f, types)
+        if len(types) != 1:
+            raise TypeError("map several arrays to one value first")
+        return types[0]
+
+    def kernel(self, terminal="to_array", op=None):
+        """The jitted function of the arrays that runs the chain.
+
+        ``terminal`` names one of the terminal methods; ``op`` is the
+        function for ``"reduce"``.
+        """
+        if terminal not in _STEPS:
+            raise ValueError("unknown terminal {!r}".format(terminal))
+        if (op is not None) != (terminal == "reduce"):
+            raise ValueError("op is needed for reduce and only for reduce")
+        try:
+            dtype = as_dtype(self._element_type())
+        except errors.NumbaNotImplementedError:
+            raise TypeError("the chain must end in numbers") from None
+        if terminal in ("sum", "mean") and dtype.kind in "biu":
+            # NumPy's accumulator types.
+            dtype = np.dtype(np.uint64 if dtype.kind == "u" else np.int64)
+        kinds = tuple(kind for kind, _ in self.stages)
+        funcs = tuple(f for _, f in self.stages)
+        cache = _parallel if self.parallel else _serial
+        return cache.get(
+            _factory,
+            len(self.arrays),
+            kinds,
+            funcs,
+            terminal,
+            dtype,
+            op if op is None or isinstance(op, np.ufunc) else _jitted(op),
+            self.parallel,
+        )
+
+    def _run(self, terminal, op=None):
+        return self.kernel(terminal, op)(*self.arrays)
+
+    def sum(self):
+        """The sum, with NumPy's accumulator dtypes."""
+        return self._run("sum")
+
+    def mean(self):
+        """The mean; NaN when nothing is left."""
+        return self._run("mean")
+
+    def count(self):
+        """The number of elements left."""
+        return self._run("count")
+
+    def min(self):
+        """The smallest element, or NaN if there is one."""
+        return self._run("min")
+
+    def max(self):
+        """The largest element, or NaN if there is one."""
+        return self._run("max")
+
+    def reduce(self, op):
+        """The elements combined with the associative ``op``.
+
+        ``op`` is a function of two elements or a NumPy ufunc.
+        """
+        return self._run("reduce", op)
+
+    def to_array(self):
+        """The elements in a new array."""
+        return self._run("to_array")
+
+
+def lazy(*arrays, parallel=False):
+    """Start a chain over 1-d arrays of equal length."""
+    if not arrays:
+        raise TypeError("lazy needs at least one array")
+    arrays = tuple(np.asarray(x) for x in arrays)
+    if any(x.ndim != 1 for x in arrays) or len({x.shape[0] for x in arrays}) > 1:
+        raise ValueError("arrays must be 1-d and of equal length")
+    return Lazy(arrays, (), parallel)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from numba import njit
+
+
+@njit
+def square(v):
+    return v * v
+
+
+@njit
+def odd(v):
+    return v % 2 == 1
+
+
+@njit
+def product(a, b):
+    return a * b
+
+
+def _data(n=100_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.integers(-1000, 1000, n), rng.random(n)
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_terminals_match_numpy(parallel):
+    from numba_extras.fuse import lazy
+
+    ints, floats = _data()
+    chain = lazy(ints, parallel=parallel).map(square).filter(odd)
+    expected = (ints * ints)[(ints * ints) % 2 == 1]
+    assert chain.sum() == expected.sum()
+    assert chain.count() == expected.shape[0]
+    assert chain.min() == expected.min() and chain.max() == expected.max()
+    assert chain.mean() == pytest.approx(expected.mean())
+    np.testing.assert_array_equal(chain.to_array(), expected)
+    f = lazy(floats, parallel=parallel).map(square)
+    assert f.sum() == pytest.approx((floats * floats).sum())
+    np.testing.assert_array_equal(f.to_array(), floats * floats)
+    assert lazy(ints, parallel=parallel).reduce(np.maximum) == ints.max()
+
+
+@pytest.mark.parametrize("parallel", [False, True])
+def test_several_arrays(parallel):
+    from numba_extras.fuse import lazy
+
+    ints, floats = _data()
+    chain = lazy(floats, ints, parallel=parallel).map(product)
+    assert chain.sum() == pytest.approx((floats * ints).sum())
+    kept = lazy(ints, floats, parallel=parallel).filter(lambda i, f: f < 0.5)
+    with pytest.raises(TypeError):
+        kept.sum()
+    expected = ints[floats < 0.5]
+    assert kept.map(lambda i, f: i).sum() == expected.sum()
+
+
+def test_dtypes_and_empty_results():
+    from numba_extras.fuse import lazy
+
+    small = np.full(1000, 100, np.int8)
+    assert lazy(small).sum() == 100_000
+    assert lazy(small.astype(np.uint8)).sum() == 100_000
+    assert lazy(np.arange(5.0)).filter(lambda v: v > 9).to_array().shape == (0,)
+    assert lazy(np.arange(5)).filter(lambda v: v > 9).sum() == 0
+    assert np.isnan(lazy(np.arange(5)).filter(lambda v: v > 9).mean())
+    with pytest.raises(ValueError):
+        lazy(np.arange(5)).filter(lambda v: v > 9).max()
+    x = np.array([1.0, np.nan, -1.0])
+    assert np.isnan(lazy(x).min()) and np.isnan(lazy(x).max())
+
+
+def test_kernel_in_njit():
+    from numba_extras.fuse import lazy
+
+    ints, _ = _data(1000)
+    total = lazy(ints).map(square).filter(odd).kernel("sum")
+
+    @njit
+    def twice(x):
+        return total(x) + total(x[::-1])
+
+    assert twice(ints) == 2 * lazy(ints).map(square).filter(odd).sum()
+
+
+def test_errors():
+    from numba_extras.fuse import lazy
+
+    with pytest.raises(ValueError):
+        lazy(np.arange(3), np.arange(4))
+    with pytest.raises(ValueError):
+        lazy(np.zeros((2, 2)))
+    with pytest.raises(ValueError):
+        lazy(np.arange(3)).kernel("median")
+    with pytest.raises(ValueError):
+        lazy(np.arange(3)).kernel("sum", op=np.add)
+    with pytest.raises(TypeError):
+        lazy(np.arange(3)).map(lambda v: (v, v)).sum()
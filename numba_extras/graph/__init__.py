@@ -0,0 +1,8 @@
+from .graph import (  # noqa: F401
+    bfs,
+    connected_components,
+    dfs,
+    dijkstra,
+    pagerank,
+    triangle_count,
+)
@@ -0,0 +1,316 @@
+"""Graph algorithms on CSR adjacency matrices.
+
+Every function takes a ``numba_extras.sparse.CSRMatrix`` whose row ``u``
+lists the edges ``u -> v``; ``data`` holds edge weights where an algorithm
+uses them. An undirected graph stores each edge in both directions, as
+``scipy.sparse.csgraph`` expects. All functions work from Python and from
+``@njit`` code.
+
+``bfs`` expands each level in parallel and claims vertices with a
+compare-and-swap, so the distances are deterministic but which of several
+equally near parents a vertex gets is not. ``connected_components`` runs a
+lock-free union-find over the edges in parallel, linking the larger root
+below the smaller one with a compare-and-swap and halving paths on the way.
+``pagerank`` and ``triangle_count`` are parallel over vertices; ``dfs`` and
+``dijkstra`` are sequential by nature.
+
+Hot loops index with unsigned integers, which spares numba's wraparound
+check for negative indices on every access.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+from ..atomic import atomic_add, atomic_cas, atomic_load
+from ..containers import IndexedPriorityQueue
+from ..sparse import to_csc
+
+
+@njit
+def _check(g, source):
+    n = g.shape[0]
+    if g.shape[1] != n:
+        raise ValueError("adjacency matrix must be square")
+    if not 0 <= source < n:
+        raise IndexError("source vertex out of range")
+    return n
+
+
+@njit(parallel=True)
+def _bfs(indptr, indices, n, source):
+    dist = np.full(n, -1, np.int64)
+    parent = np.full(n, -1, np.int64)
+    dist[source] = 0
+    # The source is its own parent while searching, so it is never claimed.
+    parent[source] = source
+    frontier = np.empty(n, np.int64)
+    frontier[0] = source
+    size = 1
+    following = np.empty(n, np.int64)
+    count = np.zeros(1, np.int64)
+    level = 0
+    while size:
+        level += 1
+        count[0] = 0
+        for f in prange(size):
+            u = frontier[f]
+            for j in range(indptr[u], indptr[u + 1]):
+                v = indices[j]
+                if atomic_load(parent, v) == -1 and atomic_cas(parent, v, -1, u) == -1:
+                    dist[v] = level
+                    following[atomic_add(count, 0, 1)] = v
+        size = atomic_load(count, 0)
+        frontier, following = following, frontier
+    parent[source] = -1
+    return dist, parent
+
+
+@njit
+def bfs(g, source):
+    """Breadth-first search from ``source``.
+
+    Returns ``(dist, parent)``: the number of edges on a shortest path, and
+    a vertex before each one on such a path. Unreached vertices get -1 in
+    both, and so does the parent of ``source``.
+    """
+    n = _check(g, source)
+    return _bfs(g.indptr, g.indices, n, source)
+
+
+@njit
+def dfs(g, source):
+    """Depth-first search from ``source``, visiting edges in row order.
+
+    Returns ``(order, parent)``: the reached vertices in preorder, and each
+    vertex's parent in the search tree (-1 for ``source`` and unreached
+    vertices).
+    """
+    n = _check(g, source)
+    indptr = g.indptr
+    indices = g.indices
+    parent = np.full(n, -1, np.int64)
+    seen = np.zeros(n, np.bool_)
+    order = np.empty(n, np.int64)
+    # Each stack entry is a vertex and the next of its edges to follow.
+    stack = np.empty(n, np.int64)
+    edge = np.empty(n, np.int64)
+    stack[0] = source
+    edge[0] = indptr[source]
+    seen[source] = True
+    order[0] = source
+    visited = 1
+    top = 0
+    while top >= 0:
+        u = stack[top]
+        j = edge[top]
+        if j == indptr[u + 1]:
+            top -= 1
+            continue
+        edge[top] = j + 1
+        v = indices[j]
+        if seen[v]:
+            continue
+        seen[v] = True
+        parent[v] = u
+        order[visited] = v
+        visited += 1
+        top += 1
+        stack[top] = v
+        edge[top] = indptr[v]
+    return order[:visited], parent
+
+
+@njit
+def _find(parent, x):
+    while True:
+        p = atomic_load(parent, x)
+        if p == x:
+            return x
+        grand = atomic_load(parent, p)
+        if grand != p:
+            # Path halving; losing this race only skips a shortcut.
+            atomic_cas(parent, x, p, grand)
+        x = grand
+
+
+@njit(parallel=True)
+def _union_find(indptr, indices, n):
+    parent = np.arange(n)
+    for i in prange(n):
+        # prange may hand out an unsigned index, which would turn the roots
+        # into floats when compared with the int64 parents.
+        u = np.int64(i)
+        for j in range(indptr[u], indptr[u + 1]):
+            v = np.int64(indices[j])
+            while True:
+                a = _find(parent, u)
+                b = _find(parent, v)
+                if a == b:
+                    break
+                if a < b:
+                    a, b = b, a
+                # Only a root still pointing at itself may be linked.
+                if atomic_cas(parent, a, a, b) == a:
+                    break
+    roots = np.empty(n, np.int64)
+    for i in prange(n):
+        roots[i] = _find(parent, np.int64(i))
+    return roots
+
+
+@njit
+def connected_components(g):
+    """Connected components, ignoring edge direction.
+
+    Returns ``(count, labels)`` with components numbered from 0 in order of
+    their smallest vertex, like ``scipy.sparse.csgraph`` with
+    ``directed=False``.
+    """
+    n = g.shape[0]
+    if g.shape[1] != n:
+        raise ValueError("adjacency matrix must be square")
+    # Roots are always the smallest vertex of their tree, so a component's
+    # root is its smallest vertex and comes first in this scan.
+    roots = _union_find(g.indptr, g.indices, n)
+    labels = np.empty(n, np.int64)
+    count = 0
+    for u in range(n):
+        if roots[u] == u:
+            labels[u] = count
+            count += 1
+        else:
+            labels[u] = labels[roots[u]]
+    return count, labels
+
+
+@njit
+def dijkstra(g, source):
+    """Shortest paths from ``source`` using the edge weights in ``g.data``.
+
+    Returns ``(dist, parent)``; unreached vertices have ``dist`` inf and
+    parent -1, as does ``source``. Negative weights raise ValueError.
+    """
+    n = _check(g, source)
+    indptr = g.indptr
+    indices = g.indices
+    weights = g.data
+    for w in weights:
+        if w < 0:
+            raise ValueError("dijkstra needs non-negative edge weights")
+    dist = np.full(n, np.inf)
+    parent = np.full(n, -1, np.int64)
+    done = np.zeros(n, np.bool_)
+    dist[source] = 0.0
+    queue = IndexedPriorityQueue(n, 4)
+    queue.push(source, 0.0)
+    while len(queue):
+        u, du = queue.pop()
+        done[u] = True
+        for j in range(np.uintp(indptr[u]), np.uintp(indptr[u + 1])):
+            v = np.uintp(indices[j])
+            alt = du + weights[j]
+            if done[v] or alt >= dist[v]:
+                continue
+            dist[v] = alt
+            parent[v] = u
+            if v in queue:
+                queue.decrease_key(v, alt)
+            else:
+                queue.push(v, alt)
+    return dist, parent
+
+
+@njit(parallel=True)
+def _pagerank(in_ptr, in_idx, out_degree, damping, tol, max_iter):
+    n = out_degree.shape[0]
+    rank = np.full(n, 1.0 / n)
+    share = np.empty(n)
+    following = np.empty(n)
+    for _ in range(max_iter):
+        dangling = 0.0
+        for u in prange(n):
+            if out_degree[u]:
+                share[u] = rank[u] / out_degree[u]
+            else:
+                share[u] = 0.0
+                dangling += rank[u]
+        base = (1.0 - damping + damping * dangling) / n
+        err = 0.0
+        for v in prange(n):
+            acc = 0.0
+            for j in range(np.uintp(in_ptr[v]), np.uintp(in_ptr[v + 1])):
+                acc += share[np.uintp(in_idx[j])]
+            following[v] = base + damping * acc
+            err += abs(following[v] - rank[v])
+        rank, following = following, rank
+        if err < n * tol:
+            break
+    return rank
+
+
+@njit
+def pagerank(g, damping=0.85, tol=1e-6, max_iter=100):
+    """PageRank of each vertex by power iteration over unweighted edges.
+
+    Dangling vertices spread their rank evenly over all vertices, and the
+    iteration stops once the L1 change falls below ``n * tol``, both as in
+    ``networkx.pagerank``.
+    """
+    n = g.shape[0]
+    if g.shape[1] != n:
+        raise ValueError("adjacency matrix must be square")
+    if not 0.0 <= damping <= 1.0:
+        raise ValueError("damping must be in [0, 1]")
+    if n == 0:
+        return np.empty(0)
+    # Pulling along incoming edges lets each vertex be summed by one thread.
+    incoming = to_csc(g)
+    out_degree = np.diff(g.indptr)
+    return _pagerank(
+        incoming.indptr, incoming.indices, out_degree, damping, tol, max_iter
+    )
+
+
+@njit(parallel=True)
+def _triangles(indptr, indices, n):
+    total = 0
+    for u in prange(n):
+        for a in range(indptr[u], indptr[u + 1]):
+            v = indices[a]
+            if v <= u:
+                continue
+            # Merging the rest of row u (all > v) with row v counts the
+            # common neighbours w > v, so each triangle u < v < w once.
+            i = a + 1
+            j = indptr[v]
+            end_u = indptr[u + 1]
+            end_v = indptr[v + 1]
+            while i < end_u and j < end_v:
+                if indices[i] < indices[j]:
+                    i += 1
+                elif indices[i] > indices[j]:
+                    j += 1
+                else:
+                    total += 1
+                    i += 1
+                    j += 1
+    return total
+
+
+@njit
+def triangle_count(g):
+    """Number of triangles in an undirected graph.
+
+    Rows must be sorted without duplicates, as ``sparse.coo_to_csr`` and
+    ``sparse.to_csr`` produce them. Self loops are ignored.
+    """
+    n = g.shape[0]
+    if g.shape[1] != n:
+        raise ValueError("adjacency matrix must be square")
+    indptr = g.indptr
+    indices = g.indices
+    for u in range(n):
+        for j in range(indptr[u] + 1, indptr[u + 1]):
+            if indices[j - 1] >= indices[j]:
+                raise ValueError("rows must be sorted without duplicates")
+    return _triangles(indptr, indices, n)
@@ -0,0 +1,137 @@
+import numpy as np
+import pytest
+
+
+def _graph(n=300, edges=900, seed=0, directed=False, weighted=False):
+    from numba_extras.sparse import coo_to_csr
+
+    rs = np.random.RandomState(seed)
+    rows = rs.randint(0, n, edges)
+    cols = rs.randint(0, n, edges)
+    keep = rows != cols
+    rows, cols = rows[keep], cols[keep]
+    data = rs.rand(rows.shape[0]) + 0.1 if weighted else np.ones(rows.shape[0])
+    if not directed:
+        rows, cols = np.concatenate([rows, cols]), np.concatenate([cols, rows])
+        data = np.concatenate([data, data])
+    g = coo_to_csr(rows, cols, data, (n, n))
+    if not weighted:
+        # Duplicate edges were summed; keep a 0/1 adjacency.
+        g.data[:] = 1.0
+    return g
+
+
+def test_bfs_distances_and_parents():
+    csgraph = pytest.importorskip("scipy.sparse.csgraph")
+    from numba_extras.graph import bfs
+    from numba_extras.sparse import to_scipy
+
+    g = _graph(directed=True)
+    dist, parent = bfs(g, 0)
+    expected = csgraph.shortest_path(to_scipy(g), unweighted=True, indices=0)
+    reached = np.isfinite(expected)
+    np.testing.assert_array_equal(dist[reached], expected[reached])
+    assert (dist[~reached] == -1).all()
+    assert parent[0] == -1
+    for v in np.flatnonzero(reached)[1:]:
+        assert dist[parent[v]] == dist[v] - 1
+        assert v in g.indices[g.indptr[parent[v]] : g.indptr[parent[v] + 1]]
+    with pytest.raises(IndexError):
+        bfs(g, 300)
+
+
+def test_dfs_preorder():
+    from numba_extras.graph import dfs
+    from numba_extras.sparse import coo_to_csr
+
+    rows = np.array([0, 0, 1, 2, 3, 5])
+    cols = np.array([1, 3, 2, 0, 4, 0])
+    g = coo_to_csr(rows, cols, np.ones(6), (6, 6))
+    order, parent = dfs(g, 0)
+    assert order.tolist() == [0, 1, 2, 3, 4]
+    assert parent.tolist() == [-1, 0, 1, 0, 3, -1]
+
+
+@pytest.mark.parametrize("edges", [50, 250, 2000])
+def test_connected_components_match_scipy(edges):
+    csgraph = pytest.importorskip("scipy.sparse.csgraph")
+    from numba_extras.graph import connected_components
+    from numba_extras.sparse import to_scipy
+
+    g = _graph(edges=edges, directed=True)
+    count, labels = connected_components(g)
+    expected_count, expected = csgraph.connected_components(to_scipy(g), directed=False)
+    assert count == expected_count
+    np.testing.assert_array_equal(labels, expected)
+
+
+def test_dijkstra_matches_scipy():
+    csgraph = pytest.importorskip("scipy.sparse.csgraph")
+    from numba_extras.graph import dijkstra
+    from numba_extras.sparse import to_scipy
+
+    g = _graph(directed=True, weighted=True)
+    dist, parent = dijkstra(g, 3)
+    expected = csgraph.dijkstra(to_scipy(g), indices=3)
+    np.testing.assert_allclose(dist, expected)
+    for v in np.flatnonzero(np.isfinite(dist)):
+        if v != 3:
+            row = slice(g.indptr[parent[v]], g.indptr[parent[v] + 1])
+            w = g.data[row][g.indices[row] == v].min()
+            assert dist[parent[v]] + w == pytest.approx(dist[v])
+    g.data[0] = -1.0
+    with pytest.raises(ValueError):
+        dijkstra(g, 0)
+
+
+def test_pagerank_against_power_iteration():
+    from numba_extras.graph import pagerank
+
+    g = _graph(n=60, edges=200, directed=True)
+    n = g.shape[0]
+    dense = np.zeros((n, n))
+    for u in range(n):
+        dense[u, g.indices[g.indptr[u] : g.indptr[u + 1]]] = 1.0
+    out = dense.sum(axis=1)
+    transition = np.where(out[:, None] > 0, dense / np.maximum(out, 1)[:, None], 1 / n)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(500):
+        rank = 0.15 / n + 0.85 * rank @ transition
+    np.testing.assert_allclose(pagerank(g, tol=1e-12, max_iter=500), rank, atol=1e-10)
+    assert pagerank(g).sum() == pytest.approx(1.0)
+
+
+def test_triangle_count_matches_dense():
+    from numba_extras.graph import triangle_count
+    from numba_extras.sparse import coo_to_csr, from_scipy, to_scipy
+
+    g = _graph(n=100, edges=1200)
+    dense = to_scipy(g).toarray()
+    assert triangle_count(g) == round(np.trace(dense @ dense @ dense) / 6)
+    unsorted = to_scipy(g)
+    unsorted.indices[[0, 1]] = unsorted.indices[[1, 0]]
+    with pytest.raises(ValueError):
+        triangle_count(from_scipy(unsorted))
+    triangle = coo_to_csr(
+        np.array([0, 1, 1, 2, 2, 0, 0]),
+        np.array([1, 0, 2, 1, 0, 2, 0]),
+        np.ones(7),
+        (3, 3),
+    )
+    assert triangle_count(triangle) == 1
+
+
+def test_composes_in_njit():
+    from numba import njit
+    from numba_extras.graph import bfs, connected_components
+    from numba_extras.sparse import coo_to_csr
+
+    @njit
+    def largest_hop(rows, cols, n):
+        g = coo_to_csr(rows, cols, np.ones(rows.shape[0]), (n, n))
+        count, _ = connected_components(g)
+        return count, bfs(g, 0)[0].max()
+
+    rows = np.array([0, 1, 2, 4])
+    cols = np.array([1, 2, 3, 5])
+    assert largest_hop(rows, cols, 6) == (2, 3)
@@ -0,0 +1 @@
+from .hashing import hash_column, murmur3_32, xxh64  # noqa: F401
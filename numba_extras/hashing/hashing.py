@@ -0,0 +1,260 @@
+"""Stable non-cryptographic hashes.
+
+``xxh64`` (XXH64) and ``murmur3_32`` (MurmurHash3_x86_32) follow their
+reference implementations, so digests are stable across processes, platforms
+and runs and match other implementations of the same algorithms, which makes
+them suitable for sharding. Both accept a ``uint8`` array, ``bytes`` or a
+string (hashed as UTF-8; lone surrogates are encoded as-is) plus a seed, from
+Python or from ``@njit`` code.
+
+``hash_column`` hashes every element of a column in parallel with XXH64:
+integers as the 8 little-endian bytes of their int64 value, floats as the
+bytes of their float64 value (``-0.0`` hashes like ``0.0``) and strings as
+UTF-8.
+"""
+
+import numpy as np
+from llvmlite import ir
+from numba import carray, njit, prange, types
+from numba.cpython.unicode import _get_code_point
+from numba.extending import intrinsic, overload
+
+_P1 = np.uint64(11400714785074694791)
+_P2 = np.uint64(14029467366897019727)
+_P3 = np.uint64(1609587929392839161)
+_P4 = np.uint64(9650029242287828579)
+_P5 = np.uint64(2870177450012600261)
+
+_C1 = np.uint64(0xCC9E2D51)
+_C2 = np.uint64(0x1B873593)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+@intrinsic
+def _float_bits(typingctx, x):
+    if x != types.float64:
+        return None
+
+    def codegen(context, builder, sig, args):
+        return builder.bitcast(args[0], ir.IntType(64))
+
+    return types.uint64(types.float64), codegen
+
+
+@njit
+def _rotl64(x, r):
+    return (x << np.uint64(r)) | (x >> np.uint64(64 - r))
+
+
+@njit
+def _rotl32(x, r):
+    return ((x << np.uint64(r)) | (x >> np.uint64(32 - r))) & _MASK32
+
+
+@njit
+def _read32(data, i):
+    return (
+        np.uint64(data[i])
+        | np.uint64(data[i + 1]) << np.uint64(8)
+        | np.uint64(data[i + 2]) << np.uint64(16)
+        | np.uint64(data[i + 3]) << np.uint64(24)
+    )
+
+
+@njit
+def _read64(data, i):
+    return _read32(data, i) | _read32(data, i + 4) << np.uint64(32)
+
+
+@njit
+def _round(acc, lane):
+    acc += lane * _P2
+    return _rotl64(acc, 31) * _P1
+
+
+@njit
+def _merge_round(acc, v):
+    return (acc ^ _round(np.uint64(0), v)) * _P1 + _P4
+
+
+@njit
+def _avalanche(h):
+    h ^= h >> np.uint64(33)
+    h *= _P2
+    h ^= h >> np.uint64(29)
+    h *= _P3
+    h ^= h >> np.uint64(32)
+    return h
+
+
+@njit
+def _xxh64_bytes(data, seed):
+    n = data.shape[0]
+    i = 0
+    if n >= 32:
+        v1 = seed + _P1 + _P2
+        v2 = seed + _P2
+        v3 = seed
+        v4 = seed - _P1
+        while i <= n - 32:
+            v1 = _round(v1, _read64(data, i))
+            v2 = _round(v2, _read64(data, i + 8))
+            v3 = _round(v3, _read64(data, i + 16))
+            v4 = _round(v4, _read64(data, i + 24))
+            i += 32
+        h = _rotl64(v1, 1) + _rotl64(v2, 7) + _rotl64(v3, 12) + _rotl64(v4, 18)
+        h = _merge_round(h, v1)
+        h = _merge_round(h, v2)
+        h = _merge_round(h, v3)
+        h = _merge_round(h, v4)
+    else:
+        h = seed + _P5
+    h += np.uint64(n)
+    while i <= n - 8:
+        h ^= _round(np.uint64(0), _read64(data, i))
+        h = _rotl64(h, 27) * _P1 + _P4
+        i += 8
+    if i <= n - 4:
+        h ^= _read32(data, i) * _P1
+        h = _rotl64(h, 23) * _P2 + _P3
+        i += 4
+    while i < n:
+        h ^= np.uint64(data[i]) * _P5
+        h = _rotl64(h, 11) * _P1
+        i += 1
+    return _avalanche(h)
+
+
+@njit
+def _xxh64_u64(x, seed):
+    # _xxh64_bytes specialised to the 8 little-endian bytes of ``x``.
+    h = seed + _P5 + np.uint64(8)
+    h ^= _round(np.uint64(0), x)
+    h = _rotl64(h, 27) * _P1 + _P4
+    return _avalanche(h)
+
+
+@njit
+def _murmur3_bytes(data, seed):
+    n = data.shape[0]
+    h = np.uint64(seed) & _MASK32
+    nblocks = n // 4
+    for b in range(nblocks):
+        k = (_read32(data, 4 * b) * _C1) & _MASK32
+        k = (_rotl32(k, 15) * _C2) & _MASK32
+        h ^= k
+        h = (_rotl32(h, 13) * np.uint64(5) + np.uint64(0xE6546B64)) & _MASK32
+    tail = 4 * nblocks
+    k = np.uint64(0)
+    rem = n & 3
+    if rem == 3:
+        k ^= np.uint64(data[tail + 2]) << np.uint64(16)
+    if rem >= 2:
+        k ^= np.uint64(data[tail + 1]) << np.uint64(8)
+    if rem >= 1:
+        k ^= np.uint64(data[tail])
+        k = (k * _C1) & _MASK32
+        k = (_rotl32(k, 15) * _C2) & _MASK32
+        h ^= k
+    h ^= np.uint64(n) & _MASK32
+    h ^= h >> np.uint64(16)
+    h = (h * np.uint64(0x85EBCA6B)) & _MASK32
+    h ^= h >> np.uint64(13)
+    h = (h * np.uint64(0xC2B2AE35)) & _MASK32
+    h ^= h >> np.uint64(16)
+    return np.uint32(h)
+
+
+@njit
+def _utf8(s):
+    # _get_code_point reads the string's storage directly; iterating over
+    # ``s`` would allocate a one-character string per code point.
+    out = np.empty(4 * len(s), np.uint8)
+    n = 0
+    for i in range(len(s)):
+        cp = _get_code_point(s, i)
+        if cp < 0x80:
+            out[n] = cp
+            n += 1
+        elif cp < 0x800:
+            out[n] = 0xC0 | (cp >> 6)
+            out[n + 1] = 0x80 | (cp & 0x3F)
+            n += 2
+        elif cp < 0x10000:
+            out[n] = 0xE0 | (cp >> 12)
+            out[n + 1] = 0x80 | ((cp >> 6) & 0x3F)
+            out[n + 2] = 0x80 | (cp & 0x3F)
+            n += 3
+        else:
+            out[n] = 0xF0 | (cp >> 18)
+            out[n + 1] = 0x80 | ((cp >> 12) & 0x3F)
+            out[n + 2] = 0x80 | ((cp >> 6) & 0x3F)
+            out[n + 3] = 0x80 | (cp & 0x3F)
+            n += 4
+    return out[:n]
+
+
+@njit
+def _digest_str(hasher, s, seed):
+    # ASCII strings are stored one byte per character, which is already their
+    # UTF-8 encoding, so they are hashed in place. ``s`` is an argument, so
+    # the caller keeps it alive while the view is read.
+    if s._is_ascii:
+        return hasher(carray(s._data, len(s), np.uint8), seed)
+    return hasher(_utf8(s), seed)
+
+
+def _digest(hasher, data, seed):
+    pass
+
+
+@overload(_digest)
+def _ol_digest(hasher, data, seed):
+    if isinstance(data, types.Array) and data.dtype == types.uint8:
+        if data.ndim != 1:
+            return None
+        return lambda hasher, data, seed: hasher(data, seed)
+    if isinstance(data, types.Bytes):
+        return lambda hasher, data, seed: hasher(np.frombuffer(data, np.uint8), seed)
+    if isinstance(data, (types.UnicodeType, types.UnicodeCharSeq)):
+        return lambda hasher, data, seed: _digest_str(hasher, str(data), seed)
+    return None
+
+
+@njit
+def xxh64(data, seed=0):
+    """XXH64 digest of ``data`` as a uint64."""
+    return _digest(_xxh64_bytes, data, np.uint64(seed))
+
+
+@njit
+def murmur3_32(data, seed=0):
+    """MurmurHash3_x86_32 digest of ``data`` as a uint32."""
+    return _digest(_murmur3_bytes, data, np.uint64(seed))
+
+
+def _hash_item(x, seed):
+    pass
+
+
+@overload(_hash_item)
+def _ol_hash_item(x, seed):
+    if isinstance(x, (types.Integer, types.Boolean)):
+        return lambda x, seed: _xxh64_u64(np.uint64(np.int64(x)), seed)
+    if isinstance(x, types.Float):
+        return lambda x, seed: _xxh64_u64(_float_bits(np.float64(x) + 0.0), seed)
+    if isinstance(x, (types.UnicodeType, types.UnicodeCharSeq)):
+        return lambda x, seed: _digest(_xxh64_bytes, x, seed)
+    return None
+
+
+@njit(parallel=True)
+def hash_column(values, seed=0):
+    """XXH64 of every element of a 1-d array or typed list, as uint64."""
+    n = len(values)
+    out = np.empty(n, np.uint64)
+    useed = np.uint64(seed)
+    for i in prange(n):
+        # Typed lists reject the unsigned index prange produces here.
+        out[i] = _hash_item(values[np.intp(i)], useed)
+    return out
@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+
+# Reference digests published with XXH64 and MurmurHash3_x86_32.
+XXH64_VECTORS = [
+    ("", 0, 0xEF46DB3751D8E999),
+    ("a", 0, 0xD24EC4F1A98C6E5B),
+    ("abc", 0, 0x44BC2CF5AD770999),
+    ("Nobody inspects the spammish repetition", 0, 0xFBCEA83C8A378BF1),
+]
+MURMUR3_VECTORS = [
+    ("", 0, 0),
+    ("", 1, 0x514E28B7),
+    ("hello", 0, 0x248BFA47),
+    ("The quick brown fox jumps over the lazy dog", 0x9747B28C, 0x2FA826CD),
+]
+
+
+@pytest.mark.parametrize("text, seed, expected", XXH64_VECTORS)
+def test_xxh64_reference(text, seed, expected):
+    from numba_extras.hashing import xxh64
+
+    assert xxh64(text, seed) == expected
+    assert xxh64(text.encode(), seed) == expected
+    assert xxh64(np.frombuffer(text.encode(), np.uint8), seed) == expected
+
+
+@pytest.mark.parametrize("text, seed, expected", MURMUR3_VECTORS)
+def test_murmur3_reference(text, seed, expected):
+    from numba_extras.hashing import murmur3_32
+
+    assert murmur3_32(text, seed) == expected
+
+
+def test_strings_hash_as_utf8():
+    from numba_extras.hashing import murmur3_32, xxh64
+
+    for text in ["héllo", "日本語", "emoji \U0001f600"]:
+        assert xxh64(text) == xxh64(text.encode("utf-8"))
+        assert murmur3_32(text, 7) == murmur3_32(text.encode("utf-8"), 7)
+
+
+def test_hash_column():
+    from numba import typed
+    from numba_extras.hashing import hash_column, xxh64
+
+    ints = np.array([-3, 0, 7, 2**30], np.int64)
+    got = hash_column(ints, 5)
+    for i, v in enumerate(ints):
+        assert got[i] == xxh64(ints[i : i + 1].view(np.uint8), 5)
+    np.testing.assert_array_equal(hash_column(ints.astype(np.int32), 5), got)
+    assert not np.array_equal(hash_column(ints, 6), got)
+
+    floats = hash_column(np.array([0.0, -0.0, 1.5]))
+    assert floats[0] == floats[1] != floats[2]
+
+    words = ["spam", "égg", ""]
+    expected = [xxh64(w) for w in words]
+    np.testing.assert_array_equal(hash_column(np.array(words)), expected)
+    np.testing.assert_array_equal(hash_column(typed.List(words)), expected)
+
+
+def test_hash_inside_njit():
+    from numba import njit, typed
+    from numba_extras.hashing import xxh64
+
+    @njit
+    def shard(keys, shards):
+        return [xxh64(k) % np.uint64(shards) for k in keys]
+
+    keys = ["user-1", "user-2", "usér-3"]
+    assert shard(typed.List(keys), 16) == [xxh64(k) % 16 for k in keys]
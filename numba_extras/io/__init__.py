@@ -0,0 +1 @@
+from .read import parallel_read  # noqa: F401
@@ -0,0 +1,109 @@
+"""Parallel file reads feeding jitted callbacks.
+
+``parallel_read`` reads whole files, or ``(path, offset, length)`` byte
+ranges, on a pool of threads and hands each one to a jitted callback as a
+uint8 array, in the order of ``sources``::
+
+    @njit(nogil=True)
+    def count_lines(data, counts, i):
+        ...
+
+    parallel_read(paths, count_lines, counts)
+
+Reads go straight into a ring of ``prefetch`` preallocated buffers with
+``os.preadv`` (``readinto`` where that is missing), both of which release
+the GIL, so up to ``prefetch`` reads are in flight or waiting while the
+callback runs on the calling thread. A buffer is reused as soon as the
+callback returns, so the callback must copy anything it wants to keep.
+Memory use is ``prefetch`` times the largest read; ``chunk_size`` splits
+large sources into reads of at most that many bytes.
+"""
+
+import collections
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+
+def _plan(sources, chunk_size):
+    # Splits every source into (path, offset, length) reads.
+    reads = []
+    for src in sources:
+        if isinstance(src, (str, bytes, os.PathLike)):
+            path, offset, length = src, 0, os.stat(src).st_size
+        else:
+            path, offset, length = src
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must be non-negative")
+        step = chunk_size or max(length, 1)
+        reads.append((path, offset, min(length, step)))
+        for start in range(offset + step, offset + length, step):
+            reads.append((path, start, min(offset + length - start, step)))
+    return reads
+
+
+def _read_into(path, offset, view):
+    done = 0
+    with open(path, "rb", buffering=0) as f:
+        while done < len(view):
+            if hasattr(os, "preadv"):
+                n = os.preadv(f.fileno(), [view[done:]], offset + done)
+            else:
+                f.seek(offset + done)
+                n = f.readinto(view[done:])
+            if not n:
+                raise EOFError(
+                    "{} ended {} bytes into a read of {} at offset {}".format(
+                        path, done, len(view), offset
+                    )
+                )
+            done += n
+
+
+def parallel_read(sources, callback, *args, chunk_size=None, prefetch=4, threads=None):
+    """Read ``sources`` in parallel and call ``callback(data, *args)`` on each.
+
+    ``sources`` holds paths, read whole, and ``(path, offset, length)``
+    tuples. Every read is delivered in order as a uint8 array ``data``
+    that is only valid during the call. Returns the callback results.
+    ``threads`` defaults to ``prefetch``.
+    """
+    if prefetch < 1:
+        raise ValueError("prefetch must be at least 1")
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    reads = _plan(sources, chunk_size)
+    if not reads:
+        return []
+    capacity = max(length for _, _, length in reads)
+    free = [np.empty(capacity, np.uint8) for _ in range(min(prefetch, len(reads)))]
+    pending = collections.deque()
+    todo = iter(reads)
+    results = []
+    with ThreadPoolExecutor(threads or prefetch) as pool:
+
+        def submit():
+            while free:
+                read = next(todo, None)
+                if read is None:
+                    return
+                path, offset, length = read
+                buf = free.pop()
+                view = memoryview(buf)[:length]
+                pending.append(
+                    (pool.submit(_read_into, path, offset, view), buf, length)
+                )
+
+        try:
+            submit()
+            while pending:
+                future, buf, length = pending.popleft()
+                future.result()
+                results.append(callback(buf[:length], *args))
+                free.append(buf)
+                submit()
+        finally:
+            for future, _, _ in pending:
+                future.cancel()
+    return results
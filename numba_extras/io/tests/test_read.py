@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+
+def _shards(tmp_path, sizes, seed=0):
+    rs = np.random.RandomState(seed)
+    paths = []
+    for i, size in enumerate(sizes):
+        path = tmp_path / "shard{}.bin".format(i)
+        path.write_bytes(rs.bytes(size))
+        paths.append(path)
+    return paths
+
+
+@pytest.mark.parametrize("prefetch", [1, 3, 16])
+def test_reads_files_in_order(tmp_path, prefetch):
+    from numba import njit
+    from numba_extras.io import parallel_read
+
+    @njit(nogil=True)
+    def checksum(data):
+        total = 0
+        for b in data:
+            total = (total * 31 + b) & 0xFFFFFFFF
+        return total, data.shape[0]
+
+    paths = _shards(tmp_path, [0, 1, 1000, 70_000, 5, 300_000])
+
+    def expected(raw):
+        total = 0
+        for b in raw:
+            total = (total * 31 + b) & 0xFFFFFFFF
+        return total, len(raw)
+
+    got = parallel_read(paths, checksum, prefetch=prefetch)
+    assert got == [expected(p.read_bytes()) for p in paths]
+
+
+def test_ranges_and_chunks(tmp_path):
+    from numba import njit
+    from numba_extras.io import parallel_read
+
+    @njit
+    def collect(data, out, cursor):
+        out[cursor[0] : cursor[0] + data.shape[0]] = data
+        cursor[0] += data.shape[0]
+
+    (path,) = _shards(tmp_path, [100_000])
+    raw = np.frombuffer(path.read_bytes(), np.uint8)
+    out = np.zeros(raw.shape[0], np.uint8)
+    cursor = np.zeros(1, np.int64)
+    parallel_read([path], collect, out, cursor, chunk_size=4096, prefetch=5)
+    np.testing.assert_array_equal(out, raw)
+
+    cursor[0] = 0
+    ranges = [(str(path), 10, 50), (path, 99_000, 1000), (path, 0, 0)]
+    parallel_read(ranges, collect, out, cursor, chunk_size=7)
+    np.testing.assert_array_equal(out[:50], raw[10:60])
+    np.testing.assert_array_equal(out[50:1050], raw[99_000:])
+
+
+def test_buffers_are_reused(tmp_path):
+    from numba_extras.io import parallel_read
+
+    paths = _shards(tmp_path, [64] * 10)
+    addresses = parallel_read(paths, lambda data: data.ctypes.data, prefetch=2)
+    assert len(set(addresses)) == 2
+
+
+def test_errors(tmp_path):
+    from numba_extras.io import parallel_read
+
+    (path,) = _shards(tmp_path, [100])
+    with pytest.raises(EOFError):
+        parallel_read([(path, 50, 100)], len)
+    with pytest.raises(FileNotFoundError):
+        parallel_read([tmp_path / "missing"], len)
+    with pytest.raises(ValueError):
+        parallel_read([path], len, prefetch=0)
+
+    def fail(data):
+        raise RuntimeError("stop")
+
+    with pytest.raises(RuntimeError):
+        parallel_read([path] * 20, fail)
+    assert parallel_read([], len) == []
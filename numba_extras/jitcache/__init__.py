@@ -0,0 +1 @@
+from .jitcache import JitCache, JitCacheStats  # noqa: F401
@@ -0,0 +1,210 @@
+"""A bounded cache of functions compiled at run time.
+
+Code that builds jitted functions on the fly, such as closures over
+constants, compiles the same function again every time it builds it. A
+``JitCache`` compiles each one once::
+
+    def scaler(k):
+        def scale(x):
+            return x * k
+        return scale
+
+    cache = JitCache(maxsize=64, parallel=False)
+    scale = cache.get(scaler, 2.5)    # njit(scaler(2.5)), made once
+
+Entries are keyed by the source of the factory, as a hash of its syntax
+tree (of its bytecode when the source is not available), its module and
+name, and the tuple of constants. The least recently used entries are
+evicted past ``maxsize`` entries or past ``maxbytes`` of generated code,
+measured as the size of the LLVM IR of every signature compiled so far.
+
+Eviction drops the cache's reference to the dispatcher; once nothing else
+refers to it, numba releases its compiled overloads, their LLVM modules
+and its registrations in the target context. The machine code itself
+stays mapped: numba never removes modules from its JIT engine, so every
+compilation still costs some native memory for good, and the way to bound
+a process is to compile less often, which is what the cache is for.
+"""
+
+import ast
+import collections
+import hashlib
+import inspect
+import marshal
+import textwrap
+import threading
+import time
+import weakref
+
+from numba import njit
+from numba.core import event
+
+JitCacheStats = collections.namedtuple(
+    "JitCacheStats",
+    [
+        "hits",
+        "misses",
+        "evictions",
+        "compiles",
+        "compile_time",
+        "currsize",
+        "nbytes",
+    ],
+)
+
+_Entry = collections.namedtuple("_Entry", ["dispatcher", "nbytes"])
+
+
+class _CompileListener(event.Listener):
+    # Times every compilation and reports those of cached dispatchers to
+    # their caches. Nested compilations, of callees, are included in the
+    # time of their caller.
+
+    def __init__(self):
+        self.caches = weakref.WeakSet()
+        self._local = threading.local()
+
+    def on_start(self, ev):
+        starts = self._local.__dict__.setdefault("starts", [])
+        starts.append(time.perf_counter())
+
+    def on_end(self, ev):
+        elapsed = time.perf_counter() - self._local.starts.pop()
+        dispatcher = ev.data["dispatcher"]
+        for cache in list(self.caches):
+            cache._compiled(dispatcher, ev.data["args"], elapsed)
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _register(cache):
+    global _listener
+    with _listener_lock:
+        if _listener is None:
+            _listener = _CompileListener()
+            event.register("numba:compile", _listener)
+        _listener.caches.add(cache)
+
+
+def _source_hash(factory):
+    try:
+        source = textwrap.dedent(inspect.getsource(factory))
+        data = ast.dump(ast.parse(source)).encode()
+    except (OSError, TypeError, SyntaxError):
+        data = marshal.dumps(factory.__code__)
+    return hashlib.sha1(data).hexdigest()
+
+
+class JitCache:
+    """An LRU cache of jitted functions; see the module documentation.
+
+    ``options`` are passed to ``numba.njit``. ``maxbytes=None`` leaves the
+    size of the generated code unbounded.
+    """
+
+    def __init__(self, maxsize=128, maxbytes=None, **options):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.options = options
+        self._lock = threading.RLock()
+        self._entries = collections.OrderedDict()
+        self._keys = {}
+        self._hashes = {}
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._compiles = 0
+        self._compile_time = 0.0
+        self._nbytes = 0
+        _register(self)
+
+    def _key(self, factory, constants):
+        if getattr(factory, "__closure__", None):
+            raise TypeError("the factory must not close over variables")
+        code = factory.__code__
+        if code not in self._hashes:
+            self._hashes[code] = _source_hash(factory)
+        key = (factory.__module__, factory.__qualname__, self._hashes[code], constants)
+        hash(key)
+        return key
+
+    def get(self, factory, *constants):
+        """The dispatcher for ``njit(factory(*constants))``, made once.
+
+        ``constants`` must be hashable.
+        """
+        with self._lock:
+            key = self._key(factory, constants)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry.dispatcher
+            self._misses += 1
+            dispatcher = njit(**self.options)(factory(*constants))
+            self._entries[key] = _Entry(dispatcher, 0)
+            self._keys[id(dispatcher)] = key
+            self._evict(keep=key)
+            return dispatcher
+
+    def _compiled(self, dispatcher, args, elapsed):
+        with self._lock:
+            key = self._keys.get(id(dispatcher))
+            entry = self._entries.get(key)
+            if entry is None or entry.dispatcher is not dispatcher:
+                return
+            cres = dispatcher.overloads.get(tuple(args))
+            if cres is None:
+                # The compilation failed.
+                return
+            nbytes = len(cres.library.get_llvm_str())
+            self._entries[key] = _Entry(dispatcher, entry.nbytes + nbytes)
+            self._nbytes += nbytes
+            self._compiles += 1
+            self._compile_time += elapsed
+            self._evict(keep=key)
+
+    def _evict(self, keep):
+        while len(self._entries) > self.maxsize or (
+            self.maxbytes is not None and self._nbytes > self.maxbytes
+        ):
+            key = next(iter(self._entries))
+            if key == keep:
+                # The newest entry stays even when it alone is too big.
+                self._entries.move_to_end(key)
+                if len(self._entries) == 1:
+                    return
+                continue
+            self._drop(key)
+            self._evictions += 1
+
+    def _drop(self, key):
+        entry = self._entries.pop(key)
+        del self._keys[id(entry.dispatcher)]
+        self._nbytes -= entry.nbytes
+
+    def clear(self):
+        """Drop every entry; the counts are kept."""
+        with self._lock:
+            for key in list(self._entries):
+                self._drop(key)
+
+    def stats(self):
+        """Counts, compile time in seconds and sizes, as ``JitCacheStats``."""
+        with self._lock:
+            return JitCacheStats(
+                self._hits,
+                self._misses,
+                self._evictions,
+                self._compiles,
+                self._compile_time,
+                len(self._entries),
+                self._nbytes,
+            )
+
+    def __len__(self):
+        return len(self._entries)
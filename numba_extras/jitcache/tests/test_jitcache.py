@@ -0,0 +1,107 @@
+import gc
+import weakref
+
+import numpy as np
+import pytest
+
+
+def scaler(k):
+    def scale(x):
+        return x * k
+
+    return scale
+
+
+def summer(k):
+    def total(x):
+        s = 0.0
+        for i in range(x.shape[0]):
+            s += x[i] ** k
+        return s
+
+    return total
+
+
+def test_compiles_once_per_key():
+    from numba_extras.jitcache import JitCache
+
+    cache = JitCache()
+    f = cache.get(scaler, 2)
+    assert cache.get(scaler, 2) is f
+    assert cache.get(scaler, 3) is not f
+    assert f(4) == 8 and cache.get(scaler, 3)(4) == 12
+    f(1.5)
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.evictions) == (2, 2, 0)
+    assert stats.compiles == 3 and stats.compile_time > 0
+    assert stats.currsize == len(cache) == 2 and stats.nbytes > 0
+
+
+def test_evicts_least_recently_used():
+    from numba_extras.jitcache import JitCache
+
+    cache = JitCache(maxsize=2)
+    first = cache.get(scaler, 1)
+    cache.get(scaler, 2)
+    assert cache.get(scaler, 1) is first
+    cache.get(scaler, 3)
+    assert cache.get(scaler, 1) is first
+    assert cache.stats().evictions == 1
+    # The entry for 2 was evicted and is made again.
+    assert cache.stats().misses == 3
+    cache.get(scaler, 2)
+    assert cache.stats().misses == 4
+
+
+def test_memory_bound_releases_dispatchers():
+    from numba_extras.jitcache import JitCache
+
+    x = np.arange(5.0)
+    probe = JitCache()
+    probe.get(summer, 2)(x)
+    size = probe.stats().nbytes
+    cache = JitCache(maxbytes=int(size * 2.5))
+    refs = []
+    for k in range(5):
+        f = cache.get(summer, k)
+        assert f(x) == pytest.approx((x**k).sum())
+        refs.append(weakref.ref(f))
+    del f
+    gc.collect()
+    stats = cache.stats()
+    assert stats.currsize == 2 and stats.evictions == 3
+    assert stats.nbytes <= cache.maxbytes
+    assert [r() is None for r in refs] == [True, True, True, False, False]
+    cache.clear()
+    assert len(cache) == 0 and cache.stats().nbytes == 0
+
+
+def test_key_is_the_source():
+    from numba_extras.jitcache import JitCache
+
+    cache = JitCache()
+    scope = {}
+    source = (
+        "def scaler(k):\n    def scale(x):\n        return x * k\n    return scale\n"
+    )
+    exec(source, scope)
+    scope["scaler"].__module__ = scaler.__module__
+    # The same name and module with different code is a different entry.
+    exec(source.replace("x * k", "x + k"), scope)
+    other = scope["scaler"]
+    other.__module__ = scaler.__module__
+    assert cache.get(other, 2)(4) == 6
+    assert cache.get(scaler, 2)(4) == 8
+
+
+def test_errors():
+    from numba_extras.jitcache import JitCache
+
+    cache = JitCache()
+    with pytest.raises(TypeError):
+        cache.get(scaler, [1, 2])
+    k = 3
+    with pytest.raises(TypeError):
+        cache.get(lambda: (lambda x: x * k))
+    with pytest.raises(ValueError):
+        JitCache(maxsize=0)
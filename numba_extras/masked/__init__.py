@@ -0,0 +1,15 @@
+from .masked import (  # noqa: F401
+    MaskedArray,
+    coalesce,
+    count,
+    fill,
+    from_arrow,
+    from_mask,
+    from_numpy,
+    is_valid,
+    max,
+    mean,
+    min,
+    sum,
+    to_numpy,
+)
@@ -0,0 +1,387 @@
+"""Nullable arrays with a validity bitmap.
+
+``MaskedArray`` is a named tuple ``(values, validity, offset)``: a 1-d
+array of values, an Arrow-style validity bitmap (bit ``offset + i`` set
+means element ``i`` is present, little-endian bit order) and the bit
+position of element 0 in that bitmap. An empty bitmap means that no
+element is null. Values under nulls are unspecified.
+
+Arithmetic (``+ - * / // % **`` and unary ``-``) between masked arrays,
+plain arrays and scalars propagates nulls, from Python and from ``@njit``
+code alike. The values are computed for every slot with NumPy's dtype
+rules, so the loops stay branch-free, and the result's bitmap is the AND of
+the operands' bitmaps. ``count``, ``sum``, ``mean``, ``min`` and ``max``
+skip nulls; ``fill`` and ``coalesce`` replace them.
+
+``from_numpy`` and ``from_arrow`` share the values with the source array.
+A NumPy mask holds one byte per element, so it is packed into a bitmap of
+an eighth of its size; an Arrow validity bitmap is used as is.
+"""
+
+import collections
+import operator
+
+import numpy as np
+from numba import njit, types
+from numba.extending import overload
+
+from ..arrow import PrimitiveColumn
+from ..arrow import from_arrow as _arrow_column
+
+
+class MaskedArray(
+    collections.namedtuple("MaskedArray", ["values", "validity", "offset"])
+):
+    __slots__ = ()
+    # Make NumPy defer to the reflected operators below instead of treating
+    # the tuple as a sequence.
+    __array_ufunc__ = None
+
+    def __add__(self, other):
+        return _add(self, other)
+
+    def __radd__(self, other):
+        return _add(other, self)
+
+    def __sub__(self, other):
+        return _sub(self, other)
+
+    def __rsub__(self, other):
+        return _sub(other, self)
+
+    def __mul__(self, other):
+        return _mul(self, other)
+
+    def __rmul__(self, other):
+        return _mul(other, self)
+
+    def __truediv__(self, other):
+        return _truediv(self, other)
+
+    def __rtruediv__(self, other):
+        return _truediv(other, self)
+
+    def __floordiv__(self, other):
+        return _floordiv(self, other)
+
+    def __rfloordiv__(self, other):
+        return _floordiv(other, self)
+
+    def __mod__(self, other):
+        return _mod(self, other)
+
+    def __rmod__(self, other):
+        return _mod(other, self)
+
+    def __pow__(self, other):
+        return _pow(self, other)
+
+    def __rpow__(self, other):
+        return _pow(other, self)
+
+    def __neg__(self):
+        return _neg(self)
+
+
+def _is(m):
+    return isinstance(m, types.BaseNamedTuple) and m.instance_class is MaskedArray
+
+
+def from_numpy(a):
+    """Wrap a ``numpy.ma.MaskedArray`` (or plain array) sharing its data."""
+    values = np.ma.getdata(a)
+    mask = np.ma.getmask(a)
+    if values.ndim != 1:
+        raise ValueError("MaskedArray is 1-d")
+    if mask is np.ma.nomask:
+        return MaskedArray(values, np.empty(0, np.uint8), 0)
+    return from_mask(values, mask)
+
+
+def to_numpy(m):
+    """A ``numpy.ma.MaskedArray`` sharing the values of ``m``."""
+    mask = ~_unpack(_aligned(m), m.values.shape[0]) if m.validity.shape[0] else False
+    return np.ma.MaskedArray(m.values, mask)
+
+
+def from_arrow(arr):
+    """Wrap a numeric pyarrow array or ``arrow.PrimitiveColumn``, zero-copy."""
+    col = arr if isinstance(arr, PrimitiveColumn) else _arrow_column(arr)
+    if not isinstance(col, PrimitiveColumn):
+        raise TypeError("expected a numeric Arrow column")
+    return MaskedArray(col.data, col.validity, col.offset)
+
+
+@njit
+def from_mask(values, mask):
+    """Wrap ``values`` with nulls where ``mask`` is True (NumPy convention)."""
+    n = values.shape[0]
+    if mask.shape[0] != n:
+        raise ValueError("values and mask differ in length")
+    bits = np.zeros((n + 7) >> 3, np.uint8)
+    for i in range(n):
+        if not mask[i]:
+            bits[i >> 3] |= np.uint8(1 << (i & 7))
+    return MaskedArray(values, bits, 0)
+
+
+@njit
+def _unpack(bits, n):
+    out = np.empty(n, np.bool_)
+    for i in range(n):
+        out[i] = (bits[i >> 3] >> (i & 7)) & 1 == 1
+    return out
+
+
+@njit
+def _aligned(m):
+    # The validity of ``m`` as a bitmap starting at bit 0: a view when the
+    # offset is byte aligned, a shifted copy otherwise.
+    bits = m.validity
+    nbytes = (m.values.shape[0] + 7) >> 3
+    base = m.offset >> 3
+    shift = m.offset & 7
+    if bits.shape[0] == 0 or shift == 0:
+        return bits[base : base + nbytes] if bits.shape[0] else bits
+    out = np.empty(nbytes, np.uint8)
+    for j in range(nbytes):
+        word = np.int64(bits[base + j]) >> shift
+        if base + j + 1 < bits.shape[0]:
+            word |= np.int64(bits[base + j + 1]) << (8 - shift)
+        out[j] = np.uint8(word & 0xFF)
+    return out
+
+
+@njit
+def _both(a, b):
+    # Bitmap valid where both ``a`` and ``b`` are; empty when all are.
+    if a.shape[0] == 0:
+        return b.copy()
+    if b.shape[0] == 0:
+        return a.copy()
+    return a & b
+
+
+@njit
+def _either(a, b):
+    if a.shape[0] == 0 or b.shape[0] == 0:
+        return np.empty(0, np.uint8)
+    return a | b
+
+
+@njit
+def is_valid(m, i):
+    """Whether element ``i`` of ``m`` is not null."""
+    if m.validity.shape[0] == 0:
+        return True
+    j = m.offset + i
+    return (m.validity[j >> 3] >> (j & 7)) & 1 == 1
+
+
+def _operand(x):
+    # How the overloads below read one operand: None when it is unsupported.
+    # Each reader gives the values, the aligned bitmap and the length, which
+    # is -1 for scalars.
+    if _is(x):
+        return lambda x: (x.values, _aligned(x), x.values.shape[0])
+    if isinstance(x, types.Array) and x.ndim == 1:
+        return lambda x: (x, np.empty(0, np.uint8), x.shape[0])
+    if isinstance(x, (types.Number, types.Boolean)):
+        return lambda x: (x, np.empty(0, np.uint8), -1)
+    return None
+
+
+def _binary(op):
+    def ol(a, b):
+        if not (_is(a) or _is(b)):
+            return None
+        read_a = _operand(a)
+        read_b = _operand(b)
+        if read_a is None or read_b is None:
+            return None
+        read_a = njit(read_a)
+        read_b = njit(read_b)
+
+        def impl(a, b):
+            va, bits_a, na = read_a(a)
+            vb, bits_b, nb = read_b(b)
+            if na >= 0 and nb >= 0 and na != nb:
+                raise ValueError("operands differ in length")
+            return MaskedArray(op(va, vb), _both(bits_a, bits_b), 0)
+
+        return impl
+
+    overload(op)(ol)
+
+    @njit
+    def run(a, b):
+        return op(a, b)
+
+    return run
+
+
+_add = _binary(operator.add)
+_sub = _binary(operator.sub)
+_mul = _binary(operator.mul)
+_truediv = _binary(operator.truediv)
+_floordiv = _binary(operator.floordiv)
+_mod = _binary(operator.mod)
+_pow = _binary(operator.pow)
+
+
+@overload(operator.neg)
+def _ol_neg(m):
+    if _is(m):
+        return lambda m: MaskedArray(-m.values, _aligned(m).copy(), 0)
+    return None
+
+
+@njit
+def _neg(m):
+    return -m
+
+
+@njit
+def count(m):
+    """Number of non-null elements."""
+    n = m.values.shape[0]
+    if m.validity.shape[0] == 0:
+        return n
+    bits = _aligned(m)
+    total = 0
+    full = n >> 3
+    for j in range(full):
+        b = np.int64(bits[j])
+        # Bit count of one byte.
+        b = (b & 0x55) + ((b >> 1) & 0x55)
+        b = (b & 0x33) + ((b >> 2) & 0x33)
+        total += (b & 0x0F) + (b >> 4)
+    for i in range(full << 3, n):
+        total += (bits[i >> 3] >> (i & 7)) & 1
+    return total
+
+
+@njit
+def sum(m):
+    """Sum of the non-null elements, accumulated in the dtype NumPy uses."""
+    values = m.values
+    n = values.shape[0]
+    acc = values[:0].sum()
+    if m.validity.shape[0] == 0:
+        return values.sum()
+    bits = _aligned(m)
+    for j in range((n + 7) >> 3):
+        b = bits[j]
+        if b == 0:
+            continue
+        start = j << 3
+        stop = start + 8 if start + 8 < n else n
+        if b == 0xFF:
+            for i in range(start, stop):
+                acc += values[i]
+        else:
+            for i in range(start, stop):
+                if (b >> (i - start)) & 1:
+                    acc += values[i]
+    return acc
+
+
+@njit
+def mean(m):
+    """Mean of the non-null elements; NaN when there are none."""
+    k = count(m)
+    if k == 0:
+        return np.nan
+    return sum(m) / k
+
+
+@njit
+def _extreme(m, largest):
+    values = m.values
+    found = False
+    best = values[0] if values.shape[0] else values[:0].sum()
+    for i in range(values.shape[0]):
+        if not is_valid(m, i):
+            continue
+        v = values[i]
+        if v != v:
+            return v
+        if not found or (v > best if largest else v < best):
+            best = v
+            found = True
+    if not found:
+        raise ValueError("no non-null elements")
+    return best
+
+
+@njit
+def min(m):
+    """Smallest non-null element; NaN if any non-null element is NaN."""
+    return _extreme(m, False)
+
+
+@njit
+def max(m):
+    """Largest non-null element; NaN if any non-null element is NaN."""
+    return _extreme(m, True)
+
+
+@njit
+def fill(m, value):
+    """A plain array with nulls replaced by ``value``."""
+    out = m.values.copy()
+    if m.validity.shape[0] == 0:
+        return out
+    bits = _aligned(m)
+    for i in range(out.shape[0]):
+        if not (bits[i >> 3] >> (i & 7)) & 1:
+            out[i] = value
+    return out
+
+
+def _coalesce(a, b):
+    pass
+
+
+@overload(_coalesce)
+def _ol_coalesce(a, b):
+    if not _is(a):
+        return None
+    if _is(b):
+
+        def impl(a, b):
+            if len(a.values) != len(b.values):
+                raise ValueError("operands differ in length")
+            bits_a = _aligned(a)
+            out = a.values.copy()
+            if bits_a.shape[0]:
+                for i in range(out.shape[0]):
+                    if not (bits_a[i >> 3] >> (i & 7)) & 1:
+                        out[i] = b.values[i]
+            return MaskedArray(out, _either(bits_a, _aligned(b)), 0)
+
+        return impl
+    if isinstance(b, types.Array):
+
+        def impl(a, b):
+            if len(a.values) != len(b):
+                raise ValueError("operands differ in length")
+            bits_a = _aligned(a)
+            out = a.values.copy()
+            if bits_a.shape[0]:
+                for i in range(out.shape[0]):
+                    if not (bits_a[i >> 3] >> (i & 7)) & 1:
+                        out[i] = b[i]
+            return MaskedArray(out, np.empty(0, np.uint8), 0)
+
+        return impl
+    return lambda a, b: MaskedArray(fill(a, b), np.empty(0, np.uint8), 0)
+
+
+@njit
+def coalesce(a, b):
+    """``a`` with its nulls taken from ``b``: a masked array, array or scalar.
+
+    The result is null only where both ``a`` and a masked ``b`` are null.
+    """
+    return _coalesce(a, b)
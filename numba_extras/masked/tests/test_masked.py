@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+
+def _random(n=100, seed=0, dtype=np.float64):
+    rs = np.random.RandomState(seed)
+    values = (rs.standard_normal(n) * 10).astype(dtype)
+    return np.ma.MaskedArray(values, rs.rand(n) < 0.3)
+
+
+def _assert_same(m, expected):
+    from numba_extras.masked import to_numpy
+
+    got = to_numpy(m)
+    np.testing.assert_array_equal(np.ma.getmaskarray(got), np.ma.getmaskarray(expected))
+    np.testing.assert_allclose(got.compressed(), expected.compressed())
+
+
+def test_arithmetic_matches_numpy_ma():
+    from numba_extras.masked import from_numpy
+
+    a = _random(seed=1)
+    b = _random(seed=2)
+    ma, mb = from_numpy(a), from_numpy(b)
+    _assert_same(ma + mb, a + b)
+    _assert_same(ma - mb, a - b)
+    _assert_same(ma * mb, a * b)
+    _assert_same(ma / 2.0, a / 2.0)
+    _assert_same(1.5 - ma, 1.5 - a)
+    _assert_same(-ma, -a)
+    _assert_same(ma * b.data, np.ma.MaskedArray(a * b.data, a.mask))
+    _assert_same(b.data + ma, np.ma.MaskedArray(b.data + a, a.mask))
+    with pytest.raises(ValueError):
+        ma + from_numpy(b[:-1])
+
+
+def test_integer_division_by_null_zero():
+    from numba_extras.masked import from_mask, to_numpy
+
+    a = from_mask(np.array([7, 8, 9]), np.array([False, False, False]))
+    b = from_mask(np.array([2, 0, 4]), np.array([False, True, False]))
+    got = to_numpy(a // b)
+    assert got.dtype == np.int64
+    assert got.tolist() == [3, None, 2]
+    assert to_numpy(a % b).tolist() == [1, None, 1]
+
+
+def test_reductions_skip_nulls():
+    from numba_extras import masked
+
+    for dtype in (np.float64, np.float32, np.int32, np.uint8):
+        a = _random(dtype=dtype)
+        m = masked.from_numpy(a)
+        assert masked.count(m) == a.count()
+        np.testing.assert_allclose(masked.sum(m), a.sum(), rtol=1e-6)
+        assert masked.min(m) == a.min()
+        assert masked.max(m) == a.max()
+        np.testing.assert_allclose(masked.mean(m), a.mean())
+
+
+def test_reductions_edge_cases():
+    from numba_extras import masked
+
+    m = masked.from_mask(np.array([1.0, np.nan, 2.0]), np.array([False, False, True]))
+    assert np.isnan(masked.max(m)) and np.isnan(masked.sum(m))
+    empty = masked.from_mask(np.array([1.0, 2.0]), np.array([True, True]))
+    assert masked.count(empty) == 0
+    assert masked.sum(empty) == 0.0
+    assert np.isnan(masked.mean(empty))
+    with pytest.raises(ValueError):
+        masked.min(empty)
+    plain = masked.from_numpy(np.arange(5))
+    assert plain.validity.shape == (0,)
+    assert masked.count(plain) == 5 and masked.sum(plain) == 10
+
+
+def test_fill_and_coalesce():
+    from numba_extras import masked
+
+    a = masked.from_mask(np.array([1.0, 2.0, 3.0]), np.array([False, True, True]))
+    b = masked.from_mask(np.array([9.0, 8.0, 7.0]), np.array([True, False, True]))
+    np.testing.assert_array_equal(masked.fill(a, -1.0), [1.0, -1.0, -1.0])
+    got = masked.to_numpy(masked.coalesce(a, b))
+    assert got.tolist() == [1.0, 8.0, None]
+    got = masked.coalesce(a, np.array([5.0, 6.0, 7.0]))
+    assert got.validity.shape == (0,)
+    np.testing.assert_array_equal(got.values, [1.0, 6.0, 7.0])
+    np.testing.assert_array_equal(masked.coalesce(a, 0.0).values, [1.0, 0.0, 0.0])
+
+
+def test_from_numpy_and_arrow_share_values():
+    pa = pytest.importorskip("pyarrow")
+    from numba_extras import masked
+
+    a = _random()
+    assert np.shares_memory(masked.from_numpy(a).values, a)
+    values = [None if i % 5 == 0 else i for i in range(40)]
+    arr = pa.array(values, pa.int64())
+
+    def expected(vs):
+        return np.ma.masked_equal([-1 if v is None else v for v in vs], -1)
+
+    for start in (0, 3, 8, 13):
+        m = masked.from_arrow(arr[start:])
+        tail = expected(values[start:])
+        assert masked.sum(m) == tail.sum()
+        assert masked.count(m) == tail.count()
+        _assert_same(m * 2, tail * 2)
+        head = masked.from_arrow(arr[: 40 - start])
+        _assert_same(m + head, tail + expected(values[: 40 - start]))
+    with pytest.raises(TypeError):
+        masked.from_arrow(pa.array(["a"]))
+
+
+def test_kernels_in_njit():
+    from numba import njit
+    from numba_extras import masked
+
+    @njit
+    def score(a, b):
+        return masked.mean(masked.coalesce(a * 2.0 + b, 0.0) - 1.0)
+
+    a = _random(seed=3)
+    b = _random(seed=4)
+    expected = ((a * 2.0 + b).filled(0.0) - 1.0).mean()
+    np.testing.assert_allclose(
+        score(masked.from_numpy(a), masked.from_numpy(b)), expected
+    )
@@ -0,0 +1 @@
+from .profiling import AllocStats, AllocTracker, alloc_stats  # noqa: F401
@@ -0,0 +1,171 @@
+"""Counting the memory that jitted code allocates.
+
+Arrays, strings, lists and other objects made in ``@njit`` code live in
+memory from numba's runtime (NRT). ``alloc_stats`` runs a function once to
+compile it and once more under measurement, and reports what that second
+call allocated::
+
+    alloc_stats(helloworld, "world")
+    # AllocStats(calls=1, allocations=1, frees=1, net_bytes=..., peak_bytes=...)
+
+``allocations`` and ``frees`` come from numba's NRT statistics, which this
+turns on for the call. An allocation in a loop shows up as one per
+iteration, so a kernel that should not allocate can be checked for
+``allocations == 0``. For a jitted ``fn``, the allocations of passing the
+arguments from Python, one for each array or string, are left out.
+
+The runtime counts but does not measure, so the bytes come from
+``tracemalloc``: numba takes NRT memory from Python's raw allocator, which
+``tracemalloc`` traces. ``net_bytes`` is how much more memory is in use
+after the call than before, such as the returned array, and
+``peak_bytes`` is the most that was in use at once during the call, above
+what was in use before. Both include the few Python objects made for the
+arguments and the result.
+
+The counts are process-wide: allocations made by other threads during the
+call are counted too. ``peak_bytes`` is None when ``tracemalloc`` was
+already tracing before the call on Python versions without
+``tracemalloc.reset_peak`` (before 3.9).
+
+``AllocTracker`` adds up the counts of the functions it runs, per function.
+As a pytest plugin, ``numba_extras.profiling.pytest_plugin`` provides one
+as the ``alloc_tracker`` fixture::
+
+    def test_no_allocations(alloc_tracker):
+        assert alloc_tracker(kernel, x).allocations == 0
+"""
+
+import collections
+import threading
+import tracemalloc
+
+from numba import njit
+from numba.core.dispatcher import Dispatcher
+from numba.core.runtime import _nrt_python as _nrt
+from numba.core.runtime import rtsys
+
+AllocStats = collections.namedtuple(
+    "AllocStats", ["calls", "allocations", "frees", "net_bytes", "peak_bytes"]
+)
+
+# Measurements switch the statistics and tracing on and off; one at a time.
+_lock = threading.RLock()
+
+
+@njit
+def _noop(*args):
+    pass
+
+
+def _counts(fn, args, kwargs):
+    before = rtsys.get_allocation_stats()
+    result = fn(*args, **kwargs)
+    after = rtsys.get_allocation_stats()
+    return after.alloc - before.alloc, after.free - before.free, result
+
+
+def _measure(fn, args, kwargs):
+    stats_enabled = _nrt.memsys_stats_enabled()
+    tracing = tracemalloc.is_tracing()
+    if not stats_enabled:
+        _nrt.memsys_enable_stats()
+    try:
+        allocs = frees = 0
+        if isinstance(fn, Dispatcher):
+            # Passing arrays and strings from Python allocates for each.
+            args_only = args + tuple(kwargs.values())
+            allocs, frees, _ = _counts(_noop, args_only, {})
+            allocs, frees = -allocs, -frees
+        if not tracing:
+            tracemalloc.start()
+        can_peak = not tracing or hasattr(tracemalloc, "reset_peak")
+        if tracing and can_peak:
+            tracemalloc.reset_peak()
+        start, _ = tracemalloc.get_traced_memory()
+        # The result is kept until its memory has been measured.
+        call_allocs, call_frees, result = _counts(fn, args, kwargs)
+        current, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+        if not stats_enabled:
+            _nrt.memsys_disable_stats()
+    return AllocStats(
+        1,
+        allocs + call_allocs,
+        frees + call_frees,
+        current - start,
+        peak - start if can_peak else None,
+    )
+
+
+def alloc_stats(fn, *args, **kwargs):
+    """What one call of ``fn(*args, **kwargs)`` allocates, as ``AllocStats``.
+
+    ``fn`` is called twice: first to compile it for these arguments,
+    which is not measured, and then under measurement.
+    """
+    fn(*args, **kwargs)
+    if isinstance(fn, Dispatcher):
+        _noop(*args, *kwargs.values())
+    with _lock:
+        return _measure(fn, args, kwargs)
+
+
+def _name(fn):
+    module = getattr(fn, "__module__", None)
+    name = getattr(fn, "__qualname__", None) or repr(fn)
+    return "{}.{}".format(module, name) if module else name
+
+
+class AllocTracker:
+    """Runs functions under ``alloc_stats`` and totals the counts of each.
+
+    ``functions`` maps the qualified name of every function run to its
+    ``AllocStats``: the sums over its calls, with the largest peak.
+    """
+
+    def __init__(self):
+        self.functions = collections.OrderedDict()
+
+    def __call__(self, fn, *args, **kwargs):
+        """``alloc_stats(fn, *args, **kwargs)``, also added to the totals."""
+        stats = alloc_stats(fn, *args, **kwargs)
+        name = _name(fn)
+        total = self.functions.get(name)
+        if total is None:
+            self.functions[name] = stats
+            return stats
+        peaks = [p for p in (total.peak_bytes, stats.peak_bytes) if p is not None]
+        self.functions[name] = AllocStats(
+            total.calls + 1,
+            total.allocations + stats.allocations,
+            total.frees + stats.frees,
+            total.net_bytes + stats.net_bytes,
+            max(peaks) if peaks else None,
+        )
+        return stats
+
+    def report(self):
+        """The totals as a table, most allocations first."""
+        rows = sorted(
+            self.functions.items(), key=lambda item: item[1].allocations, reverse=True
+        )
+        lines = [
+            "{:>8} {:>12} {:>12} {:>14} {:>14}  {}".format(
+                "calls", "allocations", "frees", "net bytes", "peak bytes", "function"
+            )
+        ]
+        for name, s in rows:
+            lines.append(
+                "{:>8} {:>12} {:>12} {:>14} {:>14}  {}".format(
+                    s.calls,
+                    s.allocations,
+                    s.frees,
+                    s.net_bytes,
+                    "-" if s.peak_bytes is None else s.peak_bytes,
+                    name,
+                )
+            )
+        return "\n".join(lines)
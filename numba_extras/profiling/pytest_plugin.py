@@ -0,0 +1,16 @@
+"""The ``alloc_tracker`` fixture, for tests that bound allocations.
+
+Load it with ``-p numba_extras.profiling.pytest_plugin`` or with
+``pytest_plugins = ["numba_extras.profiling.pytest_plugin"]`` in the root
+``conftest.py``.
+"""
+
+import pytest
+
+from .profiling import AllocTracker
+
+
+@pytest.fixture
+def alloc_tracker():
+    """An ``AllocTracker`` for the test."""
+    return AllocTracker()
@@ -0,0 +1,92 @@
+import tracemalloc
+
+import numpy as np
+from numba import njit
+
+from numba_extras.profiling.pytest_plugin import alloc_tracker  # noqa: F401
+
+
+@njit
+def total(x):
+    s = 0.0
+    for i in range(x.shape[0]):
+        s += x[i]
+    return s
+
+
+@njit
+def temporaries(x, k):
+    s = 0.0
+    for i in range(k):
+        s += (x * i).sum()
+    return s
+
+
+@njit
+def ones(n):
+    return np.ones(n)
+
+
+def test_counts_allocations():
+    from numba_extras.helloworld import helloworld
+    from numba_extras.profiling import alloc_stats
+
+    stats = alloc_stats(helloworld, "world")
+    assert stats.calls == 1
+    assert stats.allocations > 0 and stats.allocations == stats.frees
+
+    x = np.ones(1000)
+    assert alloc_stats(total, x)[1:3] == (0, 0)
+    stats = alloc_stats(temporaries, x, 10)
+    assert stats.allocations == stats.frees == 10
+    # One temporary at a time.
+    assert 8000 <= stats.peak_bytes < 16000
+    assert abs(stats.net_bytes) < 1000
+
+
+def test_measures_bytes():
+    from numba_extras.profiling import alloc_stats
+
+    stats = alloc_stats(ones, 1 << 20)
+    assert stats.allocations == 1 and stats.frees == 0
+    assert 8 << 20 <= stats.net_bytes < (8 << 20) + 4096
+    assert stats.peak_bytes >= stats.net_bytes
+
+
+def test_restores_state():
+    from numba.core.runtime import _nrt_python as _nrt
+
+    from numba_extras.profiling import alloc_stats
+
+    enabled = _nrt.memsys_stats_enabled()
+    tracing = tracemalloc.is_tracing()
+    alloc_stats(ones, 10)
+    assert _nrt.memsys_stats_enabled() == enabled
+    assert tracemalloc.is_tracing() == tracing
+
+    tracemalloc.start()
+    try:
+        stats = alloc_stats(ones, 1 << 16)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
+    if hasattr(tracemalloc, "reset_peak"):
+        assert stats.peak_bytes >= 8 << 16
+    else:
+        assert stats.peak_bytes is None
+
+
+def test_tracker_totals_per_function(alloc_tracker):  # noqa: F811
+    from numba_extras.profiling import AllocTracker
+
+    assert isinstance(alloc_tracker, AllocTracker)
+    x = np.ones(100)
+    assert alloc_tracker(temporaries, x, 3).allocations == 3
+    assert alloc_tracker(temporaries, x, 5).allocations == 5
+    assert alloc_tracker(total, x).allocations == 0
+    name = __name__ + ".temporaries"
+    assert list(alloc_tracker.functions) == [name, __name__ + ".total"]
+    stats = alloc_tracker.functions[name]
+    assert (stats.calls, stats.allocations, stats.frees) == (2, 8, 8)
+    lines = alloc_tracker.report().splitlines()
+    assert len(lines) == 3 and lines[1].endswith(name)
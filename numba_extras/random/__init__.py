@@ -0,0 +1,9 @@
+from .bitgen import PCG64DXSM, Philox, uniform  # noqa: F401
+from .sampling import (  # noqa: F401
+    alias_draw,
+    alias_table,
+    choice,
+    permutation,
+    reservoir_sample,
+    shuffle,
+)
@@ -0,0 +1,418 @@
+"""Random number generators for nopython code, parallel loops included.
+
+``Philox`` is the Philox4x64-10 counter-based generator and ``PCG64DXSM``
+the PCG64 generator with the DXSM output function; their raw outputs and
+``random()`` match NumPy's bit generators of the same name given the same
+state, and ``from_numpy`` copies the state of such a NumPy bit generator.
+Each instance is independent state, so a ``prange`` body can own one
+instead of sharing ``np.random``'s per-thread state.
+
+They are structrefs whose methods are inlined into the calling code: a
+draw is a few instructions, and an out-of-line method call per draw, which
+is what jitclass methods compile to, costs several times more.
+
+For results that do not depend on the number of threads, split the work
+into fixed blocks and give each block its own stream, as ``uniform`` does::
+
+    for b in prange(nblocks):
+        rng = Philox(seed, b)
+        for i in range(b * BLOCK, min((b + 1) * BLOCK, n)):
+            out[i] = rng.random()
+
+Philox streams are keyed by ``(seed, stream)`` and are independent for
+every pair; ``advance`` skips ahead in constant time. PCG64DXSM streams
+differ in their increment.
+"""
+
+import numpy as np
+from numba import njit, prange, types
+from numba.experimental import structref
+from numba.extending import intrinsic, overload, overload_method
+
+_PHILOX_M0 = 0xD2E7470EE14C6C93
+_PHILOX_M1 = 0xCA5A826395121157
+_PHILOX_W0 = 0x9E3779B97F4A7C15
+_PHILOX_W1 = 0xBB67AE8584CAA73B
+_PCG_MULT = np.uint64(0xDA942042E4DD58B5)
+_ONE = np.uint64(1)
+_ZERO = np.uint64(0)
+_MASK = (1 << 64) - 1
+# Draws per stream in ``uniform``.
+_BLOCK = 1 << 14
+
+
+@intrinsic
+def _mul128(typingctx, a, b):
+    # (high, low) words of the full 128-bit product of two uint64.
+    if a != types.uint64 or b != types.uint64:
+        return None
+    sig = types.UniTuple(types.uint64, 2)(types.uint64, types.uint64)
+
+    def codegen(context, builder, sig, args):
+        wide = args[0].type.__class__(128)
+        product = builder.mul(builder.zext(args[0], wide), builder.zext(args[1], wide))
+        hi = builder.trunc(builder.lshr(product, wide(64)), args[0].type)
+        lo = builder.trunc(product, args[0].type)
+        return context.make_tuple(builder, sig.return_type, (hi, lo))
+
+    return sig, codegen
+
+
+@intrinsic
+def _philox_block(typingctx, c0, c1, c2, c3, k0, k1):
+    # The ten Philox4x64 rounds on one counter block. Emitting them as LLVM
+    # IR keeps every inlined ``next_uint64`` small for numba to compile.
+    if any(t != types.uint64 for t in (c0, c1, c2, c3, k0, k1)):
+        return None
+    sig = types.UniTuple(types.uint64, 4)(*(types.uint64,) * 6)
+
+    def codegen(context, builder, sig, args):
+        word = args[0].type
+        wide = word.__class__(128)
+
+        def mul(m, x):
+            product = builder.mul(wide(m), builder.zext(x, wide))
+            hi = builder.trunc(builder.lshr(product, wide(64)), word)
+            return hi, builder.trunc(product, word)
+
+        c0, c1, c2, c3, k0, k1 = args
+        for r in range(10):
+            if r:
+                k0 = builder.add(k0, word(_PHILOX_W0))
+                k1 = builder.add(k1, word(_PHILOX_W1))
+            hi0, lo0 = mul(_PHILOX_M0, c0)
+            hi1, lo1 = mul(_PHILOX_M1, c2)
+            c0, c1, c2, c3 = (
+                builder.xor(builder.xor(hi1, c1), k0),
+                lo1,
+                builder.xor(builder.xor(hi0, c3), k1),
+                lo0,
+            )
+        return context.make_tuple(builder, sig.return_type, (c0, c1, c2, c3))
+
+    return sig, codegen
+
+
+@njit
+def _to_double(x):
+    # The top 53 bits as a float in [0, 1), as NumPy's ``random()`` does.
+    return (x >> np.uint64(11)) * (1.0 / 9007199254740992.0)
+
+
+@njit
+def _bounded(rng, n):
+    # Lemire's multiply-shift: an unbiased integer in [0, n) for n > 0.
+    hi, lo = _mul128(rng.next_uint64(), n)
+    if lo < n:
+        threshold = (_ZERO - n) % n
+        while lo < threshold:
+            hi, lo = _mul128(rng.next_uint64(), n)
+    return hi
+
+
+@njit
+def _normal_pair(rng):
+    # Marsaglia's polar method: two independent standard normals.
+    while True:
+        x = 2.0 * rng.random() - 1.0
+        y = 2.0 * rng.random() - 1.0
+        r = x * x + y * y
+        if 0.0 < r < 1.0:
+            f = np.sqrt(-2.0 * np.log(r) / r)
+            return x * f, y * f
+
+
+class _Generator(structref.StructRefProxy):
+    # Python-side methods; ``@njit`` code calls the inlined overloads.
+    def next_uint64(self):
+        return _next_uint64(self)
+
+    def random(self):
+        return _random(self)
+
+    def integers(self, low, high):
+        return _integers(self, low, high)
+
+    def normal(self):
+        return _normal(self)
+
+
+@njit
+def _next_uint64(rng):
+    return rng.next_uint64()
+
+
+@njit
+def _random(rng):
+    return rng.random()
+
+
+@njit
+def _integers(rng, low, high):
+    return rng.integers(low, high)
+
+
+@njit
+def _normal(rng):
+    return rng.normal()
+
+
+def _define_common(typ):
+    # Methods shared by both generators, built on ``next_uint64``.
+    @overload_method(typ, "random", inline="always")
+    def _ol_random(self):
+        return lambda self: _to_double(self.next_uint64())
+
+    @overload_method(typ, "integers", inline="always")
+    def _ol_integers(self, low, high):
+        def impl(self, low, high):
+            if high <= low:
+                raise ValueError("high must be larger than low")
+            return low + np.int64(_bounded(self, np.uint64(high - low)))
+
+        return impl
+
+    @overload_method(typ, "normal")
+    def _ol_normal(self):
+        def impl(self):
+            if self.has_spare:
+                self.has_spare = False
+                return self.spare
+            x, self.spare = _normal_pair(self)
+            self.has_spare = True
+            return x
+
+        return impl
+
+
+@structref.register
+class PhiloxType(types.StructRef):
+    def preprocess_fields(self, fields):
+        return tuple((name, types.unliteral(typ)) for name, typ in fields)
+
+
+_philox_type = PhiloxType(
+    [(name, types.uint64) for name in ("k0", "k1", "c0", "c1", "c2", "c3")]
+    + [(name, types.uint64) for name in ("b0", "b1", "b2", "b3")]
+    + [("pos", types.int64), ("has_spare", types.boolean), ("spare", types.float64)]
+)
+
+
+class Philox(_Generator):
+    """Philox4x64-10 keyed by ``(seed, stream)``.
+
+    Matches ``np.random.Philox(key=[seed, stream], counter=0)``.
+    """
+
+    def __new__(cls, seed, stream=0):
+        return _new_philox(seed, stream)
+
+    @classmethod
+    def from_numpy(cls, bit_generator):
+        """Copy the state of a ``numpy.random.Philox``."""
+        state = bit_generator.state
+        key = state["state"]["key"]
+        counter = state["state"]["counter"]
+        rng = _new_philox(key[0], key[1])
+        _set_philox(rng, counter, state["buffer"], state["buffer_pos"])
+        return rng
+
+    def advance(self, blocks):
+        """Skip ``blocks`` blocks of four outputs, like ``Philox.advance``."""
+        _advance(self, blocks)
+
+
+structref.define_boxing(PhiloxType, Philox)
+
+
+@njit
+def _new_philox(seed, stream):
+    rng = structref.new(_philox_type)
+    rng.k0 = np.uint64(seed)
+    rng.k1 = np.uint64(stream)
+    rng.c0 = rng.c1 = rng.c2 = rng.c3 = _ZERO
+    rng.b0 = rng.b1 = rng.b2 = rng.b3 = _ZERO
+    rng.pos = 4
+    rng.has_spare = False
+    rng.spare = 0.0
+    return rng
+
+
+@overload(Philox)
+def _ol_philox(seed, stream=0):
+    return lambda seed, stream=0: _new_philox(seed, stream)
+
+
+@njit
+def _set_philox(rng, counter, buffer, pos):
+    rng.c0, rng.c1, rng.c2, rng.c3 = counter[0], counter[1], counter[2], counter[3]
+    rng.b0, rng.b1, rng.b2, rng.b3 = buffer[0], buffer[1], buffer[2], buffer[3]
+    rng.pos = pos
+
+
+@njit(inline="always")
+def _increment(rng, n):
+    # Adds ``n`` to the 256-bit little-endian counter.
+    old = rng.c0
+    rng.c0 = old + n
+    if rng.c0 < old:
+        rng.c1 += _ONE
+        if rng.c1 == 0:
+            rng.c2 += _ONE
+            if rng.c2 == 0:
+                rng.c3 += _ONE
+
+
+@njit(inline="always")
+def _refill(rng):
+    _increment(rng, _ONE)
+    rng.b0, rng.b1, rng.b2, rng.b3 = _philox_block(
+        rng.c0, rng.c1, rng.c2, rng.c3, rng.k0, rng.k1
+    )
+    rng.pos = 0
+
+
+@overload_method(PhiloxType, "next_uint64", inline="always")
+def _ol_philox_next(self):
+    def impl(self):
+        if self.pos == 4:
+            _refill(self)
+        pos = self.pos
+        self.pos = pos + 1
+        if pos == 0:
+            return self.b0
+        if pos == 1:
+            return self.b1
+        if pos == 2:
+            return self.b2
+        return self.b3
+
+    return impl
+
+
+@overload_method(PhiloxType, "advance")
+def _ol_advance(self, blocks):
+    def impl(self, blocks):
+        _increment(self, np.uint64(blocks))
+        self.pos = 4
+
+    return impl
+
+
+@njit
+def _advance(rng, blocks):
+    rng.advance(blocks)
+
+
+_define_common(PhiloxType)
+
+
+@structref.register
+class PCG64DXSMType(types.StructRef):
+    def preprocess_fields(self, fields):
+        return tuple((name, types.unliteral(typ)) for name, typ in fields)
+
+
+# The 128-bit state and increment are kept as (high, low) uint64 words.
+_pcg_type = PCG64DXSMType(
+    [(name, types.uint64) for name in ("state_hi", "state_lo", "inc_hi", "inc_lo")]
+    + [("has_spare", types.boolean), ("spare", types.float64)]
+)
+
+
+class PCG64DXSM(_Generator):
+    """PCG64 with the DXSM output function; ``stream`` picks the increment."""
+
+    def __new__(cls, seed, stream=0):
+        return _new_pcg(seed, stream)
+
+    @classmethod
+    def from_numpy(cls, bit_generator):
+        """Copy the state of a ``numpy.random.PCG64DXSM``."""
+        state = bit_generator.state["state"]
+        rng = _new_pcg(0, 0)
+        _set_pcg(
+            rng,
+            state["state"] >> 64,
+            state["state"] & _MASK,
+            state["inc"] >> 64,
+            state["inc"] & _MASK,
+        )
+        return rng
+
+
+structref.define_boxing(PCG64DXSMType, PCG64DXSM)
+
+
+@njit(inline="always")
+def _pcg_step(rng):
+    hi, lo = _mul128(rng.state_lo, _PCG_MULT)
+    hi += rng.state_hi * _PCG_MULT
+    new_lo = lo + rng.inc_lo
+    rng.state_hi = hi + rng.inc_hi + (new_lo < lo)
+    rng.state_lo = new_lo
+
+
+@njit
+def _new_pcg(seed, stream):
+    stream = np.uint64(stream)
+    rng = structref.new(_pcg_type)
+    rng.state_hi = _ZERO
+    rng.state_lo = _ZERO
+    rng.inc_hi = stream >> np.uint64(63)
+    rng.inc_lo = (stream << _ONE) | _ONE
+    rng.has_spare = False
+    rng.spare = 0.0
+    # PCG's seeding: step, add the seed to the state, step again.
+    _pcg_step(rng)
+    lo = rng.state_lo + np.uint64(seed)
+    rng.state_hi += lo < rng.state_lo
+    rng.state_lo = lo
+    _pcg_step(rng)
+    return rng
+
+
+@overload(PCG64DXSM)
+def _ol_pcg(seed, stream=0):
+    return lambda seed, stream=0: _new_pcg(seed, stream)
+
+
+@njit
+def _set_pcg(rng, state_hi, state_lo, inc_hi, inc_lo):
+    rng.state_hi = np.uint64(state_hi)
+    rng.state_lo = np.uint64(state_lo)
+    rng.inc_hi = np.uint64(inc_hi)
+    rng.inc_lo = np.uint64(inc_lo)
+
+
+@overload_method(PCG64DXSMType, "next_uint64", inline="always")
+def _ol_pcg_next(self):
+    def impl(self):
+        hi = self.state_hi
+        lo = self.state_lo | _ONE
+        hi ^= hi >> np.uint64(32)
+        hi *= _PCG_MULT
+        hi ^= hi >> np.uint64(48)
+        hi *= lo
+        _pcg_step(self)
+        return hi
+
+    return impl
+
+
+_define_common(PCG64DXSMType)
+
+
+@njit(parallel=True)
+def uniform(n, seed):
+    """``n`` floats in [0, 1), identical for any number of threads.
+
+    Draw ``i`` comes from ``Philox(seed, i // 16384)``.
+    """
+    out = np.empty(n)
+    blocks = (n + _BLOCK - 1) // _BLOCK
+    for b in prange(blocks):
+        rng = Philox(seed, b)
+        for i in range(b * _BLOCK, min((b + 1) * _BLOCK, n)):
+            out[i] = rng.random()
+    return out
@@ -0,0 +1,145 @@
+"""Sampling with the generators of ``numba_extras.random``.
+
+Every function takes the generator as its last argument, either a
+``Philox`` or a ``PCG64DXSM``, so a result is reproducible from the
+generator's seed and stream.
+
+``choice`` without replacement draws from an alias table and rejects items
+already taken. That is exact for successive weighted sampling, where each
+draw is proportional to the weights of the items still left. Once the taken
+items hold half of the table's weight the table is rebuilt without them,
+so rejections stay below one per draw on average.
+"""
+
+import numpy as np
+from numba import njit
+
+from .bitgen import _bounded
+
+
+@njit
+def shuffle(x, rng):
+    """Shuffle a 1-d array in place (Fisher-Yates)."""
+    for i in range(x.shape[0] - 1, 0, -1):
+        j = np.int64(_bounded(rng, np.uint64(i + 1)))
+        tmp = x[i]
+        x[i] = x[j]
+        x[j] = tmp
+
+
+@njit
+def permutation(n, rng):
+    """A random permutation of ``range(n)`` as int64."""
+    out = np.arange(n)
+    shuffle(out, rng)
+    return out
+
+
+@njit
+def reservoir_sample(x, k, rng):
+    """A uniform sample of ``min(k, len(x))`` elements of ``x``.
+
+    Uses Li's Algorithm L, which jumps over the elements it skips, so it
+    draws O(k log(n / k)) random numbers instead of one per element.
+    """
+    n = x.shape[0]
+    k = min(k, n)
+    out = x[:k].copy()
+    if k == 0:
+        return out
+    # ``1.0 - random()`` is in (0, 1], so the logarithms stay finite.
+    w = np.exp(np.log(1.0 - rng.random()) / k)
+    i = k - 1
+    while True:
+        i += np.int64(np.floor(np.log(1.0 - rng.random()) / np.log1p(-w))) + 1
+        if i >= n:
+            return out
+        out[np.int64(_bounded(rng, np.uint64(k)))] = x[i]
+        w *= np.exp(np.log(1.0 - rng.random()) / k)
+
+
+@njit
+def alias_table(weights):
+    """Build Vose's alias table ``(prob, alias)`` for ``weights``."""
+    n = weights.shape[0]
+    total = 0.0
+    for w in weights:
+        if not (w >= 0.0 and np.isfinite(w)):
+            raise ValueError("weights must be finite and non-negative")
+        total += w
+    if not total > 0.0:
+        raise ValueError("weights must not all be zero")
+    scaled = weights * (n / total)
+    prob = np.ones(n)
+    alias = np.arange(n)
+    small = np.empty(n, np.int64)
+    large = np.empty(n, np.int64)
+    ns = 0
+    nl = 0
+    for i in range(n):
+        if scaled[i] < 1.0:
+            small[ns] = i
+            ns += 1
+        else:
+            large[nl] = i
+            nl += 1
+    while ns and nl:
+        ns -= 1
+        s = small[ns]
+        big = large[nl - 1]
+        prob[s] = scaled[s]
+        alias[s] = big
+        scaled[big] += scaled[s] - 1.0
+        if scaled[big] < 1.0:
+            nl -= 1
+            small[ns] = big
+            ns += 1
+    # Whatever is left is 1 up to rounding and keeps ``prob`` 1.
+    return prob, alias
+
+
+@njit
+def alias_draw(prob, alias, rng):
+    """One index drawn from an alias table."""
+    # A single draw picks the column and the coin: its integer part and
+    # its fraction.
+    u = rng.random() * prob.shape[0]
+    i = np.int64(u)
+    return i if u - i < prob[i] else alias[i]
+
+
+@njit
+def choice(weights, k, rng, replace=False):
+    """Draw ``k`` indices with probability proportional to ``weights``.
+
+    Without replacement the indices are distinct and in the order drawn,
+    and ``k`` may not exceed the number of positive weights.
+    """
+    if k < 0:
+        raise ValueError("k must be non-negative")
+    prob, alias = alias_table(weights)
+    out = np.empty(k, np.int64)
+    if replace:
+        for j in range(k):
+            out[j] = alias_draw(prob, alias, rng)
+        return out
+    if k > np.count_nonzero(weights):
+        raise ValueError("k exceeds the number of positive weights")
+    remaining = weights.copy()
+    table_weight = remaining.sum()
+    taken = 0.0
+    j = 0
+    while j < k:
+        i = alias_draw(prob, alias, rng)
+        # Zero weights are checked too: rounding can leave one selectable.
+        if remaining[i] == 0.0:
+            continue
+        out[j] = i
+        j += 1
+        taken += remaining[i]
+        remaining[i] = 0.0
+        if j < k and taken > 0.5 * table_weight:
+            prob, alias = alias_table(remaining)
+            table_weight = remaining.sum()
+            taken = 0.0
+    return out
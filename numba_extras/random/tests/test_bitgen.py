@@ -0,0 +1,71 @@
+import numpy as np
+import pytest
+
+_MASK = (1 << 64) - 1
+
+
+def test_philox_matches_numpy():
+    from numba_extras.random import Philox
+
+    expected = np.random.Philox(key=[5, 7]).random_raw(11)
+    rng = Philox(5, 7)
+    assert [rng.next_uint64() for _ in range(11)] == expected.tolist()
+    floats = np.random.Generator(np.random.Philox(key=[5, 7])).random(9)
+    rng = Philox(5, 7)
+    assert [rng.random() for _ in range(9)] == floats.tolist()
+    # Crossing a word of the 256-bit counter carries into the next.
+    reference = np.random.Philox(key=[1, 2], counter=_MASK)
+    rng = Philox.from_numpy(reference)
+    reference.advance(3)
+    rng.advance(3)
+    assert rng.next_uint64() == reference.random_raw()
+    reference.random_raw(2)
+    rng = Philox.from_numpy(reference)
+    assert rng.next_uint64() == reference.random_raw()
+
+
+def test_pcg64dxsm_matches_numpy():
+    from numba_extras.random import PCG64DXSM
+
+    reference = np.random.PCG64DXSM(12345)
+    rng = PCG64DXSM.from_numpy(reference)
+    expected = reference.random_raw(20).tolist()
+    assert [rng.next_uint64() for _ in range(20)] == expected
+    floats = np.random.Generator(reference).random(5).tolist()
+    assert [rng.random() for _ in range(5)] == floats
+
+
+@pytest.mark.parametrize("name", ["Philox", "PCG64DXSM"])
+def test_streams_and_distributions(name):
+    import numba_extras.random as nr
+
+    cls = getattr(nr, name)
+    a = [cls(1, 0).next_uint64() for _ in range(2)]
+    assert a[0] == a[1]
+    assert cls(1, 0).next_uint64() != cls(1, 1).next_uint64()
+    assert cls(1, 0).next_uint64() != cls(2, 0).next_uint64()
+    rng = cls(3)
+    ints = np.array([rng.integers(-3, 4) for _ in range(70000)])
+    assert ints.min() == -3 and ints.max() == 3
+    assert np.abs(np.bincount(ints + 3) - 10000).max() < 500
+    normals = np.array([rng.normal() for _ in range(50000)])
+    assert abs(normals.mean()) < 0.02 and abs(normals.std() - 1) < 0.02
+    with pytest.raises(ValueError):
+        rng.integers(2, 2)
+
+
+def test_uniform_independent_of_threads():
+    from numba import get_num_threads, set_num_threads
+    from numba_extras.random import Philox, uniform
+
+    n = 40000
+    out = uniform(n, 9)
+    threads = get_num_threads()
+    set_num_threads(1)
+    try:
+        np.testing.assert_array_equal(uniform(n, 9), out)
+    finally:
+        set_num_threads(threads)
+    rng = Philox(9, 2)
+    assert out[2 * 16384] == rng.random()
+    assert 0.49 < out.mean() < 0.51 and 0.0 <= out.min() and out.max() < 1.0
@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+
+def test_shuffle_and_permutation():
+    from numba_extras.random import PCG64DXSM, Philox, permutation, shuffle
+
+    x = np.arange(1000)
+    shuffle(x, Philox(1))
+    assert sorted(x.tolist()) == list(range(1000))
+    assert not (x == np.arange(1000)).all()
+    np.testing.assert_array_equal(permutation(1000, Philox(1)), x)
+    # Each value lands in each position about equally often.
+    counts = np.zeros((4, 4), int)
+    rng = PCG64DXSM(2)
+    for _ in range(8000):
+        p = permutation(4, rng)
+        counts[np.arange(4), p] += 1
+    assert np.abs(counts - 2000).max() < 200
+
+
+def test_reservoir_sample_is_uniform():
+    from numba_extras.random import Philox, reservoir_sample
+
+    rng = Philox(4)
+    hits = np.zeros(50, int)
+    for _ in range(4000):
+        sample = reservoir_sample(np.arange(50), 5, rng)
+        assert len(set(sample.tolist())) == 5
+        hits[sample] += 1
+    assert np.abs(hits - 400).max() < 100
+    assert reservoir_sample(np.arange(3), 10, rng).shape == (3,)
+    assert reservoir_sample(np.arange(3.0), 0, rng).shape == (0,)
+
+
+def test_alias_table_probabilities():
+    from numba_extras.random import Philox, alias_draw, alias_table
+
+    weights = np.array([1.0, 0.0, 3.0, 6.0])
+    prob, alias = alias_table(weights)
+    implied = prob.copy()
+    for i in range(4):
+        implied[alias[i]] += 1.0 - prob[i]
+    np.testing.assert_allclose(implied / 4, weights / weights.sum())
+    rng = Philox(5)
+    draws = np.array([alias_draw(prob, alias, rng) for _ in range(20000)])
+    np.testing.assert_allclose(
+        np.bincount(draws, minlength=4) / 20000, weights / 10, atol=0.02
+    )
+    with pytest.raises(ValueError):
+        alias_table(np.array([1.0, -1.0]))
+    with pytest.raises(ValueError):
+        alias_table(np.zeros(3))
+
+
+def test_choice_without_replacement():
+    from numba_extras.random import Philox, choice
+
+    weights = np.array([10.0, 1.0, 1.0, 0.0, 8.0])
+    rng = Philox(6)
+    first = np.zeros(5)
+    second = np.zeros(5)
+    for _ in range(10000):
+        picked = choice(weights, 2, rng)
+        assert picked[0] != picked[1] and 3 not in picked
+        first[picked[0]] += 1
+        second[picked[1]] += 1
+    np.testing.assert_allclose(first / 10000, weights / 20, atol=0.02)
+    # P(second = j) sums P(first = i) * w_j / (20 - w_i) over i != j.
+    p = weights / 20
+    expected = [
+        sum(p[i] * weights[j] / (20 - weights[i]) for i in range(5) if i != j)
+        for j in range(5)
+    ]
+    np.testing.assert_allclose(second / 10000, expected, atol=0.02)
+    assert sorted(choice(weights, 4, rng).tolist()) == [0, 1, 2, 4]
+    with pytest.raises(ValueError):
+        choice(weights, 5, rng)
+    assert choice(weights, 50, rng, replace=True).shape == (50,)
+
+
+def test_parallel_monte_carlo_in_njit():
+    from numba import njit, prange
+    from numba_extras.random import Philox
+
+    @njit(parallel=True)
+    def estimate_pi(blocks, per_block, seed):
+        inside = 0
+        for b in prange(blocks):
+            rng = Philox(seed, b)
+            for _ in range(per_block):
+                x = rng.random()
+                y = rng.random()
+                inside += x * x + y * y < 1.0
+        return 4.0 * inside / (blocks * per_block)
+
+    estimate = estimate_pi(64, 20000, 1)
+    assert estimate == estimate_pi(64, 20000, 1)
+    assert abs(estimate - np.pi) < 0.01
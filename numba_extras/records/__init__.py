@@ -0,0 +1,11 @@
+from .records import (  # noqa: F401
+    Groups,
+    argsort_by,
+    filter,
+    from_columns,
+    group_by,
+    project,
+    sort_by,
+    take,
+    to_columns,
+)
@@ -0,0 +1,289 @@
+"""Kernels over structured arrays.
+
+These work on 1-d arrays of a NumPy record dtype, such as
+``np.dtype([("id", "i8"), ("px", "f8"), ("sym", "S6")])``. Every field type
+numba supports is allowed, including fixed-width byte strings (``S``).
+
+``to_columns`` copies an array of structs into one contiguous array per
+field, in the order of the dtype, and ``from_columns`` packs columns back
+into records. Both make a single parallel pass that reads and writes
+every field, which is faster than copying one strided field at a time.
+``project`` copies a subset of the fields, in the order and with the
+types of a target record dtype. ``a.dtype[["sym", "px"]]`` works as one,
+keeping the fields in their order in ``a``, and the result is packed
+without the gaps that dtype leaves.
+
+``filter`` keeps the records for which a jitted predicate is true,
+``sort_by`` sorts stably by one field and ``group_by`` finds the runs of
+equal values of a field in that order. Field names have to be known at
+compile time: from Python any ``str`` works and in ``@njit`` code they
+must be constants. Resolving the name costs a few milliseconds on every
+call from Python, so call these from ``@njit`` code for small arrays.
+"""
+
+import collections
+
+import numpy as np
+from numba import literally, njit, prange, types
+from numba.extending import overload
+from numba.np.numpy_support import as_dtype
+
+from ..scan import nonzero
+
+Groups = collections.namedtuple("Groups", ["keys", "offsets", "order"])
+
+
+def _check_records(a):
+    if not (
+        isinstance(a, types.Array) and a.ndim == 1 and isinstance(a.dtype, types.Record)
+    ):
+        raise TypeError("expected a 1-d structured array")
+
+
+def _codegen(lines, env):
+    # Compiles a function with one statement per field; numba needs the
+    # field names as constants.
+    scope = dict(env, np=np, prange=prange)
+    exec("\n".join(lines), scope)
+    return scope["impl"]
+
+
+def _packed(record):
+    return np.dtype([(name, as_dtype(ty)) for name, ty in record.members])
+
+
+def _to_columns(a):
+    pass
+
+
+@overload(_to_columns, jit_options={"parallel": True})
+def _ol_to_columns(a):
+    _check_records(a)
+    env = {}
+    lines = ["def impl(a):", "    n = a.shape[0]"]
+    for k, (name, ty) in enumerate(a.dtype.members):
+        env["d%d" % k] = as_dtype(ty)
+        lines.append("    s%d = a[%r]" % (k, name))
+        lines.append("    c%d = np.empty(n, d%d)" % (k, k))
+    lines.append("    for i in prange(n):")
+    for k in range(len(a.dtype.members)):
+        lines.append("        c%d[i] = s%d[i]" % (k, k))
+    columns = "".join("c%d, " % k for k in range(len(a.dtype.members)))
+    lines.append("    return (%s)" % columns)
+    return _codegen(lines, env)
+
+
+@njit
+def to_columns(a):
+    """One contiguous array per field of ``a``, as a tuple in dtype order."""
+    return _to_columns(a)
+
+
+def _from_columns(columns, dtype):
+    pass
+
+
+@overload(_from_columns, jit_options={"parallel": True})
+def _ol_from_columns(columns, dtype):
+    if not (isinstance(dtype, types.DType) and isinstance(dtype.dtype, types.Record)):
+        raise TypeError("expected a record dtype")
+    members = dtype.dtype.members
+    if not isinstance(columns, types.BaseTuple) or len(columns) != len(members):
+        raise TypeError("expected a tuple of {} columns".format(len(members)))
+    env = {"out_dtype": _packed(dtype.dtype)}
+    lines = [
+        "def impl(columns, dtype):",
+        "    n = columns[0].shape[0]",
+        "    out = np.empty(n, out_dtype)",
+    ]
+    for k, (name, _) in enumerate(members):
+        lines.append("    c%d = columns[%d]" % (k, k))
+        lines.append("    if c%d.shape[0] != n:" % k)
+        lines.append("        raise ValueError('columns differ in length')")
+        lines.append("    d%d = out[%r]" % (k, name))
+    lines.append("    for i in prange(n):")
+    for k in range(len(members)):
+        lines.append("        d%d[i] = c%d[i]" % (k, k))
+    lines.append("    return out")
+    return _codegen(lines, env)
+
+
+@njit
+def from_columns(columns, dtype):
+    """Records of the record ``dtype`` with the fields from ``columns``.
+
+    ``columns`` is a tuple with one array per field, in dtype order.
+    """
+    return _from_columns(columns, dtype)
+
+
+def _project(a, dtype):
+    pass
+
+
+@overload(_project, jit_options={"parallel": True})
+def _ol_project(a, dtype):
+    _check_records(a)
+    if not (isinstance(dtype, types.DType) and isinstance(dtype.dtype, types.Record)):
+        raise TypeError("expected a record dtype")
+    fields = a.dtype.fields
+    for name, _ in dtype.dtype.members:
+        if name not in fields:
+            raise TypeError("no field {!r} in {}".format(name, a.dtype))
+    env = {"out_dtype": _packed(dtype.dtype)}
+    lines = [
+        "def impl(a, dtype):",
+        "    n = a.shape[0]",
+        "    out = np.empty(n, out_dtype)",
+    ]
+    for k, (name, _) in enumerate(dtype.dtype.members):
+        lines.append("    s%d = a[%r]" % (k, name))
+        lines.append("    d%d = out[%r]" % (k, name))
+    lines.append("    for i in prange(n):")
+    for k in range(len(dtype.dtype.members)):
+        lines.append("        d%d[i] = s%d[i]" % (k, k))
+    lines.append("    return out")
+    return _codegen(lines, env)
+
+
+@njit
+def project(a, dtype):
+    """The fields of ``a`` named in the record ``dtype``, cast to its types."""
+    return _project(a, dtype)
+
+
+def _empty(a, n):
+    pass
+
+
+@overload(_empty)
+def _ol_empty(a, n):
+    # ``np.empty(n, a.dtype)`` does not compile for record dtypes.
+    dtype = as_dtype(a.dtype)
+    return lambda a, n: np.empty(n, dtype)
+
+
+@njit(parallel=True)
+def take(a, indices):
+    """``a[indices]``, copying the records in parallel."""
+    out = _empty(a, indices.shape[0])
+    for j in prange(indices.shape[0]):
+        out[j] = a[indices[j]]
+    return out
+
+
+@njit(parallel=True)
+def filter(a, pred):
+    """The records ``r`` of ``a`` for which the jitted ``pred(r)`` is true."""
+    keep = np.empty(a.shape[0], np.bool_)
+    for i in prange(a.shape[0]):
+        keep[i] = pred(a[i])
+    return take(a, nonzero(keep))
+
+
+@njit(parallel=True)
+def _bytes_keys(col):
+    # Up to 8 bytes, zero-padded big-endian in a uint64, order like the
+    # strings and sort much faster than comparing them byte by byte.
+    keys = np.empty(col.shape[0], np.uint64)
+    for i in prange(col.shape[0]):
+        s = col[i]
+        v = np.uint64(0)
+        for k in range(len(s)):
+            v |= np.uint64(s[k]) << np.uint64(56 - 8 * k)
+        keys[i] = v
+    return keys
+
+
+def _argsort_by(a, field, descending):
+    pass
+
+
+@overload(_argsort_by)
+def _ol_argsort_by(a, field, descending):
+    _check_records(a)
+    if not isinstance(field, types.StringLiteral):
+        # ``literally`` retries with the constant.
+        return None
+    name = field.literal_value
+    if name not in a.dtype.fields:
+        raise TypeError("no field {!r} in {}".format(name, a.dtype))
+
+    short_bytes = isinstance(a.dtype.typeof(name), types.CharSeq) and (
+        a.dtype.typeof(name).count <= 8
+    )
+
+    def impl(a, field, descending):
+        keys = a[name]
+        if short_bytes:
+            keys = _bytes_keys(keys)
+        if not descending:
+            return np.argsort(keys, kind="mergesort")
+        # Sorting the reversed keys and reversing the result gives
+        # descending keys with ties still in their original order.
+        n = keys.shape[0]
+        order = np.argsort(keys[::-1], kind="mergesort")[::-1]
+        return n - 1 - order
+
+    return impl
+
+
+@njit
+def argsort_by(a, field, descending=False):
+    """Indices that sort ``a`` stably by ``field``, NaNs as the largest."""
+    return _argsort_by(a, literally(field), descending)
+
+
+@njit
+def sort_by(a, field, descending=False):
+    """A copy of ``a`` sorted stably by ``field``."""
+    return take(a, _argsort_by(a, literally(field), descending))
+
+
+def _field_column(a, field, order):
+    pass
+
+
+@overload(_field_column, jit_options={"parallel": True})
+def _ol_field_column(a, field, order):
+    if not isinstance(field, types.StringLiteral):
+        return None
+    name = field.literal_value
+    dtype = as_dtype(a.dtype.typeof(name))
+
+    def impl(a, field, order):
+        keys = a[name]
+        out = np.empty(order.shape[0], dtype)
+        for j in prange(order.shape[0]):
+            out[j] = keys[order[j]]
+        return out
+
+    return impl
+
+
+@njit(parallel=True)
+def _groups(keys, order):
+    n = keys.shape[0]
+    starts = np.empty(n, np.bool_)
+    if n:
+        starts[0] = True
+    for i in prange(1, n):
+        starts[i] = keys[i] != keys[i - 1]
+    first = nonzero(starts)
+    groups = first.shape[0]
+    bounds = np.empty(groups + 1, np.int64)
+    bounds[:groups] = first
+    bounds[groups] = n
+    return Groups(keys[first], bounds, order)
+
+
+@njit
+def group_by(a, field):
+    """The groups of records of ``a`` with equal ``field``, as ``Groups``.
+
+    ``keys`` holds the distinct values in ascending order and the records
+    of group ``g`` are ``a[order[offsets[g]:offsets[g + 1]]]``, in their
+    original order. Each NaN forms a group of its own.
+    """
+    order = _argsort_by(a, literally(field), False)
+    return _groups(_field_column(a, literally(field), order), order)
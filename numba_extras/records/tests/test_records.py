@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+DTYPE = np.dtype([("id", "i8"), ("px", "f8"), ("qty", "i4"), ("sym", "S6")])
+
+
+def _trades(n=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    a = np.empty(n, DTYPE)
+    a["id"] = np.arange(n)
+    a["px"] = rng.integers(0, 50, n) / 4
+    a["qty"] = rng.integers(-5, 5, n)
+    a["sym"] = rng.choice([b"AAPL", b"MSFT", b"", b"GOOGL", b"A"], n)
+    return a
+
+
+def test_columns_round_trip():
+    from numba_extras.records import from_columns, to_columns
+
+    a = _trades()
+    columns = to_columns(a)
+    assert len(columns) == 4
+    for name, column in zip(DTYPE.names, columns):
+        assert column.flags.c_contiguous and column.dtype == DTYPE[name]
+        np.testing.assert_array_equal(column, a[name])
+    np.testing.assert_array_equal(from_columns(columns, DTYPE), a)
+    assert from_columns(to_columns(a[:0]), DTYPE).shape == (0,)
+    with pytest.raises(ValueError):
+        from_columns((columns[0][:-1],) + columns[1:], DTYPE)
+
+
+def test_project():
+    from numba_extras.records import project
+
+    a = _trades()
+    got = project(a, np.dtype([("sym", "S6"), ("px", "f4")]))
+    assert got.dtype.names == ("sym", "px") and got.dtype.itemsize == 10
+    np.testing.assert_array_equal(got["sym"], a["sym"])
+    np.testing.assert_array_equal(got["px"], a["px"].astype(np.float32))
+    got = project(a[::3], DTYPE[["sym", "id"]])
+    assert got.dtype.names == ("id", "sym") and got.dtype.itemsize == 14
+    np.testing.assert_array_equal(got["id"], a["id"][::3])
+    with pytest.raises(Exception, match="no field 'size'"):
+        project(a, np.dtype([("size", "i4")]))
+
+
+def test_filter_and_take():
+    from numba import njit
+    from numba_extras.records import filter, take
+
+    @njit
+    def big_buy(r):
+        return r.qty > 2 and r.sym != b"A"
+
+    a = _trades()
+    expected = a[(a["qty"] > 2) & (a["sym"] != b"A")]
+    np.testing.assert_array_equal(filter(a, big_buy), expected)
+    assert filter(a[:0], big_buy).shape == (0,)
+    idx = np.array([5, 0, 5, 999])
+    np.testing.assert_array_equal(take(a, idx), a[idx])
+
+
+def test_sort_by():
+    from numba_extras.records import argsort_by, sort_by
+
+    a = _trades()
+    a["px"][::50] = np.nan
+    for name in DTYPE.names[1:]:
+        order = np.argsort(a[name], kind="stable")
+        np.testing.assert_array_equal(argsort_by(a, name), order)
+        np.testing.assert_array_equal(sort_by(a, name)["id"], order)
+        # Stable descending: keys reversed, ties in their original order.
+        got = sort_by(a, name, True)
+        keys, ids = got[name], got["id"]
+        if name == "px":
+            assert np.isnan(keys[:20]).all()
+            keys, ids = keys[20:], ids[20:]
+        assert (keys[:-1] >= keys[1:]).all()
+        ties = keys[:-1] == keys[1:]
+        assert (ids[:-1][ties] < ids[1:][ties]).all()
+
+
+def test_group_by():
+    from numba_extras.records import group_by
+
+    a = _trades()
+    for name in ("sym", "qty"):
+        groups = group_by(a, name)
+        keys, counts = np.unique(a[name], return_counts=True)
+        np.testing.assert_array_equal(groups.keys, keys)
+        np.testing.assert_array_equal(np.diff(groups.offsets), counts)
+        for g, key in enumerate(groups.keys):
+            rows = groups.order[groups.offsets[g] : groups.offsets[g + 1]]
+            np.testing.assert_array_equal(rows, np.flatnonzero(a[name] == key))
+    empty = group_by(a[:0], "sym")
+    assert empty.keys.shape == (0,) and list(empty.offsets) == [0]
+
+
+def test_in_njit():
+    from numba import njit
+    from numba_extras.records import group_by, sort_by, to_columns
+
+    @njit
+    def notional_by_symbol(a):
+        groups = group_by(a, "sym")
+        ids, px, qty, sym = to_columns(sort_by(a, "sym"))
+        totals = np.zeros(groups.keys.shape[0])
+        for g in range(totals.shape[0]):
+            for i in range(groups.offsets[g], groups.offsets[g + 1]):
+                totals[g] += px[i] * qty[i]
+        return groups.keys, totals
+
+    a = _trades()
+    keys, totals = notional_by_symbol(a)
+    for key, total in zip(keys, totals):
+        rows = a[a["sym"] == key]
+        assert total == pytest.approx((rows["px"] * rows["qty"]).sum())
+
+
+def test_errors():
+    from numba_extras.records import sort_by, to_columns
+
+    with pytest.raises(Exception, match="1-d structured array"):
+        to_columns(np.arange(3))
+    with pytest.raises(Exception, match="no field 'price'"):
+        sort_by(_trades(), "price")
+
+
+def test_sort_by_long_bytes():
+    from numba_extras.records import argsort_by
+
+    rng = np.random.default_rng(1)
+    words = [b"abcdefghij", b"abcdefghi", b"abcdefgh\x00j", b"b", b""]
+    for width in (8, 10):
+        a = np.zeros(300, [("x", "i1"), ("s", "S%d" % width)])
+        a["s"] = rng.choice(words, 300)
+        for descending in (False, True):
+            got = a["s"][argsort_by(a, "s", descending)]
+            expected = np.sort(a["s"], kind="stable")
+            np.testing.assert_array_equal(
+                got, expected[::-1] if descending else expected
+            )
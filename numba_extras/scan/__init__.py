@@ -0,0 +1,12 @@
+from .scan import (  # noqa: F401
+    compact,
+    cummax,
+    cummin,
+    cumprod,
+    cumsum,
+    nonzero,
+    offsets,
+    scan,
+    segmented_cumsum,
+    segmented_scan,
+)
@@ -0,0 +1,291 @@
+"""Parallel prefix scans and stream compaction.
+
+The scans split the input into one chunk per thread and make two passes:
+each thread reduces its chunk, the chunk totals are scanned serially, and
+each thread then scans its chunk again starting from the total of the
+chunks before it. That is 2n reads instead of n, so with one thread, or
+below ``_MIN_PARALLEL`` elements, a single serial pass runs instead.
+
+``scan`` and ``segmented_scan`` take any jitted associative ``op(a, b)``;
+``cumsum`` and friends are built on them and follow NumPy's accumulator
+dtypes. Because chunks are combined in a different order than a serial
+pass, float sums may differ from ``np.cumsum`` in the last bits.
+
+Segments are marked by a boolean ``starts`` array: the scan restarts at
+every ``i`` with ``starts[i]`` set, like ``numba_extras.ufuncs.cumsum_reset``.
+
+``nonzero`` and ``compact`` use the same two passes: count per chunk, scan
+the counts into output offsets, then write.
+"""
+
+import numpy as np
+from numba import get_num_threads, njit, prange, types
+from numba.extending import overload
+from numba.np.numpy_support import as_dtype
+
+_MIN_PARALLEL = 1 << 15
+
+
+@njit
+def _parts(n):
+    threads = get_num_threads()
+    if threads == 1 or n < _MIN_PARALLEL:
+        return 1
+    return min(threads, n // (_MIN_PARALLEL // 4))
+
+
+@njit
+def _add(a, b):
+    return a + b
+
+
+@njit
+def _mul(a, b):
+    return a * b
+
+
+@njit
+def _max(a, b):
+    # NaN propagates, as in ``np.maximum.accumulate``.
+    if a != a or a > b:
+        return a
+    return b
+
+
+@njit
+def _min(a, b):
+    if a != a or a < b:
+        return a
+    return b
+
+
+@njit
+def _scan_chunk(x, out, op, lo, hi, carry, exclusive):
+    # Scans x[lo:hi] into out[lo:hi] starting from ``carry``.
+    acc = carry
+    if exclusive:
+        for i in range(lo, hi):
+            out[i] = acc
+            acc = op(acc, x[i])
+    else:
+        for i in range(lo, hi):
+            acc = op(acc, x[i])
+            out[i] = acc
+
+
+@njit(parallel=True)
+def _scan(x, out, op, identity, exclusive):
+    n = x.shape[0]
+    parts = _parts(n)
+    # Writing through ``out`` casts to its dtype, keeping ``acc`` stable.
+    out[0] = identity
+    start = out[0]
+    if parts == 1:
+        _scan_chunk(x, out, op, 0, n, start, exclusive)
+        return
+    totals = np.empty(parts, out.dtype)
+    for p in prange(parts):
+        lo = n * p // parts
+        hi = n * (p + 1) // parts
+        totals[p] = x[lo]
+        acc = totals[p]
+        for i in range(lo + 1, hi):
+            acc = op(acc, x[i])
+        totals[p] = acc
+    carries = np.empty(parts, out.dtype)
+    carries[0] = start
+    for p in range(1, parts):
+        carries[p] = op(carries[p - 1], totals[p - 1])
+    for p in prange(parts):
+        _scan_chunk(
+            x, out, op, n * p // parts, n * (p + 1) // parts, carries[p], exclusive
+        )
+
+
+def _accumulator(x):
+    pass
+
+
+@overload(_accumulator)
+def _ol_accumulator(x):
+    # The dtype ``np.cumsum`` would produce for ``x``.
+    dtype = np.cumsum(np.zeros(1, as_dtype(x.dtype))).dtype
+    return lambda x: np.empty(x.shape[0], dtype)
+
+
+@njit
+def _run(x, out, op, identity, exclusive):
+    if x.ndim != 1:
+        raise ValueError("scans expect a 1-d array")
+    if x.shape[0]:
+        _scan(x, out, op, identity, exclusive)
+    return out
+
+
+@njit
+def scan(x, op, identity, exclusive=False):
+    """Scan ``x`` with the jitted associative ``op``, in the dtype of ``x``.
+
+    ``identity`` starts the scan: ``op(identity, a) == a`` must hold.
+    """
+    return _run(x, np.empty(x.shape[0], x.dtype), op, identity, exclusive)
+
+
+@njit
+def cumsum(x, exclusive=False):
+    """``np.cumsum(x)``, or the exclusive variant starting at 0."""
+    return _run(x, _accumulator(x), _add, 0, exclusive)
+
+
+@njit
+def cumprod(x, exclusive=False):
+    """``np.cumprod(x)``, or the exclusive variant starting at 1."""
+    return _run(x, _accumulator(x), _mul, 1, exclusive)
+
+
+@njit
+def cummax(x):
+    """``np.maximum.accumulate(x)``."""
+    if x.shape[0] == 0:
+        return np.empty(0, x.dtype)
+    return _run(x, np.empty(x.shape[0], x.dtype), _max, x[0], False)
+
+
+@njit
+def cummin(x):
+    """``np.minimum.accumulate(x)``."""
+    if x.shape[0] == 0:
+        return np.empty(0, x.dtype)
+    return _run(x, np.empty(x.shape[0], x.dtype), _min, x[0], False)
+
+
+@njit
+def offsets(lengths):
+    """Offsets of variable-length items: ``n + 1`` int64 values from 0."""
+    out = np.empty(lengths.shape[0] + 1, np.int64)
+    if lengths.shape[0]:
+        _scan(lengths, out[:-1], _add, 0, True)
+        out[-1] = out[-2] + lengths[-1]
+    else:
+        out[0] = 0
+    return out
+
+
+@njit
+def _segmented_chunk(x, starts, out, op, identity, lo, hi, carry, exclusive):
+    acc = carry
+    if exclusive:
+        for i in range(lo, hi):
+            if starts[i]:
+                acc = identity
+            out[i] = acc
+            acc = op(acc, x[i])
+    else:
+        for i in range(lo, hi):
+            if starts[i]:
+                acc = identity
+            acc = op(acc, x[i])
+            out[i] = acc
+
+
+@njit(parallel=True)
+def _segmented(x, starts, out, op, identity, exclusive):
+    n = x.shape[0]
+    parts = _parts(n)
+    out[0] = identity
+    start = out[0]
+    if parts == 1:
+        _segmented_chunk(x, starts, out, op, start, 0, n, start, exclusive)
+        return
+    # A chunk's summary: whether it contains a segment start, and the
+    # reduction of its elements from its last start (or its beginning).
+    totals = np.empty(parts, out.dtype)
+    restarts = np.zeros(parts, np.bool_)
+    for p in prange(parts):
+        lo = n * p // parts
+        hi = n * (p + 1) // parts
+        acc = start
+        for i in range(lo, hi):
+            if starts[i]:
+                acc = start
+                restarts[p] = True
+            acc = op(acc, x[i])
+        totals[p] = acc
+    carries = np.empty(parts, out.dtype)
+    carries[0] = start
+    for p in range(1, parts):
+        if restarts[p - 1]:
+            carries[p] = totals[p - 1]
+        else:
+            carries[p] = op(carries[p - 1], totals[p - 1])
+    for p in prange(parts):
+        lo = n * p // parts
+        hi = n * (p + 1) // parts
+        _segmented_chunk(x, starts, out, op, start, lo, hi, carries[p], exclusive)
+
+
+@njit
+def _run_segmented(x, starts, out, op, identity, exclusive):
+    if x.ndim != 1 or starts.shape != x.shape:
+        raise ValueError("x and starts must be 1-d arrays of the same length")
+    if x.shape[0]:
+        _segmented(x, starts, out, op, identity, exclusive)
+    return out
+
+
+@njit
+def segmented_scan(x, starts, op, identity, exclusive=False):
+    """``scan`` restarted from ``identity`` wherever ``starts`` is set."""
+    out = np.empty(x.shape[0], x.dtype)
+    return _run_segmented(x, starts, out, op, identity, exclusive)
+
+
+@njit
+def segmented_cumsum(x, starts, exclusive=False):
+    """``cumsum`` restarted from 0 wherever ``starts`` is set."""
+    return _run_segmented(x, starts, _accumulator(x), _add, 0, exclusive)
+
+
+@njit(parallel=True)
+def _compact(x, mask, positions):
+    # With ``positions`` the indices themselves are written instead of x.
+    n = mask.shape[0]
+    parts = _parts(n)
+    counts = np.zeros(parts + 1, np.int64)
+    for p in prange(parts):
+        c = 0
+        for i in range(n * p // parts, n * (p + 1) // parts):
+            c += mask[i] != 0
+        counts[p + 1] = c
+    for p in range(parts):
+        counts[p + 1] += counts[p]
+    # Every element is written and only kept ones advance the cursor, which
+    # avoids a branch per element; the spare slot takes the last write.
+    out = np.empty(counts[parts] + 1, x.dtype)
+    for p in prange(parts):
+        k = counts[p]
+        lo = n * p // parts
+        hi = n * (p + 1) // parts
+        if positions:
+            for i in range(lo, hi):
+                out[k] = i
+                k += mask[i] != 0
+        else:
+            for i in range(lo, hi):
+                out[k] = x[i]
+                k += mask[i] != 0
+    return out[: counts[parts]]
+
+
+@njit
+def nonzero(mask):
+    """Indices of the true elements of a 1-d array, like ``np.flatnonzero``."""
+    return _compact(np.empty(0, np.int64), mask, True)
+
+
+@njit
+def compact(x, mask):
+    """``x[mask]`` for 1-d arrays, filled in parallel."""
+    if mask.shape[0] != x.shape[0]:
+        raise ValueError("x and mask must have the same length")
+    return _compact(x, mask, False)
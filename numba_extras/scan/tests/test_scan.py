@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+
+# Above the serial cutoff, so machines with several threads take the
+# chunked path.
+SIZES = [0, 1, 17, 200003]
+
+
+def _shifted(inclusive, identity):
+    # The exclusive scan is the inclusive one moved right by one place.
+    return np.concatenate([[identity], inclusive[:-1]])[: len(inclusive)]
+
+
+def _ints(n, seed=0):
+    return np.random.RandomState(seed).randint(-5, 9, n).astype(np.int32)
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_cumulative_match_numpy(n):
+    from numba_extras.scan import cummax, cummin, cumprod, cumsum
+
+    x = _ints(n)
+    np.testing.assert_array_equal(cumsum(x), np.cumsum(x))
+    assert cumsum(x).dtype == np.cumsum(x).dtype
+    np.testing.assert_array_equal(cumsum(x, True), _shifted(np.cumsum(x), 0))
+    ones = x % 2 + 1
+    np.testing.assert_array_equal(cumprod(ones), np.cumprod(ones))
+    np.testing.assert_array_equal(cumprod(ones, True), _shifted(np.cumprod(ones), 1))
+    np.testing.assert_array_equal(cummax(x), np.maximum.accumulate(x))
+    np.testing.assert_array_equal(cummin(x), np.minimum.accumulate(x))
+    f = np.random.RandomState(1).standard_normal(n)
+    np.testing.assert_allclose(cumsum(f), np.cumsum(f), rtol=1e-9, atol=1e-9)
+    assert cumsum(f.astype(np.float32)).dtype == np.float32
+
+
+def test_cummax_propagates_nan():
+    from numba_extras.scan import cummax, cummin
+
+    x = np.array([1.0, 3.0, np.nan, 5.0])
+    np.testing.assert_array_equal(cummax(x), np.maximum.accumulate(x))
+    np.testing.assert_array_equal(cummin(x), np.minimum.accumulate(x))
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_segmented_cumsum(n):
+    from numba_extras.scan import segmented_cumsum
+    from numba_extras.ufuncs import cumsum_reset
+
+    x = np.random.RandomState(2).standard_normal(n)
+    starts = np.random.RandomState(3).rand(n) < 0.001
+    np.testing.assert_allclose(
+        segmented_cumsum(x, starts), cumsum_reset(x, starts), rtol=1e-9, atol=1e-9
+    )
+    ints = _ints(n)
+    got = segmented_cumsum(ints, starts, True)
+    expected = cumsum_reset(ints.astype(float), starts) - ints
+    np.testing.assert_array_equal(got, expected)
+
+
+def test_generic_scan_with_jitted_op():
+    from numba import njit
+    from numba_extras.scan import scan, segmented_scan
+
+    @njit
+    def bit_or(a, b):
+        return a | b
+
+    x = np.array([1, 2, 0, 8, 4], np.uint8)
+    assert scan(x, bit_or, 0).tolist() == [1, 3, 3, 11, 15]
+    assert scan(x, bit_or, 0, True).tolist() == [0, 1, 3, 3, 11]
+    starts = np.array([False, False, True, False, False])
+    assert segmented_scan(x, starts, bit_or, 0).tolist() == [1, 3, 0, 8, 12]
+    with pytest.raises(ValueError):
+        segmented_scan(x, starts[:3], bit_or, 0)
+
+
+@pytest.mark.parametrize("n", SIZES)
+def test_compaction(n):
+    from numba_extras.scan import compact, nonzero
+
+    x = np.random.RandomState(4).standard_normal(n)
+    mask = x > 0.5
+    np.testing.assert_array_equal(nonzero(mask), np.flatnonzero(mask))
+    np.testing.assert_array_equal(compact(x, mask), x[mask])
+    with pytest.raises(ValueError):
+        compact(x, np.ones(n + 1, bool))
+
+
+def test_offsets():
+    from numba_extras.scan import offsets
+
+    assert offsets(np.array([3, 0, 2], np.int32)).tolist() == [0, 3, 3, 5]
+    assert offsets(np.empty(0, np.int64)).tolist() == [0]
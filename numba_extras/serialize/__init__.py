@@ -0,0 +1 @@
+from .serialize import dump, dumps, load, loads, pack, unpack  # noqa: F401
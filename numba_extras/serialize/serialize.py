@@ -0,0 +1,448 @@
+"""Flat binary serialization of nopython values.
+
+Supported values are numbers and booleans, strings, arrays of numbers or
+booleans, tuples, typed ``List`` and ``Dict`` and jitclass instances whose
+fields are themselves supported, nested in any combination.
+
+``pack`` and ``unpack`` run in ``@njit`` code: ``pack`` writes a value into
+a new uint8 array and ``unpack`` rebuilds it given its numba type. Both
+walk the value once, with the type fixed at compile time, so a dict of
+1e8 entries takes seconds instead of going through Python object by object
+as pickling ``numba.typed`` containers does.
+
+``dumps`` / ``loads`` and ``dump`` / ``load`` add a header recording the
+type, so the data can be read back without knowing it. Array data is
+aligned to 16 bytes in the file and the loaded arrays are views of the
+buffer it was read into. ``load(path, mmap=True)`` maps the file
+copy-on-write instead of reading it: arrays then come straight from the
+page cache and writing to them never changes the file. Containers,
+strings and jitclass instances are always rebuilt.
+
+Numbers are stored in native byte order and files record it; loading a
+file written on a machine of the other byte order raises ValueError.
+"""
+
+import importlib
+import json
+import sys
+
+import numpy as np
+from numba import carray, njit, typeof, types
+from numba.core import cgutils
+from numba.cpython.unicode import _empty_string
+from numba.experimental.jitclass.base import imp_dtor
+from numba.extending import intrinsic, overload
+from numba.np.numpy_support import as_dtype, from_dtype
+from numba.np.unsafe.ndarray import to_fixed_tuple
+from numba.typed import Dict, List
+
+_MAGIC = b"NXSERIAL"
+_VERSION = 1
+# Alignment of array data in the payload, and of the payload in a file.
+_ALIGN = 16
+_PAYLOAD_ALIGN = 64
+
+
+def _describe(ty):
+    # JSON-able description of a supported numba type.
+    if isinstance(ty, (types.Number, types.Boolean)):
+        return {"kind": "scalar", "dtype": as_dtype(ty).str}
+    if isinstance(ty, types.UnicodeType):
+        return {"kind": "str"}
+    if (
+        isinstance(ty, types.Array)
+        and ty.ndim > 0
+        and isinstance(ty.dtype, (types.Number, types.Boolean))
+    ):
+        return {"kind": "array", "dtype": as_dtype(ty.dtype).str, "ndim": ty.ndim}
+    if isinstance(ty, types.ListType):
+        return {"kind": "list", "item": _describe(ty.item_type)}
+    if isinstance(ty, types.DictType):
+        return {
+            "kind": "dict",
+            "key": _describe(ty.key_type),
+            "value": _describe(ty.value_type),
+        }
+    if isinstance(ty, types.BaseTuple) and not isinstance(ty, types.BaseNamedTuple):
+        return {"kind": "tuple", "items": [_describe(t) for t in ty.types]}
+    if isinstance(ty, types.ClassInstanceType):
+        # The class type does not keep the Python class, so its location is
+        # taken from the jitted ``__init__``.
+        init = ty.jit_methods["__init__"].py_func
+        return {
+            "kind": "jitclass",
+            "class": "{}:{}".format(
+                init.__module__, init.__qualname__.rsplit(".", 1)[0]
+            ),
+            "fields": [[name, _describe(t)] for name, t in ty.struct.items()],
+        }
+    raise TypeError("cannot serialize values of type {}".format(ty))
+
+
+def _numba_type(desc):
+    kind = desc["kind"]
+    if kind == "scalar":
+        return from_dtype(np.dtype(desc["dtype"]))
+    if kind == "str":
+        return types.unicode_type
+    if kind == "array":
+        return types.Array(from_dtype(np.dtype(desc["dtype"])), desc["ndim"], "C")
+    if kind == "list":
+        return types.ListType(_numba_type(desc["item"]))
+    if kind == "dict":
+        return types.DictType(_numba_type(desc["key"]), _numba_type(desc["value"]))
+    if kind == "tuple":
+        return types.Tuple([_numba_type(d) for d in desc["items"]])
+    if kind == "jitclass":
+        module, qualname = desc["class"].split(":")
+        cls = importlib.import_module(module)
+        for part in qualname.split("."):
+            cls = getattr(cls, part)
+        ty = cls.class_type.instance_type
+        if _describe(ty)["fields"] != desc["fields"]:
+            raise ValueError("the fields of {} have changed".format(desc["class"]))
+        return ty
+    raise ValueError("unknown kind {!r}".format(kind))
+
+
+@njit
+def _align(pos):
+    return (pos + _ALIGN - 1) & -_ALIGN
+
+
+@intrinsic
+def _new(typingctx, cls):
+    # An instance of a jitclass with all fields zeroed and ``__init__`` not
+    # run, as the jitclass constructor allocates it.
+    inst_type = cls.instance_type
+
+    def codegen(context, builder, sig, args):
+        data_type = context.get_data_type(inst_type.get_data_type())
+        meminfo = context.nrt.meminfo_alloc_dtor(
+            builder,
+            context.get_constant(types.uintp, context.get_abi_sizeof(data_type)),
+            imp_dtor(context, builder.module, inst_type),
+        )
+        data = context.nrt.meminfo_data(builder, meminfo)
+        data = builder.bitcast(data, data_type.as_pointer())
+        builder.store(cgutils.get_null_value(data_type), data)
+        inst = context.make_helper(builder, inst_type)
+        inst.meminfo = meminfo
+        inst.data = data
+        return inst._getvalue()
+
+    return inst_type(cls), codegen
+
+
+@njit
+def _put_int(buf, pos, v):
+    buf[pos : pos + 8].view(np.int64)[0] = v
+    return pos + 8
+
+
+@njit
+def _get_int(buf, pos):
+    return buf[pos : pos + 8].view(np.int64)[0], pos + 8
+
+
+def _codegen(name, lines, env):
+    # Compiles a function unrolled over the fields of a tuple or jitclass.
+    src = "def {}:\n".format(name) + "".join("    " + ln + "\n" for ln in lines)
+    scope = dict(env)
+    exec(src, scope)
+    return scope[name.split("(")[0]]
+
+
+def _size(x, pos):
+    pass
+
+
+def _write(buf, pos, x):
+    pass
+
+
+def _read(buf, pos, ty):
+    pass
+
+
+@overload(_size)
+def _ol_size(x, pos):
+    if isinstance(x, (types.Number, types.Boolean)):
+        itemsize = as_dtype(x).itemsize
+        return lambda x, pos: pos + itemsize
+    if isinstance(x, types.UnicodeType):
+        return lambda x, pos: pos + 10 + len(x) * x._kind
+    if isinstance(x, types.Array):
+        ndim = x.ndim
+        return lambda x, pos: _align(pos + 8 * ndim) + x.nbytes
+    if isinstance(x, types.ListType):
+
+        def impl(x, pos):
+            pos += 8
+            for item in x:
+                pos = _size(item, pos)
+            return pos
+
+        return impl
+    if isinstance(x, types.DictType):
+
+        def impl(x, pos):
+            pos += 8
+            for k, v in x.items():
+                pos = _size(v, _size(k, pos))
+            return pos
+
+        return impl
+    fields = _fields(x)
+    if fields is not None:
+        lines = ["pos = _size(x{}, pos)".format(f) for f in fields]
+        return _codegen("impl(x, pos)", lines + ["return pos"], {"_size": _size})
+    return None
+
+
+@overload(_write)
+def _ol_write(buf, pos, x):
+    if isinstance(x, (types.Number, types.Boolean)):
+        dtype = as_dtype(x)
+        itemsize = dtype.itemsize
+
+        def impl(buf, pos, x):
+            buf[pos : pos + itemsize].view(dtype)[0] = x
+            return pos + itemsize
+
+        return impl
+    if isinstance(x, types.UnicodeType):
+
+        def impl(buf, pos, x):
+            nbytes = len(x) * x._kind
+            pos = _put_int(buf, pos, len(x))
+            buf[pos] = x._kind
+            buf[pos + 1] = x._is_ascii
+            pos += 2
+            buf[pos : pos + nbytes] = carray(x._data, nbytes, np.uint8)
+            return pos + nbytes
+
+        return impl
+    if isinstance(x, types.Array):
+
+        def impl(buf, pos, x):
+            for d in x.shape:
+                pos = _put_int(buf, pos, d)
+            pos = _align(pos)
+            flat = np.ascontiguousarray(x).reshape(-1).view(np.uint8)
+            buf[pos : pos + flat.shape[0]] = flat
+            return pos + flat.shape[0]
+
+        return impl
+    if isinstance(x, types.ListType):
+
+        def impl(buf, pos, x):
+            pos = _put_int(buf, pos, len(x))
+            for item in x:
+                pos = _write(buf, pos, item)
+            return pos
+
+        return impl
+    if isinstance(x, types.DictType):
+
+        def impl(buf, pos, x):
+            pos = _put_int(buf, pos, len(x))
+            for k, v in x.items():
+                pos = _write(buf, _write(buf, pos, k), v)
+            return pos
+
+        return impl
+    fields = _fields(x)
+    if fields is not None:
+        lines = ["pos = _write(buf, pos, x{})".format(f) for f in fields]
+        return _codegen("impl(buf, pos, x)", lines + ["return pos"], {"_write": _write})
+    return None
+
+
+def _fields(ty):
+    # Attribute accessors for the members of a tuple or jitclass instance.
+    if isinstance(ty, types.BaseTuple) and not isinstance(ty, types.BaseNamedTuple):
+        return ["[{}]".format(i) for i in range(len(ty))]
+    if isinstance(ty, types.ClassInstanceType):
+        return ["." + name for name in ty.struct]
+    return None
+
+
+@overload(_read)
+def _ol_read(buf, pos, ty):
+    ty = ty.instance_type
+    if isinstance(ty, (types.Number, types.Boolean)):
+        dtype = as_dtype(ty)
+        itemsize = dtype.itemsize
+        return lambda buf, pos, ty: (
+            buf[pos : pos + itemsize].view(dtype)[0],
+            pos + itemsize,
+        )
+    if isinstance(ty, types.UnicodeType):
+
+        def impl(buf, pos, ty):
+            n, pos = _get_int(buf, pos)
+            kind = np.int32(buf[pos])
+            nbytes = n * kind
+            out = _empty_string(kind, n, np.uint32(buf[pos + 1]))
+            carray(out._data, nbytes, np.uint8)[:] = buf[pos + 2 : pos + 2 + nbytes]
+            return out, pos + 2 + nbytes
+
+        return impl
+    if isinstance(ty, types.Array):
+        dtype = as_dtype(ty.dtype)
+        itemsize = dtype.itemsize
+        ndim = ty.ndim
+
+        def impl(buf, pos, ty):
+            shape = np.empty(ndim, np.int64)
+            for d in range(ndim):
+                shape[d], pos = _get_int(buf, pos)
+            pos = _align(pos)
+            stop = pos + shape.prod() * itemsize
+            data = buf[pos:stop].view(dtype)
+            return data.reshape(to_fixed_tuple(shape, ndim)), stop
+
+        return impl
+    if isinstance(ty, types.ListType):
+        item_type = ty.item_type
+
+        def impl(buf, pos, ty):
+            n, pos = _get_int(buf, pos)
+            out = List.empty_list(item_type, n)
+            for _ in range(n):
+                item, pos = _read(buf, pos, item_type)
+                out.append(item)
+            return out, pos
+
+        return impl
+    if isinstance(ty, types.DictType):
+        key_type = ty.key_type
+        value_type = ty.value_type
+
+        def impl(buf, pos, ty):
+            n, pos = _get_int(buf, pos)
+            out = Dict.empty(key_type, value_type, n)
+            for _ in range(n):
+                k, pos = _read(buf, pos, key_type)
+                v, pos = _read(buf, pos, value_type)
+                out[k] = v
+            return out, pos
+
+        return impl
+    fields = _fields(ty)
+    if fields is None:
+        return None
+    members = ty.types if isinstance(ty, types.BaseTuple) else list(ty.struct.values())
+    env = {"_read": _read, "_new": _new, "cls": ty}
+    lines = []
+    for i, t in enumerate(members):
+        env["t{}".format(i)] = t
+        lines.append("v{0}, pos = _read(buf, pos, t{0})".format(i))
+    if isinstance(ty, types.BaseTuple):
+        values = "".join("v{}, ".format(i) for i in range(len(members)))
+        lines.append("return ({}), pos".format(values))
+    else:
+        lines.append("out = _new(cls)")
+        lines += ["out{} = v{}".format(f, i) for i, f in enumerate(fields)]
+        lines.append("return out, pos")
+    return _codegen("impl(buf, pos, ty)", lines, env)
+
+
+@njit
+def pack(obj):
+    """``obj`` serialized into a new uint8 array."""
+    buf = np.empty(_size(obj, 0), np.uint8)
+    _write(buf, 0, obj)
+    return buf
+
+
+@njit
+def unpack(buf, ty):
+    """The value of numba type ``ty`` that ``pack`` wrote into ``buf``.
+
+    Arrays in the result are views of ``buf``, whose address must be a
+    multiple of 16 (as for any NumPy allocation).
+    """
+    obj, _ = _read(buf, 0, ty)
+    return obj
+
+
+def _header(obj):
+    # Magic, header length, JSON header, then zeros up to the payload.
+    meta = {
+        "version": _VERSION,
+        "byteorder": sys.byteorder,
+        "type": _describe(typeof(obj)),
+    }
+    text = json.dumps(meta).encode()
+    raw = _MAGIC + np.uint64(len(text)).tobytes() + text
+    head = np.zeros(-(-len(raw) // _PAYLOAD_ALIGN) * _PAYLOAD_ALIGN, np.uint8)
+    head[: len(raw)] = np.frombuffer(raw, np.uint8)
+    return head
+
+
+def _parse(buf):
+    if bytes(buf[: len(_MAGIC)]) != _MAGIC:
+        raise ValueError("not a numba_extras.serialize buffer")
+    n = int(buf[len(_MAGIC) : len(_MAGIC) + 8].view(np.uint64)[0])
+    meta = json.loads(bytes(buf[len(_MAGIC) + 8 : len(_MAGIC) + 8 + n]))
+    if meta["version"] != _VERSION:
+        raise ValueError("unsupported format version {}".format(meta["version"]))
+    if meta["byteorder"] != sys.byteorder:
+        raise ValueError("data was written in {} byte order".format(meta["byteorder"]))
+    start = -(-(len(_MAGIC) + 8 + n) // _PAYLOAD_ALIGN) * _PAYLOAD_ALIGN
+    return _numba_type(meta["type"]), buf[start:]
+
+
+def dumps(obj):
+    """``obj`` with a type header, as a uint8 array."""
+    head = _header(obj)
+    return np.concatenate([head, pack(obj)])
+
+
+def loads(buf):
+    """Rebuild the value ``dumps`` wrote into ``buf``.
+
+    Arrays in the result are views of ``buf`` when it is a writeable uint8
+    array; other buffers are copied first.
+    """
+    if not (isinstance(buf, np.ndarray) and buf.flags.writeable):
+        buf = np.frombuffer(buf, np.uint8).copy()
+    ty, payload = _parse(buf.view(np.uint8))
+    return unpack(payload, ty)
+
+
+def dump(obj, path):
+    """Write ``obj`` to the file ``path``, serializing straight into a map."""
+    head = _header(obj)
+    size = _size_of(obj)
+    out = np.memmap(path, np.uint8, "w+", shape=head.shape[0] + size)
+    out[: head.shape[0]] = head
+    _write_all(np.asarray(out[head.shape[0] :]), obj)
+    out.flush()
+    del out
+
+
+def load(path, mmap=False):
+    """Read back what ``dump`` wrote to ``path``.
+
+    With ``mmap`` the file is mapped copy-on-write and arrays in the result
+    view the mapping; otherwise it is read into memory first.
+    """
+    if mmap:
+        buf = np.memmap(path, np.uint8, "c")
+    else:
+        buf = np.fromfile(path, np.uint8)
+    ty, payload = _parse(buf)
+    return unpack(np.asarray(payload), ty)
+
+
+@njit
+def _size_of(obj):
+    return _size(obj, 0)
+
+
+@njit
+def _write_all(buf, obj):
+    _write(buf, 0, obj)
@@ -0,0 +1,143 @@
+import numpy as np
+import pytest
+
+
+def _nested():
+    from numba import typed, types
+
+    d = typed.Dict.empty(types.unicode_type, types.float64[::1])
+    d["a"] = np.arange(3.0)
+    d["héllo 😀"] = np.ones(2)
+    d[""] = np.empty(0)
+    return d
+
+
+def test_round_trips():
+    from numba import typed
+    from numba_extras.serialize import dumps, loads
+
+    values = [
+        5,
+        -2.5,
+        True,
+        np.uint8(200),
+        1 + 2j,
+        "héllo",
+        np.arange(12, dtype=np.int16).reshape(3, 4),
+        np.array([True, False]),
+        (1, "x", np.ones(3)),
+        typed.List([np.arange(n) for n in range(4)]),
+    ]
+    for value in values:
+        got = loads(dumps(value))
+        if isinstance(value, np.ndarray):
+            np.testing.assert_array_equal(got, value)
+            assert got.dtype == value.dtype
+        elif isinstance(value, tuple):
+            assert got[:2] == value[:2]
+            np.testing.assert_array_equal(got[2], value[2])
+        elif isinstance(value, typed.List):
+            assert len(got) == len(value)
+            for a, b in zip(got, value):
+                np.testing.assert_array_equal(a, b)
+        else:
+            assert got == value
+    got = loads(dumps(_nested()))
+    assert list(got) == list(_nested())
+    for k, v in _nested().items():
+        np.testing.assert_array_equal(got[k], v)
+
+
+def test_non_contiguous_arrays():
+    from numba_extras.serialize import dumps, loads
+
+    x = np.arange(20.0).reshape(4, 5)[:, ::2]
+    got = loads(dumps(x))
+    np.testing.assert_array_equal(got, x)
+    assert got.flags.c_contiguous
+
+
+def test_nested_containers():
+    from numba import typed, types
+    from numba_extras.serialize import dumps, loads
+
+    inner = types.ListType(types.Tuple([types.int64, types.unicode_type]))
+    d = typed.Dict.empty(types.int64, inner)
+    for k in range(3):
+        items = typed.List.empty_list(inner.item_type)
+        for j in range(k):
+            items.append((j, str(j) * j))
+        d[k] = items
+    got = loads(dumps(d))
+    assert {k: list(v) for k, v in got.items()} == {k: list(v) for k, v in d.items()}
+
+
+def test_jitclass_instances():
+    from numba import typed
+    from numba_extras.bitset import Bitset
+    from numba_extras.containers import Heap
+    from numba_extras.serialize import dumps, loads
+
+    bits = Bitset(200)
+    for i in (0, 63, 64, 199):
+        bits.set(i)
+    got = loads(dumps(bits))
+    assert got.size == 200
+    np.testing.assert_array_equal(got.indices(), [0, 63, 64, 199])
+    heap = Heap(4, 2)
+    for key in (5.0, 1.0, 3.0):
+        heap.push(key, int(key))
+    heaps = loads(dumps(typed.List([heap])))
+    assert [heaps[0].pop()[0] for _ in range(3)] == [1.0, 3.0, 5.0]
+    assert heap.pop() == (1.0, 1)
+
+
+def test_pack_in_njit():
+    from numba import njit, typed, types
+    from numba_extras.serialize import pack, unpack
+
+    ty = types.DictType(types.int64, types.float64)
+
+    @njit
+    def build_and_restore(n):
+        d = typed.Dict.empty(types.int64, types.float64)
+        for i in range(n):
+            d[i * 3] = i / 2
+        return unpack(pack(d), ty)
+
+    got = build_and_restore(1000)
+    assert len(got) == 1000 and got[2997] == 499.5
+
+
+def test_arrays_view_the_buffer(tmp_path):
+    from numba import typed
+    from numba_extras.serialize import dump, dumps, load, loads
+
+    arrays = typed.List([np.arange(10.0), np.arange(7.0)])
+    buf = dumps(arrays)
+    got = loads(buf)
+    assert all(np.shares_memory(a, buf) for a in got)
+    assert all(a.ctypes.data % 16 == 0 for a in got)
+    assert not np.shares_memory(loads(bytes(buf))[0], buf)
+
+    path = tmp_path / "arrays.bin"
+    dump(arrays, path)
+    mapped = load(path, mmap=True)
+    np.testing.assert_array_equal(mapped[1], np.arange(7.0))
+    mapped[0][:] = -1.0
+    np.testing.assert_array_equal(load(path)[0], np.arange(10.0))
+
+
+def test_errors(tmp_path):
+    from numba_extras.serialize import dumps, loads
+
+    with pytest.raises(TypeError):
+        dumps(np.zeros(2, "U3"))
+    with pytest.raises(TypeError):
+        dumps([1, 2])
+    with pytest.raises(ValueError):
+        loads(b"not serialized data")
+    buf = dumps(np.arange(3))
+    buf[16:80] = ord(" ")
+    with pytest.raises(ValueError):
+        loads(buf)
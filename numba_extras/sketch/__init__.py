@@ -0,0 +1,10 @@
+from .sketch import (  # noqa: F401
+    BloomFilter,
+    CountMinSketch,
+    HyperLogLog,
+    TDigest,
+    bloom_from_bytes,
+    countmin_from_bytes,
+    hll_from_bytes,
+    tdigest_from_bytes,
+)
@@ -0,0 +1,455 @@
+"""Mergeable probabilistic sketches.
+
+``BloomFilter`` (approximate membership), ``HyperLogLog`` (distinct counts),
+``CountMinSketch`` (frequencies) and ``TDigest`` (quantiles) are jitclasses,
+so they can be built and fed from Python or from ``@njit`` code. Items are
+integers, floats or strings; ``add_many`` inserts a whole array. Sketches
+with the same parameters can be merged, so each thread or process can fill
+its own sketch and combine them at the end.
+
+``to_bytes`` returns the state as a ``uint8`` array and the matching
+``*_from_bytes`` function rebuilds it. The layout is a little-endian int64
+header (a magic tag, a format version and the parameters) followed by the
+raw state, which is the native byte order on every platform numba targets.
+From Python, pass stored bytes as ``np.frombuffer(data, np.uint8)``.
+"""
+
+import math
+
+import numpy as np
+from llvmlite import ir
+from numba import float64, int64, njit, types, uint8, uint64
+from numba.cpython.unsafe.numbers import leading_zeros
+from numba.experimental import jitclass
+from numba.extending import intrinsic, overload
+
+_VERSION = 1
+_BLOOM_MAGIC = 0x4D4F4F4C42584E  # "NXBLOOM"
+_HLL_MAGIC = 0x4C4C4858584E  # "NXXHLL"
+_CMS_MAGIC = 0x534D4358584E  # "NXXCMS"
+_TDIGEST_MAGIC = 0x54534744544E  # "NTDGST"
+
+_M1 = np.uint64(0xFF51AFD7ED558CCD)
+_M2 = np.uint64(0xC4CEB9FE1A85EC53)
+_FNV_OFFSET = np.uint64(0xCBF29CE484222325)
+_FNV_PRIME = np.uint64(0x100000001B3)
+_U1 = np.uint64(1)
+_U32 = np.uint64(32)
+_U33 = np.uint64(33)
+_LOW32 = np.uint64(0xFFFFFFFF)
+
+# Bloom filter blocks are one 512-bit cache line of eight words.
+_BLOCK_BITS = 512
+_BLOCK_WORDS = 8
+
+
+@intrinsic
+def _float_bits(typingctx, x):
+    if x != types.float64:
+        return None
+
+    def codegen(context, builder, sig, args):
+        return builder.bitcast(args[0], ir.IntType(64))
+
+    return types.uint64(types.float64), codegen
+
+
+@njit
+def _fmix(h):
+    # MurmurHash3's 64-bit finalizer.
+    h ^= h >> _U33
+    h *= _M1
+    h ^= h >> _U33
+    h *= _M2
+    h ^= h >> _U33
+    return h
+
+
+def _hash(x):
+    pass
+
+
+@overload(_hash)
+def _ol_hash(x):
+    if isinstance(x, (types.Integer, types.Boolean)):
+        return lambda x: _fmix(np.uint64(x))
+    if isinstance(x, types.Float):
+        # Adding 0.0 maps -0.0 onto 0.0 so that equal values hash equally.
+        return lambda x: _fmix(_float_bits(np.float64(x) + 0.0))
+    if isinstance(x, (types.UnicodeType, types.UnicodeCharSeq)):
+
+        def impl(x):
+            h = _FNV_OFFSET
+            for c in str(x):
+                h = (h ^ np.uint64(ord(c))) * _FNV_PRIME
+            return _fmix(h)
+
+        return impl
+    return None
+
+
+@njit
+def _pack(magic, params, payload):
+    header = np.empty(2 + len(params), np.int64)
+    header[0] = magic
+    header[1] = _VERSION
+    for i in range(len(params)):
+        header[2 + i] = params[i]
+    return np.concatenate((header.view(np.uint8), payload.view(np.uint8)))
+
+
+@njit
+def _unpack_header(buf, magic, nparams):
+    size = 8 * (2 + nparams)
+    if buf.shape[0] < size:
+        raise ValueError("buffer too short for a sketch header")
+    header = buf[:size].copy().view(np.int64)
+    if header[0] != magic:
+        raise ValueError("buffer does not hold this kind of sketch")
+    if header[1] != _VERSION:
+        raise ValueError("unsupported sketch format version")
+    return header[2:], size
+
+
+@njit
+def _payload(buf, start, count, dtype):
+    stop = start + count * 8
+    if buf.shape[0] != stop:
+        raise ValueError("buffer size does not match the sketch header")
+    return buf[start:stop].copy().view(dtype)
+
+
+@jitclass([("nblocks", int64), ("k", int64), ("words", uint64[:])])
+class BloomFilter:
+    # Blocked Bloom filter: an item's probes all land in one 512-bit block,
+    # so a lookup touches a single cache line. The k probe positions come
+    # from double hashing within the block.
+    def __init__(self, capacity, fp_rate):
+        if capacity < 1:
+            raise ValueError("capacity must be at least 1")
+        if not 0.0 < fp_rate < 1.0:
+            raise ValueError("fp_rate must be in (0, 1)")
+        bits = -capacity * math.log(fp_rate) / (math.log(2.0) ** 2)
+        self.nblocks = max(1, int(math.ceil(bits / _BLOCK_BITS)))
+        self.k = min(16, max(1, int(round(bits / capacity * math.log(2.0)))))
+        self.words = np.zeros(self.nblocks * _BLOCK_WORDS, np.uint64)
+
+    def _probe(self, x, insert):
+        h = _hash(x)
+        base = int((h >> _U32) % np.uint64(self.nblocks)) * _BLOCK_WORDS
+        h1 = h & _LOW32
+        h2 = _fmix(h) | _U1
+        found = True
+        for i in range(self.k):
+            bit = int((h1 + np.uint64(i) * h2) % np.uint64(_BLOCK_BITS))
+            word = base + bit // 64
+            mask = _U1 << np.uint64(bit % 64)
+            if insert:
+                self.words[word] |= mask
+            elif not self.words[word] & mask:
+                found = False
+                break
+        return found
+
+    def add(self, x):
+        self._probe(x, True)
+
+    def add_many(self, values):
+        for i in range(values.shape[0]):
+            self._probe(values[i], True)
+
+    def contains(self, x):
+        return self._probe(x, False)
+
+    def contains_many(self, values):
+        out = np.empty(values.shape[0], np.bool_)
+        for i in range(values.shape[0]):
+            out[i] = self._probe(values[i], False)
+        return out
+
+    def merge(self, other):
+        if other.nblocks != self.nblocks or other.k != self.k:
+            raise ValueError("cannot merge Bloom filters of different sizes")
+        self.words |= other.words
+
+    def to_bytes(self):
+        return _pack(_BLOOM_MAGIC, (self.nblocks, self.k), self.words)
+
+
+@njit
+def bloom_from_bytes(buf):
+    """Rebuild a BloomFilter from ``BloomFilter.to_bytes`` output."""
+    params, start = _unpack_header(buf, _BLOOM_MAGIC, 2)
+    bloom = BloomFilter(1, 0.5)
+    bloom.nblocks = params[0]
+    bloom.k = params[1]
+    bloom.words = _payload(buf, start, params[0] * _BLOCK_WORDS, np.uint64)
+    return bloom
+
+
+@jitclass([("p", int64), ("registers", uint8[:])])
+class HyperLogLog:
+    # 2**p one-byte registers; the relative standard error of ``count`` is
+    # about 1.04 / sqrt(2**p).
+    def __init__(self, p):
+        if not 4 <= p <= 18:
+            raise ValueError("p must be in [4, 18]")
+        self.p = p
+        self.registers = np.zeros(1 << p, np.uint8)
+
+    def add(self, x):
+        h = _hash(x)
+        idx = int(h >> np.uint64(64 - self.p))
+        # The sentinel bit caps the rank at 64 - p + 1.
+        rest = (h << np.uint64(self.p)) | (_U1 << np.uint64(self.p - 1))
+        rank = np.uint8(leading_zeros(rest) + 1)
+        if rank > self.registers[idx]:
+            self.registers[idx] = rank
+
+    def add_many(self, values):
+        for i in range(values.shape[0]):
+            self.add(values[i])
+
+    def count(self):
+        m = self.registers.shape[0]
+        total = 0.0
+        zeros = 0
+        for r in self.registers:
+            total += 2.0 ** -float(r)
+            if r == 0:
+                zeros += 1
+        alpha = 0.7213 / (1.0 + 1.079 / m)
+        estimate = alpha * m * m / total
+        if estimate <= 2.5 * m and zeros > 0:
+            estimate = m * math.log(m / zeros)
+        return estimate
+
+    def merge(self, other):
+        if other.p != self.p:
+            raise ValueError("cannot merge HyperLogLogs of different precision")
+        np.maximum(self.registers, other.registers, self.registers)
+
+    def to_bytes(self):
+        return _pack(_HLL_MAGIC, (self.p,), self.registers)
+
+
+@njit
+def hll_from_bytes(buf):
+    """Rebuild a HyperLogLog from ``HyperLogLog.to_bytes`` output."""
+    params, start = _unpack_header(buf, _HLL_MAGIC, 1)
+    hll = HyperLogLog(params[0])
+    size = buf.shape[0] - start
+    if size != hll.registers.shape[0]:
+        raise ValueError("buffer size does not match the sketch header")
+    hll.registers[:] = buf[start:]
+    return hll
+
+
+@jitclass([("width", int64), ("depth", int64), ("table", int64[:, :])])
+class CountMinSketch:
+    # Estimates never undercount; with width w and depth d they overcount by
+    # more than e / w times the total count with probability exp(-d).
+    def __init__(self, width, depth):
+        if width < 1 or depth < 1:
+            raise ValueError("width and depth must be at least 1")
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), np.int64)
+
+    def _column(self, h1, h2, row):
+        return int((h1 + np.uint64(row) * h2) % np.uint64(self.width))
+
+    def add(self, x, count=1):
+        h1 = _hash(x)
+        h2 = _fmix(h1) | _U1
+        for row in range(self.depth):
+            self.table[row, self._column(h1, h2, row)] += count
+
+    def add_many(self, values):
+        for i in range(values.shape[0]):
+            self.add(values[i], 1)
+
+    def estimate(self, x):
+        h1 = _hash(x)
+        h2 = _fmix(h1) | _U1
+        best = self.table[0, self._column(h1, h2, 0)]
+        for row in range(1, self.depth):
+            best = min(best, self.table[row, self._column(h1, h2, row)])
+        return best
+
+    def merge(self, other):
+        if other.width != self.width or other.depth != self.depth:
+            raise ValueError("cannot merge Count-Min sketches of different sizes")
+        self.table += other.table
+
+    def to_bytes(self):
+        return _pack(_CMS_MAGIC, (self.width, self.depth), self.table.ravel())
+
+
+@njit
+def countmin_from_bytes(buf):
+    """Rebuild a CountMinSketch from ``CountMinSketch.to_bytes`` output."""
+    params, start = _unpack_header(buf, _CMS_MAGIC, 2)
+    width, depth = params[0], params[1]
+    cms = CountMinSketch(width, depth)
+    cms.table = _payload(buf, start, width * depth, np.int64).reshape((depth, width))
+    return cms
+
+
+@jitclass(
+    [
+        ("compression", float64),
+        ("means", float64[:]),
+        ("weights", float64[:]),
+        ("buf_means", float64[:]),
+        ("buf_weights", float64[:]),
+        ("nbuf", int64),
+        ("total", float64),
+        ("lo", float64),
+        ("hi", float64),
+    ]
+)
+class TDigest:
+    # Merging t-digest with the k1 (arcsine) scale function: new points are
+    # buffered and folded into the sorted centroids once the buffer is full,
+    # giving at most about ``compression`` centroids with the finest
+    # resolution at the tails.
+    def __init__(self, compression=100.0):
+        if compression < 10.0:
+            raise ValueError("compression must be at least 10")
+        self.compression = compression
+        self.means = np.empty(0, np.float64)
+        self.weights = np.empty(0, np.float64)
+        size = int(5 * compression)
+        self.buf_means = np.empty(size, np.float64)
+        self.buf_weights = np.empty(size, np.float64)
+        self.nbuf = 0
+        self.total = 0.0
+        self.lo = np.inf
+        self.hi = -np.inf
+
+    def add(self, x, weight=1.0):
+        if np.isnan(x):
+            return
+        if self.nbuf == self.buf_means.shape[0]:
+            self._compress()
+        self.buf_means[self.nbuf] = x
+        self.buf_weights[self.nbuf] = weight
+        self.nbuf += 1
+        self.total += weight
+        self.lo = min(self.lo, x)
+        self.hi = max(self.hi, x)
+
+    def add_many(self, values):
+        for i in range(values.shape[0]):
+            self.add(float(values[i]), 1.0)
+
+    def count(self):
+        return self.total
+
+    def _compress(self):
+        if self.nbuf == 0:
+            return
+        means = np.concatenate((self.means, self.buf_means[: self.nbuf]))
+        weights = np.concatenate((self.weights, self.buf_weights[: self.nbuf]))
+        self.nbuf = 0
+        order = np.argsort(means, kind="mergesort")
+        out_means = np.empty(means.shape[0], np.float64)
+        out_weights = np.empty(means.shape[0], np.float64)
+        scale = self.compression / (2.0 * math.pi)
+        n = 0
+        done = 0.0
+        limit = self._q_limit(0.0, scale)
+        cur_mean = means[order[0]]
+        cur_weight = weights[order[0]]
+        for j in range(1, order.shape[0]):
+            m = means[order[j]]
+            w = weights[order[j]]
+            if (done + cur_weight + w) / self.total <= limit:
+                cur_weight += w
+                cur_mean += (m - cur_mean) * w / cur_weight
+            else:
+                out_means[n] = cur_mean
+                out_weights[n] = cur_weight
+                n += 1
+                done += cur_weight
+                limit = self._q_limit(done / self.total, scale)
+                cur_mean = m
+                cur_weight = w
+        out_means[n] = cur_mean
+        out_weights[n] = cur_weight
+        self.means = out_means[: n + 1].copy()
+        self.weights = out_weights[: n + 1].copy()
+
+    def _q_limit(self, q, scale):
+        # Largest quantile a centroid starting at ``q`` may reach: one unit
+        # further along k(q) = scale * asin(2q - 1).
+        k = scale * math.asin(2.0 * min(max(q, 0.0), 1.0) - 1.0) + 1.0
+        if k >= scale * math.pi / 2.0:
+            return 1.0
+        return (math.sin(k / scale) + 1.0) / 2.0
+
+    def quantile(self, q):
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be in [0, 1]")
+        self._compress()
+        n = self.means.shape[0]
+        if n == 0:
+            return np.nan
+        if n == 1:
+            return self.means[0]
+        target = q * self.total
+        first = self.weights[0] / 2.0
+        if target <= first:
+            return self.lo + (self.means[0] - self.lo) * target / first
+        last = self.weights[n - 1] / 2.0
+        if target >= self.total - last:
+            frac = (self.total - target) / last
+            return self.hi - (self.hi - self.means[n - 1]) * frac
+        cum = first
+        for i in range(n - 1):
+            step = (self.weights[i] + self.weights[i + 1]) / 2.0
+            if cum + step >= target:
+                frac = (target - cum) / step
+                return self.means[i] + frac * (self.means[i + 1] - self.means[i])
+            cum += step
+        return self.hi
+
+    def merge(self, other):
+        other._compress()
+        for i in range(other.means.shape[0]):
+            if self.nbuf == self.buf_means.shape[0]:
+                self._compress()
+            self.buf_means[self.nbuf] = other.means[i]
+            self.buf_weights[self.nbuf] = other.weights[i]
+            self.nbuf += 1
+        self.total += other.total
+        self.lo = min(self.lo, other.lo)
+        self.hi = max(self.hi, other.hi)
+
+    def to_bytes(self):
+        self._compress()
+        n = self.means.shape[0]
+        state = np.empty(4 + 2 * n, np.float64)
+        state[0] = self.compression
+        state[1] = self.total
+        state[2] = self.lo
+        state[3] = self.hi
+        state[4 : 4 + n] = self.means
+        state[4 + n :] = self.weights
+        return _pack(_TDIGEST_MAGIC, (n,), state)
+
+
+@njit
+def tdigest_from_bytes(buf):
+    """Rebuild a TDigest from ``TDigest.to_bytes`` output."""
+    params, start = _unpack_header(buf, _TDIGEST_MAGIC, 1)
+    n = params[0]
+    state = _payload(buf, start, 4 + 2 * n, np.float64)
+    digest = TDigest(state[0])
+    digest.total = state[1]
+    digest.lo = state[2]
+    digest.hi = state[3]
+    digest.means = state[4 : 4 + n].copy()
+    digest.weights = state[4 + n :].copy()
+    return digest
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+
+def test_bloom_filter_membership_and_merge():
+    from numba_extras.sketch import BloomFilter, bloom_from_bytes
+
+    members = np.arange(0, 20000, 2)
+    left = BloomFilter(members.shape[0], 0.01)
+    right = BloomFilter(members.shape[0], 0.01)
+    left.add_many(members[::2])
+    right.add_many(members[1::2])
+    left.merge(right)
+    assert left.contains_many(members).all()
+    assert left.contains_many(members + 1).mean() < 0.02
+
+    restored = bloom_from_bytes(left.to_bytes())
+    np.testing.assert_array_equal(restored.words, left.words)
+    with pytest.raises(ValueError):
+        left.merge(BloomFilter(10, 0.01))
+
+
+def test_bloom_filter_scalars():
+    from numba_extras.sketch import BloomFilter
+
+    bloom = BloomFilter(100, 0.01)
+    bloom.add("spam")
+    bloom.add(0.0)
+    bloom.add(7)
+    assert bloom.contains("spam")
+    assert bloom.contains(-0.0)
+    assert bloom.contains(7)
+
+
+def test_hyperloglog_estimate_and_merge():
+    from numba_extras.sketch import HyperLogLog, hll_from_bytes
+
+    values = np.random.RandomState(0).randint(0, 50000, 200000)
+    exact = np.unique(values).shape[0]
+    whole = HyperLogLog(14)
+    whole.add_many(values)
+    assert whole.count() == pytest.approx(exact, rel=0.03)
+
+    parts = [HyperLogLog(14) for _ in range(4)]
+    for part, chunk in zip(parts, np.array_split(values, 4)):
+        part.add_many(chunk)
+    for part in parts[1:]:
+        parts[0].merge(part)
+    np.testing.assert_array_equal(parts[0].registers, whole.registers)
+
+    small = HyperLogLog(10)
+    small.add_many(np.arange(100))
+    assert small.count() == pytest.approx(100, rel=0.05)
+    assert hll_from_bytes(whole.to_bytes()).count() == whole.count()
+
+
+def test_count_min_never_undercounts():
+    from numba_extras.sketch import CountMinSketch, countmin_from_bytes
+
+    values = np.random.RandomState(1).zipf(1.3, 50000) % 1000
+    left = CountMinSketch(2000, 5)
+    right = CountMinSketch(2000, 5)
+    left.add_many(values[:25000])
+    right.add_many(values[25000:])
+    left.merge(right)
+    counts = np.bincount(values)
+    for v in np.nonzero(counts)[0]:
+        estimate = left.estimate(v)
+        assert counts[v] <= estimate <= counts[v] + np.e / 2000 * values.shape[0]
+    restored = countmin_from_bytes(left.to_bytes())
+    np.testing.assert_array_equal(restored.table, left.table)
+
+
+def test_tdigest_quantiles_and_merge():
+    from numba_extras.sketch import TDigest, tdigest_from_bytes
+
+    x = np.random.RandomState(2).standard_normal(100000)
+    parts = [TDigest(200.0) for _ in range(4)]
+    for part, chunk in zip(parts, np.array_split(x, 4)):
+        part.add_many(chunk)
+    digest = parts[0]
+    for part in parts[1:]:
+        digest.merge(part)
+    assert digest.count() == x.shape[0]
+    sorted_x = np.sort(x)
+    for q in (0.0, 0.001, 0.01, 0.25, 0.5, 0.75, 0.99, 0.999, 1.0):
+        rank = np.searchsorted(sorted_x, digest.quantile(q)) / x.shape[0]
+        assert abs(rank - q) < 0.005
+    restored = tdigest_from_bytes(digest.to_bytes())
+    assert restored.quantile(0.3) == digest.quantile(0.3)
+
+
+def test_sketches_in_njit():
+    from numba import njit
+    from numba_extras.sketch import HyperLogLog, TDigest
+
+    @njit
+    def summarise(x):
+        hll = HyperLogLog(12)
+        digest = TDigest(100.0)
+        for v in x:
+            hll.add(v)
+            digest.add(v)
+        return hll.count(), digest.quantile(0.5)
+
+    distinct, median = summarise(np.arange(1000.0))
+    assert distinct == pytest.approx(1000, rel=0.05)
+    assert median == pytest.approx(499.5, abs=5)
+
+
+def test_from_bytes_rejects_other_sketches():
+    from numba_extras.sketch import BloomFilter, HyperLogLog, hll_from_bytes
+
+    with pytest.raises(ValueError):
+        hll_from_bytes(BloomFilter(10, 0.1).to_bytes())
+    with pytest.raises(ValueError):
+        hll_from_bytes(HyperLogLog(8).to_bytes()[:-1])
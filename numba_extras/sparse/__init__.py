@@ -0,0 +1,15 @@
+from .sparse import (  # noqa: F401
+    CSCMatrix,
+    CSRMatrix,
+    coo_to_csc,
+    coo_to_csr,
+    from_scipy,
+    row_slice,
+    spmm,
+    spmv,
+    take_rows,
+    to_csc,
+    to_csr,
+    to_scipy,
+    transpose,
+)
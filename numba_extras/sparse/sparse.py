@@ -0,0 +1,450 @@
+"""Compressed sparse matrices for nopython code.
+
+``CSRMatrix`` and ``CSCMatrix`` are named tuples of ``(data, indices,
+indptr, shape)`` laid out exactly like ``scipy.sparse`` CSR and CSC
+matrices, with any index and value dtypes. ``from_scipy`` and ``to_scipy``
+share the arrays with SciPy instead of copying them, and every function
+here works from Python and from ``@njit`` code.
+
+``spmv`` and ``spmm`` multiply by a dense vector or matrix in parallel. CSR
+rows are split into chunks of about equal nonzero count, one per task, so a
+few long rows do not leave the other threads idle. A CSC product scatters
+into one output buffer per thread, which costs ``threads * nrows`` extra
+memory; ``spmm`` converts a CSC matrix to CSR instead.
+
+``transpose`` reinterprets CSR as CSC and back without copying, like
+SciPy's ``.T``; ``to_csr`` and ``to_csc`` convert between the two with a
+counting sort, which leaves the indices of each row (column) sorted.
+"""
+
+import collections
+
+import numpy as np
+from numba import get_num_threads, njit, prange, types
+from numba.extending import overload
+from numba.np.numpy_support import as_dtype
+
+CSRMatrix = collections.namedtuple("CSRMatrix", ["data", "indices", "indptr", "shape"])
+CSCMatrix = collections.namedtuple("CSCMatrix", ["data", "indices", "indptr", "shape"])
+
+# Chunks per thread for the CSR kernels, so that uneven chunks even out.
+_CHUNKS_PER_THREAD = 4
+
+
+def _is(m, cls):
+    return isinstance(m, types.BaseNamedTuple) and m.instance_class is cls
+
+
+def from_scipy(m):
+    """Wrap a ``scipy.sparse`` CSR or CSC matrix without copying.
+
+    Other formats are converted to CSR by SciPy first, which copies.
+    """
+    if m.format == "csc":
+        return CSCMatrix(m.data, m.indices, m.indptr, m.shape)
+    if m.format != "csr":
+        m = m.tocsr()
+    return CSRMatrix(m.data, m.indices, m.indptr, m.shape)
+
+
+def to_scipy(m):
+    """Return a ``scipy.sparse`` matrix sharing the arrays of ``m``."""
+    import scipy.sparse
+
+    cls = scipy.sparse.csc_matrix
+    if isinstance(m, CSRMatrix):
+        cls = scipy.sparse.csr_matrix
+    # The constructor would narrow int64 indices to int32 whenever they fit,
+    # copying them, so the arrays are attached afterwards.
+    out = cls(m.shape, dtype=m.data.dtype)
+    out.data = m.data
+    out.indices = m.indices
+    out.indptr = m.indptr
+    return out
+
+
+@njit
+def _partition(indptr, parts):
+    # Boundaries splitting the rows into ``parts`` runs of about equal nnz.
+    n = indptr.shape[0] - 1
+    nnz = indptr[n]
+    bounds = np.empty(parts + 1, np.int64)
+    bounds[0] = 0
+    for p in range(1, parts):
+        bounds[p] = np.searchsorted(indptr, nnz * p // parts)
+    bounds[parts] = n
+    for p in range(1, parts + 1):
+        bounds[p] = min(max(bounds[p], bounds[p - 1]), n)
+    return bounds
+
+
+# The kernels below index with unsigned integers: valid indices are never
+# negative, and numba then skips the wraparound check on every access, which
+# made the SpMV loop twice as slow.
+@njit(parallel=True)
+def _csr_spmv(data, indices, indptr, x, out):
+    parts = min(out.shape[0], _CHUNKS_PER_THREAD * get_num_threads())
+    bounds = _partition(indptr, max(parts, 1))
+    for p in prange(bounds.shape[0] - 1):
+        for i in range(bounds[p], bounds[p + 1]):
+            acc = out[i]
+            for j in range(np.uintp(indptr[i]), np.uintp(indptr[i + 1])):
+                acc += data[j] * x[np.uintp(indices[j])]
+            out[i] = acc
+
+
+@njit(parallel=True)
+def _csr_spmm(data, indices, indptr, b, out):
+    parts = min(out.shape[0], _CHUNKS_PER_THREAD * get_num_threads())
+    bounds = _partition(indptr, max(parts, 1))
+    for p in prange(bounds.shape[0] - 1):
+        for i in range(bounds[p], bounds[p + 1]):
+            for j in range(np.uintp(indptr[i]), np.uintp(indptr[i + 1])):
+                v = data[j]
+                r = np.uintp(indices[j])
+                for c in range(out.shape[1]):
+                    out[i, c] += v * b[r, c]
+
+
+@njit
+def _csc_scatter(data, indices, indptr, x, out, start, stop):
+    for c in range(start, stop):
+        v = x[c]
+        for j in range(np.uintp(indptr[c]), np.uintp(indptr[c + 1])):
+            out[np.uintp(indices[j])] += data[j] * v
+
+
+@njit(parallel=True)
+def _csc_spmv(data, indices, indptr, x, out):
+    threads = get_num_threads()
+    if threads == 1:
+        _csc_scatter(data, indices, indptr, x, out, 0, x.shape[0])
+        return
+    bounds = _partition(indptr, threads)
+    buffers = np.zeros((threads, out.shape[0]), out.dtype)
+    for p in prange(threads):
+        _csc_scatter(data, indices, indptr, x, buffers[p], bounds[p], bounds[p + 1])
+    for i in prange(out.shape[0]):
+        acc = out[i]
+        for p in range(threads):
+            acc += buffers[p, i]
+        out[i] = acc
+
+
+@njit
+def _swap_major(data, indices, indptr, nminor):
+    # Regroups compressed rows by column (or columns by row) with a counting
+    # sort. Walking the old groups in order leaves each new group sorted.
+    nnz = indptr[indptr.shape[0] - 1]
+    new_indptr = np.zeros(nminor + 1, indptr.dtype)
+    for j in range(nnz):
+        new_indptr[indices[j] + 1] += 1
+    for k in range(nminor):
+        new_indptr[k + 1] += new_indptr[k]
+    pos = new_indptr[:nminor].copy()
+    new_indices = np.empty(nnz, indices.dtype)
+    new_data = np.empty(nnz, data.dtype)
+    for major in range(indptr.shape[0] - 1):
+        for j in range(np.uintp(indptr[major]), np.uintp(indptr[major + 1])):
+            k = np.uintp(indices[j])
+            new_indices[pos[k]] = major
+            new_data[pos[k]] = data[j]
+            pos[k] += 1
+    return new_data, new_indices, new_indptr
+
+
+@njit
+def _bucket(data, major, minor, nmajor):
+    # Groups COO entries by ``major``, keeping their order within a group.
+    nnz = data.shape[0]
+    indptr = np.zeros(nmajor + 1, np.int64)
+    for j in range(nnz):
+        indptr[major[j] + 1] += 1
+    for k in range(nmajor):
+        indptr[k + 1] += indptr[k]
+    pos = indptr[:nmajor].copy()
+    indices = np.empty(nnz, np.int64)
+    out = np.empty(nnz, data.dtype)
+    for j in range(nnz):
+        k = np.uintp(major[j])
+        indices[pos[k]] = minor[j]
+        out[pos[k]] = data[j]
+        pos[k] += 1
+    return out, indices, indptr
+
+
+@njit
+def _sum_duplicates(data, indices, indptr):
+    # Adds up neighbouring entries with equal index inside each group.
+    n = 0
+    start = 0
+    for major in range(indptr.shape[0] - 1):
+        stop = indptr[major + 1]
+        first = n
+        for j in range(start, stop):
+            if n > first and indices[n - 1] == indices[j]:
+                data[n - 1] += data[j]
+            else:
+                indices[n] = indices[j]
+                data[n] = data[j]
+                n += 1
+        start = stop
+        indptr[major + 1] = n
+    if n == data.shape[0]:
+        return data, indices, indptr
+    return data[:n].copy(), indices[:n].copy(), indptr
+
+
+# Rows up to this length are sorted by insertion, longer ones with argsort.
+_INSERTION_MAX = 32
+
+
+@njit(parallel=True)
+def _sort_groups(data, indices, indptr):
+    # Sorts the indices inside each group, carrying ``data`` along.
+    for g in prange(indptr.shape[0] - 1):
+        lo = indptr[g]
+        hi = indptr[g + 1]
+        if hi - lo > _INSERTION_MAX:
+            order = np.argsort(indices[lo:hi], kind="mergesort") + lo
+            indices[lo:hi] = indices[order]
+            data[lo:hi] = data[order]
+            continue
+        for j in range(lo + 1, hi):
+            k = indices[j]
+            v = data[j]
+            i = j - 1
+            while i >= lo and indices[i] > k:
+                indices[i + 1] = indices[i]
+                data[i + 1] = data[i]
+                i -= 1
+            indices[i + 1] = k
+            data[i + 1] = v
+
+
+@njit
+def _coo_compress(rows, cols, data, nrows, ncols):
+    if rows.shape[0] != cols.shape[0] or rows.shape[0] != data.shape[0]:
+        raise ValueError("rows, cols and data must have the same length")
+    for j in range(rows.shape[0]):
+        if not (0 <= rows[j] < nrows and 0 <= cols[j] < ncols):
+            raise ValueError("COO coordinates out of bounds")
+    d, idx, ptr = _bucket(data, rows, cols, nrows)
+    # Sorting each row puts duplicates next to each other.
+    _sort_groups(d, idx, ptr)
+    return _sum_duplicates(d, idx, ptr)
+
+
+@njit
+def coo_to_csr(rows, cols, data, shape):
+    """Build a CSRMatrix from coordinates, summing duplicates like SciPy."""
+    d, idx, ptr = _coo_compress(rows, cols, data, shape[0], shape[1])
+    return CSRMatrix(d, idx, ptr, (shape[0], shape[1]))
+
+
+@njit
+def coo_to_csc(rows, cols, data, shape):
+    """Build a CSCMatrix from coordinates, summing duplicates like SciPy."""
+    d, idx, ptr = _coo_compress(cols, rows, data, shape[1], shape[0])
+    return CSCMatrix(d, idx, ptr, (shape[0], shape[1]))
+
+
+def _transpose(m):
+    pass
+
+
+@overload(_transpose)
+def _ol_transpose(m):
+    if _is(m, CSRMatrix):
+        return lambda m: CSCMatrix(
+            m.data, m.indices, m.indptr, (m.shape[1], m.shape[0])
+        )
+    if _is(m, CSCMatrix):
+        return lambda m: CSRMatrix(
+            m.data, m.indices, m.indptr, (m.shape[1], m.shape[0])
+        )
+    return None
+
+
+@njit
+def transpose(m):
+    """The transpose in the other format, sharing the arrays of ``m``."""
+    return _transpose(m)
+
+
+def _to_csr(m):
+    pass
+
+
+@overload(_to_csr)
+def _ol_to_csr(m):
+    if _is(m, CSRMatrix):
+        return lambda m: m
+    if _is(m, CSCMatrix):
+
+        def impl(m):
+            d, idx, ptr = _swap_major(m.data, m.indices, m.indptr, m.shape[0])
+            return CSRMatrix(d, idx, ptr, m.shape)
+
+        return impl
+    return None
+
+
+@njit
+def to_csr(m):
+    """``m`` as a CSRMatrix; a CSRMatrix is returned as is."""
+    return _to_csr(m)
+
+
+def _to_csc(m):
+    pass
+
+
+@overload(_to_csc)
+def _ol_to_csc(m):
+    if _is(m, CSCMatrix):
+        return lambda m: m
+    if _is(m, CSRMatrix):
+
+        def impl(m):
+            d, idx, ptr = _swap_major(m.data, m.indices, m.indptr, m.shape[1])
+            return CSCMatrix(d, idx, ptr, m.shape)
+
+        return impl
+    return None
+
+
+@njit
+def to_csc(m):
+    """``m`` as a CSCMatrix; a CSCMatrix is returned as is."""
+    return _to_csc(m)
+
+
+def _spmv(m, x):
+    pass
+
+
+@overload(_spmv)
+def _ol_spmv(m, x):
+    if _is(m, CSRMatrix):
+        kernel = _csr_spmv
+    elif _is(m, CSCMatrix):
+        kernel = _csc_spmv
+    else:
+        return None
+    if not isinstance(x, types.Array):
+        return None
+    dtype = np.result_type(as_dtype(m.types[0].dtype), as_dtype(x.dtype))
+
+    def impl(m, x):
+        if x.ndim != 1 or x.shape[0] != m.shape[1]:
+            raise ValueError("x must be a vector of length ncols")
+        out = np.zeros(m.shape[0], dtype)
+        kernel(m.data, m.indices, m.indptr, x, out)
+        return out
+
+    return impl
+
+
+@njit
+def spmv(m, x):
+    """Sparse matrix times dense vector, ``m @ x``."""
+    return _spmv(m, x)
+
+
+def _spmm(m, b):
+    pass
+
+
+@overload(_spmm)
+def _ol_spmm(m, b):
+    if not (isinstance(b, types.Array) and b.ndim == 2):
+        return None
+    if not (_is(m, CSRMatrix) or _is(m, CSCMatrix)):
+        return None
+    dtype = np.result_type(as_dtype(m.types[0].dtype), as_dtype(b.dtype))
+
+    def impl(m, b):
+        if b.shape[0] != m.shape[1]:
+            raise ValueError("b must have ncols rows")
+        a = to_csr(m)
+        out = np.zeros((m.shape[0], b.shape[1]), dtype)
+        _csr_spmm(a.data, a.indices, a.indptr, b, out)
+        return out
+
+    return impl
+
+
+@njit
+def spmm(m, b):
+    """Sparse matrix times dense matrix, ``m @ b``."""
+    return _spmm(m, b)
+
+
+def _row_slice(m, start, stop):
+    pass
+
+
+@overload(_row_slice)
+def _ol_row_slice(m, start, stop):
+    if not _is(m, CSRMatrix):
+        return None
+
+    def impl(m, start, stop):
+        n = m.shape[0]
+        start = min(max(start, 0), n)
+        stop = min(max(stop, start), n)
+        lo = m.indptr[start]
+        hi = m.indptr[stop]
+        indptr = m.indptr[start : stop + 1] - lo
+        return CSRMatrix(
+            m.data[lo:hi], m.indices[lo:hi], indptr, (stop - start, m.shape[1])
+        )
+
+    return impl
+
+
+@njit
+def row_slice(m, start, stop):
+    """Rows ``start:stop`` of a CSRMatrix; data and indices are views."""
+    return _row_slice(m, start, stop)
+
+
+def _take_rows(m, rows):
+    pass
+
+
+@overload(_take_rows, jit_options={"parallel": True})
+def _ol_take_rows(m, rows):
+    if not _is(m, CSRMatrix):
+        return None
+
+    def impl(m, rows):
+        n = m.shape[0]
+        indptr = np.zeros(rows.shape[0] + 1, m.indptr.dtype)
+        for k in range(rows.shape[0]):
+            r = rows[k]
+            if not 0 <= r < n:
+                raise IndexError("row index out of range")
+            indptr[k + 1] = indptr[k] + m.indptr[r + 1] - m.indptr[r]
+        nnz = indptr[rows.shape[0]]
+        # parfors cannot capture the named tuple itself, only its arrays.
+        src_data = m.data
+        src_indices = m.indices
+        src_indptr = m.indptr
+        data = np.empty(nnz, src_data.dtype)
+        indices = np.empty(nnz, src_indices.dtype)
+        for k in prange(rows.shape[0]):
+            src = src_indptr[rows[k]]
+            for j in range(indptr[k + 1] - indptr[k]):
+                data[indptr[k] + j] = src_data[src + j]
+                indices[indptr[k] + j] = src_indices[src + j]
+        return CSRMatrix(data, indices, indptr, (rows.shape[0], m.shape[1]))
+
+    return impl
+
+
+@njit
+def take_rows(m, rows):
+    """The rows of a CSRMatrix listed in ``rows``, copied in that order."""
+    return _take_rows(m, rows)
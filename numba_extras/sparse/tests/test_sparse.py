@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+
+def _random(n=300, m=200, density=0.05, seed=0, fmt="csr", index=np.int32):
+    sp = pytest.importorskip("scipy.sparse")
+    a = sp.random(n, m, density, fmt, random_state=seed)
+    # A few long rows, so the nnz-balanced chunks differ from equal rows.
+    a = a.tolil()
+    a[3, :] = 1.0
+    a = a.asformat(fmt)
+    a.indices = a.indices.astype(index)
+    a.indptr = a.indptr.astype(index)
+    return a
+
+
+@pytest.mark.parametrize("fmt", ["csr", "csc"])
+@pytest.mark.parametrize("index", [np.int32, np.int64])
+def test_products_match_scipy(fmt, index):
+    from numba_extras.sparse import from_scipy, spmm, spmv
+
+    a = _random(fmt=fmt, index=index)
+    m = from_scipy(a)
+    x = np.random.RandomState(1).standard_normal(a.shape[1])
+    b = np.random.RandomState(2).standard_normal((a.shape[1], 5))
+    np.testing.assert_allclose(spmv(m, x), a @ x)
+    np.testing.assert_allclose(spmm(m, b), a @ b)
+    assert spmv(m, x.astype(np.float32)).dtype == np.float64
+    with pytest.raises(ValueError):
+        spmv(m, x[:-1])
+
+
+def test_scipy_interop_is_zero_copy():
+    from numba_extras.sparse import coo_to_csr, from_scipy, to_scipy
+
+    a = _random()
+    m = from_scipy(a)
+    assert m.data is a.data and m.indices is a.indices and m.indptr is a.indptr
+    built = coo_to_csr(np.array([0, 1]), np.array([1, 0]), np.ones(2), (2, 2))
+    back = to_scipy(built)
+    assert back.format == "csr"
+    assert back.indices is built.indices and back.data is built.data
+    assert back.indices.dtype == np.int64
+    np.testing.assert_array_equal(back.toarray(), [[0, 1], [1, 0]])
+
+
+def test_coo_sums_duplicates_like_scipy():
+    sp = pytest.importorskip("scipy.sparse")
+    from numba_extras.sparse import coo_to_csc, coo_to_csr, to_scipy
+
+    rs = np.random.RandomState(0)
+    rows = rs.randint(0, 50, 2000)
+    cols = rs.randint(0, 40, 2000)
+    data = rs.standard_normal(2000)
+    expected = sp.coo_matrix((data, (rows, cols)), shape=(50, 40)).tocsr()
+    got = coo_to_csr(rows, cols, data, (50, 40))
+    np.testing.assert_array_equal(got.indptr, expected.indptr)
+    np.testing.assert_array_equal(got.indices, expected.indices)
+    np.testing.assert_allclose(got.data, expected.data)
+    csc = to_scipy(coo_to_csc(rows, cols, data, (50, 40)))
+    assert csc.has_canonical_format
+    np.testing.assert_allclose(csc.toarray(), expected.toarray())
+    with pytest.raises(ValueError):
+        coo_to_csr(np.array([50]), np.array([0]), np.ones(1), (50, 40))
+
+
+def test_transpose_and_conversion():
+    from numba_extras.sparse import from_scipy, to_csc, to_csr, to_scipy, transpose
+
+    a = _random()
+    m = from_scipy(a)
+    t = transpose(m)
+    assert t.shape == (a.shape[1], a.shape[0]) and t.data is m.data
+    np.testing.assert_array_equal(to_scipy(t).toarray(), a.T.toarray())
+    csc = to_csc(m)
+    assert to_scipy(csc).has_sorted_indices
+    np.testing.assert_array_equal(to_scipy(csc).toarray(), a.toarray())
+    np.testing.assert_array_equal(to_scipy(to_csr(csc)).toarray(), a.toarray())
+    assert to_csr(m).indices is m.indices
+
+
+def test_row_selection():
+    from numba_extras.sparse import from_scipy, row_slice, take_rows, to_scipy
+
+    a = _random()
+    m = from_scipy(a)
+    part = row_slice(m, 2, 40)
+    np.testing.assert_array_equal(to_scipy(part).toarray(), a[2:40].toarray())
+    assert np.shares_memory(part.data, a.data)
+    assert row_slice(m, 290, 1000).shape == (10, a.shape[1])
+    rows = np.array([5, 3, 3, 299, 0])
+    np.testing.assert_array_equal(
+        to_scipy(take_rows(m, rows)).toarray(), a[rows].toarray()
+    )
+    with pytest.raises(IndexError):
+        take_rows(m, np.array([300]))
+
+
+def test_in_njit_pipeline():
+    from numba import njit
+    from numba_extras.sparse import coo_to_csr, spmv, transpose
+
+    @njit
+    def normalized_degree(rows, cols, n):
+        adj = coo_to_csr(rows, cols, np.ones(rows.shape[0]), (n, n))
+        return spmv(transpose(adj), np.ones(n))
+
+    rows = np.array([0, 0, 1, 2])
+    cols = np.array([1, 2, 2, 0])
+    np.testing.assert_array_equal(normalized_degree(rows, cols, 3), [1, 1, 2])
@@ -0,0 +1,178 @@
+"""Byte-level fast paths for ASCII strings.
+
+numba's generic string operations read and write one code point at a time
+and dispatch on the storage kind (1, 2 or 4 bytes per character) for each
+one. Every numba string already records its kind and whether it is pure
+ASCII, so these functions check that once per call and then work on the raw
+bytes in tight loops that LLVM can vectorise. Inputs that do not qualify fall
+back to the equivalent ``str`` method, so results always match Python.
+
+Comparisons and ``find`` only need both strings stored one byte per
+character (ASCII or Latin-1); ``upper`` and ``lower`` need ASCII.
+"""
+
+import numpy as np
+from numba import carray, njit
+from numba.cpython.unicode import PY_UNICODE_1BYTE_KIND, _empty_string, _strncpy
+
+
+@njit
+def _bytes(s):
+    # Only valid while ``s`` is alive and stored one byte per character.
+    return carray(s._data, len(s), np.uint8)
+
+
+@njit
+def _narrow(a, b):
+    return a._kind == PY_UNICODE_1BYTE_KIND and b._kind == PY_UNICODE_1BYTE_KIND
+
+
+# Each function starts with ``str(x)``, a no-op that turns string literals
+# passed from @njit callers into plain strings with accessible storage.
+
+
+@njit
+def is_ascii(s):
+    """Whether ``s`` only holds ASCII characters (O(1))."""
+    s = str(s)
+    return bool(s._is_ascii)
+
+
+@njit
+def concat(a, b):
+    """``a + b``, copying whole byte ranges when both share a storage kind."""
+    a = str(a)
+    b = str(b)
+    if a._kind != b._kind:
+        return a + b
+    out = _empty_string(a._kind, len(a) + len(b), a._is_ascii & b._is_ascii)
+    _strncpy(out, 0, a, 0, len(a))
+    _strncpy(out, len(a), b, 0, len(b))
+    return out
+
+
+@njit
+def equal(a, b):
+    """``a == b``."""
+    a = str(a)
+    b = str(b)
+    if len(a) != len(b):
+        return False
+    if not _narrow(a, b):
+        return a == b
+    x = _bytes(a)
+    y = _bytes(b)
+    for i in range(x.shape[0]):
+        if x[i] != y[i]:
+            return False
+    return True
+
+
+@njit
+def compare(a, b):
+    """-1, 0 or 1 as ``a`` sorts before, equal to or after ``b``."""
+    a = str(a)
+    b = str(b)
+    if not _narrow(a, b):
+        return (a > b) - (a < b)
+    x = _bytes(a)
+    y = _bytes(b)
+    for i in range(min(x.shape[0], y.shape[0])):
+        if x[i] != y[i]:
+            return -1 if x[i] < y[i] else 1
+    return (x.shape[0] > y.shape[0]) - (x.shape[0] < y.shape[0])
+
+
+@njit
+def find(s, sub, start=0):
+    """``s.find(sub, start)``."""
+    s = str(s)
+    sub = str(sub)
+    if not _narrow(s, sub):
+        return s.find(sub, start)
+    n = len(s)
+    m = len(sub)
+    if start < 0:
+        start = max(start + n, 0)
+    if start > n:
+        return -1
+    if m == 0:
+        return start
+    hay = _bytes(s)
+    needle = _bytes(sub)
+    # CPython's fastsearch: compare the last byte first and use a bloom mask
+    # of the needle's bytes to skip past windows that cannot match.
+    mlast = m - 1
+    last = needle[mlast]
+    skip = mlast
+    mask = 1 << (last & 63)
+    for j in range(mlast):
+        mask |= 1 << (needle[j] & 63)
+        if needle[j] == last:
+            skip = mlast - j - 1
+    i = start
+    while i <= n - m:
+        if hay[i + mlast] == last:
+            j = 0
+            while j < mlast and hay[i + j] == needle[j]:
+                j += 1
+            if j == mlast:
+                return i
+            if i + m < n and not mask & (1 << (hay[i + m] & 63)):
+                i += m
+            else:
+                i += skip
+        elif i + m < n and not mask & (1 << (hay[i + m] & 63)):
+            i += m
+        i += 1
+    return -1
+
+
+@njit
+def _shift_case(s, lo, hi, delta):
+    n = len(s)
+    out = _empty_string(PY_UNICODE_1BYTE_KIND, n, 1)
+    src = _bytes(s)
+    dst = carray(out._data, n, np.uint8)
+    for i in range(n):
+        c = src[i]
+        dst[i] = c + delta if lo <= c <= hi else c
+    return out
+
+
+@njit
+def upper(s):
+    """``s.upper()``."""
+    s = str(s)
+    if not s._is_ascii:
+        return s.upper()
+    return _shift_case(s, 97, 122, -32)
+
+
+@njit
+def lower(s):
+    """``s.lower()``."""
+    s = str(s)
+    if not s._is_ascii:
+        return s.lower()
+    return _shift_case(s, 65, 90, 32)
+
+
+@njit
+def split(s, sep):
+    """``s.split(sep)`` for a non-empty separator."""
+    s = str(s)
+    sep = str(sep)
+    if len(sep) == 0:
+        raise ValueError("empty separator")
+    if not _narrow(s, sep):
+        return s.split(sep)
+    parts = []
+    begin = 0
+    while True:
+        end = find(s, sep, begin)
+        if end < 0:
+            parts.append(s[begin:])
+            return parts
+        parts.append(s[begin:end])
+        begin = end + len(sep)
@@ -0,0 +1,260 @@
+"""Multi-pattern string search with an Aho-Corasick automaton.
+
+``build(patterns)`` compiles a list of ``str`` or ``bytes`` patterns once into
+flat NumPy tables: a deterministic transition table over byte classes (only
+bytes that occur in some pattern get their own column) plus, per state, the
+pattern ending there and a link to the next shorter state that also ends a
+pattern. Scanning is then one table lookup per input byte, independent of the
+number of patterns.
+
+Patterns and text are matched as UTF-8 bytes. ``find_all`` reports every
+match, overlapping ones included, as ``(starts, ids)`` arrays ordered by end
+position. Starts are character offsets for ``str`` text and byte offsets for
+``bytes`` or ``uint8`` arrays. ``find_all_batch`` and ``any_match`` scan a
+sequence of texts in parallel.
+"""
+
+import numpy as np
+from numba import carray, int32, int64, njit, prange, types
+from numba.cpython.unicode import _get_code_point
+from numba.experimental import jitclass
+from numba.extending import overload
+
+
+@jitclass(
+    [
+        ("classes", int32[::1]),
+        ("delta", int32[:, ::1]),
+        ("match", int32[::1]),
+        ("dict_link", int32[::1]),
+        ("same_next", int32[::1]),
+        ("byte_len", int64[::1]),
+        ("char_len", int64[::1]),
+    ]
+)
+class AhoCorasick:
+    # State 0 is the root. ``match[s]`` is the first pattern ending at ``s``
+    # (``same_next`` chains duplicates) and ``dict_link[s]`` the nearest
+    # proper suffix state with a match, or 0.
+    def __init__(self, buf, offsets):
+        npat = offsets.shape[0] - 1
+        self.classes = np.zeros(256, np.int32)
+        ncls = 1
+        for b in buf:
+            if self.classes[b] == 0:
+                self.classes[b] = ncls
+                ncls += 1
+        size = buf.shape[0] + 1
+        delta = np.full((size, ncls), -1, np.int32)
+        match = np.full(size, -1, np.int32)
+        self.same_next = np.full(npat, -1, np.int32)
+        self.byte_len = np.empty(npat, np.int64)
+        self.char_len = np.empty(npat, np.int64)
+        nstates = 1
+        for p in range(npat - 1, -1, -1):
+            state = 0
+            chars = 0
+            for i in range(offsets[p], offsets[p + 1]):
+                c = self.classes[buf[i]]
+                if delta[state, c] < 0:
+                    delta[state, c] = nstates
+                    nstates += 1
+                state = delta[state, c]
+                if buf[i] & 0xC0 != 0x80:
+                    chars += 1
+            self.byte_len[p] = offsets[p + 1] - offsets[p]
+            self.char_len[p] = chars
+            self.same_next[p] = match[state]
+            match[state] = p
+        delta = delta[:nstates].copy()
+        match = match[:nstates].copy()
+        fail = np.zeros(nstates, np.int32)
+        dict_link = np.zeros(nstates, np.int32)
+        queue = np.empty(nstates, np.int32)
+        head = 0
+        tail = 0
+        for c in range(ncls):
+            t = delta[0, c]
+            if t < 0:
+                delta[0, c] = 0
+            else:
+                queue[tail] = t
+                tail += 1
+        while head < tail:
+            s = queue[head]
+            head += 1
+            for c in range(ncls):
+                t = delta[s, c]
+                if t < 0:
+                    delta[s, c] = delta[fail[s], c]
+                    continue
+                f = delta[fail[s], c]
+                fail[t] = f
+                dict_link[t] = f if match[f] >= 0 else dict_link[f]
+                queue[tail] = t
+                tail += 1
+        self.delta = delta
+        self.match = match
+        self.dict_link = dict_link
+
+    @property
+    def npatterns(self):
+        return self.byte_len.shape[0]
+
+    @property
+    def nstates(self):
+        return self.match.shape[0]
+
+
+def build(patterns):
+    """Compile ``str`` or ``bytes`` patterns into an AhoCorasick automaton.
+
+    Match ids are indices into ``patterns``. Empty patterns are rejected.
+    """
+    encoded = [p.encode("utf-8") if isinstance(p, str) else bytes(p) for p in patterns]
+    if not encoded:
+        raise ValueError("at least one pattern is required")
+    if any(len(p) == 0 for p in encoded):
+        raise ValueError("patterns must not be empty")
+    offsets = np.zeros(len(encoded) + 1, np.int64)
+    offsets[1:] = np.cumsum([len(p) for p in encoded])
+    buf = np.frombuffer(b"".join(encoded), np.uint8)
+    return AhoCorasick(buf, offsets)
+
+
+@njit
+def _report(ac, state, end, count, starts, ids, chars):
+    # Writes every pattern ending at ``state`` while there is room and
+    # returns the updated match count.
+    s = state if ac.match[state] >= 0 else ac.dict_link[state]
+    while s > 0:
+        p = ac.match[s]
+        while p >= 0:
+            if count < starts.shape[0]:
+                length = ac.char_len[p] if chars else ac.byte_len[p]
+                starts[count] = end - length + 1
+                ids[count] = p
+            count += 1
+            p = ac.same_next[p]
+        s = ac.dict_link[s]
+    return count
+
+
+@njit
+def _hit(ac, state):
+    return ac.match[state] >= 0 or ac.dict_link[state] > 0
+
+
+@njit
+def _scan_bytes(ac, data, starts, ids, first):
+    state = 0
+    count = 0
+    for i in range(data.shape[0]):
+        state = ac.delta[state, ac.classes[data[i]]]
+        if first and _hit(ac, state):
+            return 1
+        count = _report(ac, state, i, count, starts, ids, False)
+    return count
+
+
+@njit
+def _scan_str(ac, s, starts, ids, first):
+    # ASCII text is its own UTF-8 encoding and is scanned in place; other
+    # text is encoded one code point at a time.
+    if s._is_ascii:
+        return _scan_bytes(ac, carray(s._data, len(s), np.uint8), starts, ids, first)
+    state = 0
+    count = 0
+    for i in range(len(s)):
+        cp = _get_code_point(s, i)
+        if cp < 0x80:
+            state = ac.delta[state, ac.classes[cp]]
+        else:
+            if cp < 0x800:
+                nbytes = 2
+            elif cp < 0x10000:
+                nbytes = 3
+            else:
+                nbytes = 4
+            lead = (0xF0 << (4 - nbytes)) & 0xFF
+            state = ac.delta[state, ac.classes[lead | (cp >> (6 * (nbytes - 1)))]]
+            for k in range(nbytes - 2, -1, -1):
+                b = 0x80 | ((cp >> (6 * k)) & 0x3F)
+                state = ac.delta[state, ac.classes[b]]
+                if k > 0:
+                    if first and _hit(ac, state):
+                        return 1
+                    count = _report(ac, state, i, count, starts, ids, True)
+        if first and _hit(ac, state):
+            return 1
+        count = _report(ac, state, i, count, starts, ids, True)
+    return count
+
+
+def _scan(ac, text, starts, ids, first):
+    pass
+
+
+@overload(_scan)
+def _ol_scan(ac, text, starts, ids, first):
+    if isinstance(text, types.Array) and text.dtype == types.uint8:
+        if text.ndim != 1:
+            return None
+        return lambda ac, text, starts, ids, first: _scan_bytes(
+            ac, text, starts, ids, first
+        )
+    if isinstance(text, types.Bytes):
+        return lambda ac, text, starts, ids, first: _scan_bytes(
+            ac, np.frombuffer(text, np.uint8), starts, ids, first
+        )
+    if isinstance(text, (types.UnicodeType, types.UnicodeCharSeq)):
+        return lambda ac, text, starts, ids, first: _scan_str(
+            ac, str(text), starts, ids, first
+        )
+    return None
+
+
+@njit
+def find_all(ac, text):
+    """All matches of ``ac`` in ``text`` as ``(starts, ids)`` int64 arrays."""
+    none = np.empty(0, np.int64)
+    count = _scan(ac, text, none, none, False)
+    starts = np.empty(count, np.int64)
+    ids = np.empty(count, np.int64)
+    _scan(ac, text, starts, ids, False)
+    return starts, ids
+
+
+@njit(parallel=True)
+def find_all_batch(ac, texts):
+    """``find_all`` over a sequence of texts, in parallel.
+
+    Returns ``(offsets, starts, ids)``: the matches of ``texts[i]`` are
+    ``starts[offsets[i]:offsets[i + 1]]`` and the same slice of ``ids``.
+    """
+    n = len(texts)
+    none = np.empty(0, np.int64)
+    counts = np.empty(n, np.int64)
+    # Typed lists reject the unsigned index prange produces here.
+    for i in prange(n):
+        counts[i] = _scan(ac, texts[np.intp(i)], none, none, False)
+    offsets = np.zeros(n + 1, np.int64)
+    offsets[1:] = np.cumsum(counts)
+    starts = np.empty(offsets[n], np.int64)
+    ids = np.empty(offsets[n], np.int64)
+    for i in prange(n):
+        lo = offsets[i]
+        hi = offsets[i + 1]
+        _scan(ac, texts[np.intp(i)], starts[lo:hi], ids[lo:hi], False)
+    return offsets, starts, ids
+
+
+@njit(parallel=True)
+def any_match(ac, texts):
+    """Whether each of ``texts`` contains any pattern, in parallel."""
+    n = len(texts)
+    none = np.empty(0, np.int64)
+    out = np.empty(n, np.bool_)
+    for i in prange(n):
+        out[i] = _scan(ac, texts[np.intp(i)], none, none, True) > 0
+    return out
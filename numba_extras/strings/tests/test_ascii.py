@@ -0,0 +1,79 @@
+import pytest
+
+PAIRS = [
+    ("hello", "world"),
+    ("Hello, World", "lo, W"),
+    ("héllo", "wörld"),
+    ("ab", "日本"),
+    ("日本", "語"),
+    ("emoji \U0001f600", "\U0001f600"),
+    ("", "x"),
+    ("", ""),
+]
+
+
+@pytest.mark.parametrize("a, b", PAIRS)
+def test_matches_str_methods(a, b):
+    from numba_extras.strings import ascii
+
+    joined = a + b
+    assert ascii.concat(a, b) == joined
+    assert ascii.equal(a, b) == (a == b)
+    assert ascii.equal(a, a)
+    assert ascii.compare(a, b) == (a > b) - (a < b)
+    assert ascii.compare(b, a) == (b > a) - (b < a)
+    assert ascii.find(joined, b) == joined.find(b)
+    assert ascii.find(joined, b, 1) == joined.find(b, 1)
+    assert ascii.upper(joined) == joined.upper()
+    assert ascii.lower(joined.upper()) == joined.upper().lower()
+    text = ",".join([a, b, "", a])
+    assert ascii.split(text, ",") == text.split(",")
+    assert ascii.is_ascii(joined) == joined.isascii()
+
+
+def test_find_bounds():
+    from numba_extras.strings import ascii
+
+    for start in (-10, -2, 0, 3, 5, 6, 7):
+        for sub in ("", "c", "abc", "cab", "x"):
+            assert ascii.find("abcabc", sub, start) == "abcabc".find(sub, start)
+
+
+def test_split_rejects_empty_separator():
+    from numba_extras.strings import ascii
+
+    with pytest.raises(ValueError):
+        ascii.split("a b", "")
+
+
+def test_mixed_kinds_inside_njit():
+    from numba import njit
+    from numba_extras.strings import ascii
+
+    @njit
+    def run(wide):
+        # Slicing keeps the 2-byte kind, so ``tail`` is ASCII text stored
+        # with two bytes per character.
+        tail = wide[2:]
+        return (
+            ascii.equal(tail, "abc"),
+            ascii.compare(tail, "abd"),
+            ascii.concat(tail, "!"),
+            ascii.find("xxabc", tail),
+            ascii.upper(tail),
+        )
+
+    assert run("日本abc") == (True, -1, "abc!", 2, "ABC")
+
+
+def test_find_and_split_random():
+    import random
+
+    from numba_extras.strings import ascii
+
+    rng = random.Random(0)
+    for _ in range(300):
+        hay = "".join(rng.choice("abc") for _ in range(rng.randint(0, 30)))
+        sub = "".join(rng.choice("abc") for _ in range(rng.randint(1, 4)))
+        assert ascii.find(hay, sub) == hay.find(sub)
+        assert ascii.split(hay, sub) == hay.split(sub)
@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+
+
+def _naive(patterns, text):
+    found = [
+        (start, pid)
+        for pid, p in enumerate(patterns)
+        for start in range(len(text))
+        if text.startswith(p, start)
+    ]
+    return sorted(found)
+
+
+def _pairs(starts, ids):
+    return sorted(zip(starts.tolist(), ids.tolist()))
+
+
+def test_classic_example():
+    from numba_extras.strings import search
+
+    ac = search.build(["he", "she", "his", "hers"])
+    starts, ids = search.find_all(ac, "ushers")
+    assert _pairs(starts, ids) == [(1, 1), (2, 0), (2, 3)]
+    assert ac.npatterns == 4
+
+
+@pytest.mark.parametrize("alphabet", ["ab", "abé", "a日本\U0001f600"])
+def test_matches_naive_search(alphabet):
+    import random
+
+    from numba_extras.strings import search
+
+    rng = random.Random(0)
+
+    def word(lo, hi):
+        return "".join(rng.choice(alphabet) for _ in range(rng.randint(lo, hi)))
+
+    for _ in range(30):
+        patterns = [word(1, 4) for _ in range(rng.randint(1, 8))]
+        ac = search.build(patterns)
+        for _ in range(5):
+            text = word(0, 40)
+            assert _pairs(*search.find_all(ac, text)) == _naive(patterns, text)
+            raw = text.encode("utf-8")
+            expected = _naive([p.encode("utf-8") for p in patterns], raw)
+            assert _pairs(*search.find_all(ac, raw)) == expected
+            data = np.frombuffer(raw, np.uint8)
+            assert _pairs(*search.find_all(ac, data)) == expected
+
+
+def test_batch_matches_single_scans():
+    from numba import typed
+    from numba_extras.strings import search
+
+    ac = search.build(["error", "warn", "timeout", "日本"])
+    texts = ["no match", "error: timeout", "", "warn warn", "日本語 error"]
+    for batch in (typed.List(texts), np.array(texts)):
+        offsets, starts, ids = search.find_all_batch(ac, batch)
+        for i, text in enumerate(texts):
+            lo, hi = offsets[i], offsets[i + 1]
+            expected = search.find_all(ac, text)
+            np.testing.assert_array_equal(starts[lo:hi], expected[0])
+            np.testing.assert_array_equal(ids[lo:hi], expected[1])
+        np.testing.assert_array_equal(
+            search.any_match(ac, batch), [False, True, False, True, True]
+        )
+
+
+def test_build_rejects_empty_patterns():
+    from numba_extras.strings import search
+
+    with pytest.raises(ValueError):
+        search.build([])
+    with pytest.raises(ValueError):
+        search.build(["a", ""])
@@ -0,0 +1 @@
+from .tasks import next_chunk, parallel_for  # noqa: F401
@@ -0,0 +1,67 @@
+"""Dynamically scheduled parallel loops.
+
+``prange`` splits its iteration space into equal static blocks, which leaves
+threads idle when the cost per iteration is skewed. ``parallel_for`` starts
+one worker per numba thread and lets each worker claim the next ``grain``
+iterations from a shared atomic cursor until the range is exhausted, so fast
+workers pick up the slack of slow ones::
+
+    @njit
+    def body(i, lengths, out):
+        ...
+
+    parallel_for(body, n, 64, lengths, out)
+
+``grain`` trades scheduling overhead (one atomic add per chunk) against
+balance; ``0`` picks about eight chunks per thread. Loops that need more
+control can drive ``next_chunk`` themselves. For a plain ``prange`` loop,
+``numba.parallel_chunksize`` gives a similar dynamic split inside numba's
+own scheduler.
+"""
+
+import numpy as np
+from numba import get_num_threads, njit, prange
+
+from ..atomic import atomic_add
+
+
+@njit
+def next_chunk(cursor, n, grain):
+    """Claim the next ``grain`` iterations of ``range(n)`` from ``cursor``.
+
+    ``cursor`` is a 1-element int64 array shared by all workers. Returns
+    ``(start, stop)``; ``start >= stop`` once the range is exhausted.
+    """
+    start = atomic_add(cursor, 0, grain)
+    if start > n:
+        start = n
+    return start, min(start + grain, n)
+
+
+@njit
+def _auto_grain(n, workers):
+    return max(1, n // (8 * workers))
+
+
+@njit(parallel=True)
+def parallel_for(body, n, grain, *args):
+    """Call the jitted ``body(i, *args)`` for every ``i`` in ``range(n)``.
+
+    Iterations are handed out in chunks of ``grain`` (``0`` for automatic)
+    to whichever thread is free. Order across chunks is unspecified, so
+    ``body`` must only write to locations owned by ``i`` or use
+    ``numba_extras.atomic``.
+    """
+    if grain < 0:
+        raise ValueError("grain must be non-negative")
+    workers = get_num_threads()
+    if grain == 0:
+        grain = _auto_grain(n, workers)
+    cursor = np.zeros(1, np.int64)
+    for _ in prange(workers):
+        while True:
+            start, stop = next_chunk(cursor, n, grain)
+            if start >= stop:
+                break
+            for i in range(start, stop):
+                body(i, *args)
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+
+def test_parallel_for_skewed_work():
+    from numba import njit
+    from numba_extras.tasks import parallel_for
+
+    @njit
+    def body(i, lengths, out):
+        acc = 0
+        for k in range(lengths[i]):
+            acc += k
+        out[i] = acc
+
+    lengths = np.random.RandomState(0).zipf(1.5, 5000) % 5000
+    for grain in (0, 1, 7, 10000):
+        out = np.full(lengths.shape[0], -1, np.int64)
+        parallel_for(body, lengths.shape[0], grain, lengths, out)
+        np.testing.assert_array_equal(out, lengths * (lengths - 1) // 2)
+
+
+def test_parallel_for_empty_and_invalid():
+    from numba import njit
+    from numba_extras.tasks import parallel_for
+
+    @njit
+    def body(i, out):
+        out[i] = 1
+
+    out = np.zeros(3, np.int64)
+    parallel_for(body, 0, 4, out)
+    assert out.sum() == 0
+    with pytest.raises(ValueError):
+        parallel_for(body, 3, -1, out)
+
+
+def test_next_chunk_covers_range():
+    from numba import njit
+    from numba_extras.tasks import next_chunk
+
+    @njit
+    def drain(n, grain):
+        cursor = np.zeros(1, np.int64)
+        bounds = []
+        while True:
+            start, stop = next_chunk(cursor, n, grain)
+            if start >= stop:
+                break
+            bounds.append((start, stop))
+        return bounds
+
+    assert drain(10, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert drain(0, 4) == []
@@ -0,0 +1,11 @@
+from .ufuncs import (  # noqa: F401
+    DEFAULT_PARALLEL_THRESHOLDS,
+    clip_scale,
+    cummax_reset,
+    cumsum_reset,
+    ema,
+    rolling_mean,
+    rolling_std,
+    rolling_sum,
+    str_prefix,
+)
@@ -0,0 +1,139 @@
+import numpy as np
+import pytest
+
+
+def _series(n=200, seed=0):
+    return np.random.RandomState(seed).standard_normal(n)
+
+
+@pytest.mark.parametrize("target", ["cpu", "parallel"])
+def test_rolling_against_pandas(target):
+    pd = pytest.importorskip("pandas")
+    from numba_extras.ufuncs import rolling_mean, rolling_std, rolling_sum
+
+    x = _series()
+    expected = pd.Series(x).rolling(7)
+    np.testing.assert_allclose(rolling_sum(x, 7, target=target), expected.sum())
+    np.testing.assert_allclose(rolling_mean(x, 7, target=target), expected.mean())
+    np.testing.assert_allclose(rolling_std(x, 7, target=target), expected.std())
+
+
+def test_rolling_over_rows():
+    from numba_extras.ufuncs import rolling_mean
+
+    x = _series(300).reshape(3, 100)
+    out = rolling_mean(x, 5, target="parallel")
+    for row, got in zip(x, out):
+        np.testing.assert_allclose(got, rolling_mean(row, 5))
+
+
+@pytest.mark.parametrize("target", ["cpu", "parallel"])
+def test_rolling_with_gaps_against_pandas(target):
+    pd = pytest.importorskip("pandas")
+    from numba_extras import window
+    from numba_extras.ufuncs import rolling_mean, rolling_std, rolling_sum
+
+    x = np.array([1.0, 2.0, np.nan, 4.0, 5.0, 6.0, 7.0])
+    np.testing.assert_allclose(
+        rolling_sum(x, 2, target=target), [np.nan, 3, np.nan, np.nan, 9, 11, 13]
+    )
+    x = _series()
+    x[::11] = np.nan
+    expected = pd.Series(x).rolling(6, min_periods=2)
+    np.testing.assert_allclose(rolling_sum(x, 6, 2, target), expected.sum())
+    np.testing.assert_allclose(rolling_mean(x, 6, 2, target), expected.mean())
+    np.testing.assert_allclose(
+        rolling_std(x, 6, 2, target), window.rolling_std(x, 6, 2)
+    )
+
+
+def test_float32_loops():
+    from numba_extras.ufuncs import cumsum_reset, ema, rolling_sum
+
+    x = np.ones(5, np.float32)
+    assert rolling_sum(x, 2).dtype == np.float32
+    assert cumsum_reset(x, np.zeros(5, bool)).dtype == np.float32
+    assert ema(x, 0.5).dtype == np.float32
+
+
+@pytest.mark.parametrize("window", [1, 5, 300])
+def test_chunked_1d_matches_serial(window):
+    from numba_extras.ufuncs import rolling_mean, rolling_std, rolling_sum
+
+    x = _series(5000)
+    x[::7] = np.nan
+    for fn in (rolling_sum, rolling_mean, rolling_std):
+        np.testing.assert_allclose(
+            fn(x, window, 1, target="parallel"),
+            fn(x, window, 1, target="cpu"),
+            rtol=1e-9,
+        )
+    assert rolling_sum(x.astype(np.float32), 5, target="parallel").dtype == np.float32
+
+
+def test_rolling_rejects_bad_window():
+    from numba_extras.ufuncs import rolling_sum
+
+    with pytest.raises(ValueError):
+        rolling_sum(_series(), 0)
+    with pytest.raises(ValueError):
+        rolling_sum(_series(), 3, min_periods=4)
+
+
+def test_cumulative_with_resets():
+    from numba_extras.ufuncs import cummax_reset, cumsum_reset
+
+    x = np.array([1.0, 2.0, 3.0, 1.0, 5.0, 2.0])
+    reset = np.array([False, False, True, False, False, True])
+    np.testing.assert_array_equal(cumsum_reset(x, reset), [1, 3, 3, 4, 9, 2])
+    np.testing.assert_array_equal(cummax_reset(x, reset), [1, 2, 3, 3, 5, 2])
+    np.testing.assert_array_equal(
+        cumsum_reset(x, reset.astype(int)), [1, 3, 3, 4, 9, 2]
+    )
+    x[1] = np.nan
+    np.testing.assert_array_equal(cumsum_reset(x, reset), [1, np.nan, 3, 4, 9, 2])
+    np.testing.assert_array_equal(cummax_reset(x, reset), [1, np.nan, 3, 3, 5, 2])
+
+
+def test_ema_against_pandas():
+    pd = pytest.importorskip("pandas")
+    from numba_extras.ufuncs import ema
+
+    x = _series()
+    x[[0, 1, 40, 41, 42, 99]] = np.nan
+    expected = pd.Series(x).ewm(alpha=0.3, adjust=False).mean()
+    np.testing.assert_allclose(ema(x, 0.3), expected)
+    np.testing.assert_allclose(ema([1.0, np.nan, 3.0], 0.5), [1.0, 1.0, 7 / 3])
+    with pytest.raises(ValueError):
+        ema(x, 0.0)
+
+
+@pytest.mark.parametrize("target", ["cpu", "parallel"])
+def test_clip_scale(target):
+    from numba_extras.ufuncs import clip_scale
+
+    x = np.array([-5.0, 0.0, 2.5, 5.0, 50.0])
+    np.testing.assert_allclose(
+        clip_scale(x, 0.0, 5.0, target), [0.0, 0.0, 0.5, 1.0, 1.0]
+    )
+
+
+def test_str_prefix():
+    from numba import njit, typed
+    from numba_extras.ufuncs import str_prefix
+
+    assert str_prefix("world", "Hi, ") == "Hi, world"
+    assert str_prefix(["a", "b"], ">") == [">a", ">b"]
+    assert str_prefix(np.array(["x", "yz"]), "-") == ["-x", "-yz"]
+    with pytest.raises(ValueError):
+        str_prefix(np.array([["x"]]), "-")
+
+    @njit
+    def jitted(msg, prefix):
+        return str_prefix(msg, prefix)
+
+    assert jitted("world", "Hi, ") == "Hi, world"
+    assert list(jitted(typed.List(["a", "b"]), ">")) == [">a", ">b"]
+    assert jitted(np.array(["x", "yz"]), "-") == ["-x", "-yz"]
+    with pytest.raises(ValueError):
+        jitted(np.array([["x"]]), "-")
@@ -0,0 +1,293 @@
+"""NumPy ufuncs and gufuncs for time-series features.
+
+Every function takes ``target=None | "cpu" | "parallel"``. With ``None``
+the parallel build is used once the input size reaches
+``DEFAULT_PARALLEL_THRESHOLDS[kind]``. gufuncs parallelise over their loop
+(leading) dimensions; a long 1-d input to the rolling functions is instead
+split into chunks that overlap by ``window - 1`` samples and run as rows.
+The cumulative functions and ``ema`` carry state across the whole series, so
+a single 1-d series always runs on one thread. Builds are compiled lazily on
+first use of each target.
+"""
+
+import numpy as np
+from numba import get_num_threads, guvectorize, types, vectorize
+from numba.extending import overload
+
+from ..window import rolling_mean_into, rolling_std_into, rolling_sum_into
+
+# Total input size at which the ``target="parallel"`` build is picked over
+# the single-threaded one. ``benchmarks/bench_ufuncs.py`` measures the
+# crossover; run it on the deployment hardware and update this mapping. With
+# a single numba thread the parallel builds never won in that benchmark, so
+# they are not auto-selected then.
+DEFAULT_PARALLEL_THRESHOLDS = {
+    "rolling": 1 << 16,
+    "cumulative": 1 << 18,
+    "elementwise": 1 << 20,
+}
+
+# float32 loops come first: NumPy picks the first loop its inputs can be
+# safely cast to, so listing float64 first would upcast float32 input.
+_ROLLING_SERIES = [
+    "void(float32[:], int64, int64, float32[:])",
+    "void(float64[:], int64, int64, float64[:])",
+]
+_RESET_SERIES = [
+    "void(float32[:], boolean[:], float32[:])",
+    "void(float64[:], boolean[:], float64[:])",
+]
+_EMA_SERIES = [
+    "void(float32[:], float64, float32[:])",
+    "void(float64[:], float64, float64[:])",
+]
+_CLIP_SCALE = [
+    "float32(float32, float32, float32)",
+    "float64(float64, float64, float64)",
+]
+
+
+class _Builds:
+    # Compiles ``kernel`` for a target on first request and caches it.
+    def __init__(self, build, kernel):
+        self._build = build
+        self._kernel = kernel
+        self._cache = {}
+
+    def __getitem__(self, target):
+        if target not in ("cpu", "parallel"):
+            raise KeyError(target)
+        if target not in self._cache:
+            self._cache[target] = self._build(target)(self._kernel)
+        return self._cache[target]
+
+
+def _gufunc(signatures, layout):
+    def wrap(kernel):
+        def build(target):
+            return guvectorize(signatures, layout, nopython=True, target=target)
+
+        return _Builds(build, kernel)
+
+    return wrap
+
+
+def _ufunc(signatures):
+    def wrap(kernel):
+        def build(target):
+            return vectorize(signatures, nopython=True, target=target)
+
+        return _Builds(build, kernel)
+
+    return wrap
+
+
+def _resolve(x, kind, target, serial_1d=False):
+    if target is None:
+        big = x.size >= DEFAULT_PARALLEL_THRESHOLDS[kind]
+        # A 1-d series cannot be split for kernels that carry state across
+        # it, so the parallel build would only add overhead.
+        looped = x.ndim > 1 or not serial_1d
+        threaded = get_num_threads() > 1
+        target = "parallel" if big and looped and threaded else "cpu"
+    if target not in ("cpu", "parallel"):
+        raise ValueError("unknown target {!r}".format(target))
+    return target
+
+
+def _select(builds, x, kind, target, serial_1d=False):
+    return builds[_resolve(x, kind, target, serial_1d)]
+
+
+# The rolling gufuncs run the count-window kernels of numba_extras.window, so
+# NaN handling and ``min_periods`` match ``numba_extras.window.rolling_*``.
+@_gufunc(_ROLLING_SERIES, "(n),(),()->(n)")
+def _rolling_sum(x, window, min_periods, out):
+    rolling_sum_into(x, window, out, min_periods)
+
+
+@_gufunc(_ROLLING_SERIES, "(n),(),()->(n)")
+def _rolling_mean(x, window, min_periods, out):
+    rolling_mean_into(x, window, out, min_periods)
+
+
+@_gufunc(_ROLLING_SERIES, "(n),(),()->(n)")
+def _rolling_std(x, window, min_periods, out):
+    rolling_std_into(x, window, out, min_periods)
+
+
+@_gufunc(_RESET_SERIES, "(n),(n)->(n)")
+def _cumsum_reset(x, reset, out):
+    acc = 0.0
+    for i in range(x.shape[0]):
+        if reset[i]:
+            acc = 0.0
+        if np.isnan(x[i]):
+            out[i] = np.nan
+            continue
+        acc += x[i]
+        out[i] = acc
+
+
+@_gufunc(_RESET_SERIES, "(n),(n)->(n)")
+def _cummax_reset(x, reset, out):
+    acc = -np.inf
+    for i in range(x.shape[0]):
+        if reset[i]:
+            acc = -np.inf
+        if np.isnan(x[i]):
+            out[i] = np.nan
+            continue
+        if x[i] > acc:
+            acc = x[i]
+        out[i] = acc
+
+
+@_gufunc(_EMA_SERIES, "(n),()->(n)")
+def _ema(x, alpha, out):
+    # pandas ``ewm(alpha=alpha, adjust=False).mean()``: NaNs are skipped, the
+    # previous average is repeated at their position and its weight keeps
+    # decaying across the gap.
+    weighted = np.nan
+    old_wt = 1.0
+    for i in range(x.shape[0]):
+        cur = x[i]
+        observed = not np.isnan(cur)
+        if not np.isnan(weighted):
+            old_wt *= 1.0 - alpha
+            if observed:
+                if weighted != cur:
+                    weighted = (old_wt * weighted + alpha * cur) / (old_wt + alpha)
+                old_wt = 1.0
+        elif observed:
+            weighted = cur
+        out[i] = weighted
+
+
+@_ufunc(_CLIP_SCALE)
+def _clip_scale(x, lo, hi):
+    if x < lo:
+        x = lo
+    elif x > hi:
+        x = hi
+    return (x - lo) / (hi - lo)
+
+
+def _rolling(builds, x, window, min_periods, target):
+    if window < 1:
+        raise ValueError("window must be at least 1")
+    if min_periods is None:
+        min_periods = window
+    if not 0 <= min_periods <= window:
+        raise ValueError("min_periods must be in [0, window]")
+    x = np.asarray(x)
+    target = _resolve(x, "rolling", target)
+    # NaN gaps are expected input; vectorised comparisons against them must
+    # not surface as floating point warnings.
+    with np.errstate(invalid="ignore"):
+        if target == "parallel" and x.ndim == 1:
+            return _chunked(builds["parallel"], x, window, min_periods)
+        return builds[target](x, window, min_periods)
+
+
+def _chunked(gufunc, x, window, min_periods):
+    # Each row holds a chunk plus the ``window - 1`` samples before it. The
+    # series is padded with NaN in front, which the window kernels treat the
+    # same as the start of the series.
+    n = x.shape[0]
+    overlap = window - 1
+    chunk = max(4 * window, -(-n // (4 * get_num_threads())))
+    rows = -(-n // chunk)
+    dtype = x.dtype if x.dtype == np.float32 else np.float64
+    padded = np.full(overlap + rows * chunk, np.nan, dtype)
+    padded[overlap : overlap + n] = x
+    step = padded.strides[0]
+    view = np.lib.stride_tricks.as_strided(
+        padded, (rows, chunk + overlap), (chunk * step, step), writeable=False
+    )
+    out = gufunc(view, window, min_periods)
+    return out[:, overlap:].reshape(-1)[:n]
+
+
+def rolling_sum(x, window, min_periods=None, target=None):
+    """Rolling sum over the last axis; see numba_extras.window.rolling_sum."""
+    return _rolling(_rolling_sum, x, window, min_periods, target)
+
+
+def rolling_mean(x, window, min_periods=None, target=None):
+    """Rolling mean over the last axis; see numba_extras.window.rolling_mean."""
+    return _rolling(_rolling_mean, x, window, min_periods, target)
+
+
+def rolling_std(x, window, min_periods=None, target=None):
+    """Rolling std over the last axis; see numba_extras.window.rolling_std."""
+    return _rolling(_rolling_std, x, window, min_periods, target)
+
+
+def cumsum_reset(x, reset, target=None):
+    x = np.asarray(x)
+    reset = np.asarray(reset, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        return _select(_cumsum_reset, x, "cumulative", target, True)(x, reset)
+
+
+def cummax_reset(x, reset, target=None):
+    x = np.asarray(x)
+    reset = np.asarray(reset, dtype=bool)
+    with np.errstate(invalid="ignore"):
+        return _select(_cummax_reset, x, "cumulative", target, True)(x, reset)
+
+
+def ema(x, alpha, target=None):
+    if not 0.0 < alpha <= 1.0:
+        raise ValueError("alpha must be in (0, 1]")
+    x = np.asarray(x)
+    return _select(_ema, x, "cumulative", target, True)(x, alpha)
+
+
+def clip_scale(x, lo, hi, target=None):
+    if not lo < hi:
+        raise ValueError("lo must be smaller than hi")
+    x = np.asarray(x)
+    return _select(_clip_scale, x, "elementwise", target)(x, lo, hi)
+
+
+def str_prefix(msg, prefix):
+    """Prepend ``prefix`` to a string or to each string of a 1-d sequence.
+
+    A single string gives a string and a 1-d sequence or array gives a list
+    of strings, both from Python and from ``@njit`` code.
+    """
+    if isinstance(msg, str):
+        return prefix + msg
+    if isinstance(msg, np.ndarray) and msg.ndim != 1:
+        raise ValueError("str_prefix expects a string or a 1-d sequence")
+    return [prefix + str(m) for m in msg]
+
+
+@overload(str_prefix)
+def _ol_str_prefix(msg, prefix):
+    if not isinstance(prefix, types.UnicodeType):
+        return None
+    if isinstance(msg, types.UnicodeType):
+        return lambda msg, prefix: prefix + msg
+    if isinstance(msg, (types.List, types.ListType)) and isinstance(
+        msg.dtype, types.UnicodeType
+    ):
+
+        def impl(msg, prefix):
+            return [prefix + m for m in msg]
+
+        return impl
+    if isinstance(msg, types.Array) and isinstance(msg.dtype, types.UnicodeCharSeq):
+        if msg.ndim != 1:
+
+            def impl(msg, prefix):
+                raise ValueError("str_prefix expects a string or a 1-d sequence")
+
+            return impl
+
+        def impl(msg, prefix):
+            return [prefix + str(m) for m in msg]
+
+        return impl
@@ -0,0 +1,27 @@
+from .window import (  # noqa: F401
+    RollingMax,
+    RollingMin,
+    RollingMoments,
+    RollingQuantile,
+    rolling_max,
+    rolling_max_into,
+    rolling_mean,
+    rolling_mean_into,
+    rolling_min,
+    rolling_min_into,
+    rolling_quantile,
+    rolling_quantile_into,
+    rolling_std,
+    rolling_std_into,
+    rolling_sum,
+    rolling_sum_into,
+    rolling_var,
+    rolling_var_into,
+    time_rolling_max,
+    time_rolling_mean,
+    time_rolling_min,
+    time_rolling_quantile,
+    time_rolling_std,
+    time_rolling_sum,
+    time_rolling_var,
+)
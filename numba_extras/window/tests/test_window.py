@@ -0,0 +1,226 @@
+import numpy as np
+import pytest
+
+
+def _series(n=500, seed=0, nans=True):
+    rs = np.random.RandomState(seed)
+    x = rs.standard_normal(n)
+    if nans:
+        x[rs.rand(n) < 0.05] = np.nan
+    return x
+
+
+def _times(n=500, seed=1):
+    rs = np.random.RandomState(seed)
+    return np.cumsum(rs.randint(1, 2000, n)).astype(np.int64) * 1000000
+
+
+@pytest.mark.parametrize("window", [1, 2, 7, 64])
+def test_count_windows_against_pandas(window):
+    pd = pytest.importorskip("pandas")
+    from numba_extras import window as w
+
+    x = _series()
+    expected = pd.Series(x).rolling(window)
+    np.testing.assert_allclose(w.rolling_sum(x, window), expected.sum())
+    np.testing.assert_allclose(w.rolling_mean(x, window), expected.mean())
+    np.testing.assert_allclose(w.rolling_min(x, window), expected.min())
+    np.testing.assert_allclose(w.rolling_max(x, window), expected.max())
+    np.testing.assert_allclose(
+        w.rolling_quantile(x, window, 0.3), expected.quantile(0.3)
+    )
+    if window > 1:
+        np.testing.assert_allclose(w.rolling_var(x, window), expected.var(), atol=1e-12)
+        np.testing.assert_allclose(w.rolling_std(x, window), expected.std(), atol=1e-12)
+
+
+def test_min_periods_against_pandas():
+    pd = pytest.importorskip("pandas")
+    from numba_extras.window import rolling_mean, rolling_quantile
+
+    x = _series()
+    expected = pd.Series(x).rolling(10, min_periods=3)
+    np.testing.assert_allclose(rolling_mean(x, 10, 3), expected.mean())
+    np.testing.assert_allclose(rolling_quantile(x, 10, 0.5, 3), expected.quantile(0.5))
+
+
+@pytest.mark.parametrize("q", [0.0, 0.25, 0.5, 0.9, 1.0])
+def test_time_windows_against_pandas(q):
+    pd = pytest.importorskip("pandas")
+    from numba_extras import window as w
+
+    x = _series()
+    t = _times()
+    duration = 3 * 10**9
+    expected = pd.Series(x, index=pd.to_datetime(t)).rolling("3s")
+    np.testing.assert_allclose(
+        w.time_rolling_quantile(t, x, duration, q), expected.quantile(q)
+    )
+    np.testing.assert_allclose(w.time_rolling_sum(t, x, duration), expected.sum())
+    np.testing.assert_allclose(w.time_rolling_mean(t, x, duration), expected.mean())
+    np.testing.assert_allclose(w.time_rolling_min(t, x, duration), expected.min())
+    np.testing.assert_allclose(w.time_rolling_max(t, x, duration), expected.max())
+    np.testing.assert_allclose(
+        w.time_rolling_var(t, x, duration), expected.var(), atol=1e-12
+    )
+
+
+def test_quantile_matches_numpy_without_nans():
+    from numba_extras.window import rolling_quantile
+
+    x = _series(300, nans=False)
+    got = rolling_quantile(x, 25, 0.75)
+    for i in range(24, x.shape[0]):
+        assert got[i] == pytest.approx(np.quantile(x[i - 24 : i + 1], 0.75))
+
+
+def test_incremental_state_matches_batch():
+    from numba import njit
+    from numba_extras.window import (
+        RollingMax,
+        RollingMoments,
+        RollingQuantile,
+        rolling_max,
+        rolling_mean,
+        rolling_quantile,
+    )
+
+    @njit
+    def feed(moments, maximum, quantile, chunk):
+        out = np.empty((3, chunk.shape[0]))
+        for i in range(chunk.shape[0]):
+            moments.push(chunk[i])
+            maximum.push(chunk[i])
+            quantile.push(chunk[i])
+            out[0, i] = moments.mean()
+            out[1, i] = maximum.value()
+            out[2, i] = quantile.value()
+        return out
+
+    x = _series(nans=False)
+    moments = RollingMoments(20)
+    maximum = RollingMax(20)
+    quantile = RollingQuantile(20, 0.5)
+    parts = [feed(moments, maximum, quantile, c) for c in np.array_split(x, 7)]
+    got = np.concatenate(parts, axis=1)[:, 19:]
+    np.testing.assert_allclose(got[0], rolling_mean(x, 20)[19:])
+    np.testing.assert_allclose(got[1], rolling_max(x, 20)[19:])
+    np.testing.assert_allclose(got[2], rolling_quantile(x, 20, 0.5)[19:])
+
+
+def test_push_from_python():
+    from numba_extras.window import RollingMin, RollingMoments
+
+    state = RollingMin(3)
+    for x in [5.0, 3.0, 4.0, 6.0, 7.0]:
+        state.push(x)
+    assert state.value() == 4.0
+
+    moments = RollingMoments(10)
+    moments.push_at(0, 1.0)
+    moments.push_at(4, 2.0)
+    moments.push_at(12, 6.0)
+    assert moments.count() == 2
+    assert moments.sum() == pytest.approx(8.0)
+
+
+def test_invalid_arguments():
+    from numba_extras.window import RollingMoments, RollingQuantile
+
+    with pytest.raises(ValueError):
+        RollingMoments(0)
+    with pytest.raises(ValueError):
+        RollingQuantile(5, 1.5)
+
+
+def _naive(x, window, reduce):
+    out = np.full(x.shape[0], np.nan)
+    for i in range(x.shape[0]):
+        chunk = x[max(0, i - window + 1) : i + 1]
+        chunk = chunk[~np.isnan(chunk)]
+        if chunk.shape[0]:
+            out[i] = reduce(chunk)
+    return out
+
+
+def test_infinities_only_affect_their_windows():
+    from numba_extras import window as w
+
+    x = np.array([1.0, np.inf, 2.0, 3.0, -np.inf, np.inf, 4.0, 5.0, np.nan, 6.0])
+    with np.errstate(invalid="ignore"):
+        for window in (1, 2, 3):
+            np.testing.assert_allclose(
+                w.rolling_sum(x, window, 1), _naive(x, window, np.sum)
+            )
+            np.testing.assert_allclose(
+                w.rolling_mean(x, window, 1), _naive(x, window, np.mean)
+            )
+    np.testing.assert_allclose(
+        w.rolling_sum(np.array([1.0, np.inf, 2.0, 3.0, 4.0, 5.0]), 2),
+        [np.nan, np.inf, np.inf, 5.0, 7.0, 9.0],
+    )
+    var = w.rolling_var(x, 2, 1)
+    assert np.isnan(var[[1, 2, 4, 5, 6]]).all()
+    assert var[3] == pytest.approx(0.5)
+    assert var[7] == pytest.approx(0.5)
+
+
+def test_variance_recovers_after_magnitude_change():
+    from numba_extras.window import rolling_var
+
+    x = _series(20000, nans=False)
+    x[:1000] *= 1e6
+    got = rolling_var(x, 10)[2000:]
+    expected = _naive(x, 10, lambda c: np.var(c, ddof=1) if len(c) > 1 else np.nan)
+    expected = expected[2000:]
+    np.testing.assert_allclose(got, expected, rtol=1e-9)
+
+
+def test_min_periods_zero_and_invalid():
+    pd = pytest.importorskip("pandas")
+    from numba_extras.window import rolling_mean, rolling_sum
+
+    x = np.array([np.nan, np.nan, 1.0, np.nan, np.nan, np.nan])
+    expected = pd.Series(x).rolling(2, min_periods=0)
+    np.testing.assert_allclose(rolling_sum(x, 2, 0), expected.sum())
+    np.testing.assert_allclose(rolling_mean(x, 2, 0), expected.mean())
+    with pytest.raises(ValueError):
+        rolling_sum(x, 2, -1)
+    with pytest.raises(ValueError):
+        rolling_sum(x, 2, 3)
+
+
+def test_unsorted_times_raise():
+    from numba_extras.window import time_rolling_sum
+
+    times = np.array([0, 5, 3, 10, 2], dtype=np.int64)
+    with pytest.raises(ValueError):
+        time_rolling_sum(times, np.ones(5), 4)
+
+
+def test_datetime64_times_against_pandas():
+    pd = pytest.importorskip("pandas")
+    from numba_extras.window import time_rolling_mean
+
+    x = _series()
+    t = _times().astype("datetime64[ns]")
+    expected = pd.Series(x, index=t).rolling("2s").mean()
+    np.testing.assert_allclose(time_rolling_mean(t, x, 2 * 10**9), expected)
+
+
+def test_states_reject_decreasing_keys():
+    from numba_extras.window import RollingMax, RollingMoments, RollingQuantile
+
+    for state in (RollingMoments(10), RollingMax(10), RollingQuantile(10, 0.5)):
+        state.push_at(100, 1.0)
+        with pytest.raises(ValueError):
+            state.push_at(50, 2.0)
+
+
+def test_into_writes_caller_buffer():
+    from numba_extras.window import rolling_sum, rolling_sum_into
+
+    x = _series()
+    out = np.empty_like(x)
+    assert rolling_sum_into(x, 5, out, 2) is out
+    np.testing.assert_array_equal(out, rolling_sum(x, 5, 2))
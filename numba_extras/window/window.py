@@ -0,0 +1,675 @@
+"""Streaming rolling-window statistics.
+
+Every statistic is backed by a jitclass state that can be fed one observation
+at a time, from Python or from ``@njit`` code, so that new data can be
+appended without recomputing the window. Observations carry an integer key;
+an observation expires once the newest key reaches ``key + span``. ``push``
+keys observations by arrival order (fixed-size windows) while ``push_at``
+takes explicit timestamps (time-based windows over irregular samples); keys
+must never decrease. NaN observations advance the window but are otherwise
+ignored, and infinities are tracked apart from the finite moments so a single
+``inf`` only affects the windows that contain it.
+
+The ``rolling_*_into`` kernels also back the ``rolling_*`` gufuncs in
+:mod:`numba_extras.ufuncs`, so both share NaN and ``min_periods`` semantics.
+"""
+
+import numpy as np
+from numba import float64, int64, njit, types
+from numba.experimental import jitclass
+from numba.extending import overload
+
+_INITIAL_CAPACITY = 16
+_NO_KEY = np.iinfo(np.int64).min
+
+
+_moments_spec = [
+    ("span", int64),
+    ("seen", int64),
+    ("latest", int64),
+    ("keys", int64[:]),
+    ("vals", float64[:]),
+    ("head", int64),
+    ("size", int64),
+    ("finite", int64),
+    ("posinf", int64),
+    ("neginf", int64),
+    ("removed", int64),
+    ("mean_", float64),
+    ("m2", float64),
+]
+
+
+@jitclass(_moments_spec)
+class RollingMoments:
+    # Welford's algorithm over the finite observations, with infinities only
+    # counted so that they cannot poison the running sums. Down-dating drifts
+    # when magnitudes change, so the moments are recomputed exactly from the
+    # ring buffer once as many observations have expired as are live, which
+    # keeps updates amortised O(1).
+    def __init__(self, span):
+        if span < 1:
+            raise ValueError("span must be at least 1")
+        self.span = span
+        self.seen = 0
+        self.latest = _NO_KEY
+        self.keys = np.empty(_INITIAL_CAPACITY, np.int64)
+        self.vals = np.empty(_INITIAL_CAPACITY, np.float64)
+        self.head = 0
+        self.size = 0
+        self.finite = 0
+        self.posinf = 0
+        self.neginf = 0
+        self.removed = 0
+        self.mean_ = 0.0
+        self.m2 = 0.0
+
+    def push(self, x):
+        self.push_at(self.seen, x)
+        self.seen += 1
+
+    def _advance(self, key):
+        if key < self.latest:
+            raise ValueError("keys must be non-decreasing")
+        self.latest = key
+
+    def push_at(self, key, x):
+        self._advance(key)
+        cap = self.keys.shape[0]
+        expired = False
+        while self.size > 0 and self.keys[self.head] <= key - self.span:
+            self._discard(self.vals[self.head])
+            self.head = (self.head + 1) % cap
+            self.size -= 1
+            expired = True
+        if expired and self.removed >= self.finite:
+            self._resync()
+        if np.isnan(x):
+            return
+        if self.size == cap:
+            self._grow()
+            cap = self.keys.shape[0]
+        tail = (self.head + self.size) % cap
+        self.keys[tail] = key
+        self.vals[tail] = x
+        self.size += 1
+        if x == np.inf:
+            self.posinf += 1
+        elif x == -np.inf:
+            self.neginf += 1
+        else:
+            self.finite += 1
+            delta = x - self.mean_
+            self.mean_ += delta / self.finite
+            self.m2 += delta * (x - self.mean_)
+
+    def _discard(self, old):
+        if old == np.inf:
+            self.posinf -= 1
+            return
+        if old == -np.inf:
+            self.neginf -= 1
+            return
+        self.finite -= 1
+        self.removed += 1
+        if self.finite == 0:
+            self.mean_ = 0.0
+            self.m2 = 0.0
+        else:
+            prev = self.mean_
+            self.mean_ += (prev - old) / self.finite
+            self.m2 -= (old - prev) * (old - self.mean_)
+
+    def _resync(self):
+        cap = self.keys.shape[0]
+        total = 0.0
+        for i in range(self.size):
+            v = self.vals[(self.head + i) % cap]
+            if np.isfinite(v):
+                total += v
+        mean = total / self.finite if self.finite > 0 else 0.0
+        m2 = 0.0
+        for i in range(self.size):
+            v = self.vals[(self.head + i) % cap]
+            if np.isfinite(v):
+                m2 += (v - mean) * (v - mean)
+        self.mean_ = mean
+        self.m2 = m2
+        self.removed = 0
+
+    def _grow(self):
+        cap = self.keys.shape[0]
+        keys = np.empty(2 * cap, np.int64)
+        vals = np.empty(2 * cap, np.float64)
+        for i in range(self.size):
+            j = (self.head + i) % cap
+            keys[i] = self.keys[j]
+            vals[i] = self.vals[j]
+        self.keys = keys
+        self.vals = vals
+        self.head = 0
+
+    def _infinite(self):
+        if self.posinf > 0 and self.neginf > 0:
+            return np.nan
+        if self.posinf > 0:
+            return np.inf
+        return -np.inf
+
+    def count(self):
+        return self.size
+
+    def sum(self):
+        if self.finite < self.size:
+            return self._infinite()
+        return self.mean_ * self.finite
+
+    def mean(self):
+        if self.size == 0:
+            return np.nan
+        if self.finite < self.size:
+            return self._infinite()
+        return self.mean_
+
+    def var(self):
+        if self.size < 2 or self.finite < self.size:
+            return np.nan
+        return max(self.m2, 0.0) / (self.size - 1)
+
+    def std(self):
+        return np.sqrt(self.var())
+
+
+_extremum_spec = [
+    ("span", int64),
+    ("seen", int64),
+    ("latest", int64),
+    ("keys", int64[:]),
+    ("vals", float64[:]),
+    ("head", int64),
+    ("size", int64),
+]
+
+
+def _make_extremum(name, sign):
+    # Monotonic deque over ``sign * x``: the front is always the minimum of
+    # the live window and every observation is pushed and popped once.
+    class _Extremum:
+        def __init__(self, span):
+            if span < 1:
+                raise ValueError("span must be at least 1")
+            self.span = span
+            self.seen = 0
+            self.latest = _NO_KEY
+            self.keys = np.empty(_INITIAL_CAPACITY, np.int64)
+            self.vals = np.empty(_INITIAL_CAPACITY, np.float64)
+            self.head = 0
+            self.size = 0
+
+        def push(self, x):
+            self.push_at(self.seen, x)
+            self.seen += 1
+
+        def push_at(self, key, x):
+            if key < self.latest:
+                raise ValueError("keys must be non-decreasing")
+            self.latest = key
+            cap = self.keys.shape[0]
+            while self.size > 0 and self.keys[self.head] <= key - self.span:
+                self.head = (self.head + 1) % cap
+                self.size -= 1
+            if np.isnan(x):
+                return
+            v = sign * x
+            while self.size > 0 and self.vals[(self.head + self.size - 1) % cap] >= v:
+                self.size -= 1
+            if self.size == cap:
+                self._grow()
+                cap = self.keys.shape[0]
+            tail = (self.head + self.size) % cap
+            self.keys[tail] = key
+            self.vals[tail] = v
+            self.size += 1
+
+        def _grow(self):
+            cap = self.keys.shape[0]
+            keys = np.empty(2 * cap, np.int64)
+            vals = np.empty(2 * cap, np.float64)
+            for i in range(self.size):
+                j = (self.head + i) % cap
+                keys[i] = self.keys[j]
+                vals[i] = self.vals[j]
+            self.keys = keys
+            self.vals = vals
+            self.head = 0
+
+        def value(self):
+            if self.size == 0:
+                return np.nan
+            return sign * self.vals[self.head]
+
+    _Extremum.__name__ = _Extremum.__qualname__ = name
+    return jitclass(_extremum_spec)(_Extremum)
+
+
+RollingMin = _make_extremum("RollingMin", 1.0)
+RollingMax = _make_extremum("RollingMax", -1.0)
+
+
+_quantile_spec = [
+    ("span", int64),
+    ("seen", int64),
+    ("latest", int64),
+    ("q", float64),
+    ("keys", int64[:]),
+    ("vals", float64[:]),
+    ("head", int64),
+    ("size", int64),
+    ("heaps", int64[:, :]),
+    ("counts", int64[:]),
+    ("side", int64[:]),
+    ("pos", int64[:]),
+]
+
+_LO = 0
+_HI = 1
+
+
+@jitclass(_quantile_spec)
+class RollingQuantile:
+    # Two indexed heaps over ring-buffer slots: ``heaps[_LO]`` is a max-heap
+    # holding the lowest ``floor((n - 1) * q) + 1`` values and ``heaps[_HI]``
+    # a min-heap with the rest. Tracking each slot's heap position lets the
+    # oldest observation be removed in O(log w) when it expires.
+    def __init__(self, span, q):
+        if span < 1:
+            raise ValueError("span must be at least 1")
+        if not 0.0 <= q <= 1.0:
+            raise ValueError("q must be in [0, 1]")
+        self.span = span
+        self.seen = 0
+        self.latest = _NO_KEY
+        self.q = q
+        self.keys = np.empty(_INITIAL_CAPACITY, np.int64)
+        self.vals = np.empty(_INITIAL_CAPACITY, np.float64)
+        self.head = 0
+        self.size = 0
+        self.heaps = np.empty((2, _INITIAL_CAPACITY), np.int64)
+        self.counts = np.zeros(2, np.int64)
+        self.side = np.empty(_INITIAL_CAPACITY, np.int64)
+        self.pos = np.empty(_INITIAL_CAPACITY, np.int64)
+
+    def push(self, x):
+        self.push_at(self.seen, x)
+        self.seen += 1
+
+    def _advance(self, key):
+        if key < self.latest:
+            raise ValueError("keys must be non-decreasing")
+        self.latest = key
+
+    def push_at(self, key, x):
+        self._advance(key)
+        cap = self.keys.shape[0]
+        while self.size > 0 and self.keys[self.head] <= key - self.span:
+            self._remove(self.head)
+            self.head = (self.head + 1) % cap
+            self.size -= 1
+        if not np.isnan(x):
+            if self.size == cap:
+                self._grow()
+                cap = self.keys.shape[0]
+            slot = (self.head + self.size) % cap
+            self.keys[slot] = key
+            self.vals[slot] = x
+            self.size += 1
+            if self.counts[_LO] > 0 and x <= self.vals[self.heaps[_LO, 0]]:
+                self._insert(_LO, slot)
+            else:
+                self._insert(_HI, slot)
+        self._rebalance()
+
+    def value(self):
+        n = self.size
+        if n == 0:
+            return np.nan
+        h = (n - 1) * self.q
+        frac = h - np.floor(h)
+        lower = self.vals[self.heaps[_LO, 0]]
+        if frac == 0.0:
+            return lower
+        upper = self.vals[self.heaps[_HI, 0]]
+        return lower + frac * (upper - lower)
+
+    def _target(self):
+        if self.size == 0:
+            return 0
+        return int(np.floor((self.size - 1) * self.q)) + 1
+
+    def _rebalance(self):
+        target = self._target()
+        while self.counts[_LO] > target:
+            self._move(_LO, _HI)
+        while self.counts[_LO] < target:
+            self._move(_HI, _LO)
+
+    def _move(self, src, dst):
+        slot = self.heaps[src, 0]
+        self._remove(slot)
+        self._insert(dst, slot)
+
+    def _before(self, h, a, b):
+        if h == _LO:
+            return self.vals[a] > self.vals[b]
+        return self.vals[a] < self.vals[b]
+
+    def _place(self, h, i, slot):
+        self.heaps[h, i] = slot
+        self.side[slot] = h
+        self.pos[slot] = i
+
+    def _insert(self, h, slot):
+        i = self.counts[h]
+        self.counts[h] += 1
+        self._place(h, i, slot)
+        self._sift_up(h, i)
+
+    def _remove(self, slot):
+        h = self.side[slot]
+        i = self.pos[slot]
+        last = self.counts[h] - 1
+        self.counts[h] = last
+        if i == last:
+            return
+        moved = self.heaps[h, last]
+        self._place(h, i, moved)
+        self._sift_up(h, i)
+        self._sift_down(h, self.pos[moved])
+
+    def _sift_up(self, h, i):
+        slot = self.heaps[h, i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            other = self.heaps[h, parent]
+            if not self._before(h, slot, other):
+                break
+            self._place(h, i, other)
+            i = parent
+        self._place(h, i, slot)
+
+    def _sift_down(self, h, i):
+        n = self.counts[h]
+        slot = self.heaps[h, i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            if child + 1 < n and self._before(
+                h, self.heaps[h, child + 1], self.heaps[h, child]
+            ):
+                child += 1
+            other = self.heaps[h, child]
+            if not self._before(h, other, slot):
+                break
+            self._place(h, i, other)
+            i = child
+        self._place(h, i, slot)
+
+    def _grow(self):
+        cap = self.keys.shape[0]
+        keys = np.empty(2 * cap, np.int64)
+        vals = np.empty(2 * cap, np.float64)
+        side = np.empty(2 * cap, np.int64)
+        pos = np.empty(2 * cap, np.int64)
+        heaps = np.empty((2, 2 * cap), np.int64)
+        for i in range(self.size):
+            j = (self.head + i) % cap
+            keys[i] = self.keys[j]
+            vals[i] = self.vals[j]
+            side[i] = self.side[j]
+            pos[i] = self.pos[j]
+        for h in range(2):
+            for i in range(self.counts[h]):
+                heaps[h, i] = (self.heaps[h, i] - self.head) % cap
+        self.keys = keys
+        self.vals = vals
+        self.side = side
+        self.pos = pos
+        self.heaps = heaps
+        self.head = 0
+
+
+def _as_keys(times):
+    times = np.asarray(times)
+    if times.dtype.kind == "M":
+        return times.view(np.int64)
+    return times
+
+
+@overload(_as_keys)
+def _ol_as_keys(times):
+    if isinstance(times, types.Array) and isinstance(times.dtype, types.NPDatetime):
+        return lambda times: np.ascontiguousarray(times).view(np.int64)
+    return lambda times: times
+
+
+@njit
+def _periods(min_periods, window):
+    # ``window`` is the default and upper bound for fixed-size windows and
+    # zero for time-based ones, which default to one observation.
+    if min_periods is None:
+        return max(window, 1)
+    if min_periods < 0:
+        raise ValueError("min_periods must be non-negative")
+    if window > 0 and min_periods > window:
+        raise ValueError("min_periods must not exceed window")
+    return min_periods
+
+
+@njit
+def _window_into(state, values, window, min_periods, stat, out):
+    if out.shape[0] != values.shape[0]:
+        raise ValueError("out must have the same length as values")
+    live = 0
+    for i in range(values.shape[0]):
+        if not np.isnan(values[i]):
+            live += 1
+        if i >= window and not np.isnan(values[i - window]):
+            live -= 1
+        state.push(values[i])
+        out[i] = stat(state) if live >= min_periods else np.nan
+    return out
+
+
+@njit
+def _time_window(state, times, values, duration, min_periods, stat):
+    keys = _as_keys(times)
+    n = values.shape[0]
+    if keys.shape[0] != n:
+        raise ValueError("times and values must have the same length")
+    out = np.empty(n, np.float64)
+    live = 0
+    j = 0
+    for i in range(n):
+        if i > 0 and keys[i] < keys[i - 1]:
+            raise ValueError("times must be non-decreasing")
+        if not np.isnan(values[i]):
+            live += 1
+        while keys[j] <= keys[i] - duration:
+            if not np.isnan(values[j]):
+                live -= 1
+            j += 1
+        state.push_at(keys[i], values[i])
+        out[i] = stat(state) if live >= min_periods else np.nan
+    return out
+
+
+@njit
+def _sum(state):
+    return state.sum()
+
+
+@njit
+def _mean(state):
+    return state.mean()
+
+
+@njit
+def _var(state):
+    return state.var()
+
+
+@njit
+def _std(state):
+    return state.std()
+
+
+@njit
+def _value(state):
+    return state.value()
+
+
+# Batch helpers. They follow pandas ``rolling`` for windows, ``min_periods``
+# and skipped NaNs, with one deliberate difference: pandas treats +/-inf like
+# NaN, whereas here an infinity is a regular observation that makes the sum
+# and mean of the windows containing it infinite (NaN if both signs are
+# present) and their variance NaN. The ``*_into`` variants write into a
+# caller-provided ``out`` array of the same length as ``values``.
+
+
+@njit
+def rolling_sum_into(values, window, out, min_periods=None):
+    mp = _periods(min_periods, window)
+    return _window_into(RollingMoments(window), values, window, mp, _sum, out)
+
+
+@njit
+def rolling_mean_into(values, window, out, min_periods=None):
+    mp = _periods(min_periods, window)
+    return _window_into(RollingMoments(window), values, window, mp, _mean, out)
+
+
+@njit
+def rolling_var_into(values, window, out, min_periods=None):
+    mp = _periods(min_periods, window)
+    return _window_into(RollingMoments(window), values, window, mp, _var, out)
+
+
+@njit
+def rolling_std_into(values, window, out, min_periods=None):
+    mp = _periods(min_periods, window)
+    return _window_into(RollingMoments(window), values, window, mp, _std, out)
+
+
+@njit
+def rolling_min_into(values, window, out, min_periods=None):
+    mp = _periods(min_periods, window)
+    return _window_into(RollingMin(window), values, window, mp, _value, out)
+
+
+@njit
+def rolling_max_into(values, window, out, min_periods=None):
+    mp = _periods(min_periods, window)
+    return _window_into(RollingMax(window), values, window, mp, _value, out)
+
+
+@njit
+def rolling_quantile_into(values, window, q, out, min_periods=None):
+    mp = _periods(min_periods, window)
+    state = RollingQuantile(window, q)
+    return _window_into(state, values, window, mp, _value, out)
+
+
+@njit
+def rolling_sum(values, window, min_periods=None):
+    out = np.empty(values.shape[0], np.float64)
+    return rolling_sum_into(values, window, out, min_periods)
+
+
+@njit
+def rolling_mean(values, window, min_periods=None):
+    out = np.empty(values.shape[0], np.float64)
+    return rolling_mean_into(values, window, out, min_periods)
+
+
+@njit
+def rolling_var(values, window, min_periods=None):
+    out = np.empty(values.shape[0], np.float64)
+    return rolling_var_into(values, window, out, min_periods)
+
+
+@njit
+def rolling_std(values, window, min_periods=None):
+    out = np.empty(values.shape[0], np.float64)
+    return rolling_std_into(values, window, out, min_periods)
+
+
+@njit
+def rolling_min(values, window, min_periods=None):
+    out = np.empty(values.shape[0], np.float64)
+    return rolling_min_into(values, window, out, min_periods)
+
+
+@njit
+def rolling_max(values, window, min_periods=None):
+    out = np.empty(values.shape[0], np.float64)
+    return rolling_max_into(values, window, out, min_periods)
+
+
+@njit
+def rolling_quantile(values, window, q, min_periods=None):
+    out = np.empty(values.shape[0], np.float64)
+    return rolling_quantile_into(values, window, q, out, min_periods)
+
+
+# Time-based windows take integer or datetime64 ``times``; ``duration`` is an
+# integer in the unit of ``times`` (nanoseconds for ``datetime64[ns]``).
+
+
+@njit
+def time_rolling_sum(times, values, duration, min_periods=None):
+    mp = _periods(min_periods, 0)
+    state = RollingMoments(duration)
+    return _time_window(state, times, values, duration, mp, _sum)
+
+
+@njit
+def time_rolling_mean(times, values, duration, min_periods=None):
+    mp = _periods(min_periods, 0)
+    state = RollingMoments(duration)
+    return _time_window(state, times, values, duration, mp, _mean)
+
+
+@njit
+def time_rolling_var(times, values, duration, min_periods=None):
+    mp = _periods(min_periods, 0)
+    state = RollingMoments(duration)
+    return _time_window(state, times, values, duration, mp, _var)
+
+
+@njit
+def time_rolling_std(times, values, duration, min_periods=None):
+    mp = _periods(min_periods, 0)
+    state = RollingMoments(duration)
+    return _time_window(state, times, values, duration, mp, _std)
+
+
+@njit
+def time_rolling_min(times, values, duration, min_periods=None):
+    mp = _periods(min_periods, 0)
+    state = RollingMin(duration)
+    return _time_window(state, times, values, duration, mp, _value)
+
+
+@njit
+def time_rolling_max(times, values, duration, min_periods=None):
+    mp = _periods(min_periods, 0)
+    state = RollingMax(duration)
+    return _time_window(state, times, values, duration, mp, _value)
+
+
+@njit
+def time_rolling_quantile(times, values, duration, q, min_periods=None):
+    mp = _periods(min_periods, 0)
+    state = RollingQuantile(duration, q)
+    return _time_window(state, times, values, duration, mp, _value)